@@ -1,4 +1,11 @@
+import lazy_loader as lazy
+
 from .paths import PKG_DIR, ROOT_DIR
 
-from . import colors
-from .muni_codes import load_munis_geojson
+__getattr__, __dir__, __all__ = lazy.attach(
+    __name__,
+    submodules=['colors'],
+    submod_attrs={
+        'muni_codes': ['load_munis_geojson'],
+    },
+)
@@ -6,6 +6,12 @@ all ~896k tenth-mile points via `resultOffset` pagination, writes to a
 single parquet with columns: SRI, MP, SLD_NAME, Second_Name,
 ROUTE_SUBT, lon, lat.
 
+Each fetched page is spooled to a numbered parquet fragment under
+`<output>.spool/`, and `manifest.json` there records which pages are
+complete. A failed or interrupted run can be rerun and only fetches the
+missing pages. The fragments are then streamed into the output one at a
+time, and the spool is removed.
+
 Source: ArcGIS FeatureServer
   https://services.arcgis.com/HggmsDF7UJsNN1FK/arcgis/rest/services/
     New_Jersey_Standard_Route_Id_And_Milepost/FeatureServer/0/
@@ -16,15 +22,20 @@ Run:
     nj_crashes/sri/bulk_dl.py                              # standard
     nj_crashes/sri/bulk_dl.py -o /tmp/mp.parquet -c 20     # custom
 """
+import json
+import os
+import shutil
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import partial
 from pathlib import Path
 
 import click
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import requests
-from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 err = partial(print, file=sys.stderr)
 
@@ -34,10 +45,14 @@ FS_BASE = (
 )
 PAGE_SIZE = 1000  # FeatureServer's `maxRecordCount`
 FIELDS = ["SRI", "MP", "SLD_NAME", "Second_Name", "ROUTE_SUBT", "Longitude", "Latitude"]
+RENAME = {"Longitude": "lon", "Latitude": "lat"}
+RETRY_WAIT = 1.0  # Seconds before the first retry; grows 1.5× per attempt
+MANIFEST = "manifest.json"
 
 
-def fetch_page(offset: int, retries: int = 3) -> list[dict]:
+def fetch_page(offset: int, retries: int = 3, url: str = FS_BASE, session: requests.Session | None = None) -> list[dict]:
     """Return the `attributes` of one page of MP features."""
+    get = session.get if session is not None else requests.get
     params = {
         "where": "1=1",
         "outFields": ",".join(FIELDS),
@@ -50,7 +65,7 @@ def fetch_page(offset: int, retries: int = 3) -> list[dict]:
     last_exc = None
     for attempt in range(retries):
         try:
-            r = requests.get(f"{FS_BASE}/query", params=params, timeout=60)
+            r = get(f"{url}/query", params=params, timeout=60)
             r.raise_for_status()
             j = r.json()
             if "error" in j:
@@ -58,42 +73,162 @@ def fetch_page(offset: int, retries: int = 3) -> list[dict]:
             return [f["attributes"] for f in j.get("features", [])]
         except (requests.RequestException, ValueError, RuntimeError) as e:
             last_exc = e
-            wait = 1.5 ** attempt
+            wait = RETRY_WAIT * 1.5 ** attempt
             err(f"  retry {attempt + 1}/{retries} for offset={offset} after {wait:.1f}s ({e})")
             time.sleep(wait)
     raise RuntimeError(f"giving up on offset={offset}: {last_exc}")
 
 
+def fetch_count(url: str = FS_BASE) -> int:
+    r = requests.get(f"{url}/query", params={"where": "1=1", "returnCountOnly": "true", "f": "json"}, timeout=30)
+    r.raise_for_status()
+    return r.json()["count"]
+
+
+def page_table(rows: list[dict]) -> pa.Table:
+    """One page's rows as an Arrow table, columns in `FIELDS` order (renamed)."""
+    return pa.table({ RENAME.get(f, f): [ row.get(f) for row in rows ] for f in FIELDS })
+
+
+class Spool:
+    """Numbered per-page parquet fragments in `dir`, plus a manifest of completed pages.
+
+    The manifest also records the source `url`, row `total`, and page size; if
+    any of those changed since the spool was written (e.g. the layer was
+    republished with a different row count), the stale fragments are discarded.
+    """
+    def __init__(self, dir: Path, url: str, total: int, page_size: int = PAGE_SIZE):
+        self.dir = Path(dir)
+        self.params = dict(url=url, total=total, page_size=page_size, fields=FIELDS)
+        self.pages: dict[int, int] = {}  # page number → row count
+        path = self.dir / MANIFEST
+        if path.exists():
+            manifest = json.loads(path.read_text())
+            if { k: manifest.get(k) for k in self.params } == self.params:
+                self.pages = {
+                    int(page): n
+                    for page, n in manifest["pages"].items()
+                    if self.fragment(int(page)).exists()
+                }
+            else:
+                err(f"{self.dir}: spooled for {manifest.get('url')} (total {manifest.get('total')}), discarding")
+                shutil.rmtree(self.dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def num_pages(self) -> int:
+        return -(-self.params["total"] // self.params["page_size"])
+
+    def fragment(self, page: int) -> Path:
+        return self.dir / f"page-{page:05d}.parquet"
+
+    def missing(self) -> list[int]:
+        return [ page for page in range(self.num_pages) if page not in self.pages ]
+
+    def write_fragment(self, page: int, rows: list[dict]) -> int:
+        """Write one page's fragment (atomically); thread-safe. Call `complete` after."""
+        path = self.fragment(page)
+        tmp = path.with_suffix(".tmp")
+        pq.write_table(page_table(rows), tmp)
+        os.replace(tmp, path)
+        return len(rows)
+
+    def complete(self, page: int, n: int):
+        """Record `page` (`n` rows) as done in the manifest."""
+        self.pages[page] = n
+        path = self.dir / MANIFEST
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({ **self.params, "pages": { str(p): self.pages[p] for p in sorted(self.pages) } }))
+        os.replace(tmp, path)
+
+    @property
+    def num_rows(self) -> int:
+        return sum(self.pages.values())
+
+    def merge(self, out: Path) -> int:
+        """Stream the fragments, in page order, into one parquet at `out`.
+
+        Pages' inferred types can differ (an all-null column, or int vs. float
+        `MP`), so fragments are cast to their unified schema as they're copied.
+        """
+        paths = [ self.fragment(page) for page in range(self.num_pages) ]
+        schemas = [ pq.read_schema(p) for p in paths ] or [ page_table([]).schema ]
+        schema = pa.unify_schemas(schemas, promote_options="permissive")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_name(f"{out.name}.tmp")
+        n = 0
+        with pq.ParquetWriter(tmp, schema) as w:
+            for path in paths:
+                tbl = pq.read_table(path).cast(schema)
+                w.write_table(tbl)
+                n += tbl.num_rows
+        os.replace(tmp, out)
+        return n
+
+
+def download(
+    output: Path,
+    concurrency: int = 8,
+    url: str = FS_BASE,
+    retries: int = 3,
+    keep_spool: bool = False,
+) -> bool:
+    """Fetch any pages missing from `output`'s spool, then merge them into `output`.
+
+    Returns False (leaving the spool in place for a rerun) if any page failed.
+    """
+    err(f"Counting total rows…")
+    total = fetch_count(url)
+    spool = Spool(Path(f"{output}.spool"), url=url, total=total)
+    todo = spool.missing()
+    err(f"Total: {total:,} rows; {spool.num_pages} pages @ {PAGE_SIZE}/page ({len(spool.pages)} already spooled)")
+
+    def fetch(page: int, session: requests.Session) -> int:
+        rows = fetch_page(page * PAGE_SIZE, retries=retries, url=url, session=session)
+        return spool.write_fragment(page, rows)
+
+    failed = []
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=concurrency) as ex:
+        # The default pool keeps 10 connections per host; size it to the workers so they all reuse one
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(concurrency, 1))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        futures = { ex.submit(fetch, page, session): page for page in todo }
+        for done, future in enumerate(as_completed(futures), 1):
+            page = futures[future]
+            try:
+                spool.complete(page, future.result())
+            except Exception as e:
+                err(f"  page {page} (offset={page * PAGE_SIZE}): {e}")
+                failed.append(page)
+            if done % 20 == 0 or done == len(todo):
+                err(f"  {done}/{len(todo)} pages, {spool.num_rows:,} rows so far")
+
+    if failed:
+        err(f"{len(failed)} page(s) failed; completed pages are spooled in {spool.dir}, rerun to resume")
+        return False
+
+    err(f"Fetched {spool.num_rows:,} rows.")
+    if spool.num_rows != total:
+        err(f"WARNING: row count mismatch — expected {total:,}, got {spool.num_rows:,}")
+
+    spool.merge(output)
+    if not keep_spool:
+        shutil.rmtree(spool.dir)
+    err(f"Wrote {output} ({output.stat().st_size / 1024 / 1024:.1f} MB)")
+    return True
+
+
 @click.command("bulk-dl")
 @click.option("-c", "--concurrency", default=8, show_default=True, type=int)
+@click.option("-k", "--keep-spool", is_flag=True, help="Keep `<output>.spool/` (per-page fragments + manifest) after merging")
 @click.option("-o", "--output", default="njdot/data/nj_mp_tenths.parquet", show_default=True)
-def main(concurrency: int, output: str):
-    """Paginate the MP FeatureServer and write all rows to parquet."""
-    err(f"Counting total rows…")
-    r = requests.get(f"{FS_BASE}/query", params={"where": "1=1", "returnCountOnly": "true", "f": "json"}, timeout=30)
-    r.raise_for_status()
-    total = r.json()["count"]
-    err(f"Total: {total:,} rows; {total // PAGE_SIZE + 1} pages @ {PAGE_SIZE}/page")
-
-    offsets = list(range(0, total, PAGE_SIZE))
-    all_rows: list[dict] = []
-    done = 0
-    with ThreadPoolExecutor(max_workers=concurrency) as ex:
-        for rows in ex.map(fetch_page, offsets):
-            all_rows.extend(rows)
-            done += 1
-            if done % 20 == 0 or done == len(offsets):
-                err(f"  {done}/{len(offsets)} pages, {len(all_rows):,} rows so far")
-
-    df = pd.DataFrame(all_rows).rename(columns={"Longitude": "lon", "Latitude": "lat"})
-    err(f"Fetched {len(df):,} rows. Columns: {list(df.columns)}")
-    if len(df) != total:
-        err(f"WARNING: row count mismatch — expected {total:,}, got {len(df):,}")
-
-    out = Path(output)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    df.to_parquet(out, index=False)
-    err(f"Wrote {out} ({out.stat().st_size / 1024 / 1024:.1f} MB)")
+@click.option("-r", "--retries", default=3, show_default=True, type=int, help="Attempts per page")
+@click.option("-u", "--url", default=FS_BASE, show_default=True, help="FeatureServer layer URL")
+def main(concurrency: int, keep_spool: bool, output: str, retries: int, url: str):
+    """Paginate the MP FeatureServer and write all rows to parquet (resumably)."""
+    if not download(Path(output), concurrency=concurrency, url=url, retries=retries, keep_spool=keep_spool):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+"""`nj_crashes.utils.github` history walks against a recorded-fixture stand-in
+for the GitHub REST + GraphQL APIs (`fixtures/github_history.json`: 5 linear
+commits of a repo with `data/FAUQStats{2024,2025}.xml`, recorded as REST
+`commits`/`git/trees`/`git/blobs` payloads).
+
+Objects are cached on disk by SHA, so a second walk makes no requests; with a
+token, a cold walk is one GraphQL history page + one blob batch, and no REST."""
+import json
+import re
+from base64 import b64decode
+from os.path import dirname, join
+from types import SimpleNamespace
+
+import pytest
+
+from nj_crashes.utils import github
+from nj_crashes.utils.github import GithubCommit, ShaCache
+from njsp.fauqstats import FAUQStats
+
+FIXTURE = join(dirname(__file__), 'fixtures', 'github_history.json')
+
+
+class RecordedGithub:
+    """Serves REST/GraphQL responses from the fixture; counts requests."""
+    def __init__(self, path: str = FIXTURE):
+        with open(path) as f:
+            self.fx = json.load(f)
+        self.calls: list[str] = []
+
+    # REST
+    def get_commit(self, ref: str):
+        self.calls.append('rest:commit')
+        return SimpleNamespace(raw_data=self.fx['commits'][ref])
+
+    def get_git_tree(self, sha: str):
+        self.calls.append('rest:tree')
+        return SimpleNamespace(raw_data=self.fx['trees'][sha])
+
+    def get_git_blob(self, sha: str):
+        self.calls.append('rest:blob')
+        return SimpleNamespace(content=self.fx['blobs'][sha])
+
+    # GraphQL
+    def _entries(self, tree_sha: str) -> list[dict]:
+        return [
+            { 'name': e['path'], 'type': e['type'], 'oid': e['sha'], 'mode': int(e['mode'], 8) }
+            for e in self.fx['trees'][tree_sha]['tree']
+        ]
+
+    def graphql(self, query: str, variables: dict) -> dict:
+        if 'history(' in query:
+            self.calls.append('graphql:history')
+            nodes = []
+            sha = variables['oid']
+            while sha and len(nodes) < variables['n']:
+                c = self.fx['commits'][sha]
+                tree_sha = c['commit']['tree']['sha']
+                data = next(e for e in self.fx['trees'][tree_sha]['tree'] if e['path'] == 'data')
+                nodes.append({
+                    'oid': sha,
+                    'authoredDate': c['commit']['author']['date'],
+                    'author': { 'name': c['commit']['author']['name'], 'email': c['commit']['author']['email'], 'date': c['commit']['author']['date'] },
+                    'parents': { 'nodes': [ { 'oid': p['sha'] } for p in c['parents'] ] },
+                    'tree': { 'oid': tree_sha, 'entries': self._entries(tree_sha) },
+                    '_0': { 'oid': data['sha'], 'object': { 'oid': data['sha'], 'entries': self._entries(data['sha']) } },
+                })
+                sha = c['parents'][0]['sha'] if c['parents'] else None
+            return { 'repository': { 'object': { 'history': { 'nodes': nodes } } } }
+        self.calls.append('graphql:blobs')
+        repo = {}
+        for alias, oid in re.findall(r'(_\d+): object\(oid: "([0-9a-f]{40})"\)', query):
+            text = b64decode(self.fx['blobs'][oid]).decode()
+            repo[alias] = { 'oid': oid, 'text': text, 'isBinary': False, 'isTruncated': False }
+        return { 'repository': repo }
+
+
+@pytest.fixture
+def gh(tmp_path, monkeypatch):
+    rec = RecordedGithub()
+    monkeypatch.setattr(github, '_gh_get_commit', rec.get_commit)
+    monkeypatch.setattr(github, '_gh_get_git_tree', rec.get_git_tree)
+    monkeypatch.setattr(github, '_gh_get_git_blob', rec.get_git_blob)
+    monkeypatch.setattr(github, '_graphql', rec.graphql)
+    monkeypatch.setattr(github, '_cache', ShaCache(str(tmp_path / 'gh-cache')))
+    return rec
+
+
+def _walk(head: str) -> list[tuple[str, str, dict[int, bytes]]]:
+    """`get_crash_log`-style traversal: `^`-parent steps, FAUQStats blobs per commit."""
+    out = []
+    commit = GithubCommit.from_sha(head)
+    while True:
+        blobs = FAUQStats.blobs(commit)
+        out.append((commit.hexsha, commit.authored_datetime, { y: b.data_stream.read() for y, b in blobs.items() }))
+        if not commit.raw_data['parents']:
+            return out
+        commit = GithubCommit.from_sha(f'{commit.hexsha}^')
+
+
+def _expected(fx: dict) -> list[tuple[str, dict[int, bytes]]]:
+    out = []
+    sha = fx['head']
+    while sha:
+        c = fx['commits'][sha]
+        data = next(e for e in fx['trees'][c['commit']['tree']['sha']]['tree'] if e['path'] == 'data')
+        blobs = {
+            int(e['path'][9:13]): b64decode(fx['blobs'][e['sha']])
+            for e in fx['trees'][data['sha']]['tree']
+            if e['path'].startswith('FAUQStats')
+        }
+        out.append((sha, blobs))
+        sha = c['parents'][0]['sha'] if c['parents'] else None
+    return out
+
+
+def test_graphql_batched_then_cached(gh):
+    walk = _walk(gh.fx['head'])
+    assert [ (sha, blobs) for sha, _, blobs in walk ] == _expected(gh.fx)
+    assert len(walk) == 5 and set(walk[0][2]) == {2024, 2025} and set(walk[-1][2]) == {2024}
+    # 5 commits, 5 root trees, 5 `data/` trees, 8 distinct FAUQStats blobs: 2 requests.
+    assert gh.calls == ['graphql:history', 'graphql:blobs']
+
+    gh.calls.clear()
+    assert _walk(gh.fx['head']) == walk
+    assert gh.calls == []
+
+
+def test_rest_fallback_then_cached(gh, monkeypatch):
+    def no_token(query, variables):
+        raise RuntimeError("GitHub GraphQL API requires a token")
+    monkeypatch.setattr(github, '_graphql', no_token)
+    walk = _walk(gh.fx['head'])
+    assert [ (sha, blobs) for sha, _, blobs in walk ] == _expected(gh.fx)
+    # One REST call per commit, root tree, `data/` tree and distinct blob.
+    assert gh.calls.count('rest:commit') == 5
+    assert gh.calls.count('rest:tree') == 10
+    assert gh.calls.count('rest:blob') == 8
+
+    gh.calls.clear()
+    assert _walk(gh.fx['head']) == walk
+    assert gh.calls == []
+
+
+def test_mismatched_graphql_text_not_cached(gh, monkeypatch):
+    """GraphQL blob text that doesn't re-encode to the blob's bytes (here: LF → CRLF) is
+    fetched over REST instead of being cached under its SHA."""
+    graphql = gh.graphql
+    def crlf(query, variables):
+        res = graphql(query, variables)
+        if 'history(' not in query:
+            for blob in res['repository'].values():
+                blob['text'] = blob['text'].replace('\n', '\r\n')
+        return res
+    monkeypatch.setattr(github, '_graphql', crlf)
+    walk = _walk(gh.fx['head'])
+    assert [ (sha, blobs) for sha, _, blobs in walk ] == _expected(gh.fx)
+    assert gh.calls.count('graphql:blobs') == 1
+    assert gh.calls.count('rest:blob') == 8
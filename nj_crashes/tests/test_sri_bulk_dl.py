@@ -0,0 +1,134 @@
+"""`nj_crashes.sri.bulk_dl` against a local FeatureServer stand-in: pages are
+spooled to per-page fragments + a manifest, a rerun after failed pages fetches
+only the missing ones, and the merged parquet matches building one DataFrame
+from every page's rows."""
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+
+from nj_crashes.sri import bulk_dl
+from nj_crashes.sri.bulk_dl import FIELDS, PAGE_SIZE, RENAME
+
+TOTAL = 5 * PAGE_SIZE + 123
+
+
+def _row(i: int) -> dict:
+    page = i // PAGE_SIZE
+    return {
+        "SRI": f"{i // 50:08d}__",
+        # Page 1's MPs are all ints (an int64 fragment); others are floats.
+        "MP": i // 10 if page == 1 else round(i / 10, 2),
+        "SLD_NAME": f"ROUTE {i // 50}",
+        # Page 2 has no `Second_Name`s (a null-typed fragment column).
+        "Second_Name": None if page == 2 or i % 3 else f"ALT {i}",
+        "ROUTE_SUBT": i % 7,
+        "Longitude": -74 - i / 1e5,
+        "Latitude": 40 + i / 1e5,
+    }
+
+
+class FeatureServer:
+    """`rows` served in `resultOffset` pages; `flaky[offset]` leading 500s per
+    offset, and `down` offsets that always 500."""
+    def __init__(self, n: int = TOTAL):
+        self.rows = [ _row(i) for i in range(n) ]
+        self.flaky: dict[int, int] = {}
+        self.down: set[int] = set()
+        self.requests: Counter = Counter()
+        self.lock = threading.Lock()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fs = FeatureServer()
+    monkeypatch.setattr(bulk_dl, "RETRY_WAIT", 0)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body: dict | None = None):
+            data = json.dumps(body or {}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            q = { k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items() }
+            if q.get("returnCountOnly") == "true":
+                return self._send(200, {"count": len(fs.rows)})
+            offset = int(q["resultOffset"])
+            with fs.lock:
+                fs.requests[offset] += 1
+                flaky = fs.flaky.get(offset, 0)
+                if flaky:
+                    fs.flaky[offset] = flaky - 1
+            if flaky or offset in fs.down:
+                return self._send(500)
+            fields = q["outFields"].split(",")
+            rows = fs.rows[offset:offset + int(q["resultRecordCount"])]
+            self._send(200, {"features": [ {"attributes": { f: row[f] for f in fields }} for row in rows ]})
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    fs.url = f"http://127.0.0.1:{httpd.server_address[1]}/FeatureServer/0"
+    yield fs
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _expected(fs: FeatureServer) -> pd.DataFrame:
+    return pd.DataFrame(fs.rows)[FIELDS].rename(columns=RENAME)
+
+
+def test_download(server, tmp_path):
+    server.flaky = {PAGE_SIZE: 2, 3 * PAGE_SIZE: 1}
+    out = tmp_path / "mp.parquet"
+    assert bulk_dl.download(out, concurrency=4, url=server.url)
+    pd.testing.assert_frame_equal(pd.read_parquet(out), _expected(server))
+    assert not (tmp_path / "mp.parquet.spool").exists()
+    assert server.requests[PAGE_SIZE] == 3
+    assert server.requests[0] == 1
+
+
+def test_resume(server, tmp_path):
+    out = tmp_path / "mp.parquet"
+    spool = tmp_path / "mp.parquet.spool"
+    server.down = {2 * PAGE_SIZE, 4 * PAGE_SIZE}
+    assert not bulk_dl.download(out, concurrency=3, url=server.url, retries=2)
+    assert not out.exists()
+    manifest = json.loads((spool / "manifest.json").read_text())
+    assert manifest["pages"] == { "0": PAGE_SIZE, "1": PAGE_SIZE, "3": PAGE_SIZE, "5": 123 }
+    assert sorted(p.name for p in spool.glob("page-*.parquet")) == [
+        "page-00000.parquet", "page-00001.parquet", "page-00003.parquet", "page-00005.parquet",
+    ]
+
+    server.down = set()
+    server.requests.clear()
+    assert bulk_dl.download(out, concurrency=3, url=server.url, keep_spool=True)
+    assert set(server.requests) == { 2 * PAGE_SIZE, 4 * PAGE_SIZE }
+    pd.testing.assert_frame_equal(pd.read_parquet(out), _expected(server))
+    assert len(json.loads((spool / "manifest.json").read_text())["pages"]) == 6
+
+
+def test_stale_spool(server, tmp_path):
+    """A spool written against a different row count is discarded, not merged."""
+    out = tmp_path / "mp.parquet"
+    server.down = {0}
+    assert not bulk_dl.download(out, url=server.url, retries=1)
+    server.down = set()
+    server.rows = server.rows[:-200]
+    server.requests.clear()
+    assert bulk_dl.download(out, url=server.url)
+    assert len(server.requests) == 5
+    pd.testing.assert_frame_equal(pd.read_parquet(out), _expected(server))
@@ -0,0 +1,134 @@
+import json
+import os
+
+import click
+import numpy as np
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from nj_crashes.utils import stage as st
+from nj_crashes.utils.stage import ENV_VAR, NULL_STAGE, load_trace, profile_opt, render, stage, staged, summarize
+
+
+@pytest.fixture
+def trace(tmp_path, monkeypatch):
+    monkeypatch.delenv(ENV_VAR, raising=False)
+    path = tmp_path / 'trace.jsonl'
+    st.enable(str(path))
+    yield path
+    st.disable()
+
+
+@staged()
+def double(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.concat([df, df])
+
+
+DOUBLE = f'{__name__}.double'
+
+
+def test_disabled(tmp_path, monkeypatch):
+    monkeypatch.delenv(ENV_VAR, raising=False)
+    st.disable()
+    with stage('noop', rows_in=3) as s:
+        s.rows_out = 4
+    assert s is NULL_STAGE
+    df = pd.DataFrame({'a': range(3)})
+    assert len(double(df)) == 6
+    assert not list(tmp_path.iterdir())
+
+
+def test_nested(trace):
+    df = pd.DataFrame({'a': np.arange(1000)})
+    with stage('outer', rows_in=len(df), tbl='crashes') as s:
+        with stage('inner'):
+            np.sort(np.random.default_rng(0).random(10**6))
+        out = double(df)
+        s.rows_out = len(out)
+    with pytest.raises(ValueError), stage('fails'):
+        raise ValueError
+
+    records = { r['path']: r for r in load_trace(str(trace)) }
+    assert list(records) == ['outer/inner', f'outer/{DOUBLE}', 'outer', 'fails']
+    outer = records['outer']
+    assert outer['depth'] == 0 and outer['tbl'] == 'crashes'
+    assert (outer['rows_in'], outer['rows_out']) == (1000, 2000)
+    dbl = records[f'outer/{DOUBLE}']
+    assert dbl['depth'] == 1 and (dbl['rows_in'], dbl['rows_out']) == (1000, 2000)
+    assert outer['wall_s'] >= records['outer/inner']['wall_s'] > 0
+    assert records['outer/inner']['peak_rss_delta_mb'] >= 0
+    assert records['fails']['error'] == 'ValueError'
+
+    rows = summarize(list(records.values()))
+    assert [ r['path'] for r in rows ] == ['outer', 'outer/inner', f'outer/{DOUBLE}', 'fails']
+    lines = render(rows).splitlines()
+    assert lines[1].startswith('outer ')
+    assert lines[2].startswith('  inner ')
+    assert '2,000' in lines[1]
+
+
+def test_summarize_aggregates_calls():
+    records = [
+        dict(path='a', name='a', depth=0, start=t, wall_s=1., cpu_s=.5, peak_rss_delta_mb=d, rows_in=None, rows_out=10)
+        for t, d in [(0, 5.), (1, 7.)]
+    ]
+    [row] = summarize(records)
+    assert (row['calls'], row['wall_s'], row['cpu_s'], row['peak_rss_delta_mb'], row['rows_out']) == (2, 2., 1., 7., 20)
+
+
+def test_profile_opt(tmp_path, monkeypatch):
+    monkeypatch.delenv(ENV_VAR, raising=False)
+
+    @click.group('pipeline')
+    @profile_opt
+    def pipeline():
+        pass
+
+    @pipeline.command('build')
+    def build():
+        double(pd.DataFrame({'a': range(5)}))
+
+    path = tmp_path / 'trace.jsonl'
+    try:
+        res = CliRunner().invoke(pipeline, ['--profile', str(path), 'build'])
+    finally:
+        st.disable()
+    assert res.exit_code == 0, res.output
+    records = [ json.loads(line) for line in path.read_text().splitlines() ]
+    assert [ r['path'] for r in records ] == [f'pipeline/{DOUBLE}', 'pipeline']
+    assert DOUBLE in res.stderr
+
+    # Disabled again: no more records
+    CliRunner().invoke(pipeline, ['build'])
+    assert len(path.read_text().splitlines()) == 2
+
+
+def test_profile_relative_path_chdir(tmp_path, monkeypatch):
+    """A relative `--profile` path resolves against the invocation dir, even if the group `chdir`s (like `njsp`)."""
+    monkeypatch.delenv(ENV_VAR, raising=False)
+    run_dir = tmp_path / 'run'
+    root_dir = tmp_path / 'root'
+    run_dir.mkdir()
+    root_dir.mkdir()
+    (root_dir / 'trace.jsonl').write_text('')  # a same-named trace in the chdir target must not be read
+    monkeypatch.chdir(run_dir)
+
+    @click.group('pipeline')
+    @profile_opt
+    def pipeline():
+        os.chdir(root_dir)
+
+    @pipeline.command('build')
+    def build():
+        double(pd.DataFrame({'a': range(5)}))
+
+    try:
+        res = CliRunner().invoke(pipeline, ['--profile', 'trace.jsonl', 'build'])
+    finally:
+        st.disable()
+    assert res.exit_code == 0, res.output
+    assert (root_dir / 'trace.jsonl').read_text() == ''
+    records = load_trace(str(run_dir / 'trace.jsonl'))
+    assert [ r['path'] for r in records ] == [f'pipeline/{DOUBLE}', 'pipeline']
+    assert DOUBLE in res.stderr
@@ -1,4 +1,10 @@
+import lazy_loader as lazy
+
 from .tz import TZ
-from . import git, github, log, s3, show, sql
+
+__getattr__, __dir__, __all__ = lazy.attach(
+    __name__,
+    submodules=['git', 'github', 'log', 's3', 'show', 'sql'],
+)
 
 SITE = 'https://crashes.hudcostreets.org'
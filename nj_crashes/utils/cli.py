@@ -0,0 +1,59 @@
+from importlib import import_module
+from typing import Optional
+
+from click import Command, Context, Group
+
+
+class LazyGroup(Group):
+    """Click Group whose subcommands' modules are only imported when invoked.
+
+    `lazy_commands` maps each command name to `('module[:attr]', help_text)`:
+
+    - with `:attr`, the module's `attr` is the command, and is added to this group;
+    - without, importing the module registers the command (e.g. via `@group.command(...)`).
+
+    `--help` lists commands from the registry's help text, without importing anything. Use as
+    `@click.group(name, cls=LazyGroup, lazy_commands={...})`.
+    """
+
+    def __init__(self, *args, lazy_commands: Optional[dict[str, tuple[str, str]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx: Context) -> list[str]:
+        return sorted({ *self.commands, *self.lazy_commands })
+
+    def get_command(self, ctx: Context, cmd_name: str) -> Optional[Command]:
+        if cmd_name in self.commands:
+            return self.commands[cmd_name]
+        if cmd_name not in self.lazy_commands:
+            return None
+        spec, _ = self.lazy_commands[cmd_name]
+        module_name, _, attr = spec.partition(':')
+        module = import_module(module_name)
+        if attr:
+            self.add_command(getattr(module, attr), cmd_name)
+        return self.commands.get(cmd_name)
+
+    def format_commands(self, ctx: Context, formatter):
+        """Show registry help text for not-yet-imported commands."""
+        rows = []
+        for cmd_name in self.list_commands(ctx):
+            cmd = self.commands.get(cmd_name)
+            if cmd is not None:
+                if cmd.hidden:
+                    continue
+                help_text = cmd.get_short_help_str()
+            else:
+                _, help_text = self.lazy_commands[cmd_name]
+            rows.append((cmd_name, help_text))
+
+        if rows:
+            limit = formatter.width - 6 - max(len(cmd_name) for cmd_name, _ in rows)
+            rows = [
+                (cmd_name, help_text[:limit - 3] + '...' if len(help_text) > limit else help_text)
+                for cmd_name, help_text in rows
+            ]
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
@@ -1,9 +1,23 @@
+"""Partial `git` object interfaces (`GithubCommit`/`GithubTree`/`GithubBlob`)
+backed by the GitHub API, for walking history past a shallow clone.
+
+Commits, trees and blobs are immutable by SHA, so every fetched object is
+kept in an on-disk cache (`GH_CACHE_DIR`, `$NJ_CRASHES_GH_CACHE`) and never
+re-fetched. Cache misses on a commit prefetch a page of its ancestors (plus
+their root and `data/` trees, and uncached `PREFETCH_BLOBS`) in batched
+GraphQL queries, so a deep walk costs ~1 request per `HISTORY_PAGE` commits
+rather than several REST calls per commit; without a token (GraphQL requires
+auth) or on a GraphQL error, objects are fetched one at a time over REST.
+"""
+import json
 from functools import cached_property
+from hashlib import sha1
 
 from dataclasses import dataclass
 
 from base64 import b64decode
-from os import environ
+from os import environ, makedirs, replace
+from os.path import dirname, join
 from re import fullmatch
 from subprocess import CalledProcessError
 
@@ -18,6 +32,7 @@ import pandas as pd
 from utz import proc
 
 from nj_crashes.utils.git import git_fmt
+from nj_crashes.utils.log import err
 from nj_crashes.utils.retry import with_gh_retry
 from njdot.rawdata.utils import singleton
 
@@ -25,6 +40,15 @@ REPO = 'hudcostreets/nj-crashes'
 _gh: Github | None = None
 _gh_repo: Repository | None = None
 
+GRAPHQL_URL = 'https://api.github.com/graphql'
+GH_CACHE_DIR = environ.get('NJ_CRASHES_GH_CACHE') or expanduser('~/.cache/nj-crashes/github')
+# Commits per GraphQL history page, subtrees fetched with each commit, and
+# blobs (by name, within those subtrees) prefetched alongside.
+HISTORY_PAGE = 100
+PREFETCH_TREES = ('data',)
+PREFETCH_BLOBS = r'FAUQStats20\d\d\.xml'
+BLOB_BATCH = 10
+
 
 @with_gh_retry()
 def _gh_get_commit(sha: str) -> Commit:
@@ -69,17 +93,22 @@ def expand_refspec(refspec: str, *args: str) -> list[str]:
         raise ValueError(f"Invalid refspec {refspec=}")
 
 
+def github_token() -> str | None:
+    GITHUB_TOKEN = environ.get('GITHUB_TOKEN') or environ.get('GH_TOKEN')
+    if not GITHUB_TOKEN:
+        for github_token_path in [ '.github_token', '.gh_token', '~/.github_token', '~/.gh_token' ]:
+            if exists(expanduser(github_token_path)):
+                with open(expanduser(github_token_path), 'r') as f:
+                    GITHUB_TOKEN = f.read().strip()
+                    break
+    return GITHUB_TOKEN
+
+
 def get_github_repo() -> Repository:
     global _gh
     global _gh_repo
     if _gh is None:
-        GITHUB_TOKEN = environ.get('GITHUB_TOKEN') or environ.get('GH_TOKEN')
-        if not GITHUB_TOKEN:
-            for github_token_path in [ '.github_token', '.gh_token', '~/.github_token', '~/.gh_token' ]:
-                if exists(expanduser(github_token_path)):
-                    with open(github_token_path, 'r') as f:
-                        GITHUB_TOKEN = f.read()
-                        break
+        GITHUB_TOKEN = github_token()
         if GITHUB_TOKEN:
             auth = Auth.Token(GITHUB_TOKEN)
             auth_kwargs = dict(auth=auth)
@@ -110,6 +139,240 @@ def load_pqt_github(
     return pd.read_parquet(BytesIO(content_bytes))
 
 
+class ShaCache:
+    """On-disk store of immutable git objects (JSON for commits/trees, raw
+    bytes for blobs), keyed by kind + full SHA. `root=None` disables it."""
+    def __init__(self, root: str | None):
+        self.root = root
+
+    def path(self, kind: str, sha: str) -> str:
+        return join(self.root, kind, sha[:2], sha[2:])
+
+    def get(self, kind: str, sha: str) -> bytes | None:
+        if not self.root:
+            return None
+        try:
+            with open(self.path(kind, sha), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, kind: str, sha: str, data: bytes):
+        if not self.root:
+            return
+        path = self.path(kind, sha)
+        makedirs(dirname(path), exist_ok=True)
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        replace(tmp, path)
+
+    def get_json(self, kind: str, sha: str) -> dict | None:
+        data = self.get(kind, sha)
+        return None if data is None else json.loads(data)
+
+    def put_json(self, kind: str, sha: str, obj: dict):
+        self.put(kind, sha, json.dumps(obj).encode())
+
+
+_cache: ShaCache | None = None
+
+
+def gh_cache() -> ShaCache:
+    global _cache
+    if _cache is None:
+        _cache = ShaCache(GH_CACHE_DIR)
+    return _cache
+
+
+def is_sha(ref: str) -> bool:
+    return bool(fullmatch(r'[0-9a-f]{40}', ref))
+
+
+def _trim_commit(raw: dict) -> dict:
+    """The subset of a REST commit payload the wrappers read (drops `files`/`stats`)."""
+    return {
+        'sha': raw['sha'],
+        'commit': {
+            'author': raw['commit']['author'],
+            'tree': { 'sha': raw['commit']['tree']['sha'] },
+        },
+        'parents': [ { 'sha': p['sha'] } for p in raw['parents'] ],
+    }
+
+
+def _graphql(query: str, variables: dict) -> dict:
+    import requests
+    token = github_token()
+    if not token:
+        raise RuntimeError("GitHub GraphQL API requires a token")
+    res = requests.post(
+        GRAPHQL_URL,
+        json={ 'query': query, 'variables': variables },
+        headers={ 'Authorization': f'bearer {token}' },
+        timeout=60,
+    )
+    res.raise_for_status()
+    body = res.json()
+    if body.get('errors'):
+        raise RuntimeError(f"GraphQL errors: {body['errors']}")
+    return body['data']
+
+
+_TREE_ENTRIES = 'entries { name type oid mode }'
+HISTORY_QUERY = """
+query($owner: String!, $name: String!, $oid: GitObjectID!, $n: Int!) {
+  repository(owner: $owner, name: $name) {
+    object(oid: $oid) {
+      ... on Commit {
+        history(first: $n) {
+          nodes {
+            oid
+            authoredDate
+            author { name email date }
+            parents(first: 5) { nodes { oid } }
+            tree { oid %s }
+            %s
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def _rest_tree(oid: str, entries: list[dict]) -> dict:
+    """GraphQL tree entries → REST `git/trees/{sha}` payload shape."""
+    return {
+        'sha': oid,
+        'tree': [
+            { 'path': e['name'], 'mode': e['mode'] if isinstance(e['mode'], str) else f"{e['mode']:06o}", 'type': e['type'], 'sha': e['oid'] }
+            for e in entries
+        ],
+        'truncated': False,
+    }
+
+
+def prefetch_history(sha: str, n: int = HISTORY_PAGE) -> int:
+    """Cache `sha` and up to `n - 1` ancestors (first-parent-agnostic
+    `git log` order), their root and `PREFETCH_TREES` trees, and any uncached
+    `PREFETCH_BLOBS` in those trees, in a handful of GraphQL requests.
+
+    Returns the number of commits cached.
+    """
+    cache = gh_cache()
+    subtrees = '\n'.join(
+        f'_{i}: file(path: "{path}") {{ oid object {{ ... on Tree {{ oid {_TREE_ENTRIES} }} }} }}'
+        for i, path in enumerate(PREFETCH_TREES)
+    )
+    owner, name = REPO.split('/')
+    data = _graphql(HISTORY_QUERY % (_TREE_ENTRIES, subtrees), dict(owner=owner, name=name, oid=sha, n=n))
+    nodes = data['repository']['object']['history']['nodes']
+    blob_oids = {}
+    for node in nodes:
+        author = node['author'] or {}
+        cache.put_json('commits', node['oid'], {
+            'sha': node['oid'],
+            'commit': {
+                'author': { 'name': author.get('name'), 'email': author.get('email'), 'date': node['authoredDate'] },
+                'tree': { 'sha': node['tree']['oid'] },
+            },
+            'parents': [ { 'sha': p['oid'] } for p in node['parents']['nodes'] ],
+        })
+        cache.put_json('trees', node['tree']['oid'], _rest_tree(node['tree']['oid'], node['tree']['entries']))
+        for i in range(len(PREFETCH_TREES)):
+            entry = node.get(f'_{i}')
+            tree = entry and entry.get('object')
+            if not tree:
+                continue
+            cache.put_json('trees', tree['oid'], _rest_tree(tree['oid'], tree['entries']))
+            for e in tree['entries']:
+                if e['type'] == 'blob' and fullmatch(PREFETCH_BLOBS, e['name']) and cache.get('blobs', e['oid']) is None:
+                    blob_oids[e['oid']] = e['name']
+    prefetch_blobs(list(blob_oids))
+    return len(nodes)
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Git's object id for a blob with contents `data`."""
+    return sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+def prefetch_blobs(oids: list[str]) -> int:
+    """Cache text blobs `BLOB_BATCH` per GraphQL request. Binary / truncated
+    ones, and any whose re-encoded text doesn't hash back to its `oid` (e.g. a
+    decoding that normalized line endings), are left to the REST fallback.
+    Returns the number cached."""
+    cache = gh_cache()
+    owner, name = REPO.split('/')
+    n = 0
+    for start in range(0, len(oids), BLOB_BATCH):
+        batch = oids[start:start + BLOB_BATCH]
+        fields = '\n'.join(
+            f'_{i}: object(oid: "{oid}") {{ ... on Blob {{ oid text isBinary isTruncated }} }}'
+            for i, oid in enumerate(batch)
+        )
+        query = f'query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}'
+        repo = _graphql(query, dict(owner=owner, name=name))['repository']
+        for i in range(len(batch)):
+            blob = repo.get(f'_{i}')
+            if blob and not blob['isBinary'] and not blob['isTruncated'] and blob['text'] is not None:
+                data = blob['text'].encode()
+                if git_blob_sha(data) != blob['oid']:
+                    err(f"GraphQL text for blob {blob['oid']} doesn't match its SHA; leaving it to REST")
+                    continue
+                cache.put('blobs', blob['oid'], data)
+                n += 1
+    return n
+
+
+def commit_data(ref: str) -> dict:
+    """REST-shaped commit payload for `ref` (a SHA, optionally with `^`
+    suffixes, or any ref GitHub resolves), from the cache when possible."""
+    cache = gh_cache()
+    m = fullmatch(r'([0-9a-f]{40})(\^*)', ref)
+    if m:
+        sha, carets = m.groups()
+        data = cache.get_json('commits', sha)
+        if data is None:
+            try:
+                prefetch_history(sha)
+            except Exception as e:
+                err(f"GraphQL history prefetch for {sha} failed ({e}); falling back to REST")
+            data = cache.get_json('commits', sha)
+        if data is None:
+            data = _trim_commit(_gh_get_commit(sha).raw_data)
+            cache.put_json('commits', sha, data)
+        for _ in carets:
+            data = commit_data(singleton([ p['sha'] for p in data['parents'] ]))
+        return data
+    data = _trim_commit(_gh_get_commit(ref).raw_data)
+    cache.put_json('commits', data['sha'], data)
+    return data
+
+
+def tree_data(sha: str) -> dict:
+    cache = gh_cache()
+    data = cache.get_json('trees', sha)
+    if data is None:
+        data = _gh_get_git_tree(sha).raw_data
+        if data['truncated']:
+            raise RuntimeError(f"Tree {sha} is truncated")
+        data = { 'sha': data['sha'], 'tree': data['tree'], 'truncated': False }
+        cache.put_json('trees', sha, data)
+    return data
+
+
+def blob_bytes(sha: str) -> bytes:
+    cache = gh_cache()
+    data = cache.get('blobs', sha)
+    if data is None:
+        data = b64decode(_gh_get_git_blob(sha).content)
+        cache.put('blobs', sha, data)
+    return data
+
+
 @dataclass
 class GithubBlob:
     """Partial implementation of git.Blob interface for GitHub blobs."""
@@ -118,39 +381,21 @@ class GithubBlob:
 
     @property
     def data_stream(self):
-        blob = _gh_get_git_blob(self.hexsha)
-        return BytesIO(b64decode(blob.content))
-        # return BytesIO(process.output('gh', 'api', '-H', 'Accept: application/vnd.github.raw+json', f'/repos/{REPO}/git/blobs/{self.hexsha}'))
-        # TODO: streaming response
-        # gh_token = environ['GH_TOKEN']
-        # headers = {
-        #     'Accept': 'application/vnd.github.raw+json',
-        #     'Authorization': f'Bearer {gh_token}',
-        # }
-        # return BytesIO(requests.get(self.blob.url, headers=headers).content)
+        return BytesIO(blob_bytes(self.hexsha))
 
 
 @dataclass
 class GithubTree:
     """Partial implementation of git.Tree interface for GitHub trees."""
-    tree: GitTree
+    raw_data: dict
 
     @staticmethod
-    def from_commit(commit: Commit) -> 'GithubTree':
-        tree = _gh_get_git_tree(commit.raw_data['commit']['tree']['sha'])
-        return GithubTree(tree)
+    def from_commit(commit: 'GithubCommit') -> 'GithubTree':
+        return GithubTree.from_sha(commit.tree_sha)
 
     @staticmethod
     def from_sha(sha: str) -> 'GithubTree':
-        return GithubTree(_gh_get_git_tree(sha))
-
-    @cached_property
-    def raw_data(self):
-        tree = self.tree
-        raw_data = tree.raw_data
-        if raw_data['truncated']:
-            raise RuntimeError(f"Tree {tree.sha} is truncated")
-        return tree.raw_data
+        return GithubTree(tree_data(sha))
 
     def __contains__(self, item):
         return any(e['path'] == item for e in self.children)
@@ -164,20 +409,20 @@ class GithubTree:
         return self.raw_data['tree']
 
     def __getitem__(self, key) -> 'Object':
-        [ child, *descendants ] = key.split('/', 1)
-        child = singleton([ c for c in self.children if c['path'] == child ])
-        if not child:
-            raise KeyError(f"Tree {self.hexsha}: child not found: {child}")
-        elif descendants:
+        [ name, *descendants ] = key.split('/', 1)
+        children = [ c for c in self.children if c['path'] == name ]
+        if not children:
+            raise KeyError(f"Tree {self.hexsha}: child not found: {name}")
+        child = singleton(children)
+        if descendants:
             rest = singleton(descendants)
-            return GithubTree(child)[rest]
-        else:
-            kind = child['type']
-            if kind == 'blob':
-                return GithubBlob(name=child['path'], hexsha=child['sha'])
-            elif kind == 'tree':
-                return GithubTree.from_sha(child['sha'])
-            return child
+            return GithubTree.from_sha(child['sha'])[rest]
+        kind = child['type']
+        if kind == 'blob':
+            return GithubBlob(name=child['path'], hexsha=child['sha'])
+        elif kind == 'tree':
+            return GithubTree.from_sha(child['sha'])
+        return child
 
     @property
     def blobs(self):
@@ -189,7 +434,7 @@ class GithubTree:
     @property
     def trees(self):
         return [
-            GithubTree(_gh_get_git_tree(e['sha']))
+            GithubTree.from_sha(e['sha'])
             for e in self.children if e['type'] == 'tree'
         ]
 
@@ -199,19 +444,15 @@ Object = GithubBlob | GithubTree
 
 @dataclass
 class GithubCommit:
-    commit: Commit
+    raw_data: dict
 
     @staticmethod
     def from_git(git_commit: git.Commit) -> 'GithubCommit':
-        return GithubCommit(_gh_get_commit(git_commit.hexsha))
+        return GithubCommit.from_sha(git_commit.hexsha)
 
     @staticmethod
     def from_sha(sha: str) -> 'GithubCommit':
-        return GithubCommit(_gh_get_commit(sha))
-
-    @property
-    def raw_data(self):
-        return self.commit.raw_data
+        return GithubCommit(commit_data(sha))
 
     @property
     def hexsha(self):
@@ -228,7 +469,7 @@ class GithubCommit:
     @property
     def parents(self) -> list['GithubCommit']:
         return [
-            GithubCommit(_gh_get_commit(p['sha']))
+            GithubCommit.from_sha(p['sha'])
             for p in self.raw_data['parents']
         ]
 
@@ -242,9 +483,7 @@ class GithubCommit:
 
     @cached_property
     def tree(self) -> GithubTree:
-        tree = _gh_get_git_tree(self.tree_sha)
-        return GithubTree(tree)
-
+        return GithubTree.from_sha(self.tree_sha)
 
 
 Blob = git.Blob | GithubBlob
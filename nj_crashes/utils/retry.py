@@ -7,14 +7,20 @@ GitHub's "secondary" rate limit returns 429 with a textual "temporarily being
 throttled" message; PyGithub auto-retries the primary (X-RateLimit-Remaining)
 limit but not this one. `with_gh_retry` covers the gap. `http_get_with_retry`
 covers transient upstream failures (the NJSP feed has thrown 403/5xx).
+
+Concurrent fetchers can share a `HostBackoff`, so that one request's
+429/403 makes every thread hitting that host wait out the same window
+(instead of each retrying on its own schedule and re-tripping the WAF).
 """
 from __future__ import annotations
 
 import random
+import threading
 import time
 from email.utils import parsedate_to_datetime
 from datetime import datetime, timezone
 from functools import wraps
+from urllib.parse import urlsplit
 
 import requests
 from github import GithubException
@@ -50,6 +56,39 @@ def _backoff_seconds(attempt: int, base: float = 5.0, cap: float = 60.0) -> floa
     return min(cap, base * (2 ** attempt)) + random.uniform(0, base / 2)
 
 
+class HostBackoff:
+    """Thread-safe per-host "not before" deadlines.
+
+    `defer(url, s)` pushes the URL's host's deadline out to at least `s`
+    seconds from now; `wait(url)` sleeps until that host's deadline passes.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._deadlines: dict[str, float] = {}
+
+    @staticmethod
+    def host(url: str) -> str:
+        return urlsplit(url).netloc
+
+    def defer(self, url: str, seconds: float) -> None:
+        host = self.host(url)
+        with self._lock:
+            deadline = time.monotonic() + seconds
+            if deadline > self._deadlines.get(host, 0):
+                self._deadlines[host] = deadline
+
+    def remaining(self, url: str) -> float:
+        with self._lock:
+            deadline = self._deadlines.get(self.host(url), 0)
+        return max(0.0, deadline - time.monotonic())
+
+    def wait(self, url: str) -> None:
+        remaining = self.remaining(url)
+        if remaining > 0:
+            err(f"{self.host(url)}: backing off {remaining:.1f}s")
+            time.sleep(remaining)
+
+
 def with_gh_retry(max_attempts: int = 5, base: float = 5.0, cap: float = 60.0):
     """Decorator: retry the wrapped fn on transient GitHub API failures."""
     def deco(fn):
@@ -81,23 +120,39 @@ def http_get_with_retry(
     base: float = 3.0,
     cap: float = 30.0,
     retry_statuses: frozenset[int] = HTTP_RETRY_STATUSES,
+    session: requests.Session | None = None,
+    backoff: HostBackoff | None = None,
 ) -> requests.Response:
     """GET `url` with retry on transient failures (connection errors + listed
     statuses, including 403 — observed transiently from the NJSP feed).
 
+    `session` reuses pooled (keep-alive) connections. With a shared `backoff`,
+    each attempt first waits out the host's deadline, and a retryable failure
+    defers the host (for all threads) instead of sleeping locally.
+
     Returns the final `Response` (which may still be non-200 after exhausting
     attempts — the caller decides whether to raise).
     """
+    get = session.get if session is not None else requests.get
+
+    def pause(sleep_s: float):
+        if backoff is None:
+            time.sleep(sleep_s)
+        else:
+            backoff.defer(url, sleep_s)
+
     last_res = None
     for attempt in range(max_attempts):
+        if backoff is not None:
+            backoff.wait(url)
         try:
-            res = requests.get(url, allow_redirects=True, timeout=timeout, headers=headers)
+            res = get(url, allow_redirects=True, timeout=timeout, headers=headers)
         except requests.RequestException as e:
             if attempt == max_attempts - 1:
                 raise
             sleep_s = _backoff_seconds(attempt, base, cap)
             err(f"GET {url}: {e}; sleeping {sleep_s:.1f}s (attempt {attempt + 1}/{max_attempts})")
-            time.sleep(sleep_s)
+            pause(sleep_s)
             continue
         last_res = res
         if res.status_code not in retry_statuses or attempt == max_attempts - 1:
@@ -105,5 +160,5 @@ def http_get_with_retry(
         retry_after = _parse_retry_after(res.headers.get('Retry-After'))
         sleep_s = retry_after if retry_after is not None else _backoff_seconds(attempt, base, cap)
         err(f"GET {url}: {res.status_code} {res.reason}; sleeping {sleep_s:.1f}s (attempt {attempt + 1}/{max_attempts})")
-        time.sleep(sleep_s)
+        pause(sleep_s)
     return last_res
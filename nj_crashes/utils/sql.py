@@ -66,3 +66,61 @@ def write(
 
         if page_size:
             resize(cur, page_size, db_path)
+
+
+def sql_type(col: pd.Series) -> str:
+    """Column type `DataFrame.to_sql` (via SQLAlchemy) would declare for `col`."""
+    col_type = pd.api.types.infer_dtype(col, skipna=True)
+    name = col.dtype.name.lower()
+    if col_type in ('datetime64', 'datetime'):
+        return 'DATETIME'
+    if col_type == 'floating':
+        return 'FLOAT'
+    if col_type == 'integer':
+        if name in ('int8', 'uint8', 'int16'):
+            return 'SMALLINT'
+        if name in ('uint16', 'int32'):
+            return 'INTEGER'
+        return 'BIGINT'
+    if col_type == 'boolean':
+        return 'BOOLEAN'
+    return 'TEXT'
+
+
+def write_tables(
+        tables: dict[str, pd.DataFrame],
+        db_path: str,
+        page_size: Optional[int] = None,
+):
+    """Write several index-keyed DataFrames to a fresh SQLite DB in one
+    transaction.
+
+    Each table gets the schema and indices `write(df, tbl, idxs=[df.index.names])`
+    would produce (`to_sql`'s per-level `ix_{tbl}_{col}` indices + the
+    composite one), without a SQLAlchemy round-trip or per-table vacuum.
+    `page_size` is set before anything is written, so no vacuum is needed.
+    """
+    if exists(db_path):
+        err(f"Removing {db_path}")
+        remove(db_path)
+    con = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        cur = con.cursor()
+        if page_size:
+            cur.execute(f"pragma page_size = {page_size}")
+        cur.execute("BEGIN")
+        for tbl, df in tables.items():
+            idx_cols = list(df.index.names)
+            df = df.reset_index()
+            cols = ', '.join(f'\n\t{c} {sql_type(df[c])}' for c in df.columns)
+            cur.execute(f"CREATE TABLE {tbl} ({cols}\n)")
+            rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+            cur.executemany(f"INSERT INTO {tbl} VALUES ({', '.join('?' * len(df.columns))})", rows)
+            for col in idx_cols:
+                cur.execute(f"CREATE INDEX ix_{tbl}_{col} ON {tbl} ({col})")
+            add_idx(cur, tbl, *idx_cols)
+            err(f"Wrote {len(df)} rows to {db_path} ({tbl})")
+        cur.execute("COMMIT")
+    finally:
+        con.close()
+    err(f"Wrote DB: {stat(db_path).st_size} bytes")
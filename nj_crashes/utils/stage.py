@@ -0,0 +1,265 @@
+"""Stage profiler: wall time, CPU time, peak-RSS growth and row counts per
+named pipeline stage, appended to a JSONL trace.
+
+    with stage('join vehicles', rows_in=len(df)) as s:
+        df = df.merge(...)
+        s.rows_out = len(df)
+
+    @staged()                  # name defaults to `module.qualname`
+    def load_crashes(path): ...
+
+`@staged` takes `rows_in` from the first argument with a `.shape` (a frame or
+array), and `rows_out` from the result's. Nested stages record their parent
+path (`njdot/agg/load_crashes`), so the summary renders as a tree.
+
+Profiling is off unless `$NJ_CRASHES_PROFILE` names a trace file (or a CLI's
+`--profile <path>` sets it). While off, `stage` returns a shared no-op and
+`@staged` calls straight through. The env var is inherited by subprocesses
+(e.g. joblib workers), which append their own top-level stages to the trace.
+
+`python -m nj_crashes.utils.stage <trace.jsonl>` prints the summary table.
+"""
+import json
+import os
+import resource
+import sys
+import threading
+from functools import wraps
+from os.path import abspath
+from time import perf_counter, process_time, time
+from typing import Callable, Optional
+
+import click
+
+ENV_VAR = 'NJ_CRASHES_PROFILE'
+# `ru_maxrss` is KiB on Linux, bytes on macOS
+MAXRSS_MB = 1 / 2**20 if sys.platform == 'darwin' else 1 / 2**10
+
+_trace_path: Optional[str] = os.environ.get(ENV_VAR) or None
+_local = threading.local()
+
+
+def enable(path: str):
+    """Append stage records to `path` (here, and in subprocesses started later)."""
+    global _trace_path
+    _trace_path = abspath(path)
+    os.environ[ENV_VAR] = _trace_path
+
+
+def disable():
+    global _trace_path
+    _trace_path = None
+    os.environ.pop(ENV_VAR, None)
+
+
+def enabled() -> bool:
+    return _trace_path is not None
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAXRSS_MB
+
+
+def _stack() -> list[str]:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def nrows(obj) -> Optional[int]:
+    shape = getattr(obj, 'shape', None)
+    return int(shape[0]) if shape else None
+
+
+def _clean_exit(exc: BaseException) -> bool:
+    """Whether `exc` is a successful exit (e.g. click's, after `--help`)."""
+    if isinstance(exc, click.exceptions.Exit):
+        return exc.exit_code == 0
+    if isinstance(exc, SystemExit):
+        return exc.code in (0, None)
+    return False
+
+
+class Stage:
+    """One timed stage; set `rows_out` (or any `attrs`) before it exits."""
+
+    def __init__(self, name: str, rows_in: Optional[int] = None, **attrs):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.attrs = attrs
+
+    def __enter__(self) -> 'Stage':
+        stack = _stack()
+        self.path = '/'.join([*stack, self.name])
+        self.depth = len(stack)
+        stack.append(self.name)
+        self.start = time()
+        self.peak_rss0 = _peak_rss_mb()
+        self.cpu0 = process_time()
+        self.wall0 = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = perf_counter() - self.wall0
+        cpu = process_time() - self.cpu0
+        peak_rss = _peak_rss_mb()
+        _stack().pop()
+        record = dict(
+            name=self.name,
+            path=self.path,
+            depth=self.depth,
+            pid=os.getpid(),
+            start=self.start,
+            wall_s=wall,
+            cpu_s=cpu,
+            peak_rss_mb=peak_rss,
+            peak_rss_delta_mb=peak_rss - self.peak_rss0,
+            rows_in=self.rows_in,
+            rows_out=self.rows_out,
+            **({ 'error': exc_type.__name__ } if exc_type and not _clean_exit(exc) else {}),
+            **self.attrs,
+        )
+        path = _trace_path
+        if path:
+            with open(path, 'a') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+
+
+class _NullStage:
+    """What `stage` returns while profiling is off; ignores `rows_out` etc."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NULL_STAGE = _NullStage()
+
+
+def stage(name: str, rows_in: Optional[int] = None, **attrs):
+    """Context manager recording stage `name` to the trace (a no-op while profiling is off)."""
+    if _trace_path is None:
+        return NULL_STAGE
+    return Stage(name, rows_in=rows_in, **attrs)
+
+
+def staged(name: Optional[str] = None) -> Callable:
+    """Decorator: run each call of the wrapped function as a `stage`."""
+    def decorator(fn):
+        stage_name = name or f'{fn.__module__}.{fn.__qualname__}'
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _trace_path is None:
+                return fn(*args, **kwargs)
+            rows_in = next(( n for n in map(nrows, args) if n is not None ), None)
+            with Stage(stage_name, rows_in=rows_in) as s:
+                res = fn(*args, **kwargs)
+                s.rows_out = nrows(res)
+            return res
+
+        return wrapper
+
+    return decorator
+
+
+def load_trace(path: str) -> list[dict]:
+    with open(path) as f:
+        return [ json.loads(line) for line in f if line.strip() ]
+
+
+def summarize(records: list[dict]) -> list[dict]:
+    """Aggregate `records` by stage path; ordered depth-first, siblings by first start."""
+    rows = {}
+    for r in sorted(records, key=lambda r: r['start']):
+        row = rows.get(r['path'])
+        if row is None:
+            row = rows[r['path']] = dict(
+                path=r['path'], name=r['name'], depth=r['depth'], start=r['start'],
+                calls=0, wall_s=0., cpu_s=0., peak_rss_delta_mb=0., rows_in=None, rows_out=None,
+            )
+        row['calls'] += 1
+        row['wall_s'] += r['wall_s']
+        row['cpu_s'] += r['cpu_s']
+        row['peak_rss_delta_mb'] = max(row['peak_rss_delta_mb'], r['peak_rss_delta_mb'])
+        for k in ['rows_in', 'rows_out']:
+            if r.get(k) is not None:
+                row[k] = (row[k] or 0) + r[k]
+
+    children = {}
+    for row in rows.values():
+        parent = row['path'].rpartition('/')[0] if row['depth'] else None
+        children.setdefault(parent if parent in rows else None, []).append(row)
+
+    ordered = []
+
+    def visit(parent):
+        for row in children.get(parent, []):
+            ordered.append(row)
+            visit(row['path'])
+
+    visit(None)
+    return ordered
+
+
+def render(rows: list[dict], width: int = 20) -> str:
+    """Flame-style table: stages indented under their parents, with a bar of
+    each stage's share of the slowest top-level stage's wall time."""
+    if not rows:
+        return '(no stages)'
+    total = max(( r['wall_s'] for r in rows if r['depth'] == 0 ), default=0) or 1
+    fmt_rows = lambda n: '' if n is None else f'{n:,}'
+    labels = [ '  ' * r['depth'] + r['name'] for r in rows ]
+    label_width = max(map(len, labels + ['stage']))
+    lines = [
+        f"{'stage':<{label_width}}  {'calls':>5}  {'wall':>8}  {'cpu':>8}  {'Δpeak MiB':>9}  {'rows in':>11}  {'rows out':>11}"
+    ]
+    for label, r in zip(labels, rows):
+        bar = '█' * max(1, round(width * min(r['wall_s'] / total, 1)))
+        lines.append(
+            f"{label:<{label_width}}  {r['calls']:>5}  {r['wall_s']:>7.2f}s  {r['cpu_s']:>7.2f}s  "
+            f"{r['peak_rss_delta_mb']:>9.1f}  {fmt_rows(r['rows_in']):>11}  {fmt_rows(r['rows_out']):>11}  {bar}"
+        )
+    return '\n'.join(lines)
+
+
+def _start_profile(ctx: click.Context, param: click.Parameter, path: Optional[str]):
+    if not path:
+        return
+    # Resolve now: group callbacks (e.g. `njsp`'s) may `chdir` before the summary runs
+    path = abspath(path)
+    enable(path)
+    start = time()
+
+    def print_summary():
+        # The trace may hold earlier runs' records; summarize this one's
+        records = [ r for r in load_trace(path) if r['start'] >= start ]
+        print(render(summarize(records)), file=sys.stderr)
+
+    # Closed in reverse order: the root stage's record is written before the summary
+    ctx.call_on_close(print_summary)
+    ctx.with_resource(Stage(ctx.command.name or ctx.info_name))
+
+
+profile_opt = click.option(
+    '--profile', 'profile', envvar=ENV_VAR, expose_value=False, callback=_start_profile, metavar='PATH',
+    help=f'Append a JSONL stage-profile trace to PATH, and print its summary on exit (env: ${ENV_VAR})',
+)
+
+
+@click.command()
+@click.argument('trace', type=click.Path(exists=True, dir_okay=False))
+def main(trace: str):
+    """Print the summary table of a stage-profile TRACE (JSONL)."""
+    print(render(summarize(load_trace(trace))))
+
+
+if __name__ == '__main__':
+    main()
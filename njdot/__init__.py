@@ -1,11 +1,16 @@
 from os.path import dirname
 
-NJDOT_DIR = dirname(__file__)
+import lazy_loader as lazy
 
-from . import tbls
-from .data import END_YEAR, START_YEAR
-from .paths import CRASHES_PQT, WWW_DOT, CRASHES_DB, CC2MC2MN, CNS
-from .crashes import Crashes
+NJDOT_DIR = dirname(__file__)
 
-from .data import Data, START_YEAR, END_YEAR, YEARS, cc2cn, cn2cc
-from .cc2mc2mn import cc2mc2mn, denormalize_name, normalize_name
+__getattr__, __dir__, __all__ = lazy.attach(
+    __name__,
+    submodules=['data', 'paths', 'tbls'],
+    submod_attrs={
+        'data': ['Data', 'START_YEAR', 'END_YEAR', 'YEARS', 'cc2cn', 'cn2cc'],
+        'paths': ['CRASHES_PQT', 'WWW_DOT', 'CRASHES_DB', 'CC2MC2MN', 'CNS'],
+        'crashes': ['Crashes'],
+        'cc2mc2mn': ['cc2mc2mn', 'denormalize_name', 'normalize_name'],
+    },
+)
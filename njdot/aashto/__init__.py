@@ -12,19 +12,15 @@ manual `Crash.csv` download.
 """
 import click
 
+from nj_crashes.utils.cli import LazyGroup
 
-@click.group('aashto')
+
+@click.group('aashto', cls=LazyGroup, lazy_commands={
+    'schema': ('njdot.aashto.to_njdot_schema:schema', 'AASHTO crashes → NJDOT-schema combined parquet'),
+    'persons': ('njdot.aashto.to_njdot_persons:persons', 'AASHTO persons → DOTr-style occupants + pedestrians supplements'),
+    'vehicles': ('njdot.aashto.to_njdot_vehicles:vehicles', 'AASHTO vehicles → DOTr-style vehicles supplement (damage + departure)'),
+    'supplement': ('njdot.aashto.supplement_with_sp:supplement', 'Combine AASHTO + NJSP-only fatals + per-crash VTC matrix'),
+})
 def aashto():
     """Tools for AASHTO Crash.csv pipeline."""
     pass
-
-
-from njdot.aashto.to_njdot_schema import schema
-from njdot.aashto.to_njdot_persons import persons
-from njdot.aashto.to_njdot_vehicles import vehicles
-from njdot.aashto.supplement_with_sp import supplement
-
-aashto.add_command(schema)
-aashto.add_command(persons)
-aashto.add_command(vehicles)
-aashto.add_command(supplement)
@@ -0,0 +1,189 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["click", "pandas", "pyarrow", "tqdm", "utz"]
+# ///
+"""Benchmark `normalize.py` on a synthetic AASHTO-shaped `Crash.csv`.
+
+Writes `-n` rows shaped like the real export (per-person cols as
+`[[...], ...]` JSON, per-vehicle cols as flat arrays, `[object Undefined]`
+literals, compound / non-JSON bracketed cells, quoted newlines, the occasional
+fatal or bad-column-count row), then runs the `--in-memory` and streaming
+paths, each in a fresh subprocess, and reports rows/sec and peak RSS (including
+worker processes). `--check` additionally asserts the outputs are
+byte-identical.
+"""
+import csv
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+import click
+
+from njdot.aashto.normalize import (
+    AMBIGUOUS_DROPPED_COLS, COMPOUND_COLS, CRASH_LEAK_COLS, PERSON_COLS, TABLES, UNDEFINED, VEHICLE_COLS,
+)
+
+err = partial(print, file=sys.stderr)
+
+CRASH_COLS = [
+    "Agency ORI", "Crash ID", "Crash Date", "Crash Time", "County", "Municipality",
+    "Latitude", "Longitude", "Road Name", "Narrative", "Total Killed", "Total Injured",
+    *COMPOUND_COLS,
+]
+HEADER = [ *PERSON_COLS, *VEHICLE_COLS, *AMBIGUOUS_DROPPED_COLS[:4], *CRASH_LEAK_COLS, *CRASH_COLS ]
+
+
+def _value(r: random.Random):
+    """A per-vehicle/person attribute: JSON int / str / null / undefined."""
+    x = r.random()
+    if x < .4:
+        return r.randint(0, 99)
+    if x < .8:
+        return r.choice(["A", "Unknown", "Not Applicable", "12", "Passenger Car"])
+    if x < .95:
+        return None
+    return UNDEFINED
+
+
+def _cell(v) -> str:
+    if isinstance(v, list):
+        return json.dumps(v)
+    if v is None:
+        return ""
+    return str(v)
+
+
+def synthetic_row(r: random.Random, i: int) -> list[str]:
+    n_vehicles = r.choice([1, 1, 2, 2, 2, 3, 4])
+    persons = [ r.randint(1, 3) for _ in range(n_vehicles) ]
+    n_persons = sum(persons)
+
+    def per_person(gen):
+        if n_persons == 1:
+            return gen()
+        if n_vehicles == 1:
+            return [ gen() for _ in range(n_persons) ]
+        return [ [ gen() for _ in range(k) ] for k in persons ]
+
+    def per_vehicle(gen):
+        x = r.random()
+        if n_vehicles == 1:
+            return gen()
+        if x < .03:
+            # compound: a 2-tuple per vehicle
+            return [ [ gen(), gen() ] for _ in range(n_vehicles) ]
+        if x < .05:
+            return [ gen() for _ in range(n_persons) ]
+        return [ gen() for _ in range(n_vehicles) ]
+
+    cells = {}
+    pid = iter(range(10 * i, 10 * i + n_persons))
+    cells["Person ID"] = per_person(lambda: next(pid))
+    uid = iter(range(n_vehicles))
+    cells["Unit ID"] = [ [ u ] * k for u, k in zip(uid, persons) ] if n_vehicles > 1 else 0
+    for col in PERSON_COLS[2:]:
+        cells[col] = per_person(partial(_value, r))
+    if r.random() < .01:
+        # Person col length mismatch → fatal
+        cells["Age"] = [ 1 ] * (n_persons + 1)
+    for col in VEHICLE_COLS:
+        cells[col] = per_vehicle(partial(_value, r))
+    for col in AMBIGUOUS_DROPPED_COLS[:4]:
+        cells[col] = per_person(partial(_value, r))
+    for col in CRASH_LEAK_COLS:
+        cells[col] = r.choice([ r.randint(0, 5), "Urban", "", UNDEFINED, [1, 2] ])
+    cells.update({
+        "Agency ORI": f"NJ{r.randint(0, 999):07d}",
+        "Crash ID": str(1_000_000 + i if r.random() > .002 else 1_000_000),
+        "Crash Date": f"2024-{r.randint(1, 12):02d}-{r.randint(1, 28):02d}",
+        "Crash Time": f"{r.randint(0, 23):02d}{r.randint(0, 59):02d}",
+        "County": r.choice(["Hudson", "ESSEX", "[object Object]", UNDEFINED]),
+        "Municipality": r.choice(["Jersey City", "Newark", "", "[Unknown]"]),
+        "Latitude": f"{r.uniform(39, 41.3):.6f}",
+        "Longitude": f"{r.uniform(-75.5, -73.9):.6f}",
+        "Road Name": r.choice(["Route 1", 'MAIN ST "A"', "", "[ 1, 2 ]"]),
+        "Narrative": r.choice(["", "rear end", "line one\nline two", 'said "stop", then\r\nleft']),
+        "Total Killed": str(r.choice([0, 0, 0, 1])),
+        "Total Injured": r.choice(["0", "2", "", "[1.5]"]),
+        "Events": [ [ r.randint(1, 40) for _ in range(4) ] for _ in range(n_vehicles) ],
+        "Factors": r.choice([ [], ["Speeding"], "" ]),
+        "Physical Statuses": r.choice([ ["Normal", "Normal"], "" ]),
+        "NJDOT Summary": r.choice([ ["Intersection"], ["Young Driver", "Night"], "" ]),
+        "SHSP Emphasis Areas": "",
+    })
+    row = [ _cell(cells[col]) for col in HEADER ]
+    if r.random() < .001:
+        row = row[:-1]  # bad column count
+    return row
+
+
+def synthetic_csv(path: Path, n_rows: int, seed: int = 0) -> Path:
+    r = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(HEADER)
+        for i in range(n_rows):
+            w.writerow(synthetic_row(r, i))
+    return path
+
+
+def run_mode(csv_path: Path, out_dir: Path, mode: str, jobs: int | None, chunk_mb: float) -> dict:
+    """Run one normalizer path in a fresh interpreter; returns its wall time and peak RSS."""
+    code = f"""
+import json, resource, sys, time
+from pathlib import Path
+from njdot.aashto import normalize as n
+t0 = time.perf_counter()
+out = Path({str(out_dir)!r}); out.mkdir(parents=True, exist_ok=True)
+if {mode!r} == 'in-memory':
+    n.normalize_in_memory(Path({str(csv_path)!r}), out)
+else:
+    n.normalize(Path({str(csv_path)!r}), out, jobs={jobs!r}, chunk_bytes=int({chunk_mb!r} * 2**20))
+elapsed = time.perf_counter() - t0
+kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+print(json.dumps(dict(elapsed=elapsed, rss_mb=kb / 1024)))
+"""
+    proc = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+@click.command()
+@click.option("-c", "--chunk-mb", type=float, default=32, help="Streaming path: CSV MiB per parse chunk")
+@click.option("-C", "--check", is_flag=True, help="Assert the two paths' parquets are byte-identical")
+@click.option("-j", "--jobs", type=int, help="Streaming path: worker processes (default: CPU count)")
+@click.option("-k", "--keep", type=click.Path(path_type=Path), help="Write the CSV and outputs here (default: a temp dir)")
+@click.option("-n", "--rows", type=int, default=100_000, help="Synthetic CSV rows")
+@click.option("-s", "--seed", type=int, default=0)
+def main(chunk_mb: float, check: bool, jobs: int | None, keep: Path | None, rows: int, seed: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = keep or Path(tmp)
+        root.mkdir(parents=True, exist_ok=True)
+        csv_path = root / "Crash.csv"
+        t0 = time.perf_counter()
+        synthetic_csv(csv_path, rows, seed)
+        mb = csv_path.stat().st_size / 2**20
+        err(f"Wrote {csv_path}: {rows:,} rows, {mb:.1f} MiB ({time.perf_counter() - t0:.1f}s)")
+
+        results = {}
+        for mode in ["in-memory", "streaming"]:
+            res = run_mode(csv_path, root / mode, mode, jobs, chunk_mb)
+            results[mode] = res
+            print(f"{mode:>10s}: {res['elapsed']:7.2f}s  {rows / res['elapsed']:>10,.0f} rows/s  peak RSS {res['rss_mb']:7.1f} MiB")
+
+        if check:
+            for name in TABLES:
+                a = (root / "in-memory" / f"{name}.parquet").read_bytes()
+                b = (root / "streaming" / f"{name}.parquet").read_bytes()
+                assert a == b, f"{name}.parquet differs"
+            print("Outputs byte-identical")
+
+
+if __name__ == "__main__":
+    main()
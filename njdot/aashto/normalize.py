@@ -30,17 +30,32 @@ Issue policy:
 
 The issue types are kept stable so the parquet can drive a per-column,
 per-issue dashboard for AASHTO/Numetric to triage.
+
+Streaming: the CSV is split into byte ranges ending on record boundaries,
+which worker processes parse (spooling each table's columns to disk); each
+table is then written as Arrow record batches, one row group at a time. Column
+types are those `pd.DataFrame(records)` + `coerce_object_to_str` would give
+the whole table, so the parquets are byte-identical to the `--in-memory` path.
 """
 import csv
+import io
 import json
+import os
+import pickle
 import sys
+import tempfile
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from functools import partial
+from functools import lru_cache, partial
+from itertools import chain, repeat
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
 import click
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from tqdm import tqdm
 
 err = partial(print, file=sys.stderr)
@@ -49,6 +64,11 @@ UNDEFINED = "[object Undefined]"
 SANITY_MAX_VEHICLES = 200
 SANITY_MAX_PERSONS = 1000
 
+CHUNK_BYTES = 32 * 1024 * 1024
+# pyarrow's default max row-group length (what `DataFrame.to_parquet` gets)
+ROW_GROUP_SIZE = 1024 * 1024
+TABLES = ["crashes", "vehicles", "persons", "issues"]
+
 # --- Column categorization (from check_flat_alignment.py findings) ---
 
 # Per-person columns: 14 attributes that are ≥98% flat-aligned with
@@ -151,17 +171,29 @@ COMPOUND_COLS = ["Events", "Factors", "Physical Statuses", "NJDOT Summary", "SHS
 
 # --- Helpers ---
 
+# First non-whitespace char after `[` in a JSON array (incl. `NaN`/`Infinity`,
+# which `json.loads` accepts); anything else can't parse.
+JSON_ARRAY_ITEM_START = frozenset('[]{"-0123456789tfnNI')
+json_decode = json.JSONDecoder().decode
+
+
+@lru_cache(maxsize=1 << 16)
 def parse_cell(s: str):
     """Returns (kind, payload). kind ∈ {empty, undef, scalar, array}.
        arrays may be nested arbitrarily deeply; payload is the parsed
-       Python value."""
+       Python value. Cached (categorical cells repeat a lot), so callers
+       must not mutate the payload."""
     if s == "":
         return "empty", None
     if s == UNDEFINED:
         return "undef", None
     if s.startswith("[") and s.endswith("]"):
+        rest = s[1:].lstrip(" \t\n\r")
+        if not rest or rest[0] not in JSON_ARRAY_ITEM_START:
+            # e.g. `[object Object]`: skip the doomed `json.loads`
+            return "scalar", s
         try:
-            v = json.loads(s)
+            v = json_decode(s)
         except json.JSONDecodeError:
             return "scalar", s
         if isinstance(v, list):
@@ -188,6 +220,13 @@ def flatten(v):
     return out
 
 
+@lru_cache(maxsize=1 << 16)
+def flatten_cell(s: str) -> list:
+    """`flatten` of a (non-empty, non-undef) cell's parsed value; cached like
+    `parse_cell`, so don't mutate the result."""
+    return flatten(parse_cell(s)[1])
+
+
 def flatten_with_outer(v) -> list[tuple[int, object]]:
     """For a 2-D nested list `[[...], [...], ...]`, return `(outer_idx, value)`
     pairs in flat order. Scalars get outer_idx=0. Used to derive each person's
@@ -318,13 +357,17 @@ def process_row(row_idx: int, row: list[str], header: list[str], acc: Acc):
     # --- Build vehicle records ---
     # We use Vehicle ID's outer values as the vehicle index when present,
     # else fall back to outer-iter of any per-vehicle col.
+    # Each cell is parsed (and flattened) once, not once per vehicle.
+    vehicle_cells = {col: parse_cell(cell[col]) for col in VEHICLE_COLS if col in cell} if vehicle_dim else {}
+    vehicle_flats = {
+        col: flatten_cell(cell[col])
+        for col, (kind, v) in vehicle_cells.items()
+        if kind not in ("empty", "undef")
+    }
     vehicle_recs: list[dict] = []
     for vi in range(vehicle_dim):
         vrec = {"row_idx": row_idx, "crash_id": crash_id, "vehicle_index": vi}
-        for col in VEHICLE_COLS:
-            if col not in cell:
-                continue
-            kind, v = parse_cell(cell[col])
+        for col, (kind, v) in vehicle_cells.items():
             if kind == "empty":
                 vrec[col] = None
                 continue
@@ -332,7 +375,7 @@ def process_row(row_idx: int, row: list[str], header: list[str], acc: Acc):
                 add_issue(col, "object_undefined", "scalar undef", cell[col])
                 vrec[col] = None
                 continue
-            f = flatten(v)
+            f = vehicle_flats[col]
             # Three valid shapes:
             #   - flat_len == vehicle_dim     ← canonical per-vehicle
             #   - flat_len == 1                ← single value, broadcast
@@ -382,7 +425,7 @@ def process_row(row_idx: int, row: list[str], header: list[str], acc: Acc):
             flats[col] = [None] * person_dim
             add_issue(col, "object_undefined", "scalar undef in person col", cell[col])
             continue
-        f = flatten(v)
+        f = flatten_cell(cell[col])
         if len(f) == person_dim:
             flats[col] = f
         elif len(f) == 1:
@@ -427,15 +470,31 @@ def process_row(row_idx: int, row: list[str], header: list[str], acc: Acc):
         acc.persons.append(prec)
 
 
-@click.command()
-@click.option("-y", "--year", type=int, required=True)
-@click.option("-o", "--out-dir", type=click.Path(path_type=Path), default=Path("njdot/data"))
-@click.option("-n", "--limit", type=int, help="Stop after N data rows")
-@click.option("-S", "--strict/--lenient", default=False, help="Fatal on any data quality issue (default: only fatal on relational breaks)")
-@click.argument("csv_path", type=click.Path(exists=True, path_type=Path))
-def main(year: int, out_dir: Path, limit: int | None, strict: bool, csv_path: Path):
-    out_dir = out_dir / str(year)
-    out_dir.mkdir(parents=True, exist_ok=True)
+def record_fatal(e: FatalDataIssue, acc: Acc):
+    acc.issues.append(Issue(e.row_idx, e.crash_id, "(fatal)", "FATAL", e.message, ""))
+    acc.issue_counts["FATAL"] += 1
+
+
+def coerce_object_to_str(df: pd.DataFrame) -> pd.DataFrame:
+    """Pyarrow chokes on object cols with mixed scalar types (int vs
+    str). For now coerce all object cols to nullable string. Lossy
+    for genuinely numeric cols, but downstream consumers can re-cast."""
+    for c in df.columns:
+        if df[c].dtype == object:
+            df[c] = df[c].apply(lambda v: None if v is None or (isinstance(v, float) and pd.isna(v)) else str(v))
+    return df
+
+
+def print_summary(counts: dict[str, int], issue_counts: Counter, fatal_count: int):
+    err(f"\nProcessed: crashes={counts['crashes']:,}, vehicles={counts['vehicles']:,}, persons={counts['persons']:,}, issues={counts['issues']:,}, fatals={fatal_count}")
+    err("Issue summary:")
+    for k, v in sorted(issue_counts.items(), key=lambda kv: -kv[1]):
+        err(f"  {k:40s}  {v:>10,d}")
+
+
+def normalize_in_memory(csv_path: Path, out_dir: Path, limit: int | None = None, strict: bool = False):
+    """Single-process reference path: parse every row, build each table as one
+    DataFrame, write it with `to_parquet`."""
     acc = Acc()
     fatal_count = 0
 
@@ -450,8 +509,7 @@ def main(year: int, out_dir: Path, limit: int | None, strict: bool, csv_path: Pa
                 process_row(row_idx, row, header, acc)
             except FatalDataIssue as e:
                 fatal_count += 1
-                acc.issues.append(Issue(e.row_idx, e.crash_id, "(fatal)", "FATAL", e.message, ""))
-                acc.issue_counts["FATAL"] += 1
+                record_fatal(e, acc)
                 if fatal_count <= 5:
                     err(f"  FATAL row {e.row_idx} crash_id={e.crash_id}: {e.message}")
                 if strict:
@@ -460,19 +518,8 @@ def main(year: int, out_dir: Path, limit: int | None, strict: bool, csv_path: Pa
             if limit and row_idx + 1 >= limit:
                 break
 
-    err(f"\nProcessed: crashes={len(acc.crashes):,}, vehicles={len(acc.vehicles):,}, persons={len(acc.persons):,}, issues={len(acc.issues):,}, fatals={fatal_count}")
-    err("Issue summary:")
-    for k, v in sorted(acc.issue_counts.items(), key=lambda kv: -kv[1]):
-        err(f"  {k:40s}  {v:>10,d}")
-
-    def coerce_object_to_str(df: pd.DataFrame) -> pd.DataFrame:
-        """Pyarrow chokes on object cols with mixed scalar types (int vs
-        str). For now coerce all object cols to nullable string. Lossy
-        for genuinely numeric cols, but downstream consumers can re-cast."""
-        for c in df.columns:
-            if df[c].dtype == object:
-                df[c] = df[c].apply(lambda v: None if v is None or (isinstance(v, float) and pd.isna(v)) else str(v))
-        return df
+    counts = { "crashes": len(acc.crashes), "vehicles": len(acc.vehicles), "persons": len(acc.persons), "issues": len(acc.issues) }
+    print_summary(counts, acc.issue_counts, fatal_count)
 
     crashes_df = coerce_object_to_str(pd.DataFrame(acc.crashes))
     vehicles_df = coerce_object_to_str(pd.DataFrame(acc.vehicles))
@@ -488,6 +535,386 @@ def main(year: int, out_dir: Path, limit: int | None, strict: bool, csv_path: Pa
     vehicles_df.to_parquet(out_dir / "vehicles.parquet", index=False)
     persons_df.to_parquet(out_dir / "persons.parquet", index=False)
     issues_df.to_parquet(out_dir / "issues.parquet", index=False)
+
+
+# --- Streaming ---
+
+def record_bounds(csv_path: Path, chunk_bytes: int = CHUNK_BYTES) -> Iterator[int]:
+    """Yield record-boundary offsets ~`chunk_bytes` apart, lazily; the first ends
+    the header, the last is the file size. Boundaries are newlines outside
+    quoted fields, found by tracking `"` parity (escaped `""` pairs leave it
+    unchanged; RFC 4180 writers quote any field containing `"`)."""
+    size = os.path.getsize(csv_path)
+    last = None
+    target = 0  # The first boundary ends the header
+    in_quotes = False
+    pos = 0
+    with open(csv_path, "rb") as f:
+        while block := f.read(16 * 1024 * 1024):
+            start = 0
+            while True:
+                if pos + start < target:
+                    # Skip ahead to the target, tracking quote parity
+                    end = min(target - pos, len(block))
+                    in_quotes ^= block.count(b'"', start, end) & 1
+                    start = end
+                    if start == len(block):
+                        break
+                nl = block.find(b"\n", start)
+                if nl < 0:
+                    in_quotes ^= block.count(b'"', start) & 1
+                    break
+                in_quotes ^= block.count(b'"', start, nl) & 1
+                start = nl + 1
+                if not in_quotes:
+                    last = pos + start
+                    yield last
+                    target = last + chunk_bytes
+            pos += len(block)
+    if last != size:
+        yield size
+
+
+def iter_record_ranges(csv_path: Path, chunk_bytes: int = CHUNK_BYTES) -> tuple[list[str], Iterator[tuple[int, int]]]:
+    """Parse the header; the rest of the file's ~`chunk_bytes` record-aligned
+    byte ranges are found as the returned iterator is consumed."""
+    bounds = record_bounds(csv_path, chunk_bytes)
+    header_end = next(bounds)
+    with open(csv_path, "rb") as f:
+        header = next(csv.reader(io.StringIO(f.read(header_end).decode("utf-8"), newline="")))
+
+    def ranges():
+        a = header_end
+        for b in bounds:
+            if b > a:
+                yield a, b
+            a = b
+
+    return header, ranges()
+
+
+def record_ranges(csv_path: Path, chunk_bytes: int = CHUNK_BYTES) -> tuple[list[str], list[tuple[int, int]]]:
+    """Parse the header, and split the rest of the file into ~`chunk_bytes` byte
+    ranges ending on record boundaries (see `record_bounds`)."""
+    header, ranges = iter_record_ranges(csv_path, chunk_bytes)
+    return header, list(ranges)
+
+
+class ColKinds:
+    """Python value types seen in a column: enough to reproduce the dtype
+    `pd.DataFrame(records)` infers for the whole column."""
+    KNOWN = (type(None), str, bool, int, float)
+
+    def __init__(self):
+        self.null = False
+        self.str = False
+        self.bool = False
+        self.float = False
+        self.int_min = None
+        self.int_max = None
+        self.other = None
+
+    def update(self, values: list):
+        types = set(map(type, values))
+        self.null |= type(None) in types
+        self.str |= str in types
+        self.bool |= bool in types
+        if float in types:
+            floats = [ v for v in values if type(v) is float ]
+            nans = sum(v != v for v in floats)
+            self.null |= nans > 0
+            self.float |= nans < len(floats)
+        if int in types:
+            ints = values if types == {int} else [ v for v in values if type(v) is int ]
+            self.int_min = min(ints) if self.int_min is None else min(self.int_min, *ints)
+            self.int_max = max(ints) if self.int_max is None else max(self.int_max, *ints)
+        if self.other is None:
+            self.other = next((v for v in values if type(v) not in self.KNOWN), None)
+
+    def merge(self, o: "ColKinds"):
+        self.null |= o.null
+        self.str |= o.str
+        self.bool |= o.bool
+        self.float |= o.float
+        if o.int_min is not None:
+            self.int_min = o.int_min if self.int_min is None else min(self.int_min, o.int_min)
+            self.int_max = o.int_max if self.int_max is None else max(self.int_max, o.int_max)
+        if self.other is None:
+            self.other = o.other
+
+    def samples(self) -> list:
+        samples = [None] if self.null else []
+        if self.int_min is not None:
+            samples += [self.int_min, self.int_max]
+        if self.float:
+            samples.append(.5)
+        if self.bool:
+            samples.append(True)
+        if self.str:
+            samples.append("")
+        if self.other is not None:
+            samples.append(self.other)
+        return samples
+
+    def dtype(self):
+        return pd.DataFrame([ {"c": v} for v in self.samples() ])["c"].dtype
+
+    def sample(self):
+        """One value of the column's final (post-`coerce_object_to_str`) type."""
+        dtype = self.dtype()
+        if dtype == object:
+            non_null = [ v for v in self.samples() if v is not None ]
+            return pd.Series(["" if non_null else None], dtype=object)
+        return pd.Series([0], dtype=dtype)
+
+
+@dataclass
+class Chunk:
+    """A worker's results for one byte range: row count (for `row_idx`
+    offsets), per-table spool file / length / column kinds, and the
+    bad-row / fatal events to report (chunk-relative row indices)."""
+    n_rows: int = 0
+    tables: dict = field(default_factory=dict)
+    events: list = field(default_factory=list)
+    issue_counts: Counter = field(default_factory=Counter)
+    fatal_count: int = 0
+
+
+def columnize(records: list[dict]) -> dict[str, list]:
+    """Records → columns, keyed in first-appearance order (like `pd.DataFrame(records)`)."""
+    keys = dict.fromkeys(chain.from_iterable(records))
+    return { k: list(map(dict.get, records, repeat(k))) for k in keys }
+
+
+def parse_chunk(
+    csv_path: Path,
+    header: list[str],
+    rng: tuple[int, int],
+    spool: str,
+    limit: int | None = None,
+    strict: bool = False,
+) -> Chunk:
+    start, end = rng
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    acc = Acc()
+    chunk = Chunk()
+    for row_idx, row in enumerate(csv.reader(io.StringIO(text, newline=""))):
+        chunk.n_rows = row_idx + 1
+        if len(row) != len(header):
+            chunk.events.append((row_idx, "bad", len(row)))
+            continue
+        try:
+            process_row(row_idx, row, header, acc)
+        except FatalDataIssue as e:
+            chunk.fatal_count += 1
+            record_fatal(e, acc)
+            chunk.events.append((row_idx, "fatal", (e.crash_id, e.message)))
+            if strict:
+                break
+        if limit and row_idx + 1 >= limit:
+            break
+    del text
+
+    chunk.issue_counts = acc.issue_counts
+    records = {
+        "crashes": acc.crashes,
+        "vehicles": acc.vehicles,
+        "persons": acc.persons,
+        "issues": [ i.__dict__ for i in acc.issues ],
+    }
+    for name in TABLES:
+        cols = columnize(records.pop(name))
+        kinds = {}
+        for col, values in cols.items():
+            kinds[col] = ColKinds()
+            kinds[col].update(values)
+        path = f"{spool}/{start}-{name}.pkl"
+        with open(path, "wb") as f:
+            pickle.dump(cols, f, protocol=pickle.HIGHEST_PROTOCOL)
+        n = len(next(iter(cols.values()))) if cols else 0
+        chunk.tables[name] = (path, n, kinds)
+    return chunk
+
+
+def limited_chunks(
+    parse: Callable[..., Chunk],
+    ranges: Iterable[tuple[int, int]],
+    limit: int,
+) -> Iterator[tuple[tuple[int, int], Chunk]]:
+    """Parse `ranges` in order, until `limit` rows have been read."""
+    remaining = limit
+    for rng in ranges:
+        chunk = parse(rng, limit=remaining)
+        yield rng, chunk
+        remaining -= chunk.n_rows
+        if remaining <= 0:
+            break
+
+
+def to_arrow(values: list, dtype, typ: pa.DataType) -> pa.Array:
+    """One spooled column → Arrow, as `coerce_object_to_str` + `Table.from_pandas` would."""
+    if dtype == object:
+        if set(map(type, values)) <= {str, type(None)}:
+            return pa.array(values, type=typ)
+        return pa.array([ None if v is None or (isinstance(v, float) and v != v) else str(v) for v in values ], type=typ)
+    if dtype == "float64":
+        return pa.array([ None if v is None else float(v) for v in values ], type=typ, from_pandas=True)
+    if dtype in ("int64", "bool"):
+        return pa.array(values, type=typ)
+    return pa.Array.from_pandas(pd.Series(values, dtype=object).astype(dtype), type=typ)
+
+
+def write_table(
+    path: Path,
+    parts: list[tuple[str, int, int]],
+    kinds: dict[str, ColKinds],
+    count_col: str | None = None,
+    row_group_size: int | None = None,
+) -> Counter:
+    """Write spooled `(spool path, row_idx offset, length)` parts as one parquet,
+    `row_group_size` rows per row group; returns value counts of `count_col`."""
+    row_group_size = row_group_size or ROW_GROUP_SIZE
+    n = sum(length for _, _, length in parts)
+    if not n:
+        pd.DataFrame([]).to_parquet(path, index=False)
+        return Counter()
+
+    dtypes = { col: k.dtype() for col, k in kinds.items() }
+    schema = pa.Schema.from_pandas(
+        pd.DataFrame({ col: k.sample() for col, k in kinds.items() }),
+        preserve_index=False,
+    )
+    value_counts = Counter()
+    buffered: list[pa.Table] = []
+    n_buffered = 0
+
+    def flush(writer, final: bool):
+        nonlocal buffered, n_buffered
+        while n_buffered >= row_group_size or (final and n_buffered):
+            tbl = pa.concat_tables(buffered).combine_chunks()
+            writer.write_table(tbl.slice(0, row_group_size))
+            rest = tbl.slice(row_group_size)
+            buffered, n_buffered = ([rest] if len(rest) else []), len(rest)
+
+    with pq.ParquetWriter(path, schema, compression="snappy") as writer:
+        for spool_path, offset, length in parts:
+            if not length:
+                continue
+            with open(spool_path, "rb") as f:
+                cols = pickle.load(f)
+            os.remove(spool_path)
+            cols["row_idx"] = [ i + offset for i in cols["row_idx"] ]
+            if count_col:
+                value_counts.update(cols[count_col])
+            arrays = [
+                to_arrow(cols.pop(col) if col in cols else [None] * length, dtypes[col], schema.field(col).type)
+                for col in schema.names
+            ]
+            buffered.append(pa.Table.from_arrays(arrays, schema=schema))
+            n_buffered += length
+            flush(writer, final=False)
+        flush(writer, final=True)
+    return value_counts
+
+
+def normalize(
+    csv_path: Path,
+    out_dir: Path,
+    limit: int | None = None,
+    strict: bool = False,
+    jobs: int | None = None,
+    chunk_bytes: int = CHUNK_BYTES,
+):
+    """Streaming path: parse byte ranges in `jobs` worker processes, then write
+    each table one row group at a time (see module docstring)."""
+    if limit:
+        # `--limit` counts rows from the top: parse ranges serially, as they're
+        # found, until `limit` rows are read (so memory stays one range's worth)
+        header, ranges = iter_record_ranges(csv_path, chunk_bytes)
+        jobs = 1
+    else:
+        header, ranges = record_ranges(csv_path, chunk_bytes)
+    jobs = jobs or os.cpu_count()
+
+    with tempfile.TemporaryDirectory(prefix=".normalize-", dir=out_dir) as spool:
+        parse = partial(parse_chunk, csv_path, header, spool=spool, strict=strict)
+        pool = ProcessPoolExecutor(jobs) if jobs > 1 and len(ranges) > 1 else None
+        if limit:
+            chunks = limited_chunks(parse, ranges, limit)
+        else:
+            chunks = zip(ranges, pool.map(parse, ranges) if pool else map(parse, ranges))
+
+        parts = { name: [] for name in TABLES }
+        kinds = { name: {} for name in TABLES }
+        counts = Counter()
+        issue_counts = Counter()
+        fatal_count = 0
+        offset = 0
+        try:
+            total = None if limit else sum(b - a for a, b in ranges)
+            with tqdm(total=total, unit="B", unit_scale=True, desc=csv_path.name) as bar:
+                for (a, b), chunk in chunks:
+                    for row_idx, kind, detail in chunk.events:
+                        row_idx += offset
+                        if kind == "bad":
+                            err(f"  row {row_idx}: bad column count ({detail} vs {len(header)}); skipping")
+                            continue
+                        crash_id, message = detail
+                        fatal_count += 1
+                        if fatal_count <= 5:
+                            err(f"  FATAL row {row_idx} crash_id={crash_id}: {message}")
+                        if strict:
+                            err(f"FATAL row {row_idx} crash_id={crash_id}: {message}")
+                            raise SystemExit(2)
+                    for name, (path, n, chunk_kinds) in chunk.tables.items():
+                        parts[name].append((path, offset, n, set(chunk_kinds)))
+                        counts[name] += n
+                        for col, k in chunk_kinds.items():
+                            if col in kinds[name]:
+                                kinds[name][col].merge(k)
+                            else:
+                                kinds[name][col] = k
+                    issue_counts.update(chunk.issue_counts)
+                    offset += chunk.n_rows
+                    bar.update(b - a)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+        # Columns absent from some (non-empty) chunks are null there
+        for name in TABLES:
+            for col, k in kinds[name].items():
+                k.null |= any(n and col not in chunk_cols for _, _, n, chunk_cols in parts[name])
+            parts[name] = [ (path, off, n) for path, off, n, _ in parts[name] ]
+
+        print_summary(counts, issue_counts, fatal_count)
+        for name in TABLES:
+            id_counts = write_table(out_dir / f"{name}.parquet", parts[name], kinds[name], count_col="crash_id" if name == "crashes" else None)
+            # Sanity: Crash IDs unique in crashes table
+            n_dup = sum(c - 1 for c in id_counts.values() if c > 1)
+            if n_dup:
+                err(f"WARN: {n_dup} duplicate Crash IDs in crashes table")
+
+
+@click.command()
+@click.option("-c", "--chunk-mb", type=float, default=CHUNK_BYTES / 2**20, help="Approximate CSV bytes (in MiB) per parse chunk")
+@click.option("-j", "--jobs", type=int, help="Parse chunks in this many worker processes (default: CPU count)")
+@click.option("-M", "--in-memory", is_flag=True, help="Parse and write each table in memory, in one process (reference path)")
+@click.option("-y", "--year", type=int, required=True)
+@click.option("-o", "--out-dir", type=click.Path(path_type=Path), default=Path("njdot/data"))
+@click.option("-n", "--limit", type=int, help="Stop after N data rows")
+@click.option("-S", "--strict/--lenient", default=False, help="Fatal on any data quality issue (default: only fatal on relational breaks)")
+@click.argument("csv_path", type=click.Path(exists=True, path_type=Path))
+def main(chunk_mb: float, jobs: int | None, in_memory: bool, year: int, out_dir: Path, limit: int | None, strict: bool, csv_path: Path):
+    out_dir = out_dir / str(year)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if in_memory:
+        normalize_in_memory(csv_path, out_dir, limit=limit, strict=strict)
+    else:
+        normalize(csv_path, out_dir, limit=limit, strict=strict, jobs=jobs, chunk_bytes=int(chunk_mb * 2**20))
     err(f"Wrote 4 parquets under {out_dir}/")
 
 
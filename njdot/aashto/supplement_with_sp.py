@@ -39,24 +39,14 @@ from njdot.paths import (
     AASHTO_SUPPLEMENTED_OCCUPANTS,
     AASHTO_SUPPLEMENTED_PEDESTRIANS,
 )
+from njdot.vtc import VTC_COLS, person_vtc
 from njsp.paths import NJSP_NJDOT_RESIDUALS
 
 err = partial(print, file=sys.stderr)
 
-# VTC matrix: 5 victim types × 5 conditions = 25 columns
-VICTIM_TYPES = ['d', 'o', 'p', 'b', 'u']  # driver, passenger, pedestrian, bicyclist, unknown
-CONDITIONS = ['f', 's', 'm', 'p', 'n']     # fatal, serious, minor, possible, none
-VTC_COLS = [f'{vt}{c}' for vt in VICTIM_TYPES for c in CONDITIONS]
-CONDITION_MAP = {1: 'f', 2: 's', 3: 'm', 4: 'p', 5: 'n', 0: 'n'}
 CRASH_PK = ['year', 'cc', 'mc', 'case']
 
 
-def _pos_to_vt(pos):
-    if pd.isna(pos) or pos == 0:
-        return 'u'
-    return 'd' if pos == 1 else 'o'
-
-
 def compute_vtc(occupants: pd.DataFrame, pedestrians: pd.DataFrame) -> pd.DataFrame:
     """Compute 25-col VTC matrix aggregated by (year, cc, mc, case).
 
@@ -64,33 +54,7 @@ def compute_vtc(occupants: pd.DataFrame, pedestrians: pd.DataFrame) -> pd.DataFr
     `pos` (occupants, 1=driver / 2-12=passenger), `cyclist` (peds).
     Returns a DataFrame indexed by CRASH_PK with VTC_COLS columns (int).
     """
-    o = occupants.copy()
-    o['cond'] = o['condition'].map(CONDITION_MAP).fillna('n')
-    o['vt'] = o['pos'].apply(_pos_to_vt)
-    o['vtc'] = o['vt'] + o['cond']
-
-    p = pedestrians.copy()
-    p['cond'] = p['condition'].map(CONDITION_MAP).fillna('n')
-    p['vt'] = p['cyclist'].apply(lambda b: 'b' if b else 'p')
-    p['vtc'] = p['vt'] + p['cond']
-
-    parts = []
-    for df in (o, p):
-        if not len(df):
-            continue
-        agg = df.groupby(CRASH_PK + ['vtc']).size().unstack(fill_value=0)
-        parts.append(agg)
-    if not parts:
-        return pd.DataFrame(columns=CRASH_PK + VTC_COLS).set_index(CRASH_PK)
-
-    combined = parts[0]
-    for extra in parts[1:]:
-        combined = combined.add(extra, fill_value=0)
-    for col in VTC_COLS:
-        if col not in combined.columns:
-            combined[col] = 0
-    combined = combined[VTC_COLS].fillna(0).astype(int)
-    return combined
+    return person_vtc(occupants, pedestrians, CRASH_PK)
 
 
 @click.command('supplement')
@@ -9,7 +9,7 @@ merge supplements + legacy masters on the PK tuple.
 
 Mapping decisions:
   - cc/mc derived from County + Municipality via `cc2mc2mn.json`,
-    reusing `to_njdot_schema.lookup_cc_mc` (handles known AASHTO
+    reusing `to_njdot_schema.crash_pk_index` (handles known AASHTO
     typos + cross-county misclassifications).
   - vehicle_index + 1 → `vn`; per-vehicle row order → `on`.
   - per-crash pedestrian row order → `pn`.
@@ -42,7 +42,7 @@ from functools import partial
 import click
 import pandas as pd
 
-from njdot.aashto.to_njdot_schema import load_cc2mc2mn, lookup_cc_mc
+from njdot.aashto.to_njdot_schema import crash_pk_index, load_cc2mc2mn
 from njdot.paths import (
     AASHTO_SUPPLEMENTED_OCCUPANTS,
     AASHTO_SUPPLEMENTED_PEDESTRIANS,
@@ -97,18 +97,6 @@ SEX_MAP = {
 }
 
 
-def build_crash_pk_lookup(aashto_crashes: pd.DataFrame, lookup: dict) -> pd.DataFrame:
-    """Build crash_id → (cc, mc, case) lookup from AASHTO crashes.parquet."""
-    cc_mc = aashto_crashes.apply(lambda r: lookup_cc_mc(lookup, r['County'], r['Municipality']), axis=1)
-    out = pd.DataFrame({
-        'crash_id': aashto_crashes['crash_id'],
-        'cc': cc_mc.apply(lambda x: x[0]),
-        'mc': cc_mc.apply(lambda x: x[1]),
-        'case': aashto_crashes['Case Number'].astype(str),
-    })
-    return out.set_index('crash_id')
-
-
 def normalize_age(age_series: pd.Series) -> pd.Series:
     """AASHTO uses 0 for unknown; DOTr uses blank/NaN. Map 0 → NaN."""
     age = pd.to_numeric(age_series, errors='coerce')
@@ -183,7 +171,7 @@ def process_year(year: int, lookup: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
     aashto_persons = pd.read_parquet(persons_path)
     err(f'  {year}: {len(aashto_persons):,} persons across {len(aashto_crashes):,} crashes')
 
-    pk_lookup = build_crash_pk_lookup(aashto_crashes, lookup)
+    pk_lookup = crash_pk_index(aashto_crashes, lookup)
     joined = aashto_persons.join(pk_lookup, on='crash_id', how='left')
 
     n_unmatched_pk = joined['cc'].isna().sum()
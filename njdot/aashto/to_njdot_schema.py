@@ -14,7 +14,8 @@ concat of 2024+2025 (or whichever years are present). `agg.py` and
 Mapping decisions:
   - cc/mc derived from County name + Municipality name via
     `www/public/njdot/cc2mc2mn.json` (matches strict equality first,
-    then strips trailing suffix words like `City`/`Twp`/`Boro`).
+    then strips trailing suffix words like `City`/`Twp`/`Boro`). Each
+    distinct pair is resolved once (`resolve_cc_mc`), then broadcast.
   - Crashes whose (County, Municipality) can't be looked up are
     *kept* with cc/mc = NaN (FE plots use NaN-aware groupby; map
     points are dropped at the geocode-filter stage).
@@ -32,6 +33,7 @@ from functools import partial
 from pathlib import Path
 
 import click
+import numpy as np
 import pandas as pd
 
 from njdot.paths import AASHTO_COMBINED_CRASHES, CC2MC2MN, aashto_year_path
@@ -99,6 +101,52 @@ def lookup_cc_mc(lookup: dict, county, muni):
     return (None, None)
 
 
+def map_distinct(fn, *cols: pd.Series) -> tuple[list, np.ndarray]:
+    """Call `fn` once per distinct tuple of `cols` values (all nulls, e.g.
+    `None` / `NaN` / `pd.NA`, count as one value).
+
+    Returns `(vals, codes)`: `vals[codes[i]] == fn(*(col.iloc[i] for col in cols))`.
+    Each distinct tuple is passed as its first occurrence's values, so `fn`
+    sees exactly what a per-row `apply` would."""
+    n = len(cols[0])
+    key = np.zeros(n, dtype="int64")
+    for col in cols:
+        codes, uniques = pd.factorize(col, use_na_sentinel=True)
+        key = key * (len(uniques) + 1) + (codes + 1)
+    codes, _ = pd.factorize(key)
+    _, first = np.unique(codes, return_index=True)
+    arrays = [ col.to_numpy(dtype=object) for col in cols ]
+    vals = [ fn(*(arr[i] for arr in arrays)) for i in first ]
+    return vals, codes
+
+
+def resolve_cc_mc(lookup: dict, county: pd.Series, muni: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """`lookup_cc_mc` over columns: each distinct (County, Municipality) pair
+    is resolved once (same aliases, suffix fallback and null handling), and
+    the codes broadcast back to rows. Returns `(cc, mc)` indexed like
+    `county`, with the dtypes a per-row `apply` would infer (int64, or
+    float64 if any pair is unresolved)."""
+    vals, codes = map_distinct(partial(lookup_cc_mc, lookup), county, muni)
+    cc = pd.Series([ v[0] for v in vals ]).take(codes)
+    mc = pd.Series([ v[1] for v in vals ]).take(codes)
+    cc.index = mc.index = county.index
+    return cc, mc
+
+
+def crash_pk_index(crashes: pd.DataFrame, lookup: dict) -> pd.DataFrame:
+    """`crash_id` → `(cc, mc, case)`, for per-vehicle / per-person tables to
+    `.join(..., on='crash_id')` (a single hash lookup per row against the
+    unique `crash_id` Index)."""
+    cc, mc = resolve_cc_mc(lookup, crashes['County'], crashes['Municipality'])
+    out = pd.DataFrame({
+        'crash_id': crashes['crash_id'],
+        'cc': cc,
+        'mc': mc,
+        'case': crashes['Case Number'].astype(str),
+    })
+    return out.set_index('crash_id')
+
+
 def infer_severity(fatal_indicator: str, ti: int) -> str:
     """Strict-fatal severity, aligned to NJSP / federal MMUCC reporting.
 
@@ -135,9 +183,9 @@ def to_njdot_schema(df: pd.DataFrame, year: int, lookup: dict) -> pd.DataFrame:
 
     # PK columns
     out["year"] = pd.Series(year, index=df.index, dtype="int32")
-    cc_mc = df.apply(lambda r: lookup_cc_mc(lookup, r["County"], r["Municipality"]), axis=1)
-    out["cc"] = cc_mc.apply(lambda x: x[0]).astype("Int8")
-    out["mc"] = cc_mc.apply(lambda x: x[1]).astype("Int16")
+    cc, mc = resolve_cc_mc(lookup, df["County"], df["Municipality"])
+    out["cc"] = cc.astype("Int8")
+    out["mc"] = mc.astype("Int16")
     out["case"] = df["Case Number"].astype("string")
 
     # Datetime — AASHTO has both `Date & Time of Crash` and `Date of Crash`
@@ -150,14 +198,19 @@ def to_njdot_schema(df: pd.DataFrame, year: int, lookup: dict) -> pd.DataFrame:
     # Indicator=N rows even if Total Killed>0). `tk_broad` retains the
     # raw `Total Killed`, which includes ~10% extra deaths where the
     # crash didn't *cause* the fatality (medical-event drivers etc.).
+    def ints(col: str) -> pd.Series:
+        vals, codes = map_distinct(to_int, df[col])
+        return pd.Series(np.asarray(vals, dtype="int64")[codes], index=df.index)
+
     fatal_indicator = df["Fatal Crash Indicator"].astype("string").fillna("")
-    ti = df["Total Injured"].apply(to_int)
-    pk = df["Total Pedestrians Killed"].apply(to_int)
-    pi = df["Total Injured Pedestrians"].apply(to_int)
-    tv = df["Total Vehicles"].apply(to_int)
-    tk_strict = df["Crash Fatality Count"].apply(to_int)
-    tk_broad = df["Total Killed"].apply(to_int)
-    out["severity"] = pd.Series([infer_severity(f, i) for f, i in zip(fatal_indicator, ti)], index=df.index, dtype="string")
+    ti = ints("Total Injured")
+    pk = ints("Total Pedestrians Killed")
+    pi = ints("Total Injured Pedestrians")
+    tv = ints("Total Vehicles")
+    tk_strict = ints("Crash Fatality Count")
+    tk_broad = ints("Total Killed")
+    severity, codes = map_distinct(infer_severity, fatal_indicator, ti)
+    out["severity"] = pd.Series(np.asarray(severity, dtype=object)[codes], index=df.index, dtype="string")
     out["tk"] = tk_strict.astype("int8")
     out["tk_broad"] = tk_broad.astype("int8")
     out["ti"] = ti.astype("int8")
@@ -30,7 +30,7 @@ from functools import partial
 import click
 import pandas as pd
 
-from njdot.aashto.to_njdot_schema import load_cc2mc2mn, lookup_cc_mc
+from njdot.aashto.to_njdot_schema import crash_pk_index, load_cc2mc2mn, map_distinct
 from njdot.paths import AASHTO_SUPPLEMENTED_VEHICLES, aashto_year_path
 
 err = partial(print, file=sys.stderr)
@@ -87,13 +87,7 @@ def process_year(year: int, lookup: dict) -> pd.DataFrame | None:
     veh = pd.read_parquet(vehicles_path, columns=['crash_id', 'Extent of Damage', 'Removed To'])
     err(f'  {year}: {len(veh):,} vehicles across {len(crashes):,} crashes')
 
-    cc_mc = crashes.apply(lambda r: lookup_cc_mc(lookup, r['County'], r['Municipality']), axis=1)
-    pk = pd.DataFrame({
-        'crash_id': crashes['crash_id'],
-        'cc': cc_mc.apply(lambda x: x[0]),
-        'mc': cc_mc.apply(lambda x: x[1]),
-        'case': crashes['Case Number'].astype(str),
-    }).set_index('crash_id')
+    pk = crash_pk_index(crashes, lookup)
 
     v = veh.join(pk, on='crash_id', how='left')
     n_unmatched = v['cc'].isna().sum()
@@ -102,7 +96,8 @@ def process_year(year: int, lookup: dict) -> pd.DataFrame | None:
 
     v['year'] = pd.Series(year, index=v.index, dtype='int32')
     v['damage'] = v['Extent of Damage'].map(DAMAGE_MAP).astype('Int8')
-    v['departure'] = v['Removed To'].apply(map_departure).astype('Int8')
+    departures, codes = map_distinct(map_departure, v['Removed To'])
+    v['departure'] = pd.Series(departures, dtype=object).take(codes).set_axis(v.index).astype('Int8')
 
     out = v[['year', 'cc', 'mc', 'case', 'damage', 'departure']].copy()
     out = out.dropna(subset=['cc'])  # match the persons adapter pattern
@@ -11,14 +11,22 @@ Output files go to `www/public/data/njdot/` for hyparquet to load.
 
 from functools import reduce
 from pathlib import Path
+from time import time
+from typing import Callable, Optional
 
 import click
+import numpy as np
 import pandas as pd
 
+from nj_crashes.utils.stage import staged
+from njdot.compact import read_pqt
+from njdot.features import aashto_source, features_current, load_features, read_metadata
 from njdot.paths import (
-    AASHTO_SUPPLEMENTED_CRASHES, AASHTO_SUPPLEMENTED_VEHICLES, CRASHES_PQT,
+    AASHTO_SUPPLEMENTED_CRASHES, AASHTO_SUPPLEMENTED_VEHICLES, CRASH_FEATURES_PQT, CRASHES_PQT,
     WWW_DATA_DOT, OCCUPANTS_PQT, PEDESTRIANS_PQT, VEHICLES_PQT,
 )
+# Victim type × condition matrix columns
+from njdot.vtc import CONDITIONS, VTC_COLS, person_vtc
 
 
 # Dimension columns
@@ -30,12 +38,6 @@ DIMS = {
     's': 'severity',
 }
 
-# Victim type × condition matrix columns
-VICTIM_TYPES = ['d', 'o', 'p', 'b', 'u']  # driver, passenger, pedestrian, bicyclist, unknown
-CONDITIONS = ['f', 's', 'm', 'p', 'n']     # fatal, serious, minor, possible, none
-VTC_COLS = [f'{vt}{c}' for vt in VICTIM_TYPES for c in CONDITIONS]
-CONDITION_MAP = {1: 'f', 2: 's', 3: 'm', 4: 'p', 5: 'n', 0: 'n'}
-
 # Vehicle damage tiers (NJTR-1 "Extent of Damage"). Source codes: 1=None,
 # 2=Minor, 3=Moderate, 4=Disabling. Data only exists 2017+; pre-2017 all NA →
 # `vdu` (unknown).
@@ -63,13 +65,6 @@ HAS_TO_N = {c: f'n_{c.split("_")[1]}' for c in HAS_COLS}
 MEASURES = ['n', 'tk', 'ti', 'pk', 'pi', 'tv'] + VTC_COLS + VD_COLS + VEP_COLS + HAS_COLS
 
 
-def _pos_to_vt(pos):
-    """Driver / passenger / unknown classification from `pos` field."""
-    if pd.isna(pos) or pos == 0:
-        return 'u'
-    return 'd' if pos == 1 else 'o'
-
-
 def compute_legacy_vtc(occupants_path: Path, pedestrians_path: Path) -> pd.DataFrame:
     """Compute per-crash 25-col VTC matrix from legacy O/P master parquets.
 
@@ -88,23 +83,10 @@ def compute_legacy_vtc(occupants_path: Path, pedestrians_path: Path) -> pd.DataF
     # apparent injury) so those people still count as crash participants;
     # otherwise pre-2019 People bars would be artificially ~85% lower than
     # later years.
-    o = pd.read_parquet(occupants_path, columns=['crash_id', 'pos', 'condition'])
-    o['cond'] = o['condition'].map(CONDITION_MAP).fillna('n')
-    o['vt'] = o['pos'].apply(_pos_to_vt)
-    o['vtc'] = o['vt'] + o['cond']
-    o_agg = o.groupby(['crash_id', 'vtc']).size().unstack(fill_value=0)
-
-    p = pd.read_parquet(pedestrians_path, columns=['crash_id', 'cyclist', 'condition'])
-    p['cond'] = p['condition'].map(CONDITION_MAP).fillna('n')
-    p['vt'] = p['cyclist'].apply(lambda b: 'b' if b else 'p')
-    p['vtc'] = p['vt'] + p['cond']
-    p_agg = p.groupby(['crash_id', 'vtc']).size().unstack(fill_value=0)
-
-    combined = o_agg.add(p_agg, fill_value=0)
-    for col in VTC_COLS:
-        if col not in combined.columns:
-            combined[col] = 0
-    combined = combined[VTC_COLS].fillna(0).astype('int32')
+    # Occupants: int code columns only, read compact (narrow ints); `person_vtc` works on any int width.
+    o = read_pqt(occupants_path, columns=['crash_id', 'pos', 'condition'], compact=True)
+    p = read_pqt(pedestrians_path, columns=['crash_id', 'cyclist', 'condition'])
+    combined = person_vtc(o, p, ['crash_id']).astype('int32')
     print(f"    {len(combined):,} crashes with VTC; total cells = {combined.values.sum():,}")
     return combined
 
@@ -121,7 +103,7 @@ def compute_legacy_vehicle_facets(vehicles_path: Path) -> pd.DataFrame:
     Departure field is well-coded 2001+ at ~87-95% coverage.
     """
     print(f"  Computing legacy vehicle facets from {vehicles_path.name}...")
-    v = pd.read_parquet(vehicles_path, columns=['crash_id', 'damage', 'departure'])
+    v = read_pqt(vehicles_path, columns=['crash_id', 'damage', 'departure'], compact=True)
     v['vd'] = v['damage'].map(DAMAGE_MAP).fillna('vdu')
     v['vep'] = v['departure'].map(DEPARTURE_MAP).fillna('vepu')
 
@@ -162,7 +144,23 @@ def compute_aashto_vehicle_facets(vehicles_path: Path) -> pd.DataFrame:
     return combined.reset_index()
 
 
-def load_crashes(path: Path, enrich_legacy_vtc: bool = False, enrich_legacy_vehicles: bool = False) -> pd.DataFrame:
+def _fill_missing(stored: pd.DataFrame, missing: Optional[pd.Index], compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """Feature-store rows (indexed by `crash_id`), plus `compute()`'s rows for
+    the `missing` crash_ids the store doesn't have."""
+    if missing is None or missing.empty:
+        return stored
+    computed = compute()
+    computed = computed.loc[computed.index.intersection(missing)].reindex(columns=stored.columns, fill_value=0)
+    return pd.concat([stored, computed])
+
+
+@staged()
+def load_crashes(
+        path: Path,
+        enrich_legacy_vtc: bool = False,
+        enrich_legacy_vehicles: bool = False,
+        aashto_input: Optional[Path] = None,
+) -> pd.DataFrame:
     """Load crashes parquet and add month column.
 
     `enrich_legacy_vtc=True` merges VTC columns from legacy O/P masters via
@@ -172,6 +170,11 @@ def load_crashes(path: Path, enrich_legacy_vtc: bool = False, enrich_legacy_vehi
     `enrich_legacy_vehicles=True` adds per-crash damage + departure buckets
     from `vehicles.parquet` (same crash_id join). No AASHTO equivalent for
     2024+ yet (see specs/vehicle-facets.md Phase 4).
+
+    Both enrichments are read from the feature store when it's current. The
+    store omits legacy crashes of the years its AASHTO source superseded, so
+    unless `aashto_input` is that same source, the joins are computed for the
+    crash_ids it lacks.
     """
     import pyarrow.parquet as pq
     schema_cols = set(pq.read_schema(path).names)
@@ -182,7 +185,7 @@ def load_crashes(path: Path, enrich_legacy_vtc: bool = False, enrich_legacy_vehi
         print(f"  VTC columns found: {len(vtc_present)}/{len(VTC_COLS)}")
     else:
         print(f"  No VTC columns in {path.name}, using basic measures only")
-    df = pd.read_parquet(path, columns=base_cols + vtc_present)
+    df = read_pqt(path, columns=base_cols + vtc_present)
     df['month'] = pd.to_datetime(df['dt']).dt.month
     df['n'] = 1  # count column
     for c in VTC_COLS + VD_COLS + VEP_COLS:
@@ -191,8 +194,29 @@ def load_crashes(path: Path, enrich_legacy_vtc: bool = False, enrich_legacy_vehi
 
     # Enrich legacy crashes with VTC by joining O/P masters via crash_id
     # (== crashes.parquet row-index). No-op if VTC cols were already present.
+    # Both joins come precomputed from the feature store when it's current
+    # (its `crash_id` indexes the master crashes.parquet, so only that input).
+    stored, missing = None, None
+    enrich = enrich_legacy_vtc and not vtc_present or enrich_legacy_vehicles
+    if enrich and Path(path) == Path(CRASHES_PQT) and features_current():
+        print(f"  Reading legacy VTC + vehicle facets from {CRASH_FEATURES_PQT}...")
+        stored = load_features(columns=['crash_id'] + VTC_COLS + VD_COLS + VEP_COLS, legacy=True)
+        stored = stored.set_index(stored['crash_id'].astype('int64')).drop(columns='crash_id')
+        store_aashto = read_metadata().get('aashto_source')
+        if store_aashto != (aashto_input and aashto_source(aashto_input)):
+            # The store lacks legacy crashes of the years its AASHTO source superseded, which
+            # `aashto_input` (if any) may not cover
+            missing = df.index.difference(stored.index)
+            print(f"    store built against AASHTO {store_aashto}, not {aashto_input}: {len(missing):,} crashes to join directly")
+
     if enrich_legacy_vtc and not vtc_present:
-        vtc = compute_legacy_vtc(Path(OCCUPANTS_PQT), Path(PEDESTRIANS_PQT))
+        if stored is not None:
+            vtc = _fill_missing(
+                stored[VTC_COLS], missing,
+                lambda: compute_legacy_vtc(Path(OCCUPANTS_PQT), Path(PEDESTRIANS_PQT)),
+            )
+        else:
+            vtc = compute_legacy_vtc(Path(OCCUPANTS_PQT), Path(PEDESTRIANS_PQT))
         # crashes.parquet's RangeIndex is the crash_id used by O/P
         merged = df.join(vtc, how='left', rsuffix='_vtc')
         for c in VTC_COLS:
@@ -203,7 +227,13 @@ def load_crashes(path: Path, enrich_legacy_vtc: bool = False, enrich_legacy_vehi
         df = merged
 
     if enrich_legacy_vehicles:
-        veh = compute_legacy_vehicle_facets(Path(VEHICLES_PQT))
+        if stored is not None:
+            veh = _fill_missing(
+                stored[VD_COLS + VEP_COLS], missing,
+                lambda: compute_legacy_vehicle_facets(Path(VEHICLES_PQT)),
+            )
+        else:
+            veh = compute_legacy_vehicle_facets(Path(VEHICLES_PQT))
         merged = df.join(veh, how='left', rsuffix='_veh')
         for c in VD_COLS + VEP_COLS:
             veh_col = f'{c}_veh'
@@ -241,6 +271,11 @@ def aggregate(df: pd.DataFrame, dims: list[str]) -> pd.DataFrame:
     """Aggregate crashes by given dimensions."""
     group_cols = [DIMS[d] for d in dims]
     agg_df = df.groupby(group_cols, as_index=False)[MEASURES].sum()
+    return _finish(agg_df, group_cols)
+
+
+def _finish(agg_df: pd.DataFrame, group_cols: list[str]) -> pd.DataFrame:
+    """Rename, drop empty VTC columns and downcast a `groupby(...).sum()`."""
     # Rename columns to short names
     rename = {v: k for k, v in DIMS.items() if v in group_cols}
     # Also rename `has_*` (crash-level 0/1) to `n_*` (bucket count) after
@@ -268,6 +303,90 @@ def aggregate(df: pd.DataFrame, dims: list[str]) -> pd.DataFrame:
     return agg_df
 
 
+def narrow_measures(df: pd.DataFrame, keys: list[str]) -> tuple[pd.DataFrame, dict]:
+    """`df[keys + MEASURES]`, with integral numpy measure columns downcast to
+    the narrowest signed int that holds them (float NaN → 0, which `sum`
+    skips anyway), so the groupby scans a fraction of the bytes.
+
+    Returns the narrowed frame and each measure's original dtype, which
+    `_widen_sums` uses to restore the dtypes a direct `groupby().sum()`
+    would have produced. Non-integral floats and extension dtypes are left
+    as-is."""
+    dtypes = {c: df[c].dtype for c in MEASURES}
+    narrowed = {}
+    for c, dtype in dtypes.items():
+        if not isinstance(dtype, np.dtype) or dtype.kind not in 'biuf':
+            continue
+        col = df[c].to_numpy()
+        if dtype.kind == 'f':
+            col = np.nan_to_num(col, nan=0.)
+            if not np.isfinite(col).all() or (col != np.round(col)).any():
+                continue
+        if len(col) == 0:
+            continue
+        lo, hi = col.min(), col.max()
+        for t in (np.int8, np.int16, np.int32, np.int64):
+            info = np.iinfo(t)
+            if info.min <= lo and hi <= info.max:
+                narrowed[c] = col.astype(t)
+                break
+    return pd.DataFrame({c: narrowed.get(c, df[c]) for c in keys + MEASURES}), dtypes
+
+
+def _widen_sums(agg_df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """Cast measure sums to the dtype `groupby().sum()` returns for the
+    original (pre-`narrow_measures`) column: ints come back in their own
+    dtype when every sum fits, else 64-bit; bools as int64; floats as-is."""
+    for c, dtype in dtypes.items():
+        if not isinstance(dtype, np.dtype) or agg_df[c].dtype == dtype:
+            continue
+        col = agg_df[c]
+        if dtype.kind == 'b':
+            out = np.dtype('int64')
+        elif dtype.kind in 'iu':
+            info = np.iinfo(dtype)
+            fits = len(col) == 0 or (info.min <= col.min() and col.max() <= info.max)
+            out = dtype if fits else np.dtype('int64' if dtype.kind == 'i' else 'uint64')
+        else:
+            out = dtype
+        agg_df[c] = col.astype(out)
+    return agg_df
+
+
+@staged()
+def aggregate_lattice(df: pd.DataFrame, configs: dict[str, list[str]]) -> dict[str, pd.DataFrame]:
+    """`aggregate(df, dims)` for every `configs` entry from one scan of `df`.
+
+    The finest grouping (the union of all requested dims) is summed once
+    over the crashes, keeping null keys (`dropna=False`). Every other
+    grouping is rolled up from the smallest already-computed grouping whose
+    dims contain it, then drops its own null-key rows. The outputs equal
+    direct `aggregate` calls: counts are integral, so sums are exact in any
+    order, and `narrow_measures` / `_widen_sums` keep the output dtypes.
+    Logs the time spent per grouping."""
+    finest = [DIMS[d] for d in DIMS if any(d in dims for dims in configs.values())]
+    df, dtypes = narrow_measures(df, finest)
+    t0 = time()
+    sums = {tuple(finest): df.groupby(finest, as_index=False, dropna=False)[MEASURES].sum()}
+    print(f"  {'/'.join(finest)}: {len(sums[tuple(finest)]):,} groups from {len(df):,} crashes in {time() - t0:.2f}s")
+    out = {}
+    # Finest-first, so a grouping's smallest computed superset is usually
+    # only one dim finer.
+    for name, dims in sorted(configs.items(), key=lambda kv: -len(kv[1])):
+        group_cols = [DIMS[d] for d in dims]
+        t0 = time()
+        key = tuple(group_cols)
+        if key not in sums:
+            src = min((k for k in sums if set(key) <= set(k)), key=lambda k: len(sums[k]))
+            sums[key] = sums[src].groupby(list(key), as_index=False, dropna=False)[MEASURES].sum()
+        agg_df = sums[key].dropna(subset=list(key)).reset_index(drop=True)
+        agg_df = _widen_sums(agg_df[group_cols + MEASURES].copy(), dtypes)
+        out[name] = _finish(agg_df, group_cols)
+        print(f"  {name}: {len(out[name]):,} rows in {time() - t0:.2f}s")
+    return {name: out[name] for name in configs}
+
+
+@staged()
 def write_parquet(df: pd.DataFrame, path: Path):
     """Write aggregation to parquet with snappy compression (hyparquet-compatible)."""
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -324,7 +443,7 @@ def agg(input_path: str, aashto_input: str, output_dir: str, aggs: str):
     # Legacy crashes.parquet has no VTC cols — enrich from O/P masters via
     # crash_id join, so pre-2023 years populate the 25-cell matrix. Also
     # join vehicles.parquet for per-crash damage/departure facets.
-    df = load_crashes(input_path, enrich_legacy_vtc=True, enrich_legacy_vehicles=True)
+    df = load_crashes(input_path, enrich_legacy_vtc=True, enrich_legacy_vehicles=True, aashto_input=aashto_input)
     print(f"  {len(df):,} crashes loaded ({df['year'].min()}-{df['year'].max()})")
 
     if aashto_input.exists():
@@ -399,25 +518,29 @@ def agg(input_path: str, aashto_input: str, output_dir: str, aggs: str):
     agg_list = [a.strip() for a in aggs.split(',')]
 
     print(f"\nGenerating {len(agg_list)} aggregations...")
+    configs = {}
     for agg_name in agg_list:
         if agg_name not in AGG_CONFIGS:
             print(f"  {agg_name}: unknown aggregation (available: {', '.join(AGG_CONFIGS.keys())})")
             continue
-        dims = AGG_CONFIGS[agg_name]
-        try:
-            agg_df = aggregate(df, dims)
-            # Split municipality-level files by county for faster loading
-            if 'mc' in dims:
-                county_dir = output_dir / agg_name
-                county_dir.mkdir(parents=True, exist_ok=True)
-                for cc_val in sorted(agg_df['cc'].unique()):
-                    cc_df = agg_df[agg_df['cc'] == cc_val].drop(columns=['cc'])
-                    write_parquet(cc_df, county_dir / f"{cc_val}.parquet")
-                total_kb = sum(f.stat().st_size for f in county_dir.glob('*.parquet')) / 1024
-                print(f"  {agg_name}/: {len(agg_df):,} rows total, {total_kb:.1f} KB across {len(agg_df['cc'].unique())} counties")
-            else:
-                write_parquet(agg_df, output_dir / f"{agg_name}.parquet")
-        except KeyError as e:
-            print(f"  {agg_name}: error {e}")
+        missing = [DIMS[d] for d in AGG_CONFIGS[agg_name] if DIMS[d] not in df.columns]
+        if missing:
+            print(f"  {agg_name}: error {KeyError(missing)}")
+            continue
+        configs[agg_name] = AGG_CONFIGS[agg_name]
+    agg_dfs = aggregate_lattice(df, configs) if configs else {}
+    for agg_name, agg_df in agg_dfs.items():
+        dims = configs[agg_name]
+        # Split municipality-level files by county for faster loading
+        if 'mc' in dims:
+            county_dir = output_dir / agg_name
+            county_dir.mkdir(parents=True, exist_ok=True)
+            for cc_val in sorted(agg_df['cc'].unique()):
+                cc_df = agg_df[agg_df['cc'] == cc_val].drop(columns=['cc'])
+                write_parquet(cc_df, county_dir / f"{cc_val}.parquet")
+            total_kb = sum(f.stat().st_size for f in county_dir.glob('*.parquet')) / 1024
+            print(f"  {agg_name}/: {len(agg_df):,} rows total, {total_kb:.1f} KB across {len(agg_df['cc'].unique())} counties")
+        else:
+            write_parquet(agg_df, output_dir / f"{agg_name}.parquet")
 
     print("\nDone!")
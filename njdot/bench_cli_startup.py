@@ -0,0 +1,110 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["click"]
+# ///
+"""Report `python -X importtime` startup totals for the `njsp`, `njdot` and
+`rawdata` entry points.
+
+Each entry point runs (`-a`, default `--help`) `-n` times in a fresh
+interpreter. For the fastest run, this reports:
+
+- wall time;
+- the import total (sum of `-X importtime` self times), and the module count;
+- which `HEAVY_MODULES` got imported;
+- the `-k` slowest top-level imports (cumulative).
+"""
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from functools import partial
+from time import perf_counter
+
+import click
+
+err = partial(print, file=sys.stderr)
+
+# Entry point name → `module:function`, as in `pyproject.toml`'s `[project.scripts]`
+ENTRY_POINTS = {
+    'njsp': 'njsp.cli.main:main',
+    'njdot': 'njdot.cli.main:main',
+    'rawdata': 'njdot.rawdata.main:main',
+}
+
+# Slow-to-import libraries that `--help` shouldn't pull in
+HEAVY_MODULES = [
+    'boto3', 'dask', 'duckdb', 'geopandas', 'git', 'h3', 'numpy', 'pandas',
+    'plotly', 'pyarrow', 'requests', 'scipy', 'shapely', 'utz',
+]
+
+IMPORT_TIME_RGX = re.compile(r'import time:\s*(\d+)\s*\|\s*(\d+)\s*\|( *)(\S+)')
+
+
+@dataclass
+class Startup:
+    wall: float
+    self_us: dict[str, int]
+    cumulative_us: dict[str, int]
+    top_level: list[str]
+
+    @property
+    def total_us(self) -> int:
+        return sum(self.self_us.values())
+
+    @property
+    def heavy(self) -> list[str]:
+        return [ mod for mod in HEAVY_MODULES if mod in self.self_us ]
+
+
+def startup_code(entry_point: str, args: list[str]) -> str:
+    module, fn = ENTRY_POINTS[entry_point].split(':')
+    return '\n'.join([
+        'import sys',
+        f'sys.argv = {[entry_point, *args]!r}',
+        f'from {module} import {fn}',
+        f'{fn}()',
+    ])
+
+
+def run_startup(entry_point: str, args: list[str]) -> Startup:
+    """Run `entry_point` with `args` under `-X importtime` in a fresh interpreter."""
+    t0 = perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', startup_code(entry_point, args)],
+        capture_output=True, text=True,
+    )
+    wall = perf_counter() - t0
+    self_us, cumulative_us, top_level = {}, {}, []
+    for line in proc.stderr.splitlines():
+        m = IMPORT_TIME_RGX.match(line)
+        if not m:
+            continue
+        slf, cum, indent, mod = m.groups()
+        self_us[mod] = int(slf)
+        cumulative_us[mod] = int(cum)
+        if len(indent) == 1:
+            top_level.append(mod)
+    return Startup(wall=wall, self_us=self_us, cumulative_us=cumulative_us, top_level=top_level)
+
+
+@click.command()
+@click.option('-a', '--args', default='--help', help='Arguments to each entry point (space-separated)')
+@click.option('-k', '--top', type=int, default=5, help='Show this many slowest top-level imports')
+@click.option('-n', '--runs', type=int, default=3, help='Runs per entry point (the fastest is reported)')
+@click.argument('entry_points', nargs=-1)
+def main(args: str, top: int, runs: int, entry_points: tuple[str, ...]):
+    for entry_point in entry_points or ENTRY_POINTS:
+        results = [ run_startup(entry_point, args.split()) for _ in range(runs) ]
+        res = min(results, key=lambda r: r.wall)
+        print(
+            f"{entry_point} {args}: {res.wall:.2f}s wall, {res.total_us / 1e6:.2f}s imports "
+            f"({len(res.self_us)} modules), heavy: {', '.join(res.heavy) or '-'}"
+        )
+        slowest = sorted(res.top_level, key=res.cumulative_us.get, reverse=True)[:top]
+        for mod in slowest:
+            print(f"  {res.cumulative_us[mod] / 1e3:8.1f}ms  {mod}")
+
+
+if __name__ == '__main__':
+    main()
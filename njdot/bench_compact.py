@@ -0,0 +1,156 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["click", "numpy", "pandas", "pyarrow"]
+# ///
+"""Report bytes on disk and load RSS for the NJDOT master parquets: plain
+`to_parquet` vs. `njdot.compact.write_pqt`.
+
+Tables are the existing masters under `DOT_DATA` (`crashes`, `vehicles`,
+`occupants`, `pedestrians`, `drivers`), or, with `-n` or when none exist,
+synthetic `crashes`- and `vehicles`-shaped tables. Each table is written both
+ways to a temp dir. Then each of these reads runs in a fresh interpreter:
+
+- `plain`: `pd.read_parquet` of the plain file;
+- `restored`: `read_pqt` of the compact file (original dtypes);
+- `compact`: `read_pqt(..., compact=True)` (narrow dtypes, categoricals).
+
+Each read reports its peak RSS above the post-import baseline, and the
+frame's `memory_usage(deep=True)`.
+"""
+import json
+import subprocess
+import sys
+import tempfile
+from functools import partial
+from os.path import exists
+from pathlib import Path
+
+import click
+import numpy as np
+import pandas as pd
+
+from njdot.compact import read_pqt, write_pqt
+from njdot.paths import DOT_DATA
+from njdot.vtc import VTC_COLS
+
+err = partial(print, file=sys.stderr)
+
+TABLES = ['crashes', 'vehicles', 'occupants', 'pedestrians', 'drivers']
+
+
+def synthetic_crashes(n: int, seed: int = 0) -> pd.DataFrame:
+    """`crashes.parquet`-shaped columns (PKs, codes, free-text and route
+    strings, geocodes, int64 victim counts), at roughly the real cardinalities."""
+    rng = np.random.default_rng(seed)
+    codes = lambda hi: pd.array(np.where(rng.random(n) < .1, None, rng.integers(1, hi, n)), dtype='Int8')
+    roads = np.array([ f'ROAD {i}' for i in range(max(n // 20, 1)) ], dtype=object)
+    df = pd.DataFrame({
+        'year': rng.integers(2001, 2024, n).astype('int16'),
+        'cc': rng.integers(1, 22, n).astype('int8'),
+        'mc': rng.integers(1, 40, n).astype('int8'),
+        'case': [ f'{k:08d}' for k in rng.integers(0, 10 ** 8, n) ],
+        'dt': pd.to_datetime(rng.integers(10 ** 9, 17 * 10 ** 8, n), unit='s').astype('datetime64[us]'),
+        'severity': rng.choice(np.array(['f', 'i', 'p'], dtype=object), n, p=[.01, .3, .69]),
+        'road': rng.choice(roads, n),
+        'cross_street': np.where(rng.random(n) < .4, None, rng.choice(roads, n)),
+        'route': pd.array(np.where(rng.random(n) < .6, None, rng.integers(1, 700, n)), dtype='Int16'),
+        'sri': rng.choice(np.array([ f'{i:08d}__' for i in range(2000) ] + [None], dtype=object), n),
+        'mp': np.round(rng.uniform(0, 60, n), 2),
+        'olat': rng.uniform(38.9, 41.4, n),
+        'olon': rng.uniform(-75.6, -73.9, n),
+        'police_dept': rng.choice(np.array([ f'PD {i}' for i in range(600) ], dtype=object), n),
+        'crash_type': codes(17),
+        'light_condition': codes(9),
+        'cc0': pd.array(np.where(rng.random(n) < .95, None, rng.integers(1, 22, n)), dtype='Int8'),
+        'tk': rng.poisson(.01, n).astype('int8'),
+        'ti': rng.poisson(.4, n).astype('int8'),
+        'tv': rng.integers(1, 4, n).astype('int8'),
+        **{ c: rng.poisson(.05, n).astype('int64') for c in VTC_COLS },
+    })
+    df.index.name = 'id'
+    return df
+
+
+def synthetic_vehicles(n: int, seed: int = 1) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'crash_id': pd.array(rng.integers(0, n // 2, n), dtype='Int32'),
+        'year': rng.integers(2001, 2024, n).astype('int16'),
+        'vn': rng.integers(1, 4, n).astype('int8'),
+        'make': rng.choice(np.array(['TOYOTA', 'HONDA', 'FORD', 'NISSAN', None], dtype=object), n),
+        'color': rng.choice(np.array(['BK', 'WH', 'GY', 'SL', 'RD', 'BL', None], dtype=object), n),
+        'model_year': pd.array(np.where(rng.random(n) < .1, None, rng.integers(1980, 2024, n)), dtype='Int64'),
+        'damage': pd.array(np.where(rng.random(n) < .5, None, rng.integers(1, 6, n)), dtype='Int64'),
+        'departure': rng.integers(0, 4, n).astype('int64'),
+        'occupants': rng.integers(0, 6, n).astype('float64'),
+    })
+    df.index.name = 'id'
+    return df
+
+
+def load_rss(path: Path, mode: str) -> dict:
+    """Read `path` in a fresh interpreter; returns peak RSS above the post-import
+    baseline, and the frame's deep memory usage (MiB)."""
+    # `ru_maxrss` survives fork/exec (the child would start at this process's
+    # peak); `VmHWM` is the child's own high-water mark.
+    code = f"""
+import json, re
+import pandas as pd
+from njdot.compact import read_pqt
+def hwm():
+    with open('/proc/self/status') as f:
+        return int(re.search(r'VmHWM:\\s*(\\d+)', f.read()).group(1))
+base = hwm()
+mode = {mode!r}
+df = pd.read_parquet({str(path)!r}) if mode == 'plain' else read_pqt({str(path)!r}, compact=mode == 'compact')
+print(json.dumps(dict(rss_mb=(hwm() - base) / 1024, mem_mb=df.memory_usage(deep=True).sum() / 2**20)))
+"""
+    proc = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+@click.command()
+@click.option('-d', '--data-dir', default=DOT_DATA, help='Read master parquets from this directory')
+@click.option('-k', '--keep', type=click.Path(path_type=Path), help='Write the plain / compact parquets here (default: a temp dir)')
+@click.option('-n', '--rows', type=int, help='Use synthetic crashes / vehicles tables with this many rows')
+@click.option('-s', '--seed', type=int, default=0)
+def main(data_dir: str, keep: Path | None, rows: int | None, seed: int):
+    if rows is None:
+        tables = { tbl: partial(pd.read_parquet, f'{data_dir}/{tbl}.parquet') for tbl in TABLES if exists(f'{data_dir}/{tbl}.parquet') }
+    else:
+        tables = {}
+    if not tables:
+        rows = rows or 1_000_000
+        err(f"Using synthetic tables ({rows:,} rows)")
+        tables = {
+            'crashes': partial(synthetic_crashes, rows, seed),
+            'vehicles': partial(synthetic_vehicles, 2 * rows, seed + 1),
+        }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = keep or Path(tmp)
+        root.mkdir(parents=True, exist_ok=True)
+        print(f"{'table':>12s} {'rows':>11s} {'plain':>10s} {'compact':>10s}  {'load RSS / frame MiB: plain':>28s} {'restored':>16s} {'compact':>16s}")
+        for tbl, load in tables.items():
+            df = load()
+            plain = root / f'{tbl}.plain.parquet'
+            packed = root / f'{tbl}.compact.parquet'
+            df.to_parquet(plain)
+            write_pqt(df, str(packed))
+            pd.testing.assert_frame_equal(read_pqt(str(packed)), df)
+            n = len(df)
+            del df
+            loads = {
+                mode: load_rss(path, mode)
+                for mode, path in [ ('plain', plain), ('restored', packed), ('compact', packed) ]
+            }
+            mib = lambda p: f'{p.stat().st_size / 2**20:7.1f}MiB'
+            print(
+                f"{tbl:>12s} {n:>11,} {mib(plain)} {mib(packed)}  " +
+                " ".join(f"{r['rss_mb']:7.1f} / {r['mem_mb']:6.1f}" for r in loads.values())
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["click", "numpy", "pandas", "pyarrow", "utz"]
+# ///
+"""Benchmark per-table crash-PK mapping: merges vs. the persistent crash PK index.
+
+Writes `-n` synthetic crashes (plus the `crash_pk_mappings.parquet` that
+`crashes.load` exports) to a temp dir. It also builds vehicle- / driver- /
+occupant- / pedestrian-sized tables keyed by their crashes' raw PKs. Each
+table is then mapped to `crash_id` two ways:
+
+- **merge**: `remap_crash_pks` against `crash_pk_mappings.parquet`, then
+  `normalize` merging against `crashes.parquet`'s PK columns;
+- **index**: `load_crash_pk_index` (memory-mapping the index, built once up
+  front and reported separately), then the same two calls with `index=`.
+
+`--check` asserts both give identical frames. Stdout is the report; progress
+logging goes to stderr.
+"""
+import sys
+import tempfile
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+
+import click
+import numpy as np
+import pandas as pd
+
+from njdot import load
+from njdot.crash_pk_index import build, load_crash_pk_index
+from njdot.load import normalize, remap_crash_pks
+
+err = partial(print, file=sys.stderr)
+
+# Rows per crash, roughly as in the 2001-2023 NJ DOT tables.
+TABLES = {
+    'vehicles': 1.9,
+    'drivers': 1.8,
+    'occupants': 1.4,
+    'pedestrians': .03,
+}
+
+
+def synthetic_crashes(n: int, seed: int = 0) -> pd.DataFrame:
+    """`crashes.parquet`-shaped PK columns: cases repeat across munis/years, ~10%
+    of crashes were re-geocoded (`cc0`/`mc0` hold the raw PK), `mc` is the GIN
+    code (sometimes a 4-digit Port Authority code, sometimes null)."""
+    rng = np.random.default_rng(seed)
+    cc = rng.integers(1, 22, n).astype('int8')
+    mc_dot = rng.integers(1, 40, n).astype('int8')
+    moved = rng.random(n) < .1
+    mc = pd.array(mc_dot.astype('int16') + 100, dtype='Int16')
+    mc[rng.random(n) < .02] = 9901
+    mc[rng.random(n) < .01] = pd.NA
+    df = pd.DataFrame({
+        'year': rng.integers(2001, 2024, n).astype('int16'),
+        'cc': cc,
+        'mc_dot': mc_dot,
+        'case': [ f'{k:05d}-{k % 7}' for k in rng.integers(0, max(n // 3, 1), n) ],
+        'cc0': pd.array(np.where(moved, (cc + 1) % 22, None), dtype='Int8'),
+        'mc0': pd.array(np.where(moved, mc_dot // 2, None), dtype='Int8'),
+        'mc': mc,
+    })
+    # Both the corrected and the raw `(year, cc, mc, case)` are unique, as in the real data.
+    raw_cc = df['cc0'].fillna(df['cc'])
+    raw_mc = df['mc0'].fillna(df['mc_dot'])
+    df = df[
+        ~df.duplicated(['year', 'cc', 'mc_dot', 'case']) &
+        ~pd.DataFrame({ 'year': df['year'], 'cc': raw_cc, 'mc': raw_mc, 'case': df['case'] }).duplicated()
+    ].reset_index(drop=True)
+    df.index.name = 'id'
+    return df
+
+
+def synthetic_rows(crashes: pd.DataFrame, n: int, seed: int = 1) -> pd.DataFrame:
+    """Vehicle/occupant-like rows keyed by their crash's *raw* PK, plus some
+    orphans and malformed keys; `(year, cc, mc, case)`-sorted like `load_tbl`."""
+    rng = np.random.default_rng(seed)
+    src = crashes.iloc[rng.integers(0, len(crashes), n)]
+    moved = src['cc0'].notna().to_numpy()
+    rows = pd.DataFrame({
+        'year': src['year'].to_numpy(),
+        'cc': np.where(moved, src['cc0'].to_numpy('float64', na_value=0), src['cc']).astype('int8'),
+        'mc': np.where(moved, src['mc0'].to_numpy('float64', na_value=0), src['mc_dot']).astype('int8'),
+        'case': src['case'].to_numpy(dtype=object),
+        'vn': rng.integers(1, 4, n).astype('int8'),
+    })
+    rows.loc[rng.random(n) < .02, 'case'] = 'no-such-case'
+    rows.loc[rng.random(n) < .01, 'case'] = None
+    rows.loc[rng.random(n) < .005, 'case'] = 'x' * 50
+    rows = rows.sort_values(['year', 'cc', 'mc', 'case']).reset_index(drop=True)
+    rows.index.name = 'id'
+    return rows
+
+
+def write_crashes(crashes: pd.DataFrame, dir: Path) -> str:
+    """Write `crashes.parquet` and (as `crashes.load` does) `crash_pk_mappings.parquet` to `dir`."""
+    path = dir / 'crashes.parquet'
+    crashes.to_parquet(path)
+    crashes[['year', 'cc0', 'mc0', 'case', 'cc', 'mc']].to_parquet(dir / 'crash_pk_mappings.parquet', index=False)
+    return str(path)
+
+
+def map_merge(df: pd.DataFrame, tpe: str, crashes_pqt: str) -> pd.DataFrame:
+    df = remap_crash_pks(df, tpe)
+    return normalize(df, 'crash_id', lambda cols: pd.read_parquet(crashes_pqt, columns=cols))
+
+
+def map_index(df: pd.DataFrame, tpe: str, crashes_pqt: str, index_dir: str) -> pd.DataFrame:
+    index = load_crash_pk_index(crashes_pqt, index_dir)
+    df = remap_crash_pks(df, tpe, index)
+    return normalize(df, 'crash_id', lambda cols: pd.read_parquet(crashes_pqt, columns=cols), index=index)
+
+
+@click.command()
+@click.option('-C', '--check', is_flag=True, help='Assert both paths give identical frames')
+@click.option('-n', '--crashes', 'n_crashes', type=int, default=1_000_000, help='Synthetic crashes')
+@click.option('-s', '--seed', type=int, default=0)
+def main(check: bool, n_crashes: int, seed: int):
+    t0 = perf_counter()
+    crashes = synthetic_crashes(n_crashes, seed)
+    tables = {
+        tpe: synthetic_rows(crashes, int(len(crashes) * ratio), seed + i + 1)
+        for i, (tpe, ratio) in enumerate(TABLES.items())
+    }
+    err(f"Generated {len(crashes):,} crashes, " + ", ".join(f"{len(df):,} {tpe}" for tpe, df in tables.items()) + f" ({perf_counter() - t0:.1f}s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        crashes_pqt = write_crashes(crashes, Path(tmp))
+        index_dir = f'{tmp}/crash_pk_index'
+        # `remap_crash_pks`'s merge fallback reads `{DOT_DATA}/crash_pk_mappings.parquet`
+        load.DOT_DATA = tmp
+
+        t0 = perf_counter()
+        build(crashes_pqt, index_dir)
+        print(f"index build: {perf_counter() - t0:6.2f}s (once per crashes.parquet)")
+
+        totals = { 'merge': 0., 'index': 0. }
+        for tpe, df in tables.items():
+            times = {}
+            outs = {}
+            for name, fn in [
+                ('merge', partial(map_merge, tpe=tpe, crashes_pqt=crashes_pqt)),
+                ('index', partial(map_index, tpe=tpe, crashes_pqt=crashes_pqt, index_dir=index_dir)),
+            ]:
+                d = df.copy()
+                t0 = perf_counter()
+                outs[name] = fn(d)
+                times[name] = perf_counter() - t0
+                totals[name] += times[name]
+            if check:
+                pd.testing.assert_frame_equal(outs['index'], outs['merge'])
+            print(f"{tpe:>12s} ({len(df):>10,} rows): merge {times['merge']:6.2f}s  index {times['index']:6.2f}s  ({times['merge'] / times['index']:.1f}x)")
+        print(f"{'total':>12s}: merge {totals['merge']:6.2f}s  index {totals['index']:6.2f}s  ({totals['merge'] / totals['index']:.1f}x)")
+        if check:
+            print("Outputs identical")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["click", "h3", "numpy", "pandas", "pyarrow"]
+# ///
+"""Benchmark a full `export_map_data` + `export_map_v2` export on synthetic crashes.
+
+Generates `-n` crashes shaped like `load_map_input` (repeated geocodes, some
+county-less rows, every severity), then times each stage of both exports: v1
+by-year/by-year-county shards and hex aggregates, and v2 H3 columns, point
+shards and hex shards. Each `-j` value is run in turn; `--check` asserts that
+every run wrote byte-identical files.
+"""
+import sys
+import tempfile
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+
+import click
+import numpy as np
+import pandas as pd
+
+from njdot.cli.export_map_data import _build_base, _dt_year, _emit_hex_aggregates, _emit_shards
+from njdot.cli.export_map_v2 import HEX_RESOLUTIONS, SHARD_RES, _add_h3_cols, _emit_hex, _emit_points
+
+err = partial(print, file=sys.stderr)
+
+
+def synthetic_crashes(n: int, seed: int = 0) -> pd.DataFrame:
+    """`n` crashes with the columns `_build_base` reads (plus `lat`/`lon`/`geocode_src`)."""
+    rng = np.random.default_rng(seed)
+    # ~4 crashes per distinct point, like crashes geocoded to the same SRI/MP.
+    pts = rng.integers(0, max(n // 4, 1), n)
+    lat = rng.uniform(39.0, 41.2, max(n // 4, 1))[pts]
+    lon = rng.uniform(-75.4, -73.9, max(n // 4, 1))[pts]
+    return pd.DataFrame({
+        "dt": pd.to_datetime(rng.integers(1_000_000_000, 1_700_000_000, n), unit="s").astype("datetime64[us]"),
+        "cc": pd.array(np.where(rng.random(n) < .05, None, rng.integers(1, 22, n)), dtype="Int8"),
+        "mc": pd.array(rng.integers(1, 30, n), dtype="Int16"),
+        "case": [ f"c{i}" for i in range(n) ],
+        "severity": rng.choice(["f", "i", "p"], n, p=[.05, .35, .6]),
+        **{ c: rng.integers(0, 3, n).astype(float) for c in ("tk", "ti", "pk", "pi", "tv") },
+        "road": rng.choice(["ROUTE 9", "MAIN ST", "", None], n),
+        "cross_street": rng.choice(["CR 630", "", None], n),
+        "route": rng.choice(["9", "1", None], n),
+        "mp": rng.uniform(0, 20, n),
+        "sri": rng.choice(["00000009__", None], n),
+        "lat": lat,
+        "lon": lon,
+        "geocode_src": rng.choice(["crash", "sri_mp"], n),
+    }, index=pd.RangeIndex(n) * 3)
+
+
+def export(df: pd.DataFrame, out: Path, jobs: int | None) -> dict[str, float]:
+    """Run both exports' stages into `out/{v1,v2}`; return seconds per stage."""
+    times = {}
+
+    def stage(name, fn, *args, **kwargs):
+        t0 = perf_counter()
+        res = fn(*args, **kwargs)
+        times[name] = perf_counter() - t0
+        return res
+
+    base = stage("base", _build_base, df, {"f", "i", "p"})
+    v1, v2 = out / "v1", out / "v2"
+    v1.mkdir(parents=True)
+    v2.mkdir(parents=True)
+    points = base[base["severity"].isin({"f", "i"})].copy()
+    stage("v1 shards", _emit_shards, points, v1, jobs=jobs)
+    stage("v1 hex", _emit_hex_aggregates, base, v1, resolutions=(7, 8))
+
+    base = base.assign(year=_dt_year(base["dt"]))
+    base = stage("v2 h3 cols", _add_h3_cols, base, (SHARD_RES,) + HEX_RESOLUTIONS)
+    stage("v2 points", _emit_points, base, v2, {"f", "i", "p"}, jobs=jobs)
+    stage("v2 hex", _emit_hex, base, v2, jobs=jobs)
+    return times
+
+
+@click.command()
+@click.option("-C", "--check", is_flag=True, help="Assert every `-j` run's files are byte-identical")
+@click.option("-j", "--jobs", "jobs_list", default="1,8", help="Comma-separated shard-writer thread counts to time")
+@click.option("-k", "--keep", type=click.Path(path_type=Path), help="Write outputs here (default: a temp dir)")
+@click.option("-n", "--rows", type=int, default=1_000_000, help="Synthetic crashes")
+@click.option("-s", "--seed", type=int, default=0)
+def main(check: bool, jobs_list: str, keep: Path | None, rows: int, seed: int):
+    t0 = perf_counter()
+    df = synthetic_crashes(rows, seed)
+    err(f"Generated {rows:,} crashes ({perf_counter() - t0:.1f}s)")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = keep or Path(tmp)
+        runs = {}
+        for jobs in [ int(j) for j in jobs_list.split(",") ]:
+            out = root / f"j{jobs}"
+            # Stdout is the report; silence the exporters' progress prints.
+            stdout, sys.stdout = sys.stdout, open("/dev/null", "w")
+            try:
+                times = export(df, out, jobs)
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+            runs[jobs] = out
+            total = sum(times.values())
+            print(f"-j{jobs}: {total:6.2f}s total ({rows / total:,.0f} rows/s)  " + "  ".join(f"{k}: {v:.2f}s" for k, v in times.items()))
+
+        if check:
+            files = {
+                jobs: { p.relative_to(out).as_posix(): p.read_bytes() for p in sorted(out.rglob("*.parquet")) }
+                for jobs, out in runs.items()
+            }
+            first, *rest = files.values()
+            for jobs, fs in zip(list(files)[1:], rest):
+                assert fs == first, f"-j{jobs} output differs"
+            print(f"Outputs byte-identical ({len(first)} files)")
+
+
+if __name__ == "__main__":
+    main()
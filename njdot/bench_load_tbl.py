@@ -0,0 +1,116 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["click", "humanize", "numpy", "pandas", "pyarrow", "utz"]
+# ///
+"""Benchmark `load_tbl` year / county loads: row-group pushdown vs. full load.
+
+Writes synthetic `crashes` (`-n` rows, `year`/`cc`/`mc`-keyed) and `vehicles`
+(2 per crash, `crash_id`-keyed) masters with `write_master`. Then it times
+these loads of each table:
+
+- a full load;
+- one year;
+- one county;
+- one year of one county.
+
+Each filtered load runs two ways:
+
+- **filter**: the full table is read, then filtered in pandas (how
+  `load_tbl` used to do it);
+- **pushdown**: `load_tbl(years=..., cc=...)`.
+
+Both ways must return identical frames.
+"""
+import sys
+import tempfile
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+
+import click
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from njdot import compact
+from njdot.bench_compact import synthetic_crashes
+from njdot.load import load_tbl, sort_master, write_master
+
+err = partial(print, file=sys.stderr)
+
+
+def synthetic_vehicles(crashes: pd.DataFrame, per_crash: int = 2, seed: int = 1) -> pd.DataFrame:
+    """`per_crash` vehicles per crash, keyed by `crash_id` (the `crashes` index)."""
+    rng = np.random.default_rng(seed)
+    n = len(crashes) * per_crash
+    df = pd.DataFrame({
+        'crash_id': pd.array(np.repeat(crashes.index.to_numpy(), per_crash), dtype='Int32'),
+        'vn': np.tile(np.arange(1, per_crash + 1), len(crashes)).astype('int8'),
+        'make': rng.choice(np.array(['TOYOTA', 'HONDA', 'FORD', None], dtype=object), n),
+        'model_year': pd.array(rng.integers(1980, 2024, n), dtype='Int16'),
+        'damage': pd.array(np.where(rng.random(n) < .5, None, rng.integers(1, 6, n)), dtype='Int8'),
+    })
+    df.index = pd.RangeIndex(n).astype('int32')
+    df.index.name = 'id'
+    return df
+
+
+def filter_full(tbl: str, root: Path, years: list[int] | None, ccs: list[int] | None) -> pd.DataFrame:
+    """Read all of `tbl`, then filter in pandas (`crash_id` tables via the crashes they match)."""
+    df = compact.read_pqt(str(root / f'{tbl}.parquet'))
+    keys = df if 'year' in df else compact.read_pqt(str(root / 'crashes.parquet'), columns=['year', 'cc'])
+    mask = pd.Series(True, index=keys.index)
+    if years is not None:
+        mask &= keys.year.isin(years)
+    if ccs is not None:
+        mask &= keys.cc.isin(ccs)
+    if keys is df:
+        return df[mask]
+    return df[df.crash_id.isin(keys.index[mask])]
+
+
+def timed(fn):
+    t0 = perf_counter()
+    df = fn()
+    return df, perf_counter() - t0
+
+
+@click.command()
+@click.option('-c', '--cc', type=int, default=9, help='County code for the single-county loads')
+@click.option('-k', '--keep', type=click.Path(path_type=Path), help='Write the masters here (default: a temp dir)')
+@click.option('-n', '--rows', type=int, default=2_000_000, help='Synthetic crashes')
+@click.option('-s', '--seed', type=int, default=0)
+@click.option('-y', '--year', type=int, default=2015, help='Year for the single-year loads')
+def main(cc: int, keep: Path | None, rows: int, seed: int, year: int):
+    t0 = perf_counter()
+    # Crash ids as `load_tbl` assigns them: positions in the sorted crashes
+    crashes = sort_master(synthetic_crashes(rows, seed)).reset_index(drop=True)
+    crashes.index.name = 'id'
+    with tempfile.TemporaryDirectory() as tmp:
+        root = keep or Path(tmp)
+        root.mkdir(parents=True, exist_ok=True)
+        write_master(crashes, str(root / 'crashes.parquet'))
+        write_master(synthetic_vehicles(crashes, seed=seed + 1), str(root / 'vehicles.parquet'))
+        err(f"Wrote masters ({perf_counter() - t0:.1f}s)")
+
+        cases = {
+            'year': ([year], None),
+            'county': (None, [cc]),
+            'year+county': ([year], [cc]),
+        }
+        for tbl in ['crashes', 'vehicles']:
+            path = root / f'{tbl}.parquet'
+            md = pq.ParquetFile(path).metadata
+            load = partial(load_tbl, tbl, read_pqt=True, pqt_path=str(path))
+            full, t_full = timed(load)
+            print(f"{tbl} ({len(full):,} rows, {md.num_row_groups} row groups): full load {t_full:.2f}s")
+            for name, (years, ccs) in cases.items():
+                exp, t_filter = timed(partial(filter_full, tbl, root, years, ccs))
+                act, t_push = timed(partial(load, years=years, cc=ccs))
+                pd.testing.assert_frame_equal(act, exp)
+                print(f"  {name:>12s} ({len(act):>9,} rows): filter {t_filter:6.2f}s  pushdown {t_push:6.2f}s  ({t_filter / t_push:5.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,539 @@
+"""Python reference for the cells API's H3 `/v1/cells` query (see
+`cells-api/src/cells.ts`).
+
+Answers the worker's request shape — shard cover cells, `res`, `years`,
+`severities`, `polygon` (plus `maxCells` / `labels`) — against a local
+`data/cells/` tree (`manifest.json`, `cells.db`, `pyramid/r{N}/{r4}.parquet`,
+`raw/h3_r{base}/{r4}.parquet`), with the worker's path selection (D1 fast path
+→ pyramid → raw fallback), its row-group pruning (a port of `h3-range.ts`
+`descendantRange` / `mergeRanges` tested against each row group's min/max
+stats), and its per-cell folding. Every query also returns `QueryStats`, so
+`cells pyramid -r/--row-group-size`, `-s/--shard-res` and combo choices can be
+compared offline (`njdot compute cells bench`) before deploying.
+
+`bytes_read` models what the worker range-fetches from R2: a file's footer on
+first touch (the worker caches parsed footers per isolate), then the
+compressed column chunks of each selected row group for the requested
+columns. The D1 path reads no parquet; its cost shows up in `rows` and
+`resp_bytes` (the serialized response).
+
+S2 (`grid=s2`) requests are not modeled.
+"""
+import json
+import sqlite3
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from time import perf_counter
+from urllib.parse import parse_qs, urlsplit
+
+import h3
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from h3.api import numpy_int as h3i
+
+SEVERITIES = ('f', 'i', 'p')
+COUNT_COLS = ('n_fatal', 'n_inj_ped', 'n_inj_other', 'n_pdo', 'n_vehs')
+LABEL_COLS = ('sld_name', 'cross_sld_name', 'mun', 'county')
+# Coarsest res the worker's `maxCells` walk will drop to.
+MIN_RES = 5
+
+_H3_RES_SHIFT = 52
+_H3_RES_MASK = 0xF << _H3_RES_SHIFT
+
+
+def _digit_shift(d: int) -> int:
+    return (15 - d) * 3
+
+
+def descendant_range(ancestor: int, ancestor_res: int, base_res: int) -> tuple[int, int]:
+    """Inclusive `[lo, hi]` of r{base_res} cell ids descending from
+    `ancestor` (at `ancestor_res`). Port of `h3-range.ts` `descendantRange`:
+    stamp `base_res` into the resolution nibble, fill the digits below
+    `ancestor_res` with 0 (lo) / 6 (hi), keep the sentinel 7s past
+    `base_res`."""
+    if not 0 <= ancestor_res <= base_res:
+        raise ValueError(f'ancestor_res {ancestor_res} must be in [0, {base_res}]')
+    if ancestor_res == base_res:
+        return ancestor, ancestor
+    stamped = (ancestor & ~_H3_RES_MASK) | (base_res << _H3_RES_SHIFT)
+    lo = hi = stamped
+    for d in range(ancestor_res + 1, base_res + 1):
+        shift = _digit_shift(d)
+        lo &= ~(7 << shift)
+        hi = (hi & ~(7 << shift)) | (6 << shift)
+    for d in range(base_res + 1, 16):
+        shift = _digit_shift(d)
+        lo |= 7 << shift
+        hi |= 7 << shift
+    return lo, hi
+
+
+def merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sort by `lo` and merge adjacent/overlapping ranges (`h3-range.ts`
+    `mergeRanges`)."""
+    out: list[list[int]] = []
+    for lo, hi in sorted(ranges):
+        if out and lo <= out[-1][1] + 1:
+            out[-1][1] = max(out[-1][1], hi)
+        else:
+            out.append([lo, hi])
+    return [(lo, hi) for lo, hi in out]
+
+
+def _in_ranges(vals: np.ndarray, ranges: list[tuple[int, int]]) -> np.ndarray:
+    """Mask of `vals` falling in any of the (merged, sorted) `ranges`."""
+    if not ranges:
+        return np.ones(len(vals), dtype=bool)
+    los = np.array([lo for lo, _ in ranges], dtype=np.int64)
+    his = np.array([hi for _, hi in ranges], dtype=np.int64)
+    idx = np.searchsorted(los, vals, side='right') - 1
+    ok = idx >= 0
+    ok[ok] = vals[ok] <= his[idx[ok]]
+    return ok
+
+
+def _points_in_polygon(lon: np.ndarray, lat: np.ndarray, poly: list[tuple[float, float]]) -> np.ndarray:
+    """Ray-casting point-in-polygon over arrays (the worker's `pointInPolygon`)."""
+    inside = np.zeros(len(lon), dtype=bool)
+    n = len(poly)
+    for i in range(n):
+        xi, yi = poly[i]
+        xj, yj = poly[i - 1]
+        crosses = (yi > lat) != (yj > lat)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_int = (xj - xi) * (lat - yi) / (yj - yi) + xi
+        inside ^= crosses & (lon < x_int)
+    return inside
+
+
+def _cells_in_polygon(cells: np.ndarray, poly: list[tuple[float, float]] | None) -> np.ndarray:
+    """Mask of int64 h3 `cells` whose centroid lies in `poly` (all-true when
+    `poly` is None). Centroids are computed once per unique cell."""
+    if poly is None:
+        return np.ones(len(cells), dtype=bool)
+    uniq, inv = np.unique(cells, return_inverse=True)
+    ll = np.array([h3i.cell_to_latlng(int(c)) for c in uniq]).reshape(-1, 2)
+    return _points_in_polygon(ll[:, 1], ll[:, 0], poly)[inv]
+
+
+def _parents(cells: np.ndarray, res: int) -> np.ndarray:
+    """int64 r{res} parent per cell, computed once per unique cell."""
+    uniq, inv = np.unique(cells, return_inverse=True)
+    parents = np.array([h3i.cell_to_parent(int(c), res) for c in uniq], dtype=np.int64)
+    return parents[inv]
+
+
+@dataclass
+class CellsRequest:
+    """One `/v1/cells` request (H3). `polygon` is a `[(lon, lat), ...]` ring."""
+    cells: list[str]
+    res: int
+    years: tuple[int, int] | None = None
+    severities: frozenset[str] | None = None
+    polygon: list[tuple[float, float]] | None = None
+    max_cells: int | None = None
+    labels: str = 'full'
+
+    @classmethod
+    def from_url(cls, url: str) -> 'CellsRequest':
+        """Parse a request URL (or bare query string), validating like the
+        worker's `parseCellsRequest`."""
+        query = urlsplit(url).query if '?' in url else url
+        params = {k: v[-1] for k, v in parse_qs(query, keep_blank_values=True).items()}
+        grid = params.get('grid', 'h3')
+        if grid != 'h3':
+            raise ValueError(f'grid={grid} not supported (H3 only)')
+        cells = [c.strip() for c in params.get('cells', '').split(',') if c.strip()]
+        if not cells:
+            raise ValueError('cells must list ≥1 shard')
+        if any(len(c) != 15 or any(ch not in '0123456789abcdef' for ch in c) for c in cells):
+            raise ValueError('h3 cells must be 15-char lowercase hex IDs')
+        if 'res' not in params:
+            raise ValueError('res is required')
+        res = int(params['res'])
+        years = None
+        if params.get('years'):
+            lo, hi = params['years'].split('-')
+            years = (int(lo), int(hi))
+            if years[0] > years[1]:
+                raise ValueError('years[0] > years[1]')
+        severities = None
+        ss = params.get('severity') or params.get('severities')
+        if ss:
+            if set(ss) - set(SEVERITIES):
+                raise ValueError(f'unknown severity in {ss!r}')
+            severities = frozenset(ss)
+        polygon = None
+        if params.get('polygon'):
+            nums = [float(x) for x in params['polygon'].split(',')]
+            if len(nums) < 6 or len(nums) % 2:
+                raise ValueError('polygon must be ≥3 lon,lat pairs')
+            polygon = list(zip(nums[::2], nums[1::2]))
+        max_cells = int(params['maxCells']) if params.get('maxCells') else None
+        labels = params.get('labels') or 'full'
+        if labels not in ('full', 'nums', 'only'):
+            raise ValueError('labels must be one of full|nums|only')
+        return cls(
+            cells=cells, res=res, years=years, severities=severities,
+            polygon=polygon, max_cells=max_cells, labels=labels,
+        )
+
+
+@dataclass
+class QueryStats:
+    source: str = ''
+    res: int = 0
+    files: int = 0
+    bytes_read: int = 0
+    row_groups: int = 0
+    row_groups_total: int = 0
+    rows: int = 0
+    cells: int = 0
+    resp_bytes: int = 0
+    ms: float = 0.
+
+
+def load_manifest(root: Path) -> dict:
+    """`{root}/manifest.json`, or one synthesized from the on-disk layout
+    (`raw/h3_r*`, `pyramid/r*`) when it hasn't been written."""
+    path = root / 'manifest.json'
+    if path.exists():
+        return json.loads(path.read_text())
+    raw_dirs = sorted(
+        (p for p in (root / 'raw').glob('h3_r*') if p.is_dir() and any(p.glob('*.parquet'))),
+        key=lambda p: int(p.name[len('h3_r'):]),
+    )
+    pyramid_levels = sorted(
+        int(p.name[1:]) for p in (root / 'pyramid').glob('r*')
+        if p.is_dir() and p.name[1:].isdigit() and any(p.glob('*.parquet'))
+    )
+    shard_cells = sorted(p.stem for p in raw_dirs[-1].glob('*.parquet')) if raw_dirs else []
+    if not shard_cells and pyramid_levels:
+        shard_cells = sorted(p.stem for p in (root / 'pyramid' / f'r{pyramid_levels[0]}').glob('*.parquet'))
+    if not shard_cells:
+        raise FileNotFoundError(f'No manifest.json, raw index, or pyramid under {root}')
+    return {
+        'data_version': 'local',
+        'base_res': int(raw_dirs[-1].name[len('h3_r'):]) if raw_dirs else max(pyramid_levels),
+        'shard_res': h3.get_resolution(shard_cells[0]),
+        'pyramid_levels': pyramid_levels,
+        'year_range': None,
+        'shard_cells': shard_cells,
+    }
+
+
+class CellsQuery:
+    """Local `/v1/cells` engine over a `data/cells/` tree.
+
+    `db=False` skips the `cells.db` (D1) fast path, e.g. to benchmark the
+    pyramid alone. `footer_cache=False` charges every file read its footer
+    bytes (a cold worker isolate)."""
+
+    def __init__(self, root: Path = Path('data/cells'), db: bool = True, footer_cache: bool = True):
+        self.root = Path(root)
+        self.manifest = load_manifest(self.root)
+        db_path = self.root / 'cells.db'
+        self.db_path = db_path if db and db_path.exists() else None
+        self.footer_cache = footer_cache
+        self._footers: dict[Path, pq.FileMetaData] = {}
+
+    def query(self, req: CellsRequest) -> tuple[dict, QueryStats]:
+        """Answer `req` → (worker-shaped response dict, stats)."""
+        t0 = perf_counter()
+        m = self.manifest
+        base_res = m['base_res']
+        if not 0 <= req.res <= base_res:
+            raise ValueError(f'res {req.res} out of range [0, {base_res}]')
+        year_range = tuple(req.years or m['year_range'] or ()) or None
+        stats = QueryStats(res=req.res)
+        file_res = m['shard_res']
+        if any(h3.get_resolution(s) < file_res for s in req.cells):
+            shards = list(m['shard_cells'])
+        else:
+            shards = list(dict.fromkeys(h3.cell_to_parent(s, file_res) for s in req.cells))
+        ranges = merge_ranges([
+            descendant_range(h3.str_to_int(s), h3.get_resolution(s), req.res)
+            for s in req.cells
+        ])
+        sevs = req.severities
+        all_sev = sevs is None or set(SEVERITIES) <= sevs
+        covers_all_years = req.years is None or (
+            m['year_range'] is not None
+            and req.years[0] <= m['year_range'][0]
+            and req.years[1] >= m['year_range'][1]
+        )
+
+        cells = None
+        if (
+            self.db_path and all_sev and covers_all_years and req.labels == 'full'
+            and 6 <= req.res <= base_res
+        ):
+            try:
+                cells = self._query_db(req.res, ranges, req.polygon, stats)
+                stats.source = 'd1'
+            except sqlite3.OperationalError:
+                cells = None
+        if cells is None and req.res in m['pyramid_levels']:
+            cells = self._query_pyramid(req.res, shards, year_range, sevs, req.polygon, ranges, req.labels, stats)
+            stats.source = 'pyramid'
+        if cells is None:
+            cells = self._query_raw(req.res, shards, year_range, sevs, req.polygon, stats)
+            stats.source = 'raw'
+
+        res = req.res
+        if stats.source != 'raw' and req.labels != 'only':
+            while req.max_cells is not None and len(cells) > req.max_cells and res > MIN_RES:
+                res -= 1
+                cells = coarsen_cells(cells, res)
+        stats.res = res
+        resp = {
+            'res': res,
+            'year_range': list(year_range) if year_range else None,
+            'data_version': m['data_version'],
+            'source': stats.source,
+            'cells': cells_to_records(cells),
+        }
+        stats.cells = len(cells)
+        stats.resp_bytes = len(json.dumps(resp, separators=(',', ':')))
+        stats.ms = (perf_counter() - t0) * 1000
+        return resp, stats
+
+    def _metadata(self, path: Path, stats: QueryStats) -> pq.FileMetaData:
+        md = self._footers.get(path)
+        if md is None:
+            md = pq.ParquetFile(path).metadata
+            if self.footer_cache:
+                self._footers[path] = md
+            stats.bytes_read += md.serialized_size + 8
+        return md
+
+    def _read(
+        self,
+        path: Path,
+        columns: list[str],
+        cell_col: str,
+        ranges: list[tuple[int, int]] | None,
+        year_range: tuple[int, int] | None,
+        stats: QueryStats,
+    ) -> pa.Table | None:
+        """Row-group-pruned read of `columns` from one shard file, mirroring
+        hyparquet's filter pushdown: skip row groups whose `year` / `cell_col`
+        stats miss every requested range, then filter the surviving rows."""
+        if not path.exists():
+            return None
+        md = self._metadata(path, stats)
+        stats.files += 1
+        stats.row_groups_total += md.num_row_groups
+        # Parquet leaf-column index per (flat) column; nested `topK` leaves are
+        # never read. Columns absent from the file (e.g. labels in a pyramid
+        # built without sld) are skipped, as hyparquet does.
+        leaves = {md.schema.column(i).path: i for i in range(md.num_columns)}
+        columns = [c for c in columns if c in leaves]
+        col_idx = {c: leaves[c] for c in columns}
+        cell_i = col_idx[cell_col]
+        year_i = leaves.get('year', -1) if year_range else -1
+        keep: list[int] = []
+        for rg_i in range(md.num_row_groups):
+            rg = md.row_group(rg_i)
+            if year_i >= 0:
+                st = rg.column(year_i).statistics
+                if st is not None and st.has_min_max and (st.max < year_range[0] or st.min > year_range[1]):
+                    continue
+            if ranges:
+                st = rg.column(cell_i).statistics
+                if st is not None and st.has_min_max and not any(lo <= st.max and hi >= st.min for lo, hi in ranges):
+                    continue
+            keep.append(rg_i)
+            stats.bytes_read += sum(rg.column(i).total_compressed_size for i in col_idx.values())
+        stats.row_groups += len(keep)
+        if not keep:
+            return None
+        table = pq.ParquetFile(path).read_row_groups(keep, columns=columns)
+        stats.rows += table.num_rows
+        mask = None
+        if year_range:
+            year = table.column('year')
+            mask = pc.and_(pc.greater_equal(year, year_range[0]), pc.less_equal(year, year_range[1]))
+        if ranges:
+            in_rng = pa.array(_in_ranges(table.column(cell_col).to_numpy(), ranges))
+            mask = in_rng if mask is None else pc.and_(mask, in_rng)
+        return table if mask is None else table.filter(mask)
+
+    def _query_db(self, res, ranges, polygon, stats) -> pd.DataFrame:
+        where = ' OR '.join(f'(h3 BETWEEN {lo} AND {hi})' for lo, hi in ranges) or '1=1'
+        cols = ['h3', *COUNT_COLS, 'fatal_years', *LABEL_COLS]
+        with sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True) as con:
+            df = pd.read_sql_query(f'SELECT {", ".join(cols)} FROM cells_r{res} WHERE {where}', con)
+        stats.rows += len(df)
+        df = df[(df[['n_fatal', 'n_inj_ped', 'n_inj_other', 'n_pdo']] > 0).any(axis=1)]
+        df = df[_cells_in_polygon(df['h3'].to_numpy(dtype=np.int64), polygon)]
+        df['fatal_years'] = [
+            [int(y) for y in fy.split(',')] if fy else None
+            for fy in df['fatal_years']
+        ]
+        return df.reset_index(drop=True)
+
+    def _query_pyramid(self, res, shards, year_range, sevs, polygon, ranges, labels, stats) -> pd.DataFrame:
+        h3_col = f'h3_r{res}'
+        if labels == 'only':
+            cols = [h3_col, *LABEL_COLS]
+            year_range = None
+        elif labels == 'nums':
+            cols = [h3_col, 'year', *COUNT_COLS]
+        else:
+            cols = [h3_col, 'year', *COUNT_COLS, *LABEL_COLS]
+        tables = [
+            t for s in shards
+            if (t := self._read(self.root / 'pyramid' / f'r{res}' / f'{s}.parquet', cols, h3_col, ranges, year_range, stats)) is not None
+        ]
+        if not tables:
+            return _empty_cells()
+        df = pa.concat_tables(tables).to_pandas().rename(columns={h3_col: 'h3'})
+        df = df[_cells_in_polygon(df['h3'].to_numpy(), polygon)]
+        if labels == 'only':
+            df = df.drop_duplicates('h3')
+            df = df[df[list(LABEL_COLS)].fillna('').ne('').any(axis=1)]
+            for c in COUNT_COLS:
+                df[c] = 0
+            df['fatal_years'] = None
+            return df.reset_index(drop=True)
+        return _fold(df, sevs)
+
+    def _query_raw(self, res, shards, year_range, sevs, polygon, stats) -> pd.DataFrame:
+        base_res = self.manifest['base_res']
+        base_col = f'h3_r{base_res}'
+        cols = [base_col, 'year', 'severity', 'tk', 'ti', 'pk', 'pi', 'tv']
+        tables = [
+            t for s in shards
+            if (t := self._read(self.root / 'raw' / base_col / f'{s}.parquet', cols, base_col, None, year_range, stats)) is not None
+        ]
+        if not tables:
+            return _empty_cells()
+        raw = pa.concat_tables(tables).to_pandas()
+        cells = raw[base_col].to_numpy()
+        raw['h3'] = cells if res == base_res else _parents(cells, res)
+        raw = raw[_cells_in_polygon(raw['h3'].to_numpy(), polygon)]
+        sev = raw['severity']
+        pi = raw['pi'].fillna(0)
+        is_i = sev == 'i'
+        df = pd.DataFrame({
+            'h3': raw['h3'],
+            'year': raw['year'],
+            'n_fatal': (sev == 'f').astype('int64'),
+            'n_inj_ped': pi.where(is_i, 0),
+            'n_inj_other': (raw['ti'].fillna(0) - pi).where(is_i, 0),
+            'n_pdo': (sev == 'p').astype('int64'),
+            'n_vehs': raw['tv'].fillna(0),
+        })
+        return _fold(df, sevs)
+
+
+def _empty_cells() -> pd.DataFrame:
+    return pd.DataFrame(columns=['h3', *COUNT_COLS, 'fatal_years', *LABEL_COLS])
+
+
+def _fold(df: pd.DataFrame, sevs: frozenset[str] | None) -> pd.DataFrame:
+    """Fold per-(cell, year) (or per-crash) rows into one row per cell, gated
+    by the requested severities; drops cells with no requested-severity hit.
+    Cells keep first-seen order, like the worker's `Map`."""
+    want_f = sevs is None or 'f' in sevs
+    want_i = sevs is None or 'i' in sevs
+    want_p = sevs is None or 'p' in sevs
+    if not want_f:
+        df = df.assign(n_fatal=0)
+    if not want_i:
+        df = df.assign(n_inj_ped=0, n_inj_other=0)
+    if not want_p:
+        df = df.assign(n_pdo=0)
+    g = df.groupby('h3', sort=False)
+    out = g[list(COUNT_COLS)].sum()
+    for c in LABEL_COLS:
+        if c in df:
+            out[c] = g[c].first()
+    fatal = df[df['n_fatal'] > 0]
+    fatal_years = fatal.groupby('h3', sort=False)['year'].agg(lambda ys: sorted({int(y) for y in ys}))
+    out['fatal_years'] = fatal_years.reindex(out.index)
+    out = out.reset_index()
+    keep = (out['n_fatal'] > 0) | (out['n_inj_ped'] > 0) | (out['n_inj_other'] > 0) | (out['n_pdo'] > 0)
+    return out[keep].reset_index(drop=True)
+
+
+def coarsen_cells(cells: pd.DataFrame, to_res: int) -> pd.DataFrame:
+    """Roll cells up to their r{to_res} parents (the worker's `coarsenCells`):
+    counts sum, `fatal_years` union, labels from the first child with an
+    `sld_name`."""
+    if cells.empty:
+        return cells
+    df = cells.assign(h3=_parents(cells['h3'].to_numpy(dtype=np.int64), to_res))
+    g = df.groupby('h3', sort=False)
+    out = g[list(COUNT_COLS)].sum()
+    fy = df.dropna(subset=['fatal_years']).groupby('h3', sort=False)['fatal_years'].agg(
+        lambda yss: sorted({y for ys in yss for y in ys})
+    )
+    out['fatal_years'] = fy.reindex(out.index)
+    if 'sld_name' in df:
+        labeled = df[df['sld_name'].notna()].drop_duplicates('h3').set_index('h3')
+        for c in LABEL_COLS:
+            out[c] = labeled[c].reindex(out.index) if c in labeled else None
+    return out.reset_index()
+
+
+def cells_to_records(cells: pd.DataFrame) -> list[dict]:
+    """Worker-shaped `CellOut` records: hex `h3`, int counts, and
+    `fatal_years` / label keys omitted when empty."""
+    recs = []
+    cols = [c for c in (*COUNT_COLS, 'fatal_years', *LABEL_COLS) if c in cells]
+    for h, *vals in cells[['h3', *cols]].itertuples(index=False):
+        rec = {'h3': h3.int_to_str(int(h))}
+        for c, v in zip(cols, vals):
+            if c in COUNT_COLS:
+                rec[c] = int(v)
+            elif isinstance(v, list) or (isinstance(v, str) and v):
+                rec[c] = v
+        recs.append(rec)
+    return recs
+
+
+def load_requests(path: Path) -> list[CellsRequest]:
+    """Recorded viewport requests: one per line, either a `/v1/cells` URL (or
+    bare query string) or a JSON object with a `url` key (e.g. exported from
+    worker logs). Blank and `#` lines are skipped."""
+    reqs = []
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        url = json.loads(line)['url'] if line.startswith('{') else line
+        reqs.append(CellsRequest.from_url(url))
+    return reqs
+
+
+def bench(engine: CellsQuery, reqs: list[CellsRequest], repeat: int = 1) -> pd.DataFrame:
+    """Replay `reqs` (`repeat` passes) → one row of `QueryStats` per query,
+    tagged with the request index and pass number. Later passes see a warm
+    footer cache, like a long-lived worker isolate."""
+    rows = []
+    for it in range(repeat):
+        for i, req in enumerate(reqs):
+            _, stats = engine.query(req)
+            rows.append({'pass': it, 'req': i, 'req_res': req.res, 'shards': len(req.cells), **asdict(stats)})
+    return pd.DataFrame(rows)
+
+
+def summarize(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-source latency percentiles + mean bytes / row groups / cells."""
+    g = df.groupby('source')
+    return pd.DataFrame({
+        'n': g.size(),
+        'p50_ms': g['ms'].median(),
+        'p95_ms': g['ms'].quantile(.95),
+        'max_ms': g['ms'].max(),
+        'mean_bytes': g['bytes_read'].mean(),
+        'mean_rgs': g['row_groups'].mean(),
+        'rg_frac': g['row_groups'].sum() / g['row_groups_total'].sum().clip(lower=1),
+        'mean_cells': g['cells'].mean(),
+        'mean_resp_bytes': g['resp_bytes'].mean(),
+    })
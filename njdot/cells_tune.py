@@ -0,0 +1,322 @@
+"""Offline tuner for the H3 cells pyramid layout and the client cover menu.
+
+Three knobs set what a map viewport costs the cells API:
+
+- the pyramid's physical file sharding (`cells pyramid -s/--shard-res`),
+- its row-group size (`-r/--row-group-size`), which bounds how finely the
+  worker can prune a shard by cell range,
+- the manifest's `pyramid_combos` cover menu: per `data_res`, the
+  `shard_res` granularities the client's `pickCover` may use. Coarser covers
+  mean fewer cover cells and batch requests, but wider `descendantRange`s
+  and more row groups per request.
+
+This module replays a synthetic viewport workload against candidate layouts
+built with `njdot compute cells tune`. Viewports are sampled crash-weighted
+across NJ over a zoom-level distribution. Each viewport goes through ports
+of the client's `pickRes` / `pickCover` / batching (`www/src/map/`), then
+through `cells_query.CellsQuery`. Costs are compared per viewport as bytes
+read, R2 objects touched (file footers + row groups) and HTTP requests.
+"""
+from dataclasses import dataclass
+from math import cos, pi, sqrt
+
+import h3
+import numpy as np
+import pandas as pd
+
+from njdot.cells_query import CellsQuery, CellsRequest, bench
+
+# Ported from `www/src/map/` (CrashMap.tsx, picker.ts, useCellsApi.ts).
+H3_RADIUS_METERS = {
+    5: 8544, 6: 3229, 7: 1220, 8: 461, 9: 174, 10: 66,
+    11: 25, 12: 9.4, 13: 3.6, 14: 1.4, 15: 0.54,
+}
+BINS_BUDGET = 100_000
+MIN_PYRAMID_RES = 6
+MAX_PYRAMID_RES = 14
+COVER_MAX_SHARDS = 80
+OVERHANG_REFINE_THRESHOLD = .30
+BATCH_SIZE = 25
+LABELS_NUMS_RES_THRESHOLD = 12
+SHARD_ROOT_RES = 4
+
+VIEWPORT_PX = (1280, 800)
+ZOOM_WEIGHTS_DEFAULT = '8:1,9:2,10:3,11:3,12:3,13:2,14:1'
+# Cover-menu candidates per data_res: contiguous `shard_res` runs within
+# `data_res - MENU_DEPTHS`, at most `MENU_MAX_LEN` long.
+MENU_DEPTHS = (2, 3, 4, 5)
+MENU_MAX_LEN = 3
+# Bytes one extra R2 range GET is "worth" when collapsing (bytes, objects) to
+# a single score: ~the payload a GET's latency could have streamed instead.
+GET_BYTES_DEFAULT = 32 * 1024
+
+
+def parse_zoom_weights(spec: str) -> dict[int, float]:
+    """`'8:1,9:2,...'` → {zoom: weight}."""
+    out = {}
+    for tok in spec.split(','):
+        tok = tok.strip()
+        if not tok:
+            continue
+        z, w = tok.split(':') if ':' in tok else (tok, '1')
+        out[int(z)] = float(w)
+    if not out:
+        raise ValueError(f'empty zoom-weight spec {spec!r}')
+    return out
+
+
+def meters_per_pixel(zoom: float, lat: float) -> float:
+    """Web-mercator meters per pixel (`CrashMap.tsx` `metersPerPixel`)."""
+    return 156543.03 * cos(lat * pi / 180) / 2 ** zoom
+
+
+def pick_res(zoom: float, lat: float, width: int, height: int, budget: int = BINS_BUDGET) -> int:
+    """Data res the client requests for a viewport: `picker.ts` `pickRes`
+    (auto hex-px target from the bins budget) clamped like `useCellsApi`."""
+    target_px = min(30., max(1., sqrt(width * height / max(1, budget))))
+    target_m = target_px * meters_per_pixel(zoom, lat)
+    best = min(H3_RADIUS_METERS)
+    for r in sorted(H3_RADIUS_METERS):
+        if 2 * H3_RADIUS_METERS[r] >= target_m:
+            best = r
+        else:
+            break
+    return max(MIN_PYRAMID_RES, min(MAX_PYRAMID_RES, best))
+
+
+def viewport_bbox(lon: float, lat: float, zoom: float, width: int, height: int) -> tuple[float, float, float, float]:
+    """`(w, s, e, n)` of a `width`×`height` px viewport centered at `(lon, lat)`."""
+    mpp = meters_per_pixel(zoom, lat)
+    dlat = height / 2 * mpp / 111_320
+    dlon = width / 2 * mpp / (111_320 * cos(lat * pi / 180))
+    return lon - dlon, lat - dlat, lon + dlon, lat + dlat
+
+
+def _cell_bbox(cell: str) -> tuple[float, float, float, float]:
+    lats, lons = zip(*h3.cell_to_boundary(cell))
+    return min(lons), min(lats), max(lons), max(lats)
+
+
+def _overhang(cell: str, vp: tuple[float, float, float, float]) -> float:
+    """Fraction of `cell`'s bbox outside `vp` (`useCellsApi.ts` `cellOverhang`)."""
+    w, s, e, n = _cell_bbox(cell)
+    total = (e - w) * (n - s)
+    if total == 0:
+        return 0.
+    iw, is_, ie, in_ = max(w, vp[0]), max(s, vp[1]), min(e, vp[2]), min(n, vp[3])
+    if iw >= ie or is_ >= in_:
+        return 1.
+    return 1 - (ie - iw) * (in_ - is_) / total
+
+
+def _in_root(cell: str, root_cells: set[str]) -> bool:
+    """`h3cover.ts` `isInRootCover`."""
+    res = h3.get_resolution(cell)
+    if res >= SHARD_ROOT_RES:
+        return h3.cell_to_parent(cell, SHARD_ROOT_RES) in root_cells
+    return any(h3.cell_to_parent(rc, res) == cell for rc in root_cells)
+
+
+def pick_cover(
+    menu: tuple[int, ...],
+    bbox: tuple[float, float, float, float],
+    root_cells: set[str],
+    max_shards: int = COVER_MAX_SHARDS,
+) -> list[tuple[int, str]]:
+    """Greedy mixed-res viewport cover (`useCellsApi.ts` `pickCover`) over
+    the `shard_res` values in `menu` → `[(shard_res, h3), ...]`."""
+    if not menu:
+        return []
+    known = set(menu)
+    min_res, max_res = min(menu), max(menu)
+    w, s, e, n = bbox
+    shape = h3.LatLngPoly([(s, w), (s, e), (n, e), (n, w)])
+    initial = h3.h3shape_to_cells_experimental(shape, min_res, contain='overlap')
+    cover = [(min_res, c) for c in initial if _in_root(c, root_cells)]
+    no_refine: set[str] = set()
+    while len(cover) + 6 <= max_shards:
+        worst_i, worst = -1, OVERHANG_REFINE_THRESHOLD
+        for i, (r, c) in enumerate(cover):
+            if r >= max_res or c in no_refine:
+                continue
+            o = _overhang(c, bbox)
+            if o > worst:
+                worst_i, worst = i, o
+        if worst_i < 0:
+            break
+        r, c = cover[worst_i]
+        if r + 1 not in known:
+            no_refine.add(c)
+            continue
+        children = [
+            k for k in h3.cell_to_children(c, r + 1)
+            if _overhang(k, bbox) < 1 and _in_root(k, root_cells)
+        ]
+        if not children:
+            no_refine.add(c)
+            continue
+        cover[worst_i:worst_i + 1] = [(r + 1, k) for k in children]
+    return cover
+
+
+def cover_requests(
+    cover: list[tuple[int, str]],
+    res: int,
+    years: tuple[int, int] | None = None,
+) -> list[CellsRequest]:
+    """The batched `/v1/cells` requests the client fires for `cover`: one
+    tier per request, ≤`BATCH_SIZE` cells each (`ensureShardsCached`)."""
+    tiers: dict[int, list[str]] = {}
+    for r, c in cover:
+        tiers.setdefault(r, []).append(c)
+    labels = 'nums' if res < LABELS_NUMS_RES_THRESHOLD else 'full'
+    return [
+        CellsRequest(cells=cells[i:i + BATCH_SIZE], res=res, years=years, labels=labels)
+        for _, cells in sorted(tiers.items())
+        for i in range(0, len(cells), BATCH_SIZE)
+    ]
+
+
+def menu_candidates(data_res: int, depths: tuple[int, ...] = MENU_DEPTHS, max_len: int = MENU_MAX_LEN) -> list[tuple[int, ...]]:
+    """Contiguous `shard_res` runs in `data_res - depths` (≥ r0), ≤`max_len`
+    long: the cover menus considered for one `data_res`."""
+    opts = sorted({data_res - d for d in depths if data_res - d >= 0})
+    return [
+        tuple(opts[i:j])
+        for i in range(len(opts))
+        for j in range(i + 1, min(len(opts), i + max_len) + 1)
+    ]
+
+
+@dataclass
+class Viewport:
+    zoom: int
+    lon: float
+    lat: float
+    bbox: tuple[float, float, float, float]
+    res: int
+
+
+def sample_viewports(
+    cells: np.ndarray,
+    zoom_weights: dict[int, float],
+    n: int,
+    seed: int = 0,
+    px: tuple[int, int] = VIEWPORT_PX,
+) -> list[Viewport]:
+    """`n` viewports: zooms drawn from `zoom_weights`, centers drawn from
+    `cells` (int64 h3 ids, one per crash, so busy areas are sampled in
+    proportion to their crashes)."""
+    rng = np.random.default_rng(seed)
+    zooms = np.array(sorted(zoom_weights))
+    p = np.array([zoom_weights[z] for z in zooms], dtype=float)
+    zs = rng.choice(zooms, size=n, p=p / p.sum())
+    centers = cells[rng.integers(0, len(cells), size=n)]
+    w, h = px
+    vps = []
+    for z, c in zip(zs, centers):
+        lat, lon = h3.cell_to_latlng(h3.int_to_str(int(c)))
+        vps.append(Viewport(int(z), lon, lat, viewport_bbox(lon, lat, z, w, h), pick_res(z, lat, w, h)))
+    return vps
+
+
+def plan_covers(
+    viewports: list[Viewport],
+    menus: dict[int, list[tuple[int, ...]]],
+    root_cells: set[str],
+) -> dict[tuple[int, tuple[int, ...]], list[tuple[int, str]]]:
+    """`pick_cover` for each viewport under each candidate menu for its
+    `res` → {(viewport index, menu): cover}. Layout-independent, so computed
+    once and replayed against every layout."""
+    return {
+        (vi, menu): pick_cover(menu, vp.bbox, root_cells)
+        for vi, vp in enumerate(viewports)
+        for menu in menus.get(vp.res, ())
+    }
+
+
+_SUM_COLS = ('files', 'row_groups', 'bytes_read', 'resp_bytes', 'cells')
+
+
+def replay(
+    engine: CellsQuery,
+    viewports: list[Viewport],
+    covers: dict[tuple[int, tuple[int, ...]], list[tuple[int, str]]],
+    years: tuple[int, int] | None = None,
+) -> pd.DataFrame:
+    """Replay each planned (viewport, menu) cover's batched requests → one
+    row per (viewport, menu) with summed request stats."""
+    rows = []
+    for (vi, menu), cover in covers.items():
+        vp = viewports[vi]
+        reqs = cover_requests(cover, vp.res, years)
+        stats = bench(engine, reqs) if reqs else pd.DataFrame(columns=_SUM_COLS)
+        rows.append({
+            'vp': vi,
+            'zoom': vp.zoom,
+            'res': vp.res,
+            'menu': ','.join(map(str, menu)),
+            'cover': len(cover),
+            'requests': len(reqs),
+            **{c: int(stats[c].sum()) for c in _SUM_COLS},
+        })
+    df = pd.DataFrame(rows)
+    df['objects'] = df['files'] + df['row_groups']
+    return df
+
+
+def pareto_front(df: pd.DataFrame, cols: list[str]) -> pd.Series:
+    """Mask of rows not dominated on `cols` (all minimized): no other row is
+    ≤ on every column and < on one."""
+    vals = df[cols].to_numpy(dtype=float)
+    le = (vals[:, None, :] <= vals[None, :, :]).all(axis=2)
+    lt = (vals[:, None, :] < vals[None, :, :]).any(axis=2)
+    dominated = (le & lt).any(axis=0)
+    return pd.Series(~dominated, index=df.index)
+
+
+def score(df: pd.DataFrame, get_bytes: int = GET_BYTES_DEFAULT) -> pd.Series:
+    """Scalar cost: bytes read + `get_bytes` per object (R2 GET) and per
+    HTTP request."""
+    return df['bytes_read'] + get_bytes * (df['objects'] + df['requests'])
+
+
+def best_menus(runs: pd.DataFrame, get_bytes: int = GET_BYTES_DEFAULT) -> pd.DataFrame:
+    """Per (layout, res): mean per-viewport cost of each menu, its Pareto
+    flag on (bytes_read, objects, requests), and the min-`score` menu
+    (`best`, always on the front)."""
+    cols = ['cover', 'requests', 'files', 'row_groups', 'objects', 'bytes_read', 'resp_bytes']
+    agg = runs.groupby(['layout', 'res', 'menu'])[cols].mean()
+    agg['n'] = runs.groupby(['layout', 'res', 'menu']).size()
+    agg = agg.reset_index()
+    agg['score'] = score(agg, get_bytes)
+    agg['pareto'] = False
+    agg['best'] = False
+    for _, g in agg.groupby(['layout', 'res']):
+        agg.loc[g.index, 'pareto'] = pareto_front(g, ['bytes_read', 'objects', 'requests'])
+        agg.loc[g['score'].idxmin(), 'best'] = True
+    return agg
+
+
+def layout_summary(menus: pd.DataFrame, storage: dict[str, int]) -> pd.DataFrame:
+    """Per layout, workload-mean cost per viewport when each res uses its
+    `best` menu, plus on-disk pyramid bytes and the Pareto flag on
+    (bytes_read, objects, requests, storage_bytes)."""
+    best = menus[menus['best']]
+    cols = ['requests', 'objects', 'bytes_read', 'resp_bytes', 'score']
+    weighted = best[cols].mul(best['n'], axis=0).assign(layout=best['layout'], n=best['n'])
+    sums = weighted.groupby('layout').sum()
+    out = sums[cols].div(sums['n'], axis=0)
+    out['storage_bytes'] = pd.Series(storage).reindex(out.index)
+    out['pareto'] = pareto_front(out, ['bytes_read', 'objects', 'requests', 'storage_bytes'])
+    return out.sort_values('score')
+
+
+def combos_for(menus: pd.DataFrame, layout: str) -> list[dict]:
+    """Manifest `pyramid_combos` entries for `layout`'s best menu per res."""
+    best = menus[menus['best'] & (menus['layout'] == layout)].sort_values('res')
+    return [
+        {'shard_res': int(s), 'data_res': int(r)}
+        for r, menu in zip(best['res'], best['menu'])
+        for s in menu.split(',')
+    ]
@@ -1,9 +0,0 @@
-# Register subcommands on the njdot group
-from njdot.cli import export_map_data  # noqa: F401
-from njdot.cli import export_map_v2  # noqa: F401
-from njdot.cli import export_hex_sld  # noqa: F401
-from njdot.cli import reshard_hex_sld  # noqa: F401
-from njdot.cli import gen_county_outlines  # noqa: F401
-from njdot.cli import gen_muni_outlines  # noqa: F401
-from njdot.cli import cells  # noqa: F401
-from njdot.cli import backfill_geocodes  # noqa: F401
@@ -29,6 +29,7 @@ import click
 import pandas as pd
 
 from .base import njdot
+from njdot.compact import read_pqt
 from njdot.paths import CRASHES_GEOCODE_BACKFILL, CRASHES_PQT, DOT_DATA
 from nj_crashes.paths import ROOT_DIR
 
@@ -171,7 +172,7 @@ def _lookup_latlon(sri: str, mp_val: float, mp_df: pd.DataFrame) -> tuple[float,
 @click.option("-o", "--output", default=DEFAULT_OUT, show_default=True)
 def backfill_geocodes(crashes_path: str, match_path: str, crash_log_path: str, mp_path: str, output: str):
     err(f"Loading {crashes_path}")
-    crashes = pd.read_parquet(crashes_path, columns=["year", "cc", "mc", "case", "tk", "severity", "sri", "mp", "olat", "olon", "ilat", "ilon"])
+    crashes = read_pqt(crashes_path, columns=["year", "cc", "mc", "case", "tk", "severity", "sri", "mp", "olat", "olon", "ilat", "ilon"])
 
     # Target: fatal crashes (tk > 0 OR severity == 'f') with no usable geocode.
     is_fatal = (crashes["tk"].fillna(0) > 0) | (crashes["severity"] == "f")
@@ -1,213 +1,27 @@
-from os.path import exists, join, dirname, basename
-
 import click
-import pandas as pd
-from utz import process
-
-from nj_crashes.utils import sql
-from nj_crashes.utils.log import err
-from nj_crashes.utils.parallel import njobs_opt
-from njdot import crashes, vehicles, occupants, pedestrians, drivers
-from njdot.load import CRASH_IDXS
-from njdot.paths import DOT_DATA, WWW_DOT, DOT_DATA_S3
-from njdot.tbls import Tbl, tbls_opt
 
-
-@click.group('njdot')
+from nj_crashes.utils.cli import LazyGroup
+from nj_crashes.utils.stage import profile_opt
+
+# Subcommands, imported when invoked: command name → ('module[:attr]', help text)
+LAZY_COMMANDS = {
+    'aashto': ('njdot.aashto:aashto', 'Tools for AASHTO Crash.csv pipeline.'),
+    'agg': ('njdot.agg:agg', 'Generate aggregated parquet files for NJDOT crash data.'),
+    'backfill_geocodes': ('njdot.cli.backfill_geocodes', 'Backfill missing lat/lon for fatal crashes via NJSP `LOCATION` parsing.'),
+    'cmymc': ('njdot.cmymc:cmymc', 'Build cmymc.db: {County, Muni, Year, Month} crash + victim aggregations.'),
+    'compute': ('njdot.cli.compute', 'Compute NJDOT Parquet / SQLite / aggregation outputs.'),
+    'export_hex_sld': ('njdot.cli.export_hex_sld', 'Build the hex → nearest-MP-name + muni/county sidecar for the crash map.'),
+    'export_map_data': ('njdot.cli.export_map_data', 'Export crash data as sharded parquet for the interactive map frontend.'),
+    'export_map_v2': ('njdot.cli.export_map_v2', 'Export H3 r5-sharded crash data for the interactive map (v2 layout).'),
+    'features': ('njdot.features:features', 'Materialize the per-crash feature store read by `agg`, `cells raw` and `export-map-v2`.'),
+    'gen_county_outlines': ('njdot.cli.gen_county_outlines', 'Dissolve NJ muni boundaries into per-county GeoJSON for map overlays.'),
+    'gen_muni_outlines': ('njdot.cli.gen_muni_outlines', 'Split NJ muni boundaries into per-county GeoJSON for muni-scope map overlays.'),
+    'rawdata': ('njdot.rawdata:rawdata', 'Download and process NJDOT crash data.'),
+    'reshard_hex_sld': ('njdot.cli.reshard_hex_sld', 'Column-prune + zstd + h3-sort the hex-sld sidecar for cells-api.'),
+}
+
+
+@click.group('njdot', cls=LazyGroup, lazy_commands=LAZY_COMMANDS)
+@profile_opt
 def njdot():
     pass
-
-
-@njdot.group('compute')
-def compute():
-    pass
-
-
-@compute.command('pqt')
-@click.option('-f', '--force-recompute', is_flag=True, help="Force recompute, don't read from existing Parquet")
-@njobs_opt
-@click.option('-n', '--dry-run', is_flag=True, help="Don't write Parquet or DB, or upload to S3")
-@click.option('-p', '--pqt-path', 'pqt_path0', help=f'Write Parquet to this path (default: {DOT_DATA}/<tbl>.parquet`')
-@tbls_opt
-def compute_pqt(force_recompute, pqt_path0, n_jobs, dry_run, tbls: list[Tbl]):
-    for tbl in tbls:
-        pqt_path = pqt_path0 or f'{DOT_DATA}/{tbl}.parquet'
-        if exists(pqt_path):
-            if force_recompute:
-                err(f"{pqt_path} exists; overwriting")
-            else:
-                err(f"{pqt_path} exists; use -f/--force-recompute to overwrite")
-                continue
-        else:
-            err(f"{pqt_path} doesn't exist; computing")
-
-        kwargs = dict(read_pqt=False, write_pqt=not dry_run, pqt_path=pqt_path, n_jobs=n_jobs)
-        load_fn = {
-            'crashes': crashes.load,
-            'vehicles': vehicles.load,
-            'occupants': occupants.load,
-            'pedestrians': pedestrians.load,
-            'drivers': drivers.load,
-        }[tbl]
-        load_fn(**kwargs)
-
-
-def write_db(
-        tbl: Tbl,
-        db_path: str = None,
-        pqt_dir: str = None,
-        force_recompute: bool = False,
-        dry_run: bool = False,
-        replace: bool = False,
-        page_size: int = 2**16,
-        s3_url: str = None,
-        no_s3: bool = False,
-):
-    db_path = db_path or f'{WWW_DOT}/{tbl}.db'
-    do_write_db = True
-    if exists(db_path):
-        if force_recompute:
-            err(f"{db_path} exists; overwriting")
-        else:
-            err(f"{db_path} exists; use -f/--force-recompute to overwrite")
-            do_write_db = False
-    else:
-        err(f"{db_path} doesn't exist; computing")
-
-    if do_write_db and not dry_run:
-        pqt_dir = pqt_dir or DOT_DATA
-        pqt_path = join(pqt_dir, f'{tbl}.parquet')
-        df = pd.read_parquet(pqt_path)
-        idxs = CRASH_IDXS if tbl == 'crashes' else [('crash_id',)]
-        sql.write(
-            df=df,
-            tbl=tbl,
-            db_path=db_path,
-            idxs=idxs,
-            rm=not replace,
-            replace=replace,
-            page_size=page_size,
-        )
-
-    if not no_s3:
-        s3_url = s3_url or f'{DOT_DATA_S3}/{tbl}.db'
-        err(f'Uploading {db_path} to {s3_url}')
-        db_dir = dirname(db_path)
-        s3_dir = dirname(s3_url)
-        process.run(
-            'aws', 's3', 'sync',
-            *(('--dryrun',) if dry_run else ()),
-            '--exclude', '*',
-            '--include', basename(db_path),
-            f'{db_dir}/',
-            f'{s3_dir}/',
-        )
-
-
-@compute.command('db')
-@click.option('-f', '--force-recompute', is_flag=True, help="Force recompute, don't read from existing Parquet")
-@njobs_opt
-@click.option('-n', '--dry-run', is_flag=True, help="Don't write Parquet or DB, or upload to S3")
-@click.option('-d', '--pqt-dir', help=f'Read Parquet files from this directory (default: {DOT_DATA}`')
-@click.option('-r', '--replace', is_flag=True, help='Pass `if_exists="replace"` to `DataFrame.to_sql`')
-@click.option('-s', '--page-size', type=int, default=2**16, help='Page size for SQLite DB (default: 2**16)')
-@click.option('--s3-url', help=f'Upload to this S3 URL (default: `{DOT_DATA_S3}/<tbl>.db')
-@click.option('-S', '--no-s3', is_flag=True, help='Do not upload to S3')
-@tbls_opt
-@click.argument('db-path', required=False)
-def compute_db(force_recompute, db_path, n_jobs, dry_run, pqt_dir, replace, page_size, s3_url, no_s3, tbls: list[Tbl]):
-    f"""Compute SQLite DB from Parquet files.
-
-    db-path: write SQLite to this path (default: {WWW_DOT}/<tbl>.db'
-    """
-    kwargs = dict(
-        db_path=db_path,
-        pqt_dir=pqt_dir,
-        force_recompute=force_recompute,
-        dry_run=dry_run,
-        replace=replace,
-        page_size=page_size,
-        s3_url=s3_url,
-        no_s3=no_s3,
-    )
-    if len(tbls) > 1 and n_jobs != 1:
-        from joblib import Parallel, delayed
-        if not n_jobs:
-            n_jobs = -1
-        Parallel(n_jobs=n_jobs)(
-            delayed(write_db)(tbl, **kwargs)
-            for tbl in tbls
-        )
-    else:
-        for tbl in tbls:
-            write_db(tbl, **kwargs)
-
-
-@compute.command('cm')
-@click.option('-f', '--force', is_flag=True, help="Force recompute even if output exists")
-@click.option('-n', '--dry-run', is_flag=True, help="Don't write output file")
-def compute_cm(force, dry_run):
-    """Compute county-month aggregations (cm.pqt) from crashes.parquet."""
-    from njdot.data import cc2cn
-    from njdot.paths import CM_PQT, CRASHES_PQT
-    from utz import to_dt
-
-    if exists(CM_PQT) and not force:
-        err(f"{CM_PQT} exists; use -f/--force to overwrite")
-        return
-
-    err(f"Loading {CRASHES_PQT}...")
-    df = pd.read_parquet(CRASHES_PQT, columns=['year', 'cc', 'dt', 'ti', 'tk', 'severity'])
-
-    # Filter out Port Authority (cc=99)
-    n_before = len(df)
-    df = df[df.cc != 99]
-    n_filtered = n_before - len(df)
-    if n_filtered:
-        err(f"Filtered {n_filtered} Port Authority crashes (cc=99)")
-
-    # Map county code to name
-    df['County'] = df.cc.map(cc2cn).str.upper()
-
-    # Compute aggregation columns
-    df['Total Injured'] = df.ti.fillna(0).astype(int)
-    df['Total Killed'] = df.tk.fillna(0).astype(int)
-    df['Property Damage'] = (df.severity == 'p').astype(int)
-    df['Year'] = df.dt.dt.year
-    df['Month'] = df.dt.dt.month
-
-    # Aggregate by county-month
-    keys = ['Total Injured', 'Property Damage', 'Total Killed']
-    cm = (
-        df
-        .groupby(['Year', 'Month', 'County'])
-        [keys]
-        .sum()
-        .reset_index()
-    )
-    cm['Date'] = cm.apply(lambda r: to_dt('%d-%02d' % (r.Year, r.Month)), axis=1)
-    cm = cm[['Date', 'County'] + keys]
-
-    err(f"Total rows: {len(cm)}")
-
-    if not dry_run:
-        err(f"Writing {CM_PQT}")
-        cm.to_parquet(CM_PQT)
-    else:
-        err(f"Dry run; would write {CM_PQT}")
-
-
-# Add rawdata subcommand at end to avoid import ordering issues
-try:
-    from njdot.rawdata import rawdata
-    njdot.add_command(rawdata)
-except ImportError:
-    pass  # rawdata available as standalone CLI if dependencies missing
-
-from njdot.aashto import aashto
-from njdot.agg import agg
-from njdot.cmymc import cmymc
-
-njdot.add_command(aashto)
-njdot.add_command(agg)
-njdot.add_command(cmymc)
@@ -30,10 +30,11 @@ import pyarrow.parquet as pq
 from h3.api import numpy_int as h3i
 
 from nj_crashes.utils.log import err
+from nj_crashes.utils.stage import staged
 from njdot import s2
-from njdot.cli.base import compute
+from njdot.cli.compute import compute
 from njdot.cli.export_map_data import _build_base
-from njdot.load import load_crashes_with_aashto
+from njdot.features import H3_COL, load_map_input
 
 
 # Subset of crashes.parquet that `_build_base` needs (mirrors export_map_v2).
@@ -52,6 +53,13 @@ SHARD_RES_DEFAULT = 4
 PYRAMID_LEVELS_DEFAULT = (6, 7, 8, 9, 10, 11, 12, 13)
 TOPK_DEFAULT = 10
 SCHEMA_VERSION = 4
+# Client cover menu (`pyramid_combos`) per data_res: the `shard_res`
+# granularities `pickCover` may split a viewport cover into. Tunable offline
+# with `cells tune`.
+COVER_MENU_DEFAULT = {
+    6: (2, 3), 7: (2, 3, 4), 8: (3, 4, 5), 9: (4, 5, 6), 10: (5, 6, 7),
+    11: (6, 7, 8), 12: (7, 8, 9), 13: (8, 9), 14: (9,), 15: (7, 8),
+}
 
 # Resolutions covered by `hex-sld.parquet` (r6-r11). Pyramid rows at a finer
 # `data_res` inherit sld from their r{SLD_MAX_RES} ancestor — same fallback the
@@ -88,21 +96,37 @@ R2_PROFILE_DEFAULT = 'cf'
 
 
 def _h3_int_col(lat: np.ndarray, lon: np.ndarray, res: int) -> np.ndarray:
-    """Vectorize h3.latlng_to_cell over (lat, lon) → int64 numpy array."""
-    n = len(lat)
-    out = np.empty(n, dtype=np.int64)
+    """Vectorize h3.latlng_to_cell over (lat, lon) → int64 numpy array.
+
+    Each distinct point is converted once: geocodes repeat heavily (crashes
+    located by SRI/MP share the same tenth-mile point), and `latlng_to_cell`
+    has no array form. `lat + 1j*lon` factorizes the pairs in one hash pass.
+    """
+    codes, uniq = pd.factorize(np.asarray(lat, dtype=np.float64) + 1j * np.asarray(lon, dtype=np.float64))
+    out = np.empty(len(uniq), dtype=np.int64)
     # h3 v4 numpy_int variant returns int directly (no string roundtrip).
-    for i in range(n):
-        out[i] = h3i.latlng_to_cell(float(lat[i]), float(lon[i]), res)
-    return out
+    for i, p in enumerate(uniq.tolist()):
+        out[i] = h3i.latlng_to_cell(p.real, p.imag, res)
+    return out[codes]
+
+
+# H3 index bit layout: 4-bit resolution at bits 52-55, then 15 3-bit digits
+# (digit 1 at bits 42-44 … digit 15 at bits 0-2); digits finer than the
+# cell's resolution are 7 ("unused").
+H3_RES_OFFSET = 52
+H3_RES_MASK = np.int64(0xF << H3_RES_OFFSET)
+H3_MAX_RES = 15
 
 
 def _parent_int_col(cells: np.ndarray, res: int) -> np.ndarray:
-    n = len(cells)
-    out = np.empty(n, dtype=np.int64)
-    for i in range(n):
-        out[i] = h3i.cell_to_parent(int(cells[i]), res)
-    return out
+    """`h3.cell_to_parent` over an int64 array, as bit math: set the resolution
+    field to `res`, and every digit finer than `res` to 7."""
+    cells = np.asarray(cells, dtype=np.int64)
+    cell_res = (cells & H3_RES_MASK) >> H3_RES_OFFSET
+    if len(cells) and cell_res.min() < res:
+        raise ValueError(f'parent res {res} is finer than some cells (res {cell_res.min()})')
+    unused = np.int64((1 << 3 * (H3_MAX_RES - res)) - 1)
+    return (cells & ~H3_RES_MASK) | np.int64(res << H3_RES_OFFSET) | unused
 
 
 def _str_to_int_col(cells: np.ndarray) -> np.ndarray:
@@ -178,7 +202,7 @@ def cells_raw(base_res: int | None, force: bool, grid: str, out_dir: Path, shard
             p.unlink()
     raw_dir.mkdir(parents=True, exist_ok=True)
 
-    df = load_crashes_with_aashto(columns=MAP_INPUT_COLS)
+    df = load_map_input(MAP_INPUT_COLS, extra=[H3_COL] if grid == 'h3' else None)
     n_total = len(df)
 
     err('Computing effective lat/lon (via _build_base)...')
@@ -198,6 +222,10 @@ def cells_raw(base_res: int | None, force: bool, grid: str, out_dir: Path, shard
         cells = s2.latlng_to_id(lat, lon, base_res)          # uint64
         shard_arr = s2.parent_id(cells, shard_res)           # uint64
         shard_name = lambda v: s2.id_to_token(int(v))
+    elif cell_name in df.columns:
+        cells = df.loc[base.index, cell_name].to_numpy('int64')  # feature store
+        shard_arr = _parent_int_col(cells, shard_res)
+        shard_name = lambda v: h3.int_to_str(int(v))
     else:
         cells = _h3_int_col(lat, lon, base_res)              # int64
         shard_arr = _parent_int_col(cells, shard_res)        # int64
@@ -229,6 +257,7 @@ def cells_raw(base_res: int | None, force: bool, grid: str, out_dir: Path, shard
     err('Row-count parity OK.')
 
 
+@staged()
 def _build_pyramid_level(
     base: pd.DataFrame,
     h3_base_col: str,
@@ -378,6 +407,7 @@ _PYRAMID_COUNT_COLS = (
 )
 
 
+@staged()
 def _build_pyramid_level_s2(
     base: pd.DataFrame,
     s2col: str,
@@ -569,7 +599,7 @@ def _cells_pyramid_s2(base_level, force, topk, levels, out_dir, row_group_size,
 @click.option('-b', '--base-res', type=int, default=None)
 @click.option('-f', '--force', is_flag=True, help='Overwrite existing pyramid output')
 @click.option('-g', '--grid', type=click.Choice(['h3', 's2']), default='h3', help='Cell grid (default: h3)')
-@click.option('-j', '--jobs', type=int, default=0, help='Parallel level workers (0 = min(#levels, cpu_count))')
+@click.option('-j', '--jobs', type=int, default=0, help='Parallel raw-shard workers (0 = min(#shards, cpu_count))')
 @click.option('-k', '--topk', type=int, default=TOPK_DEFAULT, help=f'topK most-recent crashes per cell-year (default: {TOPK_DEFAULT})')
 @click.option('-l', '--levels', default=None, help='Comma-separated pyramid levels')
 @click.option('-o', '--out-dir', type=click.Path(path_type=Path), default=OUT_DIR_DEFAULT)
@@ -583,7 +613,11 @@ def cells_pyramid(base_res: int | None, force: bool, grid: str, jobs: int, topk:
     cell-sorted with `row_group_size` row-groups so the worker prunes to
     viewport row-groups by cell range. `--grid s2` writes
     `s2_pyramid/s2_l{level}/{token}.parquet` (see specs/s2-pyramid.md); default
-    `--grid h3` writes `pyramid/r{N}/{hex}.parquet`."""
+    `--grid h3` writes `pyramid/r{N}/{hex}.parquet`.
+
+    The h3 build streams raw shards: each worker (`-j`) loads one raw shard,
+    builds every level from it, writes, and releases it, so peak memory is
+    bounded by the largest shard (× `-j`), not the whole raw index."""
     if grid == 's2':
         return _cells_pyramid_s2(base_res, force, topk, levels, out_dir, row_group_size, shard_res, sld_path)
     if base_res is None:
@@ -611,16 +645,7 @@ def cells_pyramid(base_res: int | None, force: bool, grid: str, jobs: int, topk:
     if not raw_paths:
         err(f'No raw shards in {raw_dir}; run `compute cells raw` first')
         raise SystemExit(1)
-    keep = _pyramid_keep_cols(base_res)
-    err(f'Loading {len(raw_paths)} raw shards from {raw_dir} (cols: {keep})...')
-    t0 = time()
-    base = pd.concat([pd.read_parquet(p, columns=keep) for p in raw_paths], ignore_index=True)
-    err(f'  {len(base):,} rows in {time() - t0:.1f}s')
-
-    err('Sorting by dt desc (once, for topK head() correctness)...')
-    t0 = time()
-    base = base.sort_values('dt', ascending=False, kind='mergesort')
-    err(f'  {time() - t0:.1f}s')
+    units = _raw_units(raw_paths, shard_res)
 
     sld = None
     if str(sld_path):
@@ -629,26 +654,13 @@ def cells_pyramid(base_res: int | None, force: bool, grid: str, jobs: int, topk:
         sld = _load_sld_lookup(sld_path)
         err(f'  {len(sld):,} labelled cells in {time() - t0:.1f}s')
 
-    global _MP_BASE, _MP_SLD, _MP_H3_BASE_COL, _MP_TOPK, _MP_PYRAMID_DIR, _MP_SHARD_RES, _MP_RGS
-    _MP_BASE = base
-    _MP_SLD = sld
-    _MP_H3_BASE_COL = f'h3_r{base_res}'
-    _MP_TOPK = topk
-    _MP_PYRAMID_DIR = pyramid_dir
-    _MP_SHARD_RES = shard_res
-    _MP_RGS = row_group_size
-
-    n_jobs = jobs if jobs > 0 else min(len(level_ints), os.cpu_count() or 1)
-    err(f'\nBuilding {len(level_ints)} levels (shard r{shard_res}, rgs={row_group_size}) across {n_jobs} worker(s)...')
+    targets = [(level, shard_res, f'r{level}', row_group_size) for level in level_ints]
+    n_jobs = jobs if jobs > 0 else min(len(units), os.cpu_count() or 1)
+    err(f'\nBuilding {len(level_ints)} levels (shard r{shard_res}, rgs={row_group_size}) from {len(units)} raw shard unit(s) across {n_jobs} worker(s)...')
     t0 = time()
-    if n_jobs == 1:
-        for level in level_ints:
-            _level_task(level)
-    else:
-        from multiprocessing import get_context
-        with get_context('fork').Pool(n_jobs) as pool:
-            for level, n in pool.imap_unordered(_level_task, level_ints):
-                err(f'  ✓ r{level}: {n:,} rows')
+    totals = _run_pyramid_units(units, base_res, targets, topk, pyramid_dir, sld, n_jobs)
+    for level in level_ints:
+        err(f'  r{level}: {totals.get(f"r{level}", 0):,} rows')
     err(f'All levels done in {time() - t0:.1f}s')
 
 
@@ -673,44 +685,115 @@ def _parse_combos(spec: str) -> list[tuple[int, int]]:
     return out
 
 
-# Fork-shared state for combo workers. Set once in `cells_pyramid_combos`
-# before the pool is created; children inherit via copy-on-write so the
-# multi-million-row `base` (and the sld lookup) are never pickled per task.
-_MP_BASE: pd.DataFrame | None = None
+def _raw_units(raw_paths: list[Path], shard_res: int) -> list[list[Path]]:
+    """Group raw shard files into independent pyramid work units.
+
+    A pyramid row lands in its cell's r{shard_res} parent shard, so when
+    `shard_res` is at least the raw shards' resolution each raw file feeds
+    exactly one set of output shards that no other file touches — every file
+    is its own unit. For a coarser `shard_res`, raw files sharing an
+    r{shard_res} parent are grouped so no output shard is split (and
+    overwritten) across units. Largest units come first, so a pool starts the
+    long poles early."""
+    groups: dict[int, list[Path]] = {}
+    for p in raw_paths:
+        cell = h3i.str_to_int(p.stem)
+        key = h3i.cell_to_parent(cell, shard_res) if shard_res < h3.get_resolution(p.stem) else cell
+        groups.setdefault(key, []).append(p)
+    return sorted(groups.values(), key=lambda ps: -sum(p.stat().st_size for p in ps))
+
+
+@staged()
+def _build_pyramid_unit(
+    paths: list[Path],
+    base_res: int,
+    targets: list[tuple[int, int, str, int]],
+    topk: int,
+    pyramid_dir: Path,
+    sld: pd.DataFrame | None = None,
+) -> dict[str, int]:
+    """Load one raw shard unit, build every `(level, shard_res, subdir,
+    row_group_size)` target from it, and release it.
+
+    Returns {subdir: row_count}. Peak memory is one unit's rows (the largest
+    raw shard, for the default r4 layout) rather than the whole raw index.
+    Output is identical to building from the concatenated index: the per-unit
+    `dt` sort preserves the global sort's relative order, and each output shard
+    is written from exactly one unit."""
+    h3_base_col = f'h3_r{base_res}'
+    keep = _pyramid_keep_cols(base_res)
+    base = pd.concat([pd.read_parquet(p, columns=keep) for p in paths], ignore_index=True)
+    base = base.sort_values('dt', ascending=False, kind='mergesort')
+    totals: dict[str, int] = {}
+    for level, shard_res, subdir, rgs in targets:
+        counts = _build_pyramid_level(
+            base, h3_base_col, level, shard_res, topk,
+            pyramid_dir / subdir, sld=sld, row_group_size=rgs,
+        )
+        totals[subdir] = sum(counts.values())
+    return totals
+
+
+# Fork-shared state for pyramid shard workers. Set once in
+# `_run_pyramid_units` before the pool is created; children inherit via
+# copy-on-write so the sld lookup is never pickled per task. Each task reads
+# its own raw shard(s), so the raw index itself is never shared.
 _MP_SLD: pd.DataFrame | None = None
-_MP_H3_BASE_COL: str | None = None
+_MP_BASE_RES: int | None = None
+_MP_TARGETS: list[tuple[int, int, str, int]] | None = None
 _MP_TOPK: int | None = None
 _MP_PYRAMID_DIR: Path | None = None
-_MP_SHARD_RES: int | None = None
-_MP_RGS: int | None = None
 
 
-def _level_task(level: int) -> tuple[int, int]:
-    """Fork worker: build one consolidated level `pyramid/r{level}/` sharded at
-    `_MP_SHARD_RES` (r4) with sld baked. Mirrors `_combo_task` but one
-    shard_res, plain `r{level}` output path."""
-    counts = _build_pyramid_level(
-        _MP_BASE, _MP_H3_BASE_COL, level, _MP_SHARD_RES, _MP_TOPK,
-        _MP_PYRAMID_DIR / f'r{level}', sld=_MP_SLD, row_group_size=_MP_RGS,
-    )
-    return level, sum(counts.values())
+def _unit_task(paths: list[Path]) -> tuple[str, dict[str, int]]:
+    """Fork worker: build every target level from one raw shard unit."""
+    totals = _build_pyramid_unit(paths, _MP_BASE_RES, _MP_TARGETS, _MP_TOPK, _MP_PYRAMID_DIR, sld=_MP_SLD)
+    return ','.join(p.stem for p in paths), totals
 
 
-def _combo_task(combo: tuple[int, int]) -> tuple[int, int, int]:
-    s_res, d_res = combo
-    err(f'=== Combo s{s_res} / r{d_res} (D={d_res - s_res}) ===')
-    counts = _build_pyramid_level(
-        _MP_BASE, _MP_H3_BASE_COL, d_res, s_res, _MP_TOPK,
-        _MP_PYRAMID_DIR / f's{s_res}_r{d_res}', sld=_MP_SLD,
-    )
-    return s_res, d_res, sum(counts.values())
+def _run_pyramid_units(
+    units: list[list[Path]],
+    base_res: int,
+    targets: list[tuple[int, int, str, int]],
+    topk: int,
+    pyramid_dir: Path,
+    sld: pd.DataFrame | None,
+    n_jobs: int,
+) -> dict[str, int]:
+    """Build `targets` from each raw shard unit, `n_jobs` units at a time.
+
+    Returns {subdir: total row_count} summed over units."""
+    global _MP_SLD, _MP_BASE_RES, _MP_TARGETS, _MP_TOPK, _MP_PYRAMID_DIR
+    _MP_SLD = sld
+    _MP_BASE_RES = base_res
+    _MP_TARGETS = targets
+    _MP_TOPK = topk
+    _MP_PYRAMID_DIR = pyramid_dir
+
+    totals: dict[str, int] = {}
+    t0 = time()
+
+    def tally(name: str, unit_totals: dict[str, int]):
+        for subdir, n in unit_totals.items():
+            totals[subdir] = totals.get(subdir, 0) + n
+        err(f'  ✓ {name}: {sum(unit_totals.values()):,} rows ({time() - t0:.1f}s)')
+
+    if n_jobs == 1:
+        for paths in units:
+            tally(*_unit_task(paths))
+    else:
+        from multiprocessing import get_context
+        with get_context('fork').Pool(n_jobs) as pool:
+            for name, unit_totals in pool.imap_unordered(_unit_task, units):
+                tally(name, unit_totals)
+    return totals
 
 
 @cells.command('pyramid-combos')
 @click.option('-b', '--base-res', type=int, default=BASE_RES_DEFAULT)
 @click.option('-c', '--combos', required=True, help='Comma-sep (shard_res, data_res) pairs, e.g. "s5:r9,s6:r10,s7:r11,s8:r12"')
 @click.option('-f', '--force', is_flag=True, help='Overwrite existing combo output dirs')
-@click.option('-j', '--jobs', type=int, default=0, help='Parallel combo workers (0 = min(#combos, cpu_count))')
+@click.option('-j', '--jobs', type=int, default=0, help='Parallel raw-shard workers (0 = min(#shards, cpu_count))')
 @click.option('-k', '--topk', type=int, default=TOPK_DEFAULT)
 @click.option('-o', '--out-dir', type=click.Path(path_type=Path), default=OUT_DIR_DEFAULT)
 @click.option('-S', '--sld-path', type=click.Path(path_type=Path), default=SLD_PATH_DEFAULT, help=f'hex-sld.parquet to bake into rows, or "" to skip (default: {SLD_PATH_DEFAULT})')
@@ -720,13 +803,12 @@ def cells_pyramid_combos(base_res: int, combos: str, force: bool, jobs: int, top
     client picks the combo whose viewport-shard count is in target
     range (typically D = data_res - shard_res = 3-5).
 
-    Combos run in a fork pool (`-j`); `SLD_COLS` are baked into every row
-    from `--sld-path` unless it's empty."""
+    Raw shards stream through a fork pool (`-j`), each building every combo;
+    `SLD_COLS` are baked into every row from `--sld-path` unless it's empty."""
     combo_list = _parse_combos(combos)
-    # Coarse→fine: per-worker memory is dominated by the topK object graph,
-    # which grows with data_res (fine combos are ~all singleton groups, so
-    # head(topk) keeps ~every row). Ordering cheap combos first lets them
-    # clear fast, so at most `-j` of the *expensive* fine combos overlap.
+    # Coarse→fine: each worker builds every combo from its raw shard in this
+    # order, and the topK object graph grows with data_res (fine combos are
+    # ~all singleton groups, so head(topk) keeps ~every row).
     combo_list = sorted(combo_list, key=lambda c: (c[1], c[0]))
     err(f'Generating {len(combo_list)} combos: {combo_list}')
     pyramid_dir = out_dir / 'pyramid'
@@ -746,15 +828,9 @@ def cells_pyramid_combos(base_res: int, combos: str, force: bool, jobs: int, top
     if not raw_paths:
         err(f'No raw shards in {raw_dir}; run `compute cells raw` first')
         raise SystemExit(1)
-    keep = _pyramid_keep_cols(base_res)
-    err(f'Loading {len(raw_paths)} raw shards from {raw_dir} (cols: {keep})...')
-    t0 = time()
-    base = pd.concat([pd.read_parquet(p, columns=keep) for p in raw_paths], ignore_index=True)
-    err(f'  {len(base):,} rows in {time() - t0:.1f}s')
-    err('Sorting by dt desc (once, for topK head() correctness)...')
-    t0 = time()
-    base = base.sort_values('dt', ascending=False, kind='mergesort')
-    err(f'  {time() - t0:.1f}s')
+    # One unit must cover every output shard of every combo, so group raw
+    # files at the coarsest combo shard_res.
+    units = _raw_units(raw_paths, min(s_res for s_res, _ in combo_list))
 
     sld = None
     if str(sld_path):
@@ -763,33 +839,23 @@ def cells_pyramid_combos(base_res: int, combos: str, force: bool, jobs: int, top
         sld = _load_sld_lookup(sld_path)
         err(f'  {len(sld):,} labelled cells in {time() - t0:.1f}s')
 
-    global _MP_BASE, _MP_SLD, _MP_H3_BASE_COL, _MP_TOPK, _MP_PYRAMID_DIR
-    _MP_BASE = base
-    _MP_SLD = sld
-    _MP_H3_BASE_COL = f'h3_r{base_res}'
-    _MP_TOPK = topk
-    _MP_PYRAMID_DIR = pyramid_dir
-
-    n_jobs = jobs if jobs > 0 else min(len(combo_list), os.cpu_count() or 1)
-    err(f'\nBuilding {len(combo_list)} combos across {n_jobs} worker(s)...')
+    targets = [(d_res, s_res, f's{s_res}_r{d_res}', 20_000) for s_res, d_res in combo_list]
+    n_jobs = jobs if jobs > 0 else min(len(units), os.cpu_count() or 1)
+    err(f'\nBuilding {len(combo_list)} combos from {len(units)} raw shard unit(s) across {n_jobs} worker(s)...')
     t0 = time()
-    if n_jobs == 1:
-        for combo in combo_list:
-            _combo_task(combo)
-    else:
-        from multiprocessing import get_context
-        with get_context('fork').Pool(n_jobs) as pool:
-            for s_res, d_res, n in pool.imap_unordered(_combo_task, combo_list):
-                err(f'  ✓ s{s_res}_r{d_res}: {n:,} rows')
+    totals = _run_pyramid_units(units, base_res, targets, topk, pyramid_dir, sld, n_jobs)
+    for s_res, d_res in combo_list:
+        err(f'  s{s_res}_r{d_res}: {totals.get(f"s{s_res}_r{d_res}", 0):,} rows')
     err(f'All combos done in {time() - t0:.1f}s')
 
 
 @cells.command('manifest')
 @click.option('-b', '--base-res', type=int, default=BASE_RES_DEFAULT)
+@click.option('-c', '--cover-menu', default=None, help='Client cover menu as "s{shard_res}:r{data_res},..." (default: COVER_MENU_DEFAULT; see `cells tune`)')
 @click.option('-l', '--pyramid-levels', default=','.join(map(str, PYRAMID_LEVELS_DEFAULT)), help='Comma-separated pyramid levels')
 @click.option('-o', '--out-dir', type=click.Path(path_type=Path), default=OUT_DIR_DEFAULT)
 @click.option('-s', '--shard-res', type=int, default=SHARD_RES_DEFAULT)
-def cells_manifest(base_res: int, pyramid_levels: str, out_dir: Path, shard_res: int):
+def cells_manifest(base_res: int, cover_menu: str | None, pyramid_levels: str, out_dir: Path, shard_res: int):
     """Walk on-disk shards and emit `manifest.json` per cells API spec."""
     levels = [int(x) for x in pyramid_levels.split(',') if x.strip()]
     raw_dir = out_dir / 'raw' / f'h3_r{base_res}'
@@ -876,13 +942,16 @@ def cells_manifest(base_res: int, pyramid_levels: str, out_dir: Path, shard_res:
     # pruning), so this is purely a client-side cover-sizing menu. Synthesize
     # it — the exact granularities the old fine tiers advertised, so cover
     # counts stay within the client's COVER_MAX_SHARDS — for every level.
+    # `-c/--cover-menu` (e.g. from `cells tune`) replaces the default menu.
     if not pyramid_combos:
-        cover_menu = {
-            6: (2, 3), 7: (2, 3, 4), 8: (3, 4, 5), 9: (4, 5, 6), 10: (5, 6, 7),
-            11: (6, 7, 8), 12: (7, 8, 9), 13: (8, 9), 14: (9,), 15: (7, 8),
-        }
+        if cover_menu:
+            menu: dict[int, list[int]] = {}
+            for s_res, d_res in _parse_combos(cover_menu):
+                menu.setdefault(d_res, []).append(s_res)
+        else:
+            menu = COVER_MENU_DEFAULT
         for d_res in levels:
-            for s_res in cover_menu.get(d_res, ()):
+            for s_res in sorted(menu.get(d_res, ())):
                 pyramid_combos.append({'shard_res': s_res, 'data_res': d_res})
 
     sha = _git_sha()
@@ -941,7 +1010,7 @@ def _cells_db_h3(base_res: int | None, force: bool, levels: str, out_dir: Path,
     fatal_years, sld_name, cross_sld_name, mun, county)` for each requested res,
     the default (all-years, all-severity) `/v1/cells` fast path. Building from
     raw (not the pyramid) keeps the whole rollup memory-bounded — duckdb streams
-    each res's group-by — so it runs in CI where the pyramid build OOMs. The
+    each res's group-by — so it runs in CI on a single small runner. The
     per-res counts match `_build_pyramid_level` exactly (verified row-for-row
     against the pyramid-derived output).
 
@@ -1213,6 +1282,212 @@ def cells_sld(base_level: int | None, grid: str, levels: str | None, mp_path: st
     err(f'Wrote {out_path} ({len(enriched):,} cells, {n_mun:,} with muni)')
 
 
+@cells.command('query')
+@click.option('-D', '--no-db', is_flag=True, help='Skip the cells.db (D1) fast path')
+@click.option('-o', '--out-dir', type=click.Path(path_type=Path), default=OUT_DIR_DEFAULT)
+@click.argument('url')
+def cells_query(no_db: bool, out_dir: Path, url: str):
+    """Answer one `/v1/cells` URL (or query string) from the local pyramid.
+
+    Prints the worker-shaped JSON response to stdout, and the query's stats
+    (source, bytes read, row groups touched, latency) to stderr."""
+    from dataclasses import asdict
+    from njdot.cells_query import CellsQuery, CellsRequest
+    engine = CellsQuery(out_dir, db=not no_db)
+    resp, stats = engine.query(CellsRequest.from_url(url))
+    err(json.dumps(asdict(stats)))
+    print(json.dumps(resp))
+
+
+@cells.command('bench')
+@click.option('-D', '--no-db', is_flag=True, help='Skip the cells.db (D1) fast path (benchmark the pyramid alone)')
+@click.option('-F', '--no-footer-cache', is_flag=True, help="Charge every read its footer bytes (cold worker isolate)")
+@click.option('-n', '--repeat', type=int, default=1, help='Replay the request set this many times (default: 1)')
+@click.option('-o', '--out-dir', type=click.Path(path_type=Path), default=OUT_DIR_DEFAULT)
+@click.option('-O', '--output', type=click.Path(path_type=Path), default=None, help='Write per-request stats (.csv, .parquet, or .jsonl)')
+@click.argument('requests_path', type=click.Path(exists=True, path_type=Path))
+def cells_bench(no_db: bool, no_footer_cache: bool, repeat: int, out_dir: Path, output: Path | None, requests_path: Path):
+    """Replay recorded `/v1/cells` requests against the local pyramid.
+
+    REQUESTS_PATH has one request per line: a URL / query string, or a JSON
+    object with a `url` key. Reports bytes read, row groups touched and
+    latency per source (d1 / pyramid / raw); `-O` keeps the per-request rows
+    for comparing `pyramid -r/-s` layouts offline."""
+    from njdot import cells_query as cq
+    reqs = cq.load_requests(requests_path)
+    engine = cq.CellsQuery(out_dir, db=not no_db, footer_cache=not no_footer_cache)
+    err(f'Replaying {len(reqs)} requests × {repeat} against {out_dir}...')
+    df = cq.bench(engine, reqs, repeat=repeat)
+    if output:
+        ext = output.suffix
+        if ext == '.parquet':
+            df.to_parquet(output, index=False)
+        elif ext == '.jsonl':
+            df.to_json(output, orient='records', lines=True)
+        else:
+            df.to_csv(output, index=False)
+        err(f'Wrote {output}')
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(cq.summarize(df).round(2).to_string())
+
+
+def _build_tune_layout(
+    raw_paths: list[Path],
+    base_res: int,
+    levels: list[int],
+    shard_res: int,
+    row_group_size: int,
+    topk: int,
+    layout_dir: Path,
+    sld: pd.DataFrame | None,
+    n_jobs: int,
+    year_range: list[int] | None,
+):
+    """Build one candidate pyramid layout (`pyramid/r{N}/` at `shard_res`
+    sharding, `row_group_size` row groups) plus a minimal `manifest.json`
+    for `CellsQuery`."""
+    pyramid_dir = layout_dir / 'pyramid'
+    for p in pyramid_dir.glob('r*/*.parquet'):
+        p.unlink()
+    pyramid_dir.mkdir(parents=True, exist_ok=True)
+    targets = [(level, shard_res, f'r{level}', row_group_size) for level in levels]
+    _run_pyramid_units(_raw_units(raw_paths, shard_res), base_res, targets, topk, pyramid_dir, sld, n_jobs)
+    shard_cells = sorted({p.stem for p in pyramid_dir.glob('r*/*.parquet')})
+    manifest = {
+        'data_version': layout_dir.name,
+        'base_res': base_res,
+        'shard_res': shard_res,
+        'pyramid_levels': levels,
+        'year_range': year_range,
+        'shard_cells': shard_cells,
+    }
+    (layout_dir / 'manifest.json').write_text(json.dumps(manifest, indent=2) + '\n')
+
+
+@cells.command('tune')
+@click.option('-b', '--base-res', type=int, default=BASE_RES_DEFAULT)
+@click.option('-d', '--scratch-dir', type=click.Path(path_type=Path), default=None, help='Candidate layouts go here (default: <out-dir>/tune)')
+@click.option('-f', '--force', is_flag=True, help='Rebuild candidate layouts that already exist')
+@click.option('-g', '--get-bytes', type=int, default=None, help='Bytes one R2 GET / HTTP request is worth when scoring (default: 32KiB)')
+@click.option('-j', '--jobs', type=int, default=0, help='Parallel raw-shard workers per layout build (0 = min(#shards, cpu_count))')
+@click.option('-k', '--topk', type=int, default=TOPK_DEFAULT)
+@click.option('-l', '--levels', default=','.join(map(str, PYRAMID_LEVELS_DEFAULT)), help='Comma-separated pyramid levels to build and replay')
+@click.option('-n', '--viewports', type=int, default=200, help='Viewports in the replayed workload (default: 200)')
+@click.option('-o', '--out-dir', type=click.Path(path_type=Path), default=OUT_DIR_DEFAULT)
+@click.option('-O', '--output', type=click.Path(path_type=Path), default=None, help='Write per-(layout, viewport, menu) stats (.csv, .parquet, or .jsonl)')
+@click.option('-r', '--row-group-sizes', default='1024,4096,16384', help='Comma-separated candidate row-group sizes')
+@click.option('-s', '--shard-res', 'shard_res_list', default=str(SHARD_RES_DEFAULT), help='Comma-separated candidate file shard resolutions')
+@click.option('-S', '--sld-path', default=str(SLD_PATH_DEFAULT), help='sld parquet to bake into rows, or "" to skip')
+@click.option('-w', '--write', is_flag=True, help="Write the recommended cover menu into <out-dir>/manifest.json's `pyramid_combos`")
+@click.option('-y', '--years', default=None, help='Year filter on replayed requests, e.g. 2020-2024 (default: none)')
+@click.option('-z', '--zoom-weights', default=None, help='Viewport zoom distribution as "zoom:weight,..." (default: 8:1,9:2,10:3,11:3,12:3,13:2,14:1)')
+@click.option('--seed', type=int, default=0)
+def cells_tune(
+    base_res: int, scratch_dir: Path | None, force: bool, get_bytes: int | None, jobs: int, topk: int,
+    levels: str, viewports: int, out_dir: Path, output: Path | None, row_group_sizes: str,
+    shard_res_list: str, sld_path: str, write: bool, years: str | None, zoom_weights: str | None, seed: int,
+):
+    """Pick pyramid `-s/--shard-res`, `-r/--row-group-size` and the client
+    cover menu (`pyramid_combos`) from a replayed viewport workload.
+
+    Builds each candidate (shard_res × row_group_size) layout from the raw
+    index into `--scratch-dir`. Samples `-n` crash-weighted NJ viewports over
+    the `-z` zoom distribution, covers each one with every candidate menu for
+    its data res (ports of the client's `pickRes` / `pickCover` / batching),
+    and replays the resulting `/v1/cells` requests (pyramid path, no D1).
+    Reports per-viewport bytes read, objects (footers + row groups) and
+    requests, plus each layout's storage, with Pareto fronts; `-w` writes
+    the recommended menu into `manifest.json`. See `njdot/cells_tune.py`."""
+    from njdot import cells_query as cq
+    from njdot import cells_tune as ct
+    scratch_dir = scratch_dir or out_dir / 'tune'
+    get_bytes = ct.GET_BYTES_DEFAULT if get_bytes is None else get_bytes
+    level_ints = sorted(int(x) for x in levels.split(',') if x.strip())
+    shard_ress = sorted(int(x) for x in shard_res_list.split(',') if x.strip())
+    rgss = sorted(int(x) for x in row_group_sizes.split(',') if x.strip())
+    year_filter = tuple(int(y) for y in years.split('-')) if years else None
+
+    raw_dir = out_dir / 'raw' / f'h3_r{base_res}'
+    raw_paths = sorted(raw_dir.glob('*.parquet'))
+    if not raw_paths:
+        err(f'No raw shards in {raw_dir}; run `compute cells raw` first')
+        raise SystemExit(1)
+    manifest_path = out_dir / 'manifest.json'
+    year_range = json.loads(manifest_path.read_text()).get('year_range') if manifest_path.exists() else None
+
+    layouts = {f's{s}_rg{r}': (s, r) for s in shard_ress for r in rgss}
+    todo = [name for name in layouts if force or not (scratch_dir / name / 'manifest.json').exists()]
+    sld = None
+    if todo and sld_path:
+        err(f'Loading sld lookup from {sld_path}...')
+        sld = _load_sld_lookup(Path(sld_path))
+    n_jobs = jobs if jobs > 0 else min(len(raw_paths), os.cpu_count() or 1)
+    for name in todo:
+        s_res, rgs = layouts[name]
+        err(f'\nBuilding layout {name} (levels {level_ints})...')
+        t0 = time()
+        _build_tune_layout(raw_paths, base_res, level_ints, s_res, rgs, topk, scratch_dir / name, sld, n_jobs, year_range)
+        err(f'  {name} built in {time() - t0:.1f}s')
+    storage = {
+        name: sum(
+            p.stat().st_size
+            for lv in level_ints
+            for p in (scratch_dir / name / 'pyramid' / f'r{lv}').glob('*.parquet')
+        )
+        for name in layouts
+    }
+
+    cells_col = f'h3_r{base_res}'
+    crash_cells = np.concatenate([pq.read_table(p, columns=[cells_col]).column(0).to_numpy() for p in raw_paths])
+    vps = ct.sample_viewports(
+        crash_cells, ct.parse_zoom_weights(zoom_weights or ct.ZOOM_WEIGHTS_DEFAULT), viewports, seed=seed,
+    )
+    vps = [vp for vp in vps if vp.res in level_ints]
+    menus = {res: ct.menu_candidates(res) for res in sorted({vp.res for vp in vps})}
+    root_cells = {p.stem for p in raw_paths}
+    err(f'\nPlanning covers for {len(vps)} viewports × {sum(map(len, menus.values()))} menus...')
+    covers = ct.plan_covers(vps, menus, root_cells)
+
+    runs = []
+    for name in layouts:
+        err(f'Replaying against {name}...')
+        engine = cq.CellsQuery(scratch_dir / name, db=False)
+        runs.append(ct.replay(engine, vps, covers, year_filter).assign(layout=name))
+    runs = pd.concat(runs, ignore_index=True)
+    if output:
+        ext = output.suffix
+        if ext == '.parquet':
+            runs.to_parquet(output, index=False)
+        elif ext == '.jsonl':
+            runs.to_json(output, orient='records', lines=True)
+        else:
+            runs.to_csv(output, index=False)
+        err(f'Wrote {output}')
+
+    menu_stats = ct.best_menus(runs, get_bytes)
+    summary = ct.layout_summary(menu_stats, storage)
+    best_layout = summary.index[0]
+    s_res, rgs = layouts[best_layout]
+    combos = ct.combos_for(menu_stats, best_layout)
+    spec = ','.join(f's{c["shard_res"]}:r{c["data_res"]}' for c in combos)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print('Layouts (per-viewport means with each res on its best menu):')
+        print(summary.round(1).to_string())
+        print(f'\nCover menus for {best_layout} (per-viewport means):')
+        cols = ['res', 'menu', 'n', 'cover', 'requests', 'objects', 'bytes_read', 'score', 'pareto', 'best']
+        print(menu_stats[menu_stats['layout'] == best_layout][cols].round(1).to_string(index=False))
+    print(f'\nRecommended: cells pyramid -s {s_res} -r {rgs}; cells manifest -c {spec}')
+
+    if write:
+        if not manifest_path.exists():
+            err(f'{manifest_path} does not exist; run `compute cells manifest` first')
+            raise SystemExit(1)
+        manifest = json.loads(manifest_path.read_text())
+        manifest['pyramid_combos'] = combos
+        manifest_path.write_text(json.dumps(manifest, indent=2) + '\n')
+        err(f'Wrote {len(combos)} pyramid_combos to {manifest_path}')
+
+
 @cells.command('push')
 @click.option('-b', '--bucket', default=R2_BUCKET_DEFAULT, help=f'R2 bucket (default: {R2_BUCKET_DEFAULT})')
 @click.option('-D', '--no-delete', is_flag=True, help='Additive push (skip `--delete`). Use when local lacks legacy data still needed in R2.')
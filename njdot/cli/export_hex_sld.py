@@ -22,6 +22,7 @@ from functools import partial
 
 import click
 import h3
+import numpy as np
 import pandas as pd
 from scipy.spatial import cKDTree
 
@@ -92,28 +93,20 @@ def _nearest_mp(centroids: pd.DataFrame, mp: pd.DataFrame) -> pd.DataFrame:
     pts = mp[["lon", "lat"]].values
     sris = mp["SRI"].values
     tree = cKDTree(pts)
-    _, idx = tree.query(centroids[["lon", "lat"]].values, k=1)
-    nearest = mp.iloc[idx].reset_index(drop=True)
-    # Find cross-street by querying k≥20 neighbors and picking the first
-    # with a different SRI inside the threshold. k=20 covers the dense
-    # urban case where each road has many MP rows; we exit at the first
-    # qualifying neighbor.
+    # One k-NN query serves both lookups: column 0 is the nearest MP, and
+    # the cross-street is the first neighbor (in distance order) with a
+    # different SRI inside the threshold. k=20 covers the dense urban case
+    # where each road has many MP rows. Missing neighbors (fewer than K
+    # MPs) come back as `inf` / index `n`, which the threshold masks out.
     K = 20
     dists, idxs = tree.query(centroids[["lon", "lat"]].values, k=K)
-    primary_sri_arr = sris[idx]
-    cross_idx = pd.Series([-1] * len(centroids), dtype="int64")
-    for i in range(len(centroids)):
-        for j in range(K):
-            d = dists[i, j]
-            if d > CROSS_DIST_THRESHOLD:
-                break
-            cand_idx = idxs[i, j]
-            if sris[cand_idx] != primary_sri_arr[i]:
-                cross_idx.iloc[i] = cand_idx
-                break
-    has_cross = cross_idx >= 0
-    cross_idx_safe = cross_idx.where(has_cross, 0).astype("int64")
-    cross = mp.iloc[cross_idx_safe.values].reset_index(drop=True)
+    nearest = mp.iloc[idxs[:, 0]].reset_index(drop=True)
+    idxs_safe = np.minimum(idxs, len(mp) - 1)
+    qualifies = (dists <= CROSS_DIST_THRESHOLD) & (sris[idxs_safe] != sris[idxs[:, [0]]])
+    first = qualifies.argmax(axis=1)
+    has_cross = pd.Series(qualifies[np.arange(len(centroids)), first])
+    cross_idx_safe = np.where(has_cross, idxs_safe[np.arange(len(centroids)), first], 0)
+    cross = mp.iloc[cross_idx_safe].reset_index(drop=True)
     n_with_cross = int(has_cross.sum())
     err(f"  {n_with_cross:,} cells with cross-street (within {CROSS_DIST_THRESHOLD}° ≈ 80m)")
     out = pd.DataFrame({
@@ -131,9 +124,12 @@ def _nearest_mp(centroids: pd.DataFrame, mp: pd.DataFrame) -> pd.DataFrame:
 
 def _muni_county(centroids: pd.DataFrame, muni_path: str) -> pd.DataFrame:
     """Point-in-polygon: assign each centroid to its containing
-    municipality. Empty strings for ocean/boundary misses. Uses shapely
-    `STRtree` for fast bbox prefiltering then exact contains check."""
-    from shapely.geometry import Point, shape
+    municipality. Empty strings for ocean/boundary misses. One bulk shapely
+    `STRtree.query(predicate="within")` does the bbox prefilter and exact
+    check for every point; a point inside overlapping polygons takes its
+    first match in tree order."""
+    import shapely
+    from shapely.geometry import shape
     from shapely.strtree import STRtree
 
     with open(muni_path) as f:
@@ -145,17 +141,14 @@ def _muni_county(centroids: pd.DataFrame, muni_path: str) -> pd.DataFrame:
         muns.append(props.get("MUN_LABEL") or props.get("MUN") or "")
         counties.append((props.get("COUNTY") or "").title())
     tree = STRtree(polys)
-    pts = [Point(lon, lat) for lon, lat in zip(centroids["lon"], centroids["lat"])]
-    mun_col, county_col = [], []
-    for pt in pts:
-        cand = tree.query(pt)
-        m, c = "", ""
-        for i in cand:
-            if polys[i].contains(pt):
-                m, c = muns[i], counties[i]
-                break
-        mun_col.append(m)
-        county_col.append(c)
+    pts = shapely.points(centroids["lon"].to_numpy(), centroids["lat"].to_numpy())
+    pt_idx, poly_idx = tree.query(pts, predicate="within")
+    # Results are grouped by point, each group in tree order: keep the first.
+    pt_idx, first = np.unique(pt_idx, return_index=True)
+    mun_col = np.full(len(centroids), "", dtype=object)
+    county_col = np.full(len(centroids), "", dtype=object)
+    mun_col[pt_idx] = np.asarray(muns, dtype=object)[poly_idx[first]]
+    county_col[pt_idx] = np.asarray(counties, dtype=object)[poly_idx[first]]
     return pd.DataFrame({
         "h3": centroids["h3"].values,
         "mun": mun_col,
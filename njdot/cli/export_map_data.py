@@ -9,12 +9,17 @@ Layout:
 See specs/map-data-backend.md.
 """
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import click
 import pandas as pd
 import numpy as np
 
+from njdot.compact import read_pqt
+from njdot.features import effective_latlon
+
 from .base import njdot
 
 
@@ -36,22 +41,9 @@ def _build_base(df: pd.DataFrame, keep_severities: set[str]) -> pd.DataFrame:
     else:
         df = df.copy()
 
-    # Prefer interpolated (ilat/ilon), fall back to original (olat/olon)
-    ilat = df["ilat"]
-    ilon = df["ilon"]
-    olat = df["olat"].where(_in_nj_bbox(df["olat"], df["olon"]))
-    olon = df["olon"].where(_in_nj_bbox(df["olat"], df["olon"]))
-
-    lat = ilat.fillna(olat)
-    lon = ilon.fillna(olon)
-
-    src = np.full(len(df), "none", dtype=object)
-    src[ilat.notna().values] = "interpolated"
-    needs_o = ilat.isna().values & olat.notna().values
-    src[needs_o] = "original"
-    df["lat"] = lat.astype("float32")
-    df["lon"] = lon.astype("float32")
-    df["geocode_src"] = src
+    # Precomputed by the feature store (`load_features`) when present.
+    if "lat" not in df.columns:
+        df["lat"], df["lon"], df["geocode_src"] = effective_latlon(df)
 
     keep = df[df["lat"].notna() & df["lon"].notna()].copy()
 
@@ -77,38 +69,90 @@ def _build_base(df: pd.DataFrame, keep_severities: set[str]) -> pd.DataFrame:
     return keep[MAP_COLS]
 
 
-def _in_nj_bbox(lat, lon) -> pd.Series:
-    """True for coords inside a generous NJ bounding box, excluding 0/NaN."""
-    lat_ok = lat.between(38.9, 41.4)
-    lon_ok = lon.between(-75.7, -73.9)
-    return lat_ok & lon_ok
+def _dt_year(dt) -> np.ndarray:
+    """UTC calendar year (int16) of epoch-minute `dt`s."""
+    years = np.asarray(dt, dtype="int64").astype("datetime64[m]").astype("datetime64[Y]")
+    return (years.astype("int64") + 1970).astype("int16")
+
+
+def _h3_str_col(lat: np.ndarray, lon: np.ndarray, res: int) -> np.ndarray:
+    """H3 cell strings (object array) for each (lat, lon); one `int_to_str` per distinct cell."""
+    from h3.api import numpy_int as h3i
+    from .cells import _h3_int_col
+
+    uniq, inv = np.unique(_h3_int_col(lat, lon, res), return_inverse=True)
+    return np.array([h3i.int_to_str(int(c)) for c in uniq], dtype=object)[inv]
+
+
+def _runs(*keys: np.ndarray) -> list[tuple[int, int]]:
+    """`[start, end)` ranges over which (already-sorted) `keys` are constant."""
+    n = len(keys[0])
+    if not n:
+        return []
+    change = np.zeros(n - 1, dtype=bool)
+    for key in keys:
+        key = np.asarray(key)
+        change |= key[1:] != key[:-1]
+    bounds = np.concatenate([[0], np.flatnonzero(change) + 1, [n]]).tolist()
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _write_shards(df: pd.DataFrame, shards: list[tuple[Path, object]], row_group_size: int, jobs: int | None = None):
+    """Write each `(path, rows)` shard (`rows`: positions or a slice into `df`)
+    from a thread pool; pyarrow's encode + compress release the GIL."""
+    def write(shard):
+        path, rows = shard
+        df.iloc[rows].to_parquet(path, row_group_size=row_group_size, index=False, compression="snappy")
 
+    with ThreadPoolExecutor(jobs or os.cpu_count()) as ex:
+        list(ex.map(write, shards))
 
-def _emit_shards(df: pd.DataFrame, outdir: Path) -> dict:
-    """Write by-year + by-year-county shards. Returns manifest fragment."""
+
+def _emit_shards(df: pd.DataFrame, outdir: Path, jobs: int | None = None) -> dict:
+    """Write by-year + by-year-county shards. Returns manifest fragment.
+
+    Rows are stably ordered by `year` (and by `(year, cc)`) once, and each
+    shard is a contiguous run of that order, so shards keep `df`'s row order.
+    """
     (outdir / "by-year").mkdir(parents=True, exist_ok=True)
     (outdir / "by-year-county").mkdir(parents=True, exist_ok=True)
+    year = _dt_year(df["dt"])
+    by_year = np.argsort(year, kind="stable")
     per_year = {}
+    year_shards = []
+    for start, end in _runs(year[by_year]):
+        y = int(year[by_year[start]])
+        year_shards.append((outdir / "by-year" / f"{y}.parquet", by_year[start:end]))
+        per_year[y] = end - start
+
+    # Rows without a county are in their year's shard, but no county shard.
+    has_cc = np.flatnonzero(df["cc"].notna().to_numpy())
+    cc = df["cc"].to_numpy("int16", na_value=-1)
+    by_year_cc = has_cc[np.lexsort((cc[has_cc], year[has_cc]))]
     per_year_county = {}
-    years = sorted(df["dt"].apply(lambda m: pd.Timestamp(m * 60, unit="s", tz="UTC").year).unique().tolist())
-    # faster: year via numpy
-    df = df.copy()
-    df["_year"] = (pd.to_datetime(df["dt"] * 60, unit="s", utc=True)).dt.year
-    for y in sorted(df["_year"].unique().tolist()):
-        sub = df[df["_year"] == y].drop(columns=["_year"])
-        path = outdir / "by-year" / f"{y}.parquet"
-        sub.to_parquet(path, row_group_size=20_000, index=False, compression="snappy")
-        per_year[int(y)] = len(sub)
-        for cc in sorted(sub["cc"].dropna().unique()):
-            sub_cc = sub[sub["cc"] == cc]
-            if len(sub_cc) == 0:
-                continue
-            p = outdir / "by-year-county" / f"{y}-{int(cc):02d}.parquet"
-            sub_cc.to_parquet(p, row_group_size=5_000, index=False, compression="snappy")
-            per_year_county[f"{y}-{int(cc):02d}"] = len(sub_cc)
+    county_shards = []
+    for start, end in _runs(year[by_year_cc], cc[by_year_cc]):
+        row = by_year_cc[start]
+        key = f"{year[row]}-{cc[row]:02d}"
+        county_shards.append((outdir / "by-year-county" / f"{key}.parquet", by_year_cc[start:end]))
+        per_year_county[key] = end - start
+
+    _write_shards(df, year_shards, row_group_size=20_000, jobs=jobs)
+    _write_shards(df, county_shards, row_group_size=5_000, jobs=jobs)
     return {"per_year": per_year, "per_year_county": per_year_county}
 
 
+def _top_road(df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """Most common `_road` per `keys` bin, as `keys` + `top_route` columns.
+
+    Ties go to the lexicographically-first road, as `Series.mode().iloc[0]`
+    would pick; one `size()` + sort instead of a `mode()` call per bin.
+    """
+    counts = df.groupby([*keys, "_road"]).size().rename("_n").reset_index()
+    top = counts.sort_values(["_n", "_road"], ascending=[False, True], kind="mergesort").drop_duplicates(keys)
+    return top.drop(columns="_n").rename(columns={"_road": "top_route"})
+
+
 def _emit_hex_aggregates(df: pd.DataFrame, outdir: Path, resolutions=(7, 8)) -> dict:
     """Bin crashes into H3 cells per (year, cc, mc). One parquet per (res, year).
 
@@ -119,11 +163,9 @@ def _emit_hex_aggregates(df: pd.DataFrame, outdir: Path, resolutions=(7, 8)) ->
                                                  arbitrarily). Empty when
                                                  no row has a route value.
     """
-    import h3
-
     manifest = {}
     df = df.copy()
-    df["_year"] = pd.to_datetime(df["dt"] * 60, unit="s", utc=True).dt.year.astype("int16")
+    df["_year"] = _dt_year(df["dt"])
     # Severity tiers for stacked viz: fatal / ped_inj / other_inj / pdo
     tier = np.where(df["severity"] == "f", "fatal",
             np.where((df["severity"] == "i") & ((df["pi"] > 0) | (df["pk"] > 0)), "ped_inj",
@@ -139,13 +181,7 @@ def _emit_hex_aggregates(df: pd.DataFrame, outdir: Path, resolutions=(7, 8)) ->
     for res in resolutions:
         sub_dir = outdir / f"hex-r{res}"
         sub_dir.mkdir(parents=True, exist_ok=True)
-        # Compute H3 index per row
-        lat_arr = df["lat"].to_numpy()
-        lon_arr = df["lon"].to_numpy()
-        h3_idx = np.empty(len(df), dtype=object)
-        for i, (la, lo) in enumerate(zip(lat_arr, lon_arr)):
-            h3_idx[i] = h3.latlng_to_cell(float(la), float(lo), res)
-        df[f"_h3_r{res}"] = h3_idx
+        df[f"_h3_r{res}"] = _h3_str_col(df["lat"].to_numpy(), df["lon"].to_numpy(), res)
 
         # Severity tier counts per bin
         grouped = (
@@ -172,10 +208,8 @@ def _emit_hex_aggregates(df: pd.DataFrame, outdir: Path, resolutions=(7, 8)) ->
         non_blank = df[df["_road"] != ""]
         if len(non_blank):
             top_road = (
-                non_blank.groupby([f"_h3_r{res}", "_year", "cc", "mc"])["_road"]
-                .agg(lambda s: s.mode().iloc[0] if len(s.mode()) else "")
-                .reset_index()
-                .rename(columns={f"_h3_r{res}": "h3", "_year": "year", "_road": "top_route"})
+                _top_road(non_blank, [f"_h3_r{res}", "_year", "cc", "mc"])
+                .rename(columns={f"_h3_r{res}": "h3", "_year": "year"})
             )
             grouped = grouped.merge(top_road, on=["h3", "year", "cc", "mc"], how="left")
             grouped["top_route"] = grouped["top_route"].fillna("").astype("string")
@@ -208,10 +242,11 @@ def _emit_hex_aggregates(df: pd.DataFrame, outdir: Path, resolutions=(7, 8)) ->
 @click.option("-H", "--hex-severities", default="i,f,p", help="Severities for the hex aggregates (default: i,f,p). PDO counts are cheap at the aggregate level.")
 @click.option("--years", default=None, help="Year range, e.g. 2019:2023 (inclusive, default: all)")
 @click.option("--hex-resolutions", default="7,8", help="H3 resolutions for pre-aggregates")
-def export_map_data(outdir, severities, hex_severities, years, hex_resolutions):
+@click.option("-j", "--jobs", type=int, default=None, help="Shard-writer threads (default: CPU count)")
+def export_map_data(outdir, severities, hex_severities, years, hex_resolutions, jobs):
     """Export crash data as sharded parquet for the interactive map frontend."""
     print(f"Loading crashes.parquet...")
-    df = pd.read_parquet("njdot/data/crashes.parquet")
+    df = read_pqt("njdot/data/crashes.parquet")
     print(f"  loaded {len(df):,} crashes")
 
     if years:
@@ -269,7 +304,7 @@ def export_map_data(outdir, severities, hex_severities, years, hex_resolutions):
     }
 
     print(f"\nWriting by-year + by-year-county shards to {out}/...")
-    shard_manifest = _emit_shards(point_base, out)
+    shard_manifest = _emit_shards(point_base, out, jobs=jobs)
     manifest.update(shard_manifest)
 
     res_list = [int(r) for r in hex_resolutions.split(",") if r]
@@ -22,10 +22,11 @@ import h3
 import numpy as np
 import pandas as pd
 
-from njdot.load import load_crashes_with_aashto
+from njdot.features import load_map_input
 
 from .base import njdot
-from .export_map_data import _build_base
+from .cells import _parent_int_col, _str_to_int_col
+from .export_map_data import _build_base, _dt_year, _h3_str_col, _runs, _top_road, _write_shards
 
 
 SHARD_RES = 5
@@ -46,37 +47,32 @@ HEX_COLS_OUT = [
 ]
 
 
-def _h3_column(lat: np.ndarray, lon: np.ndarray, res: int) -> np.ndarray:
-    """Compute H3 cell strings for each (lat, lon) at the given resolution."""
-    out = np.empty(len(lat), dtype=object)
-    for i, (la, lo) in enumerate(zip(lat, lon)):
-        out[i] = h3.latlng_to_cell(float(la), float(lo), res)
-    return out
-
-
 def _add_h3_cols(df: pd.DataFrame, resolutions) -> pd.DataFrame:
     lat = df["lat"].to_numpy()
     lon = df["lon"].to_numpy()
     for res in resolutions:
         t0 = time()
-        cells = _h3_column(lat, lon, res)
+        cells = _h3_str_col(lat, lon, res)
         df[f"h3_r{res}"] = pd.array(cells, dtype="string")
         print(f"  h3_r{res}: {time() - t0:.1f}s, {len(np.unique(cells)):,} unique cells")
     return df
 
 
-def _emit_points(df: pd.DataFrame, outdir: Path, point_sevs: set[str]) -> dict:
+def _emit_points(df: pd.DataFrame, outdir: Path, point_sevs: set[str], jobs: int | None = None) -> dict:
     pts_dir = outdir / "points"
     pts_dir.mkdir(parents=True, exist_ok=True)
-    pts = df[df["severity"].isin(point_sevs)].copy()
+    pts = df[df["severity"].isin(point_sevs)]
     print(f"\nEmitting points/ ({len(pts):,} rows, {pts['h3_r5'].nunique()} shards)...")
     pts = pts.sort_values(["h3_r5", "year", "h3_r9"], kind="mergesort")
+    shard = pts["h3_r5"].to_numpy()
+    pts = pts[POINT_COLS_OUT]
     counts: dict[str, int] = {}
-    for cell, sub in pts.groupby("h3_r5", sort=False):
-        out = sub[POINT_COLS_OUT]
-        path = pts_dir / f"{cell}.parquet"
-        out.to_parquet(path, row_group_size=5_000, index=False, compression="snappy")
-        counts[str(cell)] = len(out)
+    shards = []
+    for start, end in _runs(shard):
+        cell = str(shard[start])
+        shards.append((pts_dir / f"{cell}.parquet", slice(start, end)))
+        counts[cell] = end - start
+    _write_shards(pts, shards, row_group_size=5_000, jobs=jobs)
     print(f"  wrote {len(counts)} shards, total {sum(counts.values()):,} rows")
     return counts
 
@@ -116,12 +112,7 @@ def _hex_aggregate(df: pd.DataFrame, res: int) -> pd.DataFrame:
     nb = df.assign(_road=road_eff)
     nb = nb[nb["_road"] != ""]
     if len(nb):
-        top = (
-            nb.groupby([h3_col, "year", "cc", "mc"])["_road"]
-            .agg(lambda s: s.mode().iloc[0] if len(s.mode()) else "")
-            .reset_index()
-            .rename(columns={h3_col: "h3", "_road": "top_route"})
-        )
+        top = _top_road(nb, [h3_col, "year", "cc", "mc"]).rename(columns={h3_col: "h3"})
         grouped = grouped.merge(top, on=["h3", "year", "cc", "mc"], how="left")
         grouped["top_route"] = grouped["top_route"].fillna("").astype("string")
     else:
@@ -136,7 +127,7 @@ def _hex_aggregate(df: pd.DataFrame, res: int) -> pd.DataFrame:
     return grouped[HEX_COLS_OUT].sort_values(["year", "h3"], kind="mergesort").reset_index(drop=True)
 
 
-def _emit_hex(df: pd.DataFrame, outdir: Path) -> dict:
+def _emit_hex(df: pd.DataFrame, outdir: Path, jobs: int | None = None) -> dict:
     """Emit hex-r{N}.parquet single-file (for all N in HEX_RESOLUTIONS) +
     hex-r{N}/{shardCell}.parquet sharded (for N > SHARD_RES + 1).
 
@@ -164,14 +155,18 @@ def _emit_hex(df: pd.DataFrame, outdir: Path) -> dict:
         else:
             sub_dir = outdir / f"hex-r{res}"
             sub_dir.mkdir(parents=True, exist_ok=True)
-            parents = agg["h3"].apply(lambda c: h3.cell_to_parent(c, SHARD_RES)).astype("string")
-            agg_sharded = agg.assign(_parent=parents)
+            # r{SHARD_RES} parent of each distinct cell (bit math), broadcast back;
+            # a stable sort by parent makes each shard a contiguous run.
+            codes, cells = pd.factorize(agg["h3"])
+            parents = _parent_int_col(_str_to_int_col(np.asarray(cells, dtype=object)), SHARD_RES)[codes]
+            order = np.argsort(parents, kind="stable")
             shard_counts: dict[str, int] = {}
-            for cell, sub in agg_sharded.groupby("_parent", sort=False):
-                out = sub.drop(columns=["_parent"])
-                path = sub_dir / f"{cell}.parquet"
-                out.to_parquet(path, row_group_size=10_000, index=False, compression="snappy")
-                shard_counts[str(cell)] = len(out)
+            shards = []
+            for start, end in _runs(parents[order]):
+                cell = h3.int_to_str(int(parents[order[start]]))
+                shards.append((sub_dir / f"{cell}.parquet", order[start:end]))
+                shard_counts[cell] = end - start
+            _write_shards(agg, shards, row_group_size=10_000, jobs=jobs)
             counts[f"r{res}"] = shard_counts
             print(f"  hex-r{res}.parquet: {len(agg):,} rows, {single_size / 1024:.0f} KB single-file"
                   f" + {len(shard_counts)} shards ({time() - t0:.1f}s)")
@@ -194,7 +189,8 @@ def _shard_bboxes(cells) -> dict[str, list[float]]:
 @click.option("-s", "--severities", default="i,f,p", help="Severities for raw point shards (default: all). Client filters by severity at fetch-time; this just controls which rows are written to disk.")
 @click.option("-H", "--hex-severities", default="i,f,p", help="Severities for hex prebins")
 @click.option("--years", default=None, help="Year range, e.g. 2019:2023 (inclusive, default: all)")
-def export_map_v2(outdir, severities, hex_severities, years):
+@click.option("-j", "--jobs", type=int, default=None, help="Shard-writer threads (default: CPU count)")
+def export_map_v2(outdir, severities, hex_severities, years, jobs):
     """Export H3 r5-sharded crash data for the interactive map (v2 layout)."""
     # Column-filtered read avoids a pyarrow "Unknown error: Wrapping" exception
     # when the full per-table schema tries to round-trip through pandas.
@@ -204,7 +200,7 @@ def export_map_v2(outdir, severities, hex_severities, years):
         "olat", "olon", "ilat", "ilon",
         "road", "cross_street", "route", "sri", "mp",
     ]
-    df = load_crashes_with_aashto(columns=MAP_INPUT_COLS)
+    df = load_map_input(MAP_INPUT_COLS)
 
     if years:
         y0, y1 = [int(x) for x in years.split(":")]
@@ -219,9 +215,7 @@ def export_map_v2(outdir, severities, hex_severities, years):
     base = _build_base(df, hex_sevs)
     print(f"  with lat/lon: {len(base):,}")
 
-    base["year"] = (
-        pd.to_datetime(base["dt"] * 60, unit="s", utc=True).dt.year.astype("int16")
-    )
+    base["year"] = _dt_year(base["dt"])
 
     print("\nComputing H3 cells per resolution...")
     base = _add_h3_cols(base, (SHARD_RES,) + HEX_RESOLUTIONS)
@@ -229,10 +223,10 @@ def export_map_v2(outdir, severities, hex_severities, years):
     out = Path(outdir)
     out.mkdir(parents=True, exist_ok=True)
 
-    point_counts = _emit_points(base, out, point_sevs)
+    point_counts = _emit_points(base, out, point_sevs, jobs=jobs)
 
     print("\nComputing hex aggregates...")
-    hex_counts = _emit_hex(base, out)
+    hex_counts = _emit_hex(base, out, jobs=jobs)
 
     shard_cells = sorted(point_counts.keys())
     bboxes = _shard_bboxes(shard_cells)
@@ -18,6 +18,7 @@ for now.
 """
 import sys
 from functools import partial
+from os import remove, stat
 
 import click
 import pandas as pd
@@ -249,14 +250,142 @@ def sum_idx_col(df0, col, db_path, tbl_suffix='', page_size=None):
     return df1
 
 
+# Rollups of `cmymc` / `cmymv`: index levels kept. Table names follow
+# `sum_idx_col` (first letter of each level, plus the `v` suffix for vehicles).
+CMYMC_ROLLUPS = [
+    ['cc', 'mc', 'y', 'condition'],
+    ['cc', 'y', 'm', 'condition'],
+    ['y', 'm', 'condition'],
+    ['cc', 'y', 'condition'],
+    ['y', 'condition'],
+]
+CMYMV_ROLLUPS = [
+    ['cc', 'mc', 'y'],
+    ['cc', 'y', 'm'],
+    ['cc', 'y'],
+    ['y', 'm'],
+    ['y'],
+]
+
+
+def rollup_tbl(idx_cols: list[str], suffix: str = '') -> str:
+    return ''.join(c[0] for c in idx_cols) + suffix
+
+
+def rollups(df: pd.DataFrame, sets: list[list[str]], suffix: str = '') -> dict[str, pd.DataFrame]:
+    """Every rollup of `df` (a groupby-sum output indexed by its keys) in one
+    duckdb `GROUPING SETS` scan.
+
+    `df`'s keys are never null (it's a `groupby` output), so summing it
+    directly per set equals `sum_idx_col`'s cascade (which re-sums each
+    rollup from the previous one). Keys keep `df`'s index dtypes; sums are
+    int64, like pandas' groupby-sum of int/bool columns.
+    """
+    import duckdb
+    keys = list(df.index.names)
+    vals = list(df.columns)
+    base = df.reset_index()
+    for c in vals:
+        if base[c].dtype == bool:
+            base[c] = base[c].astype('int64')
+    gid = f"GROUPING({', '.join(keys)})"
+    sums = ', '.join(f'SUM({c})::BIGINT AS {c}' for c in vals)
+    grouping_sets = ', '.join(f"({', '.join(s)})" for s in sets)
+    con = duckdb.connect()
+    con.register('base', base)
+    out = con.execute(
+        f'SELECT {", ".join(keys)}, {gid} AS gid, {sums} FROM base GROUP BY GROUPING SETS ({grouping_sets})'
+    ).df()
+    con.close()
+    dtypes = df.index.to_frame().dtypes
+    tables = {}
+    for s in sets:
+        # GROUPING() sets bit (n-1-i) for each key i *not* in the set.
+        bits = sum(1 << (len(keys) - 1 - i) for i, k in enumerate(keys) if k not in s)
+        t = out[out['gid'] == bits]
+        t = t[s + vals].astype({**{k: dtypes[k] for k in s}, **{c: 'int64' for c in vals}})
+        tables[rollup_tbl(s, suffix)] = t.sort_values(s).set_index(s)
+    return tables
+
+
+def write_db(cmymc: pd.DataFrame, cmymv: pd.DataFrame, out: str):
+    """Write `cmymc`, `cmymv` and all their rollups to `out` in one
+    transaction."""
+    tables = {
+        'cmymc': cmymc,
+        **rollups(cmymc, CMYMC_ROLLUPS),
+        'cmymv': cmymv,
+        **rollups(cmymv, CMYMV_ROLLUPS, suffix='v'),
+    }
+    sql.write_tables(tables, out, page_size=2**16)
+
+
+def write_db_cascade(cmymc: pd.DataFrame, cmymv: pd.DataFrame, out: str):
+    """Pre-`write_db` writer: one `to_sql` + index build per table, each
+    rollup re-summed from the previous (`sum_idx_col`). Kept as the
+    `--bench` baseline."""
+    sql.write(
+        cmymc, 'cmymc', out,
+        idxs=[('cc', 'mc', 'y', 'm', 'condition')],
+        rm=True,
+        page_size=2**16,
+    )
+    sum_idx_col(cmymc, 'm', out)
+    cymc = sum_idx_col(cmymc, 'mc', out)
+    sum_idx_col(cymc, 'cc', out)
+    cyc = sum_idx_col(cymc, 'm', out)
+    sum_idx_col(cyc, 'cc', out)
+
+    sql.write(cmymv, 'cmymv', out, idxs=[tuple(CMYM_COLS)], replace=False)
+    sum_idx_col(cmymv, 'm', out, tbl_suffix='v')
+    cymv = sum_idx_col(cmymv, 'mc', out, tbl_suffix='v')
+    sum_idx_col(cymv, 'm', out, tbl_suffix='v')
+    ymv = sum_idx_col(cymv, 'cc', out, tbl_suffix='v')
+    sum_idx_col(ymv, 'm', out, tbl_suffix='v', page_size=2**16)
+
+
+def _forked(fn, *args) -> tuple[float, int]:
+    """Run `fn(*args)` in a forked child → (wall seconds, child peak RSS
+    above the parent's peak RSS, bytes)."""
+    import os
+    import resource
+    from time import time
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            fn(*args)
+        finally:
+            os._exit(0)
+    _, status, ru = os.wait4(pid, 0)
+    if status:
+        raise RuntimeError(f'{fn.__name__} exited with status {status}')
+    return time() - t0, max(ru.ru_maxrss - base, 0) * 1024
+
+
+def bench_write(cmymc: pd.DataFrame, cmymv: pd.DataFrame, out: str) -> pd.DataFrame:
+    """Wall time + peak RSS of `write_db` vs `write_db_cascade` (each in a
+    forked child, writing to a `{out}.bench-*` sibling)."""
+    from humanize import naturalsize
+    rows = []
+    for name, fn in (('cascade', write_db_cascade), ('grouping-sets', write_db)):
+        path = f'{out}.bench-{name}'
+        secs, rss = _forked(fn, cmymc, cmymv, path)
+        rows.append({'writer': name, 'secs': round(secs, 3), 'peak_rss': naturalsize(rss), 'db_bytes': stat(path).st_size})
+        remove(path)
+    return pd.DataFrame(rows)
+
+
 @click.command('cmymc')
 @click.option('-O', '--occupants-supplement', default=AASHTO_SUPPLEMENTED_OCCUPANTS, help='Occupants supplement input')
 @click.option('-P', '--pedestrians-supplement', default=AASHTO_SUPPLEMENTED_PEDESTRIANS, help='Pedestrians supplement input')
 @click.option('-C', '--crashes-supplement', default=AASHTO_SUPPLEMENTED_CRASHES, help='AASHTO supplemented crashes input')
 @click.option('-o', '--out', default=CMYMC_DB, help='Output SQLite path')
 @click.option('-S', '--skip-upload', is_flag=True, help='Skip S3 upload')
+@click.option('-B', '--bench', is_flag=True, help='Also time the previous per-table writer against this one (wall time, peak RSS)')
 def cmymc(occupants_supplement: str, pedestrians_supplement: str,
-          crashes_supplement: str, out: str, skip_upload: bool):
+          crashes_supplement: str, out: str, skip_upload: bool, bench: bool):
     """Build cmymc.db: {County, Muni, Year, Month} crash + victim aggregations."""
     # Legacy leg
     c_legacy = load_legacy_crashes(drop_years=AASHTO_YEARS)
@@ -323,20 +452,6 @@ def cmymc(occupants_supplement: str, pedestrians_supplement: str,
     new_deaths = cmymc.loc[cmymc.index.get_level_values('condition') == 1, ['drivers', 'passengers', 'pedestrians', 'cyclists']].sum().sum()
     err(f'  new condition=1 deaths total (all years): {new_deaths:,}')
 
-    err(f'\nWriting tables to {out}…')
-    sql.write(
-        cmymc, 'cmymc', str(out),
-        idxs=[('cc', 'mc', 'y', 'm', 'condition')],
-        rm=True,
-        page_size=2**16,
-    )
-
-    cmyc = sum_idx_col(cmymc, 'm', str(out))
-    cymc = sum_idx_col(cmymc, 'mc', str(out))
-    ymc = sum_idx_col(cymc, 'cc', str(out))
-    cyc = sum_idx_col(cymc, 'm', str(out))
-    yc = sum_idx_col(cyc, 'cc', str(out))
-
     # Vehicles leg — legacy only for now (AASHTO has no per-vehicle disposition adapter yet)
     err('Loading legacy vehicles…')
     v = vehicles.load()
@@ -344,12 +459,12 @@ def cmymc(occupants_supplement: str, pedestrians_supplement: str,
     vm['towed'] = vm.departure >= 3
     vm['disabled'] = (vm.departure == 3) | (vm.departure == 5) | (vm.damage == 4)
     cmymv = vm.groupby(CMYM_COLS)[['hit_run', 'towed', 'disabled']].sum()
-    sql.write(cmymv, 'cmymv', str(out), idxs=[tuple(CMYM_COLS)], replace=False)
-    cmyv = sum_idx_col(cmymv, 'm', str(out), tbl_suffix='v')
-    cymv = sum_idx_col(cmymv, 'mc', str(out), tbl_suffix='v')
-    cyv = sum_idx_col(cymv, 'm', str(out), tbl_suffix='v')
-    ymv = sum_idx_col(cymv, 'cc', str(out), tbl_suffix='v')
-    yv = sum_idx_col(ymv, 'm', str(out), tbl_suffix='v', page_size=2**16)
+
+    if bench:
+        err(f'\nBenchmarking writers…\n{bench_write(cmymc, cmymv, str(out)).to_string(index=False)}')
+
+    err(f'\nWriting tables to {out}…')
+    write_db(cmymc, cmymv, str(out))
 
     if not skip_upload:
         import boto3
@@ -0,0 +1,272 @@
+"""Persistent crash primary-key index, shared by the vehicle / occupant /
+pedestrian / driver builds.
+
+Each of those tables maps its rows' `(year, cc, mc, case)` to a crash twice:
+
+1. remap `(year, cc0, mc0, case)` → the crash's geocode-corrected `(cc, mc)`
+   (formerly a merge against `crash_pk_mappings.parquet`), then
+2. `(year, cc, mc_dot, case)` → `crash_id` (formerly `normalize`'s merge
+   against `crashes.load()`).
+
+Both lookups are served from sorted arrays of packed `uint64` keys, `np.save`d
+under `crash_pk_index/` and memory-mapped on load, so a build reads
+`crashes.parquet` once (to build the index) rather than once per table, and
+each table's mapping is a `searchsorted` instead of a hash join:
+
+    year (12 bits) | cc (8) | mc (16) | case code (28)
+
+`case code` is the case's position in the sorted array of distinct crash case
+numbers (`cases.npy`). A query key that doesn't fit these widths, has a
+null, or has a case no crash has, doesn't match.
+
+`meta.json` records the SHA-256 of the `crashes.parquet` the index was built
+from (plus its size / mtime, to skip rehashing an unchanged file); a changed
+hash rebuilds the index.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from os.path import abspath, basename, dirname, exists
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from utz import err
+
+from njdot.compact import read_pqt
+from njdot.paths import CRASH_PK_INDEX_DIR, CRASHES_PQT
+
+VERSION = 1
+YEAR_BITS, CC_BITS, MC_BITS, CASE_BITS = 12, 8, 16, 28
+CASE_SHIFT = 0
+MC_SHIFT = CASE_BITS
+CC_SHIFT = MC_SHIFT + MC_BITS
+YEAR_SHIFT = CC_SHIFT + CC_BITS
+ARRAYS = ['cases', 'keys', 'crash_id', 'remap_keys', 'remap_cc', 'remap_mc']
+
+
+def content_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _ints(col, bits: int) -> tuple[np.ndarray, np.ndarray]:
+    """`col` as uint64, and a mask of values that are non-null integers in `[0, 2**bits)`."""
+    v = pd.to_numeric(pd.Series(col), errors='coerce').to_numpy('float64', na_value=np.nan)
+    ok = (v >= 0) & (v < 2 ** bits) & (v == np.floor(v))
+    return np.where(ok, v, 0).astype(np.uint64), ok
+
+
+def _case_codes(cases: np.ndarray, case) -> tuple[np.ndarray, np.ndarray]:
+    """Positions of `case` values in the sorted `cases` vocabulary, and a found-mask.
+
+    Only distinct query values are searched (and cast to the vocabulary's
+    fixed-width dtype, after ruling out ones too long to be in it).
+    """
+    codes, uniq = pd.factorize(pd.Series(case, dtype=object), use_na_sentinel=True)
+    uniq = np.asarray(uniq, dtype=object)
+    width = cases.dtype.itemsize // 4
+    fits = np.array([ isinstance(c, str) and len(c) <= width for c in uniq ], dtype=bool)
+    pos = np.zeros(len(uniq), dtype=np.int64)
+    found = np.zeros(len(uniq), dtype=bool)
+    if fits.any() and len(cases):
+        q = uniq[fits].astype(cases.dtype)
+        p = np.searchsorted(cases, q)
+        hit = p < len(cases)
+        hit[hit] = cases[p[hit]] == q[hit]
+        pos[fits] = p
+        found[fits] = hit
+    valid = codes >= 0
+    idx = np.where(valid, codes, 0)
+    return pos[idx].astype(np.uint64), valid & found[idx]
+
+
+def pack(cases: np.ndarray, year, cc, mc, case) -> tuple[np.ndarray, np.ndarray]:
+    """Packed `uint64` keys for the given columns, and a mask of packable rows."""
+    y, y_ok = _ints(year, YEAR_BITS)
+    c, c_ok = _ints(cc, CC_BITS)
+    m, m_ok = _ints(mc, MC_BITS)
+    k, k_ok = _case_codes(cases, case)
+    keys = (y << np.uint64(YEAR_SHIFT)) | (c << np.uint64(CC_SHIFT)) | (m << np.uint64(MC_SHIFT)) | k
+    return keys, y_ok & c_ok & m_ok & k_ok
+
+
+def _sorted_unique(keys: np.ndarray, what: str) -> tuple[np.ndarray, np.ndarray]:
+    """Stable sort order of `keys`, keeping the first row of any duplicate key."""
+    order = np.argsort(keys, kind='stable')
+    sk = keys[order]
+    first = np.ones(len(sk), dtype=bool)
+    first[1:] = sk[1:] != sk[:-1]
+    n_dupes = len(sk) - first.sum()
+    if n_dupes:
+        err(f"WARNING: crash PK index: {n_dupes:,} duplicate {what} keys; keeping the first of each")
+    return sk[first], order[first]
+
+
+def _search(sorted_keys: np.ndarray, keys: np.ndarray, ok: np.ndarray) -> np.ndarray:
+    """Position of each `keys` in `sorted_keys`, -1 if absent (or not `ok`)."""
+    pos = np.searchsorted(sorted_keys, keys)
+    hit = ok & (pos < len(sorted_keys))
+    hit[hit] = sorted_keys[pos[hit]] == keys[hit]
+    return np.where(hit, pos, -1)
+
+
+@dataclass
+class CrashPKIndex:
+    cases: np.ndarray       # sorted distinct crash `case`s (fixed-width unicode)
+    keys: np.ndarray        # sorted packed (year, cc, mc_dot, case)
+    crash_id: np.ndarray    # int32, aligned with `keys`
+    remap_keys: np.ndarray  # sorted packed (year, cc0, mc0, case), crashes whose PK was changed
+    remap_cc: np.ndarray    # float64 (NaN: null), aligned with `remap_keys`
+    remap_mc: np.ndarray    # float64 (NaN: null), aligned with `remap_keys`
+    mc_dtype: str = 'float64'  # crashes' `mc` dtype, which remapped `mc`s take on
+
+    @classmethod
+    def from_crashes(cls, crashes: pd.DataFrame) -> 'CrashPKIndex':
+        """Build from a `crashes.parquet` frame: index `id`, columns `year`, `cc`,
+        `mc_dot`, `case`, and (for the remap) `cc0`, `mc0`, `mc`."""
+        case = crashes['case']
+        cases = np.unique(np.asarray(case[case.notna()], dtype=str))
+        keys, ok = pack(cases, crashes['year'], crashes['cc'], crashes['mc_dot'], case)
+        keys, order = _sorted_unique(keys[ok], 'crash')
+        crash_id = crashes.index.to_numpy()[ok][order].astype(np.int32)
+
+        has0 = (crashes['cc0'].notna() & crashes['mc0'].notna()).to_numpy()
+        remapped = crashes[has0]
+        remap_keys, ok = pack(cases, remapped['year'], remapped['cc0'], remapped['mc0'], remapped['case'])
+        remap_keys, order = _sorted_unique(remap_keys[ok], 'remap')
+        remap_cc, remap_mc = (
+            remapped[col].to_numpy('float64', na_value=np.nan)[ok][order]
+            for col in ('cc', 'mc')
+        )
+        return cls(cases, keys, crash_id, remap_keys, remap_cc, remap_mc, str(crashes['mc'].dtype))
+
+    def save(self, dir: str, meta: dict):
+        """Write the arrays + `meta.json` to `dir` (replacing it atomically)."""
+        parent = dirname(abspath(dir))
+        os.makedirs(parent, exist_ok=True)
+        # A unique staging dir, so concurrent rebuilds don't clobber each other's files
+        tmp = tempfile.mkdtemp(prefix=f'.{basename(dir)}.', dir=parent)
+        try:
+            for name in ARRAYS:
+                np.save(f'{tmp}/{name}.npy', getattr(self, name))
+            _write_json(f'{tmp}/meta.json', { **meta, 'mc_dtype': self.mc_dtype })
+            os.chmod(tmp, 0o755)
+            shutil.rmtree(dir, ignore_errors=True)
+            try:
+                os.replace(tmp, dir)
+            except OSError:
+                # Another process installed its (equivalent) index in between
+                if not exists(f'{dir}/meta.json'):
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @classmethod
+    def open(cls, dir: str) -> 'CrashPKIndex':
+        with open(f'{dir}/meta.json') as f:
+            mc_dtype = json.load(f)['mc_dtype']
+        return cls(
+            **{ name: np.load(f'{dir}/{name}.npy', mmap_mode='r') for name in ARRAYS },
+            mc_dtype=mc_dtype,
+        )
+
+    def lookup(self, df: pd.DataFrame, mc: str = 'mc') -> np.ndarray:
+        """Positions in `keys` of `df`'s `(year, cc, <mc>, case)`, -1 where unmatched."""
+        keys, ok = pack(self.cases, df['year'], df['cc'], df[mc], df['case'])
+        return _search(self.keys, keys, ok)
+
+    def crash_ids(self, df: pd.DataFrame) -> pd.Series:
+        """`crash_id` (Int32, `<NA>` where unmatched) for each row of `df`."""
+        pos = self.lookup(df)
+        ids = np.asarray(self.crash_id)[np.maximum(pos, 0)]
+        return pd.Series(pd.arrays.IntegerArray(ids, pos < 0), index=df.index, name='crash_id')
+
+    def remap(self, df: pd.DataFrame) -> tuple[pd.Series, pd.Series, int]:
+        """`df`'s `(cc, mc)`, replaced by the crash's (geocode-corrected) `(cc, mc)`
+        where `df`'s `(year, cc, mc, case)` is some crash's `(year, cc0, mc0, case)`.
+
+        Returns `cc` (int8), `mc` (crashes' `mc` dtype, as a merge against them
+        would give: combined codes like 9901 don't fit the raw int8), and the
+        number of rows remapped.
+        """
+        keys, ok = pack(self.cases, df['year'], df['cc'], df['mc'], df['case'])
+        pos = _search(self.remap_keys, keys, ok)
+        hit = pos >= 0
+        cc = np.full(len(df), np.nan)
+        mc = np.full(len(df), np.nan)
+        cc[hit] = np.asarray(self.remap_cc)[pos[hit]]
+        mc[hit] = np.asarray(self.remap_mc)[pos[hit]]
+        n_updated = int((~np.isnan(cc)).sum())
+        cc = pd.Series(cc, index=df.index).fillna(df['cc']).astype('int8')
+        mc = pd.Series(mc, index=df.index).astype(self.mc_dtype).fillna(df['mc'].astype('float64'))
+        return cc, mc, n_updated
+
+
+def _write_json(path: str, obj: dict):
+    """Write `obj` to `path` via a temp file + `os.replace`, so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(prefix=f'.{basename(path)}.', dir=dirname(abspath(path)))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(obj, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _meta(crashes_pqt: str, sha256: str) -> dict:
+    st = os.stat(crashes_pqt)
+    return dict(version=VERSION, source=crashes_pqt, sha256=sha256, size=st.st_size, mtime_ns=st.st_mtime_ns)
+
+
+def _current(dir: str, crashes_pqt: str) -> bool:
+    """Whether `dir` holds an index of `crashes_pqt`'s current content.
+
+    An unchanged size + mtime is trusted; otherwise the file is rehashed, and
+    a matching hash just refreshes the recorded size / mtime.
+    """
+    meta_path = f'{dir}/meta.json'
+    if not exists(meta_path):
+        return False
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get('version') != VERSION:
+        return False
+    st = os.stat(crashes_pqt)
+    if (meta.get('size'), meta.get('mtime_ns')) == (st.st_size, st.st_mtime_ns):
+        return True
+    if meta.get('sha256') != content_hash(crashes_pqt):
+        return False
+    _write_json(meta_path, { **meta, **_meta(crashes_pqt, meta['sha256']) })
+    return True
+
+
+def build(crashes_pqt: str = CRASHES_PQT, dir: str = CRASH_PK_INDEX_DIR) -> CrashPKIndex:
+    """(Re)build the index of `crashes_pqt` under `dir`."""
+    sha256 = content_hash(crashes_pqt)
+    err(f"Building crash PK index {dir} from {crashes_pqt}")
+    crashes = read_pqt(crashes_pqt, columns=['year', 'cc', 'mc', 'mc_dot', 'case', 'cc0', 'mc0'])
+    index = CrashPKIndex.from_crashes(crashes)
+    index.save(dir, _meta(crashes_pqt, sha256))
+    err(f"  {len(index.keys):,} crash keys, {len(index.remap_keys):,} remapped PKs, {len(index.cases):,} distinct cases")
+    return CrashPKIndex.open(dir)
+
+
+def load_crash_pk_index(crashes_pqt: str = CRASHES_PQT, dir: str = CRASH_PK_INDEX_DIR) -> Optional[CrashPKIndex]:
+    """Memory-map the index of `crashes_pqt`, (re)building it if missing or stale.
+
+    `None` if `crashes_pqt` doesn't exist (callers fall back to merging against
+    freshly-computed crashes).
+    """
+    if not exists(crashes_pqt):
+        return None
+    if _current(dir, crashes_pqt):
+        return CrashPKIndex.open(dir)
+    return build(crashes_pqt, dir)
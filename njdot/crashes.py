@@ -11,28 +11,17 @@ from utz import cached_property, DF, sxs, err
 from nj_crashes.geo import is_nj_ll
 from nj_crashes.muni_codes import update_mc, load_munis_geojson
 from nj_crashes.sri.mp05 import get_mp05_map
+from nj_crashes.utils.stage import staged
 from njdot.load import load_tbl, INDEX_NAME, pk_renames
 from njdot.merge_dupes import merge_duplicates
+from njdot.paths import CRASHES_PQT
+from njdot.vtc import VICTIM_TYPES, VTC_COLS, person_vtc
 
 Year = Union[str, int]
 Years = Union[Year, list[Year]]
 
-# Victim type × condition matrix columns
-VICTIM_TYPES = ['d', 'o', 'p', 'b', 'u']  # driver, passenger, pedestrian, bicyclist, unknown
-CONDITIONS = ['f', 's', 'm', 'p', 'n']     # fatal, serious, minor, possible, none
-VTC_COLS = [f'{vt}{c}' for vt in VICTIM_TYPES for c in CONDITIONS]
-
-# Map physical condition codes to single-char conditions
-CONDITION_MAP = {
-    1: 'f',   # Fatal Injury
-    2: 's',   # Suspected Serious Injury
-    3: 'm',   # Suspected Minor Injury
-    4: 'p',   # Possible Injury
-    5: 'n',   # No Apparent Injury
-    0: 'n',   # Unknown → treat as no apparent
-}
-
 
+@staged()
 def compute_victim_counts(crashes_df: pd.DataFrame, years: list[int]) -> pd.DataFrame:
     """Compute victim type × condition counts by joining with pedestrians/occupants.
 
@@ -47,10 +36,6 @@ def compute_victim_counts(crashes_df: pd.DataFrame, years: list[int]) -> pd.Data
     from njdot import pedestrians as peds_mod
     from njdot import occupants as occs_mod
 
-    # Initialize all VTC columns to 0
-    for col in VTC_COLS:
-        crashes_df[col] = 0
-
     crash_pk = ['year', 'cc', 'mc', 'case']
 
     # Load raw pedestrians (only map_year_df, not map_df which normalizes with crashes)
@@ -77,75 +62,14 @@ def compute_victim_counts(crashes_df: pd.DataFrame, years: list[int]) -> pd.Data
     )
     err(f"  Loaded {len(occs):,} occupant records")
 
-    # Map condition codes to single-char conditions
-    peds['cond'] = peds['condition'].map(CONDITION_MAP).fillna('n')
-    occs['cond'] = occs['condition'].map(CONDITION_MAP).fillna('n')
-
-    # Pedestrians: split into pedestrians (p) and bicyclists (b)
-    peds['vt'] = peds['cyclist'].apply(lambda x: 'b' if x else 'p')
-
-    # Occupants: driver (pos=1), passenger (pos=2-12), unknown (pos=0 or null)
-    def pos_to_vt(pos):
-        if pd.isna(pos) or pos == 0:
-            return 'u'
-        elif pos == 1:
-            return 'd'
-        else:
-            return 'o'
-    occs['vt'] = occs['pos'].apply(pos_to_vt)
-
-    # Create VTC column name for each record
-    peds['vtc'] = peds['vt'] + peds['cond']
-    occs['vtc'] = occs['vt'] + occs['cond']
-
-    # Aggregate pedestrians by crash PK and VTC
-    err("Aggregating pedestrian victim counts...")
-    peds_agg = peds.groupby(crash_pk + ['vtc']).size().unstack(fill_value=0)
-    # Ensure all VTC columns exist
-    for col in VTC_COLS:
-        if col not in peds_agg.columns:
-            peds_agg[col] = 0
-    peds_agg = peds_agg[VTC_COLS].reset_index()
-
-    # Aggregate occupants by crash PK and VTC
-    err("Aggregating occupant victim counts...")
-    occs_agg = occs.groupby(crash_pk + ['vtc']).size().unstack(fill_value=0)
-    for col in VTC_COLS:
-        if col not in occs_agg.columns:
-            occs_agg[col] = 0
-    occs_agg = occs_agg[VTC_COLS].reset_index()
+    err("Aggregating victim counts...")
+    vtc = person_vtc(occs, peds, crash_pk).reset_index()
 
     # Merge victim counts into crashes
     err("Merging victim counts with crashes...")
-    crashes_df = crashes_df.reset_index()
-
-    # Merge pedestrian counts
-    crashes_df = crashes_df.merge(
-        peds_agg,
-        on=crash_pk,
-        how='left',
-        suffixes=('', '_peds')
-    )
-    # Add pedestrian counts to totals
-    for col in VTC_COLS:
-        peds_col = f'{col}_peds'
-        if peds_col in crashes_df.columns:
-            crashes_df[col] = crashes_df[col] + crashes_df[peds_col].fillna(0).astype('int8')
-            crashes_df = crashes_df.drop(columns=[peds_col])
-
-    # Merge occupant counts
-    crashes_df = crashes_df.merge(
-        occs_agg,
-        on=crash_pk,
-        how='left',
-        suffixes=('', '_occs')
-    )
-    # Add occupant counts to totals
-    for col in VTC_COLS:
-        occs_col = f'{col}_occs'
-        if occs_col in crashes_df.columns:
-            crashes_df[col] = crashes_df[col] + crashes_df[occs_col].fillna(0).astype('int8')
-            crashes_df = crashes_df.drop(columns=[occs_col])
+    crashes_df = crashes_df.drop(columns=VTC_COLS, errors='ignore').reset_index()
+    crashes_df = crashes_df.merge(vtc, on=crash_pk, how='left')
+    crashes_df[VTC_COLS] = crashes_df[VTC_COLS].fillna(0).astype('int64')
 
     crashes_df = crashes_df.set_index('id')
 
@@ -412,6 +336,11 @@ def load(
         mapping.to_parquet(mapping_path, index=False)
         err(f"Wrote {mapping_path}")
 
+    # Index the freshly-written crashes' PKs once, for the V/D/O/P builds to share
+    if write_pqt and (pqt_path is None or pqt_path == CRASHES_PQT):
+        from njdot.crash_pk_index import build
+        build(CRASHES_PQT)
+
     # Compute victim type × condition matrix from pedestrians/occupants
     if compute_victims or write_pqt:
         loaded_years = sorted(df['year'].unique().tolist())
@@ -0,0 +1,260 @@
+"""Per-crash feature store: the joins/derivations every downstream builder
+used to redo, materialized once per data release.
+
+`crash_features.parquet` holds one row per crash of `load_crashes_with_aashto()`
+(same AASHTO-supersedes policy + NJSP geocode backfill), sorted by
+`(year, cc, mc, case)` and written in modest row groups so `year`/`cc`
+filters prune on read:
+
+- keys: `year`, `cc`, `mc`, `case`; `crash_id` (legacy `crashes.parquet`
+  row index — the O/P/V masters' join key; null for AASHTO rows)
+- map columns: `dt`, `severity`, `tk`, `ti`, `pk`, `pi`, `tv`, `road`,
+  `cross_street`, `route`, `sri`, `mp`
+- `VTC_COLS` (25): legacy from the O/P masters, AASHTO from its own columns
+- `VD_COLS` + `VEP_COLS` (9): raw per-vehicle facet counts (no `tv` backfill;
+  that's a presentation choice left to `agg`)
+- `lat`, `lon`, `geocode_src`: effective location (`effective_latlon`)
+- `h3_r{H3_RES}`: int64 H3 cell of `(lat, lon)`, null when ungeocoded
+
+The parquet's key-value metadata records `FEATURES_VERSION` and a size/mtime
+fingerprint of every input; `features_current()` compares both, so consumers
+fall back to recomputing rather than reading a stale store. It also records
+the AASHTO source (`aashto_source()`) whose years superseded legacy rows, so a
+consumer with a different AASHTO input knows which legacy crashes are missing.
+
+Build with `njdot features`.
+"""
+import json
+from os import stat
+from os.path import abspath, exists
+from pathlib import Path
+from time import time
+from typing import Optional
+
+import click
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from nj_crashes.utils.log import err
+from nj_crashes.utils.stage import staged
+from njdot.load import load_crashes_with_aashto
+from njdot.paths import (
+    AASHTO_SUPPLEMENTED_CRASHES, AASHTO_SUPPLEMENTED_VEHICLES, CRASH_FEATURES_PQT,
+    CRASHES_GEOCODE_BACKFILL, CRASHES_PQT, OCCUPANTS_PQT, PEDESTRIANS_PQT, VEHICLES_PQT,
+)
+
+# Bump when columns or their derivation change; older stores read as stale.
+FEATURES_VERSION = 2
+METADATA_KEY = b'njdot:features'
+
+KEYS = ['year', 'cc', 'mc', 'case']
+H3_RES = 14
+H3_COL = f'h3_r{H3_RES}'
+ROW_GROUP_SIZE = 128 * 1024
+
+# Columns of `load_crashes_with_aashto` carried through (plus raw geocodes,
+# which are reduced to `lat`/`lon`/`geocode_src`).
+BASE_COLS = [
+    *KEYS, 'dt', 'severity', 'tk', 'ti', 'pk', 'pi', 'tv',
+    'road', 'cross_street', 'route', 'sri', 'mp',
+]
+GEOCODE_COLS = ['olat', 'olon', 'ilat', 'ilon']
+
+
+def sources() -> list[str]:
+    """Inputs whose change invalidates the store."""
+    return [
+        CRASHES_PQT, OCCUPANTS_PQT, PEDESTRIANS_PQT, VEHICLES_PQT,
+        AASHTO_SUPPLEMENTED_CRASHES, AASHTO_SUPPLEMENTED_VEHICLES,
+        CRASHES_GEOCODE_BACKFILL,
+    ]
+
+
+def aashto_source(path: Optional[str] = None) -> Optional[str]:
+    """Absolute path of the AASHTO crashes parquet (default: `AASHTO_SUPPLEMENTED_CRASHES`)
+    that supersedes legacy years, or `None` if it's absent."""
+    path = str(path or AASHTO_SUPPLEMENTED_CRASHES)
+    return abspath(path) if exists(path) else None
+
+
+def fingerprint(paths: list[str]) -> dict[str, Optional[list[int]]]:
+    """`(size, mtime_ns)` per path; `None` for absent (optional) inputs."""
+    fp = {}
+    for path in paths:
+        if exists(path):
+            st = stat(path)
+            fp[path] = [st.st_size, st.st_mtime_ns]
+        else:
+            fp[path] = None
+    return fp
+
+
+def in_nj_bbox(lat, lon) -> pd.Series:
+    """True for coords inside a generous NJ bounding box, excluding 0/NaN."""
+    lat_ok = lat.between(38.9, 41.4)
+    lon_ok = lon.between(-75.7, -73.9)
+    return lat_ok & lon_ok
+
+
+def effective_latlon(df: pd.DataFrame) -> tuple[pd.Series, pd.Series, np.ndarray]:
+    """Effective `(lat, lon)` (float32) + provenance from raw geocodes.
+
+    Prefer interpolated (`ilat`/`ilon`), fall back to original (`olat`/`olon`)
+    when it lies inside NJ. Provenance is "interpolated", "original" or "none".
+    """
+    ilat = df["ilat"]
+    ilon = df["ilon"]
+    in_nj = in_nj_bbox(df["olat"], df["olon"])
+    olat = df["olat"].where(in_nj)
+    olon = df["olon"].where(in_nj)
+
+    lat = ilat.fillna(olat)
+    lon = ilon.fillna(olon)
+
+    src = np.full(len(df), "none", dtype=object)
+    src[ilat.notna().values] = "interpolated"
+    needs_o = ilat.isna().values & olat.notna().values
+    src[needs_o] = "original"
+    return lat.astype("float32"), lon.astype("float32"), src
+
+
+def _h3_cells(lat: pd.Series, lon: pd.Series) -> pd.Series:
+    from njdot.cli.cells import _h3_int_col
+    geo = lat.notna() & lon.notna()
+    out = pd.Series(pd.NA, index=lat.index, dtype='Int64')
+    out[geo] = _h3_int_col(lat[geo].to_numpy(), lon[geo].to_numpy(), H3_RES)
+    return out
+
+
+@staged()
+def build_features() -> pd.DataFrame:
+    """Assemble the per-crash feature frame (see module docstring)."""
+    from njdot.agg import (
+        VD_COLS, VEP_COLS, VTC_COLS,
+        compute_aashto_vehicle_facets, compute_legacy_vehicle_facets, compute_legacy_vtc,
+    )
+    facet_cols = VD_COLS + VEP_COLS
+
+    df = load_crashes_with_aashto(columns=BASE_COLS + GEOCODE_COLS, crash_id=True)
+    df['year'] = df['year'].astype('int16')
+    df['cc'] = df['cc'].astype('Int8')
+    df['mc'] = df['mc'].astype('Int16')
+    df['case'] = df['case'].astype('string')
+    legacy = df['crash_id'].notna()
+    legacy_ids = df.loc[legacy, 'crash_id'].astype('int64')
+
+    err('Joining legacy VTC + vehicle facets by crash_id...')
+    vtc = compute_legacy_vtc(Path(OCCUPANTS_PQT), Path(PEDESTRIANS_PQT))
+    veh = compute_legacy_vehicle_facets(Path(VEHICLES_PQT))
+    for cols, src in ((VTC_COLS, vtc), (facet_cols, veh)):
+        vals = np.zeros((len(df), len(cols)), dtype='int16')
+        vals[legacy.to_numpy()] = src.reindex(legacy_ids.to_numpy(), fill_value=0)[cols].to_numpy()
+        df[cols] = pd.DataFrame(vals, index=df.index, columns=cols)
+
+    if (~legacy).any():
+        err('Joining AASHTO VTC + vehicle facets by (year, cc, mc, case)...')
+        a_cols = [c for c in VTC_COLS if c in pq.read_schema(AASHTO_SUPPLEMENTED_CRASHES).names]
+        parts = [pd.read_parquet(AASHTO_SUPPLEMENTED_CRASHES, columns=KEYS + a_cols)]
+        if exists(AASHTO_SUPPLEMENTED_VEHICLES):
+            parts.append(compute_aashto_vehicle_facets(Path(AASHTO_SUPPLEMENTED_VEHICLES)))
+        aashto = df.loc[~legacy, KEYS]
+        for part in parts:
+            part = part.astype({'year': 'int16', 'cc': 'Int8', 'mc': 'Int16', 'case': 'string'})
+            cols = [c for c in part.columns if c not in KEYS]
+            part = part.drop_duplicates(KEYS)
+            m = aashto.merge(part, on=KEYS, how='left')
+            df.loc[~legacy, cols] = m[cols].fillna(0).astype('int16').to_numpy()
+
+    err('Computing effective lat/lon + H3...')
+    t0 = time()
+    df['lat'], df['lon'], df['geocode_src'] = effective_latlon(df)
+    df['geocode_src'] = df['geocode_src'].astype('string')
+    df[H3_COL] = _h3_cells(df['lat'], df['lon'])
+    err(f'  {time() - t0:.1f}s')
+
+    df = df.drop(columns=GEOCODE_COLS)
+    df = df.sort_values(KEYS, kind='mergesort', na_position='last').reset_index(drop=True)
+    return df
+
+
+@staged()
+def write_features(df: pd.DataFrame, path: Optional[str] = None):
+    path = path or CRASH_FEATURES_PQT
+    tbl = pa.Table.from_pandas(df, preserve_index=False)
+    meta = {'version': FEATURES_VERSION, 'sources': fingerprint(sources()), 'aashto_source': aashto_source()}
+    tbl = tbl.replace_schema_metadata({**(tbl.schema.metadata or {}), METADATA_KEY: json.dumps(meta)})
+    pq.write_table(tbl, path, row_group_size=ROW_GROUP_SIZE)
+
+
+def read_metadata(path: Optional[str] = None) -> Optional[dict]:
+    path = path or CRASH_FEATURES_PQT
+    md = pq.read_schema(path).metadata or {}
+    meta = md.get(METADATA_KEY)
+    return json.loads(meta) if meta else None
+
+
+def features_current(path: Optional[str] = None) -> bool:
+    """True iff `path` exists, matches `FEATURES_VERSION`, and every input is
+    unchanged since it was built."""
+    path = path or CRASH_FEATURES_PQT
+    if not exists(path):
+        return False
+    meta = read_metadata(path)
+    if not meta or meta.get('version') != FEATURES_VERSION:
+        return False
+    return meta.get('sources') == fingerprint(sources())
+
+
+def load_features(
+        columns: Optional[list[str]] = None,
+        years: Optional[list[int]] = None,
+        legacy: Optional[bool] = None,
+        path: Optional[str] = None,
+) -> pd.DataFrame:
+    """Read `columns` of the store, pushing a `years` filter down to the
+    parquet reader. `legacy=True`/`False` keeps only per-table / AASHTO rows."""
+    path = path or CRASH_FEATURES_PQT
+    filters = [('year', 'in', list(years))] if years is not None else None
+    read_cols = columns
+    if legacy is not None and columns is not None and 'crash_id' not in columns:
+        read_cols = [*columns, 'crash_id']
+    df = pd.read_parquet(path, columns=read_cols, filters=filters)
+    if legacy is not None:
+        df = df[df['crash_id'].notna() == legacy]
+        if read_cols is not columns:
+            df = df.drop(columns='crash_id')
+    return df
+
+
+def load_map_input(columns: list[str], extra: Optional[list[str]] = None) -> pd.DataFrame:
+    """`load_crashes_with_aashto(columns)`, served from the store when it's
+    current: raw geocode columns are swapped for the store's `lat`/`lon`/
+    `geocode_src` (which `_build_base` passes through) and `extra` store
+    columns (e.g. `H3_COL`) are appended. Falls back to the raw load (without
+    `extra`) when the store is missing or stale."""
+    if features_current():
+        cols = [c for c in columns if c not in GEOCODE_COLS]
+        if any(c in GEOCODE_COLS for c in columns):
+            cols += ['lat', 'lon', 'geocode_src']
+        cols += [c for c in extra or [] if c not in cols]
+        err(f'Loading {len(cols)} columns from {CRASH_FEATURES_PQT}...')
+        return load_features(columns=cols)
+    if exists(CRASH_FEATURES_PQT):
+        err(f'{CRASH_FEATURES_PQT} is stale (rebuild with `njdot features`); recomputing')
+    return load_crashes_with_aashto(columns=columns)
+
+
+@click.command('features')
+@click.option('-f', '--force', is_flag=True, help='Rebuild even if the store is current')
+@click.option('-o', '--out-path', default=None, help=f'Output parquet (default: {CRASH_FEATURES_PQT})')
+def features(force: bool, out_path: Optional[str]):
+    """Materialize the per-crash feature store read by `agg`, `cells raw` and `export-map-v2`."""
+    out_path = out_path or CRASH_FEATURES_PQT
+    if not force and features_current(out_path):
+        err(f'{out_path} is current (v{FEATURES_VERSION}); use -f/--force to rebuild')
+        return
+    df = build_features()
+    write_features(df, out_path)
+    err(f'Wrote {len(df):,} crashes × {len(df.columns)} columns to {out_path}')
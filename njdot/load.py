@@ -1,20 +1,28 @@
 #!/usr/bin/env python
+import json
 from os import stat, cpu_count
-from os.path import exists
+from os.path import dirname, exists, join
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 from humanize import naturalsize
 from inspect import getfullargspec
 from numpy import nan
 from pandas import read_parquet
-from typing import Union, Optional, Callable, Protocol
+from typing import TYPE_CHECKING, Union, Optional, Callable, Protocol
 from utz import err, sxs
 
+from nj_crashes.utils.stage import staged
 from njdot import NJDOT_DIR
+from njdot import compact
 from njdot.data import YEARS, cn2cc
 from njdot.paths import AASHTO_SUPPLEMENTED_CRASHES, CRASHES_GEOCODE_BACKFILL, CRASHES_PQT, DOT_DATA
 from njdot.tbls import Tbl, TBL_TO_TYPE, Type
 
+if TYPE_CHECKING:
+    from njdot.crash_pk_index import CrashPKIndex
+
 Year = int
 Years = Union[Year, list[Year]]
 
@@ -31,6 +39,16 @@ pk_astype = {
     'year': 'int16',
 }
 
+# Master parquets are written sorted by `SORT_COLS` (V/O/P/D masters, whose PK
+# columns `normalize` drops, by `crash_id`) in row groups of `ROW_GROUP_SIZE`
+# rows with min/max statistics, so `years` / `cc` filters skip the row groups
+# they can't match (~20 per year of crashes). Crash ids are assigned in raw PK
+# order, before crashes' `map_df` remaps geocoded / Port Authority `cc`/`mc`:
+# a (year, cc)'s ids are mostly, not entirely, one contiguous run, so V/O/P/D
+# county filters can split into several `crash_id` ranges (still exact).
+SORT_COLS = ['year', 'cc', 'mc']
+ROW_GROUP_SIZE = 16 * 1024
+
 
 def print_hists(df: pd.DataFrame, cols: Optional[list[str]] = None):
     for k in df:
@@ -53,19 +71,81 @@ class MapYearDF2(Protocol):
         ...
 
 
+def remap_crash_pks(df: pd.DataFrame, tpe: str, index: Optional['CrashPKIndex'] = None) -> pd.DataFrame:
+    """Fix `df`'s denormalized `(cc, mc)` (in place; also returned).
+
+    Crashes undergo geocoding (Port Authority, empty municipality fixes) that
+    updates cc/mc, but vehicles / occupants / pedestrians / drivers retain the
+    original cc/mc from the raw data. Rows whose `(year, cc, mc, case)` is a
+    crash's `(year, cc0, mc0, case)` get that crash's `(cc, mc)`; `mc` becomes
+    float64 (combined codes like 9901.0 for Port Authority don't fit int8).
+
+    Served by the crash PK `index` when given, else by merging against
+    `crash_pk_mappings.parquet` (if present).
+    """
+    if index is not None:
+        err(f"Fixing {tpe} cc/mc using crash PK index")
+        df['cc'], df['mc'], num_updated = index.remap(df)
+        err(f"  Updated {num_updated:,} {tpe} PKs from crash PK index")
+        return df
+
+    mapping_path = f'{DOT_DATA}/crash_pk_mappings.parquet'
+    if exists(mapping_path):
+        err(f"Fixing {tpe} cc/mc using PK mapping table")
+        mapping = pd.read_parquet(mapping_path)
+
+        # Merge on (year, cc, mc, case) to get updated cc/mc
+        # Note: `df` has original cc/mc, which match mapping's cc0/mc0
+        df_with_mapping = df.merge(
+            mapping[['year', 'cc0', 'mc0', 'case', 'cc', 'mc']],
+            left_on=['year', 'cc', 'mc', 'case'],
+            right_on=['year', 'cc0', 'mc0', 'case'],
+            how='left',
+            suffixes=('_old', '')
+        )
+
+        # Update cc/mc where mapping exists
+        # For rows without mapping, cc/mc will be NaN, so fill with original values
+        df['cc'] = df_with_mapping['cc'].fillna(df['cc']).astype('int8')
+        df['mc'] = df_with_mapping['mc'].fillna(df['mc'].astype('float64'))
+
+        num_updated = df_with_mapping['cc'].notna().sum()
+        err(f"  Updated {num_updated:,} {tpe} PKs from mapping table")
+    else:
+        err(f"Warning: PK mapping table not found at {mapping_path}, skipping cc/mc fix")
+    return df
+
+
 def normalize(
         df: pd.DataFrame,
         id: str,
         r_fn: Collable,
         drop: bool = True,
-        cols: Optional[list[str]] = None
+        cols: Optional[list[str]] = None,
+        index: Optional['CrashPKIndex'] = None,
 ) -> pd.DataFrame:
+    """Prepend an `id` column to `df`: the index of `r_fn`'s row matching `df`'s
+    `cols` (default: the crash PK), `<NA>` where none does.
+
+    With a crash PK `index` (and `id == 'crash_id'`), crash ids are looked up in
+    it rather than by merging against `r_fn(...)`.
+    """
     if cols:
         left_on = right_on = cols
     else:
         left_on = pk_base
         right_on = [ 'mc_dot' if c == 'mc' else c for c in pk_base ] if id == 'crash_id' else pk_base
 
+    if index is not None and id == 'crash_id' and not cols:
+        ids = index.crash_ids(df)
+        if drop:
+            drop_cols = [ c for c in set(left_on + right_on) if c in df ]
+            err(f"Dropping cols: {drop_cols}")
+            df = df.drop(columns=drop_cols)
+        dfm = sxs(ids, df)
+        dfm.index.name = INDEX_NAME
+        return dfm
+
     dfb = df[left_on]
     r = r_fn(cols=right_on)
     r_for_merge = r.reset_index().rename(columns={ 'id': id })
@@ -100,6 +180,7 @@ def normalize(
     return dfm
 
 
+@staged()
 def load_year_df(
         year: int,
         typ: Type,
@@ -238,10 +319,115 @@ def load_year_df(
     return df
 
 
+def county_codes(county: Optional[str] = None, cc: Union[None, int, list[int]] = None) -> Optional[list[int]]:
+    """County codes selected by a `county` name and/or `cc` code(s); `None` for all."""
+    ccs = None
+    if cc is not None:
+        ccs = [cc] if isinstance(cc, int) else list(cc)
+    if county:
+        county_cc = cn2cc[county.title()]
+        ccs = [county_cc] if ccs is None else [ c for c in ccs if c == county_cc ]
+    return ccs
+
+
+def sort_master(df: pd.DataFrame) -> pd.DataFrame:
+    """Stable-sort `df` by `SORT_COLS` (or `crash_id`, for tables without them), keeping its index."""
+    by = [ c for c in SORT_COLS if c in df ] or [ c for c in ['crash_id'] if c in df ]
+    if not by:
+        return df
+    return df.sort_values(by, kind='stable', na_position='last')
+
+
+@staged()
+def write_master(df: pd.DataFrame, pqt_path: str, row_group_size: int = ROW_GROUP_SIZE):
+    """Write a master table sorted, in `row_group_size`-row groups with statistics
+    (and `compact` dtypes), for `read_master`'s row-group pruning."""
+    compact.write_pqt(sort_master(df), pqt_path, row_group_size=row_group_size, write_statistics=True)
+    size = stat(pqt_path).st_size
+    err(f"Wrote {pqt_path} ({len(df)} rows, {naturalsize(size)})")
+
+
+def _id_ranges(ids: np.ndarray) -> list[tuple[int, int]]:
+    """Sorted `ids` as inclusive `(lo, hi)` runs of consecutive values."""
+    if not len(ids):
+        return []
+    breaks = np.flatnonzero(np.diff(ids) != 1)
+    los = ids[np.concatenate([[0], breaks + 1])]
+    his = ids[np.concatenate([breaks, [len(ids) - 1]])]
+    return list(zip(los.tolist(), his.tolist()))
+
+
+def pushdown_filters(
+        pqt_path: str,
+        years: Optional[list[Year]] = None,
+        ccs: Optional[list[int]] = None,
+        crashes_pqt: Optional[str] = None,
+) -> Optional[list]:
+    """pyarrow filters selecting `years` / `ccs` rows of a master parquet.
+
+    Tables with `year` / `cc` columns filter on them directly. V/O/P/D masters
+    (keyed by `crash_id`) filter on the runs of matching crash ids, read (with
+    the same pushdown) from `crashes_pqt` (default: `crashes.parquet` beside
+    `pqt_path`). `None` if there's nothing to filter, or no way to push it down.
+    """
+    if years is None and ccs is None:
+        return None
+    names = pq.read_schema(pqt_path).names
+    if 'year' in names and (ccs is None or 'cc' in names):
+        filters = []
+        if years is not None:
+            filters.append(('year', 'in', list(years)))
+        if ccs is not None:
+            filters.append(('cc', 'in', list(ccs)))
+        return filters
+    if 'crash_id' not in names:
+        return None
+    crashes_pqt = crashes_pqt or join(dirname(pqt_path), 'crashes.parquet')
+    if not exists(crashes_pqt):
+        return None
+    ids = read_master(crashes_pqt, years=years, ccs=ccs, cols=['year']).index.to_numpy()
+    ranges = _id_ranges(np.sort(ids))
+    if not ranges:
+        return [('crash_id', 'in', [])]
+    return [ [('crash_id', '>=', lo), ('crash_id', '<=', hi)] for lo, hi in ranges ]
+
+
+def _has_stored_index(pqt_path: str) -> bool:
+    """Whether `pqt_path`'s pandas index is a stored column (rather than
+    `RangeIndex` metadata, which row-filtered reads would renumber)."""
+    md = (pq.read_schema(pqt_path).metadata or {}).get(b'pandas')
+    if not md:
+        return True
+    return all(isinstance(c, str) for c in json.loads(md).get('index_columns', []))
+
+
+@staged()
+def read_master(
+        pqt_path: str,
+        years: Optional[list[Year]] = None,
+        ccs: Optional[list[int]] = None,
+        cols: Optional[list[str]] = None,
+        crashes_pqt: Optional[str] = None,
+) -> pd.DataFrame:
+    """Read `cols` of a master parquet's `years` / `ccs` rows, decoding only the
+    row groups whose statistics can match (see `pushdown_filters`)."""
+    filters = pushdown_filters(pqt_path, years, ccs, crashes_pqt) if _has_stored_index(pqt_path) else None
+    err(f"Reading {pqt_path}" + (f" ({len(filters)} pushdown filters)" if filters else ""))
+    df = compact.read_pqt(pqt_path, columns=cols, filters=filters)
+    if filters is None:
+        # Older files (or no pushdown possible): filter after loading, as before.
+        if years is not None:
+            df = df[df.year.isin(years)]
+        if ccs is not None:
+            df = df[df.cc.isin(ccs)]
+    return df
+
+
 def load_tbl(
         tbl: Tbl,
         years: Years = None,
         county: str = None,
+        cc: Union[None, int, list[int]] = None,
         n_jobs: int = 0,
         read_pqt: Optional[bool] = None,
         write_pqt: bool = False,
@@ -262,16 +448,11 @@ def load_tbl(
 
     typ = TBL_TO_TYPE[tbl]
 
+    ccs = county_codes(county, cc)
+
     pqt_path = pqt_path or f'{DOT_DATA}/{tbl}.parquet'
     if read_pqt or (read_pqt is None and exists(pqt_path) and not write_pqt):
-        err(f"Reading {pqt_path}")
-        df = read_parquet(pqt_path, columns=cols)
-        if years != YEARS:
-            df = df[df.year.isin(years)]
-        if county:
-            cc = cn2cc[county.title()]
-            df = df[df.cc == cc]
-        return df
+        return read_master(pqt_path, years=None if years == YEARS else years, ccs=ccs, cols=cols)
     else:
         err("Computing")
 
@@ -312,6 +493,8 @@ def load_tbl(
         ]
 
     df = pd.concat(dfs)
+    if ccs is not None:
+        df = df[df.cc.isin(ccs)]
 
     pk_cols = pk_cols or []
     pk_cols = pk_base + pk_cols
@@ -332,9 +515,7 @@ def load_tbl(
     df = df.drop(columns=['_orig_lineno'], errors='ignore')
 
     if write_pqt:
-        df.to_parquet(pqt_path)
-        size = stat(pqt_path).st_size
-        err(f"Wrote {pqt_path} ({len(df)} rows, {naturalsize(size)})")
+        write_master(df, pqt_path)
 
     return df
 
@@ -349,7 +530,7 @@ CRASH_IDXS = [
 ]
 
 
-def load_crashes_with_aashto(columns: Optional[list[str]] = None) -> pd.DataFrame:
+def load_crashes_with_aashto(columns: Optional[list[str]] = None, crash_id: bool = False) -> pd.DataFrame:
     """NJDOT 2001-2022 + AASHTO 2023+ (when present), columns normalized to NJDOT.
 
     AASHTO supersedes per-table for any year it covers — the per-table 2023
@@ -360,9 +541,14 @@ def load_crashes_with_aashto(columns: Optional[list[str]] = None) -> pd.DataFram
     If `crashes_geocode_backfill.parquet` exists, NJSP-recovered
     `(sri, mp, ilat, ilon)` rows are merged in (filling NaNs only) so
     fatals without an original geocode still get placed on the map.
+
+    `crash_id=True` adds a nullable `crash_id` column: the per-table row index
+    (the O/P/V masters' join key), `<NA>` for AASHTO rows.
     """
     err(f'Loading {CRASHES_PQT}...')
-    df = read_parquet(CRASHES_PQT, columns=columns)
+    df = compact.read_pqt(CRASHES_PQT, columns=columns)
+    if crash_id:
+        df['crash_id'] = pd.Series(df.index, index=df.index, dtype='Int64')
     err(f'  per-table: {len(df):,} crashes ({df["year"].min()}–{df["year"].max()})')
     if exists(AASHTO_SUPPLEMENTED_CRASHES):
         aashto = read_parquet(AASHTO_SUPPLEMENTED_CRASHES, columns=columns)
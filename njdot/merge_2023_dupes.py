@@ -14,7 +14,7 @@ from geopy.distance import distance as geodist
 from typing import Optional
 
 # Import canonical merge logic
-from njdot.merge_dupes import classify_case, merge_ucase_tcase
+from njdot.merge_dupes import DEFAULT_TEXT_FIELDS, classify_cases, merge_ucase_tcase
 
 def normalize_pd_name(name: str) -> str:
     """Normalize Police Department names for comparison."""
@@ -230,8 +230,7 @@ def main():
     err(f"Found {len(dupes)} duplicate records")
 
     # Classify case for each record
-    text_fields = ['Police Department', 'Crash Location', 'Cross Street Name']
-    dupes['case_class'] = dupes.apply(lambda r: classify_case(r, text_fields), axis=1)
+    dupes['case_class'] = classify_cases(dupes, DEFAULT_TEXT_FIELDS)
 
     # Group by PK
     grouped = dupes.groupby(pk_cols)
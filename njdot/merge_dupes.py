@@ -6,12 +6,21 @@ the ucase/tcase pattern discovered in 2023 NJDOT data where:
 - UPPERCASE records = original/ungeocoded versions
 - Title/mixed case = updated/geocoded versions
 """
+import numpy as np
 import pandas as pd
 import re
 from geopy.distance import distance as geodist
 from typing import Optional
 from utz import err
 
+DEFAULT_TEXT_FIELDS = ['Police Department', 'Crash Location', 'Cross Street Name']
+DEFAULT_FILLABLE_FIELDS = [
+    'SRI (Standard Route Identifier)',
+    'Mile Post',
+    'Cross Street Name',
+    'Direction From Cross Street',
+]
+
 
 def classify_case(row: pd.Series, text_fields: list[str]) -> str:
     """
@@ -56,6 +65,45 @@ def classify_case(row: pd.Series, text_fields: list[str]) -> str:
         return 'neither'
 
 
+def classify_cases(df: pd.DataFrame, text_fields: list[str]) -> pd.Series:
+    """
+    Vectorized `classify_case`: one 'ucase' / 'tcase' / 'neither' per row of `df`.
+
+    Per text field, non-empty values count as upper (`str.isupper`), mixed (any
+    other value with an uppercase char, i.e. that `str.lower` changes), or
+    neither; the majority rule is then
+    applied to the per-row counts.
+    """
+    upper = np.zeros(len(df), dtype='int64')
+    mixed = np.zeros(len(df), dtype='int64')
+    total = np.zeros(len(df), dtype='int64')
+    for field in text_fields:
+        col = df[field]
+        present = (col.notna() & col.ne('')).fillna(False).to_numpy(dtype=bool)
+        s = col[present].astype(str)
+        is_upper = s.str.isupper().to_numpy(dtype=bool)
+        has_upper = (s != s.str.lower()).to_numpy(dtype=bool)
+        total += present
+        upper[present] += is_upper
+        mixed[present] += ~is_upper & has_upper
+
+    # `count / total > .5`, in integers
+    cases = np.where(
+        2 * upper > total, 'ucase',
+        np.where(2 * mixed > total, 'tcase', 'neither'),
+    )
+    return pd.Series(cases, index=df.index, dtype=object)
+
+
+def is_empty(col: pd.Series) -> pd.Series:
+    """Vectorized "missing" check used by `merge_ucase_tcase`: NA, or a blank string."""
+    empty = col.isna()
+    if col.dtype == object or pd.api.types.is_string_dtype(col):
+        present = col[~empty]
+        empty[~empty] = present.astype(str).str.strip().eq('').to_numpy(dtype=bool)
+    return empty
+
+
 def merge_ucase_tcase(
     ucase: pd.Series,
     tcase: pd.Series,
@@ -82,12 +130,7 @@ def merge_ucase_tcase(
 
     # Default fillable fields (using original column names)
     if fillable_fields is None:
-        fillable_fields = [
-            'SRI (Standard Route Identifier)',
-            'Mile Post',
-            'Cross Street Name',
-            'Direction From Cross Street',
-        ]
+        fillable_fields = DEFAULT_FILLABLE_FIELDS
 
     # Fill missing TCASE fields from UCASE (when TCASE doesn't have it)
     for field in fillable_fields:
@@ -119,6 +162,12 @@ def merge_duplicates(
     Uses ucase/tcase merge strategy when applicable (69.5% success rate on 2023 data).
     For duplicates that don't fit the ucase/tcase pattern, keeps the last record.
 
+    Columnar equivalent of applying `classify_case` / `merge_ucase_tcase` per
+    group: rows are classified in one pass, ucase/tcase pairs are found by
+    comparing each row's class to its group-mate's (`groupby().shift`), and
+    `fillable_fields` are broadcast from the ucase row to the tcase row with
+    `groupby().transform('first')`.
+
     Args:
         df: DataFrame with potential duplicates
         pk_cols: Primary key columns that define duplicates
@@ -131,7 +180,9 @@ def merge_duplicates(
         DataFrame with duplicates merged
     """
     if text_fields is None:
-        text_fields = ['Police Department', 'Crash Location', 'Cross Street Name']
+        text_fields = DEFAULT_TEXT_FIELDS
+    if fillable_fields is None:
+        fillable_fields = DEFAULT_FILLABLE_FIELDS
 
     # Find duplicates
     dupe_mask = df.duplicated(pk_cols, keep=False)
@@ -139,57 +190,46 @@ def merge_duplicates(
         return df  # No duplicates
 
     num_dupes = dupe_mask.sum()
-    dupes = df[dupe_mask].copy()
-    non_dupes = df[~dupe_mask].copy()
-
-    # Classify case for each duplicate record
-    dupes['_case_class'] = dupes.apply(lambda r: classify_case(r, text_fields), axis=1)
-
-    # Group by PK
-    grouped = dupes.groupby(pk_cols, sort=False)
-    num_groups = len(grouped)
-
-    merged_records = []
-    ucase_tcase_merges = 0
-
-    for pk, group in grouped:
-        if len(group) == 2:
-            # Check if this is a ucase/tcase pair
-            r1, r2 = group.iloc[0], group.iloc[1]
-            cases = sorted([r1['_case_class'], r2['_case_class']])
-            is_ucase_tcase = (cases == ['tcase', 'ucase'])
-
-            if is_ucase_tcase:
-                # Identify which is which
-                if r1['_case_class'] == 'ucase':
-                    ucase, tcase = r1, r2
-                else:
-                    ucase, tcase = r2, r1
-
-                # Use ucase/tcase merge strategy
-                merged = merge_ucase_tcase(ucase, tcase, fillable_fields=fillable_fields)
-                ucase_tcase_merges += 1
-            else:
-                # Keep last record (like original behavior)
-                merged = group.iloc[-1]
-        else:
-            # 3+ duplicates - keep last record
-            merged = group.iloc[-1]
-
-        # Drop temporary classification column
-        merged_records.append(merged.drop('_case_class'))
-
-    merged_df = pd.DataFrame(merged_records)
-
-    # Preserve original dtypes (important for Int8/Int16/timestamp precision)
-    # This prevents type upcasting that increases storage size
-    for col in merged_df.columns:
-        if col in df.columns and col != '_case_class':
-            try:
-                merged_df[col] = merged_df[col].astype(df[col].dtype)
-            except (ValueError, TypeError):
-                # If conversion fails, keep the merged dtype
-                pass
+    dupes = df[dupe_mask]
+    non_dupes = df[~dupe_mask]
+
+    # Group ids in first-appearance order; rows with NA keys fall out of the
+    # groupby (and the output), as they did when iterating it.
+    gid = dupes.groupby(pk_cols, sort=False).ngroup()
+    grouped = gid.notna() & (gid >= 0)
+    dupes = dupes[grouped.to_numpy()]
+    gid = gid[grouped].astype('int64').to_numpy()
+    num_groups = int(gid.max()) + 1 if len(gid) else 0
+
+    pos = pd.Series(gid).groupby(gid).cumcount().to_numpy()
+    size = np.bincount(gid, minlength=num_groups)[gid]
+
+    # Pair each row of a 2-row group with its group-mate's class
+    cases = pd.Series(classify_cases(dupes, text_fields).to_numpy())
+    by_group = cases.groupby(gid)
+    mate = by_group.shift(-1).fillna(by_group.shift(1)).to_numpy()
+    cases = cases.to_numpy()
+    pair = size == 2
+    is_ucase = pair & (cases == 'ucase') & (mate == 'tcase')
+    is_tcase = pair & (cases == 'tcase') & (mate == 'ucase')
+    ucase_tcase_merges = int(is_tcase.sum())
+
+    # Keep the tcase row of ucase/tcase pairs, else the last row of each group
+    keep = is_tcase | (~(is_ucase | is_tcase) & (pos == size - 1))
+    order = np.argsort(gid[keep], kind='stable')
+    merged_df = dupes[keep].iloc[order].copy()
+
+    # Fill missing TCASE fields from UCASE
+    tcase_rows = is_tcase[keep][order]
+    for field in fillable_fields:
+        if field not in dupes.columns:
+            continue
+        col = dupes[field]
+        donor = col.where(is_ucase & ~is_empty(col).to_numpy())
+        fill = donor.groupby(gid).transform('first').to_numpy()[keep][order]
+        fill_mask = tcase_rows & is_empty(merged_df[field]).to_numpy() & pd.notna(fill)
+        if fill_mask.any():
+            merged_df.iloc[np.flatnonzero(fill_mask), merged_df.columns.get_loc(field)] = fill[fill_mask]
 
     # Combine non-duplicates with merged duplicates
     result = pd.concat([non_dupes, merged_df], ignore_index=False).sort_index()
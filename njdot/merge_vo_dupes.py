@@ -14,6 +14,7 @@ import pandas as pd
 from typing import Optional
 
 from nj_crashes.utils.log import err
+from njdot.merge_dupes import DEFAULT_TEXT_FIELDS, classify_cases
 
 
 def load_crash_version_map(crash_dupes_path: str = 'njdot/data/2023/crash_dupes/merged.pqt') -> dict:
@@ -25,48 +26,15 @@ def load_crash_version_map(crash_dupes_path: str = 'njdot/data/2023/crash_dupes/
     crash_dupes = pd.read_parquet(crash_dupes_path)
 
     # Classify crashes
-    text_fields = ['Police Department', 'Crash Location', 'Cross Street Name']
-
-    def classify_case(row):
-        upper_count = 0
-        mixed_count = 0
-        total_fields = 0
-
-        for field in text_fields:
-            val = row[field]
-            if pd.isna(val) or val == '':
-                continue
-            s = str(val)
-            total_fields += 1
-            if s.isupper():
-                upper_count += 1
-            elif any(c.isupper() for c in s):
-                mixed_count += 1
-
-        if total_fields == 0:
-            return 'neither'
-        if upper_count / total_fields > 0.5:
-            return 'ucase'
-        elif mixed_count / total_fields > 0.5:
-            return 'tcase'
-        else:
-            return 'neither'
-
-    crash_dupes['case_class'] = crash_dupes.apply(classify_case, axis=1)
+    crash_dupes['case_class'] = classify_cases(crash_dupes, DEFAULT_TEXT_FIELDS)
 
-    # Build map: crash PK -> sorted list of (lineno, case_class)
+    # Build map: crash PK -> list of (lineno, case_class), sorted by line number
     crash_key_cols = ['County Code', 'Municipality Code', 'Department Case Number']
-    crash_map = {}
-
-    for _, row in crash_dupes.iterrows():
-        pk = tuple(row[crash_key_cols])
-        if pk not in crash_map:
-            crash_map[pk] = []
-        crash_map[pk].append((row['lineno'], row['case_class']))
-
-    # Sort by line number
-    for pk in crash_map:
-        crash_map[pk] = sorted(crash_map[pk], key=lambda x: x[0])
+    crash_dupes = crash_dupes.sort_values('lineno', kind='stable')
+    crash_map = {
+        pk: list(zip(group['lineno'], group['case_class']))
+        for pk, group in crash_dupes.groupby(crash_key_cols, sort=False, dropna=False)
+    }
 
     return crash_map
 
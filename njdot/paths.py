@@ -35,6 +35,14 @@ AASHTO_SUPPLEMENTED_VEHICLES = f'{DOT_DATA}/aashto_supplemented_vehicles.parquet
 # `(year, cc, mc, case)`; merged in by `load_crashes_with_aashto`.
 CRASHES_GEOCODE_BACKFILL = f'{DOT_DATA}/crashes_geocode_backfill.parquet'
 
+# Per-crash feature store (`njdot features`): VTC, vehicle facets, effective
+# lat/lon + H3, keyed by `(year, cc, mc, case)`. See `njdot/features.py`.
+CRASH_FEATURES_PQT = f'{DOT_DATA}/crash_features.parquet'
+
+# Memory-mapped `(year, cc, mc, case)` → crash index, rebuilt when
+# `crashes.parquet`'s content hash changes. See `njdot/crash_pk_index.py`.
+CRASH_PK_INDEX_DIR = f'{DOT_DATA}/crash_pk_index'
+
 
 def aashto_year_path(year: int, name: str) -> str:
     return f'{DOT_DATA}/{year}/{name}'
@@ -1,12 +1,11 @@
-from .base import rawdata
-from .utils import singleton, years_opt, regions_opt, overwrite_opt, dry_run_opt
+import lazy_loader as lazy
 
-# Import all subcommands to register them with the CLI
-from . import zip
-from . import txt
-from . import pqt
-from . import fsck
-from . import fields
-from . import check
+from .base import rawdata
 
-__all__ = ['rawdata', 'singleton', 'years_opt', 'regions_opt', 'overwrite_opt', 'dry_run_opt']
+# Subcommand modules register themselves on `rawdata` when it resolves them
+__getattr__, __dir__, __all__ = lazy.attach(
+    __name__,
+    submod_attrs={
+        'utils': ['singleton', 'years_opt', 'regions_opt', 'overwrite_opt', 'dry_run_opt'],
+    },
+)
@@ -1,7 +1,18 @@
 import click
 
+from nj_crashes.utils.cli import LazyGroup
+from nj_crashes.utils.stage import profile_opt
 
-@click.group('rawdata')
+
+@click.group('rawdata', cls=LazyGroup, lazy_commands={
+    'check-nj-agg': ('njdot.rawdata.check', 'For one or more years, verify the `NewJersey` file is a concatenation of the county-specific files'),
+    'fsck': ('njdot.rawdata.fsck', 'Verify and analyze data file structure'),
+    'parse-fields-pdf': ('njdot.rawdata.fields', 'Parse fields+lengths from one or more schema PDFs, using Tabula'),
+    'pqt': ('njdot.rawdata.pqt', 'Convert 1 or more unzipped {year, county} `.txt` files to `.pqt`s, with some dtypes and cleanup'),
+    'txt': ('njdot.rawdata.txt', 'Convert 1 or more {year, county} .zip files (convert each .zip to a single .txt)'),
+    'zip': ('njdot.rawdata.zip', 'Download 1 or more {year, county} .zip file(s)'),
+})
+@profile_opt
 def rawdata():
     """Download and process NJDOT crash data."""
     pass
@@ -0,0 +1,96 @@
+"""Victim type × condition ("VTC") matrix: 5 victim types × 5 conditions = 25
+per-crash count columns (`df`, `ds`, …, `un`).
+
+Shared by the legacy master build (`crashes.compute_victim_counts`), `agg`
+(legacy O/P masters) and the AASHTO supplement (`aashto supplement`). Person
+rows map to an integer code `vt * 5 + cond` (the column's position in
+`VTC_COLS`) via array lookups, and `vtc_matrix` counts codes per crash with a
+single `np.bincount` over `crash_idx * 25 + code`.
+"""
+import numpy as np
+import pandas as pd
+
+VICTIM_TYPES = ['d', 'o', 'p', 'b', 'u']  # driver, passenger, pedestrian, bicyclist, unknown
+CONDITIONS = ['f', 's', 'm', 'p', 'n']     # fatal, serious, minor, possible, none
+VTC_COLS = [f'{vt}{c}' for vt in VICTIM_TYPES for c in CONDITIONS]
+N_VTC = len(VTC_COLS)
+
+# Map physical condition codes to single-char conditions
+CONDITION_MAP = {
+    1: 'f',   # Fatal Injury
+    2: 's',   # Suspected Serious Injury
+    3: 'm',   # Suspected Minor Injury
+    4: 'p',   # Possible Injury
+    5: 'n',   # No Apparent Injury
+    0: 'n',   # Unknown → treat as no apparent
+}
+
+VT_D, VT_O, VT_P, VT_B, VT_U = range(len(VICTIM_TYPES))
+COND_N = CONDITIONS.index('n')
+
+
+def _floats(s) -> np.ndarray:
+    return pd.Series(s).to_numpy(dtype='float64', na_value=np.nan)
+
+
+def condition_idx(condition) -> np.ndarray:
+    """Index into `CONDITIONS`: codes 1-4 → f/s/m/p; 5, 0, null and anything
+    else → 'n' (legacy pre-2019 rows are ~76% null; they still count as
+    participants)."""
+    c = _floats(condition)
+    return np.where(np.isin(c, (1, 2, 3, 4)), c - 1, COND_N).astype('int8')
+
+
+def occupant_codes(pos, condition) -> np.ndarray:
+    """VTC code per occupant: `pos` 1 → driver, other non-zero → passenger,
+    0/null → unknown."""
+    p = _floats(pos)
+    vt = np.select([np.isnan(p) | (p == 0), p == 1], [VT_U, VT_D], VT_O)
+    return (vt * len(CONDITIONS) + condition_idx(condition)).astype('int8')
+
+
+def pedestrian_codes(cyclist, condition) -> np.ndarray:
+    """VTC code per pedestrian: `cyclist` truthy → bicyclist, else pedestrian
+    (null → pedestrian)."""
+    b = pd.Series(cyclist).astype('boolean').to_numpy(dtype=bool, na_value=False)
+    vt = np.where(b, VT_B, VT_P)
+    return (vt * len(CONDITIONS) + condition_idx(condition)).astype('int8')
+
+
+def vtc_matrix(keys: pd.DataFrame, codes: np.ndarray) -> pd.DataFrame:
+    """Count `codes` per distinct `keys` row.
+
+    Returns a `VTC_COLS` int64 frame indexed by the (sorted) distinct keys, as
+    `groupby(keys + ['vtc']).size().unstack(fill_value=0)` would; rows with a
+    null key are dropped.
+    """
+    ok = keys.notna().all(axis=1).to_numpy()
+    if not ok.all():
+        keys = keys[ok]
+        codes = codes[ok]
+    if keys.shape[1] == 1:
+        col = keys.columns[0]
+        crash_idx, uniques = pd.factorize(keys[col], sort=True)
+        index = pd.Index(uniques, name=col)
+    else:
+        g = keys.groupby(list(keys.columns), sort=True)
+        crash_idx = g.ngroup().to_numpy()
+        index = g.size().index
+    flat = crash_idx.astype('int64') * N_VTC + codes
+    counts = np.bincount(flat, minlength=len(index) * N_VTC).reshape(len(index), N_VTC)
+    return pd.DataFrame(counts, index=index, columns=VTC_COLS)
+
+
+def person_vtc(
+    occupants: pd.DataFrame,
+    pedestrians: pd.DataFrame,
+    keys: list[str],
+) -> pd.DataFrame:
+    """25-col VTC matrix over occupant (`pos`, `condition`) + pedestrian
+    (`cyclist`, `condition`) rows, keyed by `keys`."""
+    codes = np.concatenate([
+        occupant_codes(occupants['pos'], occupants['condition']),
+        pedestrian_codes(pedestrians['cyclist'], pedestrians['condition']),
+    ])
+    k = pd.concat([occupants[keys], pedestrians[keys]], ignore_index=True)
+    return vtc_matrix(k, codes)
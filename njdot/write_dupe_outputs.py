@@ -62,16 +62,15 @@ def write_dupe_outputs(
     err(f"  Total duplicate records: {num_dupes:,}")
     err(f"  Duplicate groups: {num_groups:,}")
 
-    # Add group_idx and idx (position within group)
-    group_records = []
-    for group_idx, (pk, group) in enumerate(grouped):
-        for idx, (_, row) in enumerate(group.iterrows()):
-            rec = row.copy()
-            rec['group_idx'] = group_idx
-            rec['idx'] = idx
-            group_records.append(rec)
-
-    dupes_df = pd.DataFrame(group_records)
+    # Add group_idx and idx (position within group), ordered by group; rows
+    # with null keys aren't in any group
+    dupes_df = (
+        dupes
+        .assign(group_idx=grouped.ngroup(), idx=grouped.cumcount())
+        .dropna(subset=['group_idx'])
+        .astype({'group_idx': 'int64', 'idx': 'int64'})
+        .sort_values('group_idx', kind='stable')
+    )
 
     # Create output directory
     output_dir = Path(output_base)
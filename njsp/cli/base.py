@@ -1,9 +1,9 @@
 from functools import wraps
-from importlib import import_module
 
-from click import pass_context, Group
+from click import group, pass_context
 from nj_crashes.paths import ROOT_DIR
-from utz import err
+from nj_crashes.utils.cli import LazyGroup
+from nj_crashes.utils.stage import profile_opt, stage
 
 
 # Commands to load lazily: module_name → (command_name, help_text)
@@ -23,77 +23,35 @@ LAZY_COMMANDS = {
 }
 
 
-class LazyGroup(Group):
-    """Click Group that lazily imports commands only when invoked."""
-
-    def list_commands(self, ctx):
-        return sorted(cmd_name for cmd_name, _ in LAZY_COMMANDS.values())
-
-    def get_command(self, ctx, cmd_name):
-        # Check if already loaded
-        if cmd_name in self.commands:
-            return self.commands[cmd_name]
-
-        # Find the module for this command
-        module_name = None
-        for mod, (cmd, _) in LAZY_COMMANDS.items():
-            if cmd == cmd_name:
-                module_name = mod
-                break
-
-        if module_name is None:
-            return None
-
-        # Import the module (this triggers the @command decorator registration)
-        import_module(f'njsp.cli.{module_name}')
-
-        # Now the command should be registered
-        return self.commands.get(cmd_name)
-
-    def format_commands(self, ctx, formatter):
-        """Override to show help text without importing modules."""
-        commands = []
-        for cmd_name, help_text in sorted(LAZY_COMMANDS.values()):
-            commands.append((cmd_name, help_text))
-
-        if commands:
-            # Calculate max width for alignment
-            limit = formatter.width - 6 - max(len(cmd) for cmd, _ in commands)
-            rows = []
-            for cmd_name, help_text in commands:
-                # Truncate help text if needed
-                if len(help_text) > limit:
-                    help_text = help_text[:limit - 3] + '...'
-                rows.append((cmd_name, help_text))
-
-            with formatter.section('Commands'):
-                formatter.write_dl(rows)
-
-
+@group(
+    'njsp',
+    cls=LazyGroup,
+    lazy_commands={
+        cmd_name: (f'njsp.cli.{module_name}', help_text)
+        for module_name, (cmd_name, help_text) in LAZY_COMMANDS.items()
+    },
+)
+@profile_opt
 @pass_context
-def _njsp_callback(ctx):
+def njsp(ctx):
     import os
     ctx.obj = dict(original_cwd=os.getcwd())
     os.chdir(ROOT_DIR)
 
 
-njsp = LazyGroup(
-    'njsp',
-    callback=_njsp_callback,
-)
-
-
 def command(fn):
     @njsp.command(fn.__name__)
     @pass_context
     @wraps(fn)
     def _fn(ctx, *args, **kwargs):
-        msg = fn(*args, **kwargs)
+        with stage(fn.__name__):
+            msg = fn(*args, **kwargs)
 
         # Signal commit message to DVX harness
         try:
             from dvx.stage import stage as dvx_stage
             if dvx_stage.is_dvx_run and msg:
+                from utz import err
                 dvx_stage.commit(msg)
                 err(f"DVX commit: {msg}")
         except ImportError:
@@ -13,7 +13,7 @@ from nj_crashes.utils.log import err, none, Log
 from nj_crashes.utils.s3 import output_ctx, input_ctx
 from njsp.cli.base import njsp
 from njsp.commit_crashes import DEFAULT_ROOT_SHA_PARENT
-from njsp.crash_log import get_crash_log
+from njsp.crash_log import get_crash_log, sort_crash_log, write_crash_log
 from njsp.paths import S3_CRASH_LOG_PQT, S3_CRASH_LOG_DB
 
 # Enforce column order, otherwise DFs built using 1 or more -a/--append-to chains can have different column orders (e.g.
@@ -47,7 +47,7 @@ def load(url: str) -> DataFrame:
 def save(df: DataFrame, path: str | None = None):
     stem, xtn = splitext(path)
     if xtn in [".pqt", ".parquet"]:
-        df.to_parquet(path)
+        write_crash_log(df, path)
     elif xtn == ".csv":
         df.to_csv(path)
     elif xtn in [".db", ".sqlite"]:
@@ -183,7 +183,7 @@ def compute(
                 err(msg)
             else:
                 raise ValueError(msg)
-    df = df.sort_values(['accid', 'rundate'])
+    df = sort_crash_log(df)
     err(df)
     return df
 
@@ -1,19 +1,21 @@
 import hashlib
 import re
+from concurrent.futures import ThreadPoolExecutor
 from os.path import basename
 from pathlib import Path
 
-from datetime import datetime
+from datetime import datetime, timezone
 
-from click import argument
+from click import argument, option
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from utz import err, process, s3
 from utz.cli import flag
 
-from nj_crashes.utils.retry import http_get_with_retry
+from nj_crashes.utils.retry import HostBackoff, http_get_with_retry
 from .base import command
-from ..paths import fauqstats_relpath, S3_XML_FETCH_LOG
+from ..paths import fauqstats_relpath, fauqstats_url, S3_XML_FETCH_LOG
 
 
 def parse_rundate(xml_content: bytes) -> str | None:
@@ -72,6 +74,17 @@ def update_xml_dvc(out_path: str, content: bytes, response=None):
 
 
 UA = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36'
+HEADERS = {
+    'Accept': 'text/xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache',
+    'User-Agent': UA,
+}
+# Concurrent year fetches (one pooled connection each).
+JOBS = 3
+HOST_BACKOFF = HostBackoff()
 
 
 def _load_prior_dep(dvc_path: Path) -> dict | None:
@@ -86,11 +99,50 @@ def _load_prior_dep(dvc_path: Path) -> dict | None:
     return deps[0] if deps else None
 
 
-def update_years(*years, current_year: int = None, log_s3: bool = False):
+def conditional_headers(prior: dict | None, out_path: str) -> dict:
+    """`If-None-Match` / `If-Modified-Since` from a prior `.dvc` dep (ETag,
+    ISO mtime), if the local XML they describe is present."""
+    if not prior or not Path(out_path).exists():
+        return {}
+    headers = {}
+    if prior.get('checksum'):
+        headers['If-None-Match'] = prior['checksum']
+    if prior.get('mtime'):
+        from email.utils import format_datetime
+        try:
+            mtime = datetime.fromisoformat(prior['mtime'])
+        except ValueError:
+            mtime = None
+        if mtime is not None and mtime.tzinfo is not None:
+            headers['If-Modified-Since'] = format_datetime(mtime.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def fetch_year(session: requests.Session, year: int, prior: dict | None) -> requests.Response:
+    """Conditional GET of one year's XML (304 when unchanged upstream)."""
+    # Wider envelope than the retry helper's default (4×3s cap 30s). NJSP's
+    # WAF has been observed to reject for windows longer than 30s — daily
+    # run 28885986554 (2026-07-07) exhausted the default envelope while the
+    # feed was blocking every request. 6 attempts / base 15s / cap 180s
+    # covers ~5min worst case (~15+30+60+120+180s), giving the WAF cool-off
+    # room while still bounding the daily's wall-clock. Backoff is shared per
+    # host, so one year's 429/403 pauses the other in-flight years too.
+    return http_get_with_retry(
+        fauqstats_url(year),
+        headers=conditional_headers(prior, fauqstats_relpath(year)),
+        timeout=30, max_attempts=6, base=15.0, cap=180.0,
+        session=session, backoff=HOST_BACKOFF,
+    )
+
+
+def update_years(*years, current_year: int = None, log_s3: bool = False, jobs: int = JOBS):
     """Update FAUQStats XML files for the given years.
 
-    HEAD-checks each URL first; skips the download when ETag / Last-Modified
-    match the previously recorded values (no content change upstream).
+    Issues one conditional GET per year (`If-None-Match` / `If-Modified-Since`
+    from the previously recorded ETag / Last-Modified), `jobs` at a time over
+    a pooled keep-alive session; a 304 means no content change upstream.
+    Responses are then applied (file writes, `git add`, `.dvc` updates) in
+    year order.
 
     Returns:
         (latest_rundate, changed_years): latest RUNDATE string from the
@@ -101,60 +153,30 @@ def update_years(*years, current_year: int = None, log_s3: bool = False):
     fetch_time = datetime.now()
     latest_rundate = None
     changed_years: list[int] = []
-    headers = {
-        'Accept': 'text/xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Encoding': 'gzip, deflate',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Cache-Control': 'no-cache',
-        'Pragma': 'no-cache',
-        'User-Agent': UA,
+    priors = {
+        year: _load_prior_dep(Path(fauqstats_relpath(year) + '.dvc'))
+        for year in years
     }
-    for year in years:
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(jobs, 1))
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(HEADERS)
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            responses = list(executor.map(lambda year: fetch_year(session, year, priors[year]), years))
+
+    for year, res in zip(years, responses):
         out_path = fauqstats_relpath(year)
         name = basename(out_path)
-        url = f'https://njsp.njoag.gov/wp/wp-content/plugins/fatal-crash-data/xml/{name}'
         dvc_path = Path(out_path + '.dvc')
-        prior = _load_prior_dep(dvc_path)
-
-        # HEAD-check: if ETag or Last-Modified matches prior values and
-        # the local XML exists intact, skip the GET.
-        try:
-            head = requests.head(url, allow_redirects=True, timeout=30, headers=headers)
-        except requests.RequestException as e:
-            err(f"HEAD failed for {name}: {e}; falling back to GET")
-            head = None
+        prior = priors[year]
 
-        if head is not None and head.status_code == 404 and year == current_year:
+        if res.status_code == 404 and year == current_year:
             err(f"Skipping {name}: 404 Not Found (current year file not yet available)")
             continue
 
-        skip_fetch = False
-        if head is not None and head.status_code == 200 and prior and Path(out_path).exists():
-            head_etag = head.headers.get('ETag')
-            head_lm = head.headers.get('Last-Modified')
-            prior_etag = prior.get('checksum')
-            prior_mtime_iso = prior.get('mtime')
-            from email.utils import parsedate_to_datetime
-            prior_lm = None
-            if prior_mtime_iso:
-                try:
-                    # prior mtime is stored as ISO; HEAD returns HTTP-date. Normalize both to datetime.
-                    prior_lm = datetime.fromisoformat(prior_mtime_iso)
-                except ValueError:
-                    prior_lm = None
-            head_lm_dt = None
-            if head_lm:
-                try:
-                    head_lm_dt = parsedate_to_datetime(head_lm)
-                except (TypeError, ValueError):
-                    head_lm_dt = None
-            etag_match = bool(head_etag and prior_etag and head_etag == prior_etag)
-            lm_match = bool(head_lm_dt and prior_lm and head_lm_dt == prior_lm)
-            if etag_match or lm_match:
-                skip_fetch = True
-
-        if skip_fetch:
-            err(f"{name}: HEAD matches prior (ETag/LM unchanged); skipping download")
+        if res.status_code == 304:
+            err(f"{name}: 304 Not Modified (ETag/LM unchanged); skipping download")
             # Still need rundate for commit-message date suffix, read from existing file.
             try:
                 with open(out_path, 'rb') as f:
@@ -167,26 +189,13 @@ def update_years(*years, current_year: int = None, log_s3: bool = False):
             fetch_records.append({
                 'fetch_time': fetch_time,
                 'year': year,
-                'last_modified': head.headers.get('Last-Modified') if head is not None else None,
+                'last_modified': res.headers.get('Last-Modified') or (prior.get('mtime') if prior else None),
                 'rundate': rundate,
                 'content_length': prior.get('size') if prior else None,
                 'changed': False,
             })
             continue
 
-        # Wider envelope than the retry helper's default (4×3s cap 30s). NJSP's
-        # WAF has been observed to reject for windows longer than 30s — daily
-        # run 28885986554 (2026-07-07) exhausted the default envelope while the
-        # feed was blocking every request. 6 attempts / base 15s / cap 180s
-        # covers ~5min worst case (~15+30+60+120+180s), giving the WAF cool-off
-        # room while still bounding the daily's wall-clock.
-        res = http_get_with_retry(
-            url, headers=headers, timeout=30,
-            max_attempts=6, base=15.0, cap=180.0,
-        )
-        if res.status_code == 404 and year == current_year:
-            err(f"Skipping {name}: 404 Not Found (current year file not yet available)")
-            continue
         if res.status_code != 200:
             raise ValueError(f"Failed to download {name}: {res.status_code} {res.reason}")
         if res.headers.get('Content-Type') != 'text/xml':
@@ -249,19 +258,20 @@ def update_years(*years, current_year: int = None, log_s3: bool = False):
 
 @command
 @flag('--s3', 'log_s3', help='Log fetch metadata to S3')
-@argument('years', nargs=-1)
-def refresh_data(log_s3, years):
+@option('-j', '--jobs', type=int, default=JOBS, help=f'Concurrent fetches (default: {JOBS})')
+@argument('years', type=int, nargs=-1)
+def refresh_data(log_s3, jobs, years):
     """Snapshot NJSP fatal crash data for the given years.
 
-    HEAD-checks each URL and skips re-downloading XMLs whose ETag /
-    Last-Modified hasn't moved. Returns a commit message only when at
+    Conditionally GETs each URL concurrently, and skips XMLs whose ETag /
+    Last-Modified hasn't moved (304). Returns a commit message only when at
     least one XML's content actually changed — no-op polls produce no
     commit.
     """
     current_year = datetime.now().year
     if not years:
         years = [current_year - 2, current_year - 1, current_year]
-    latest_rundate, changed_years = update_years(*years, current_year=current_year, log_s3=log_s3)
+    latest_rundate, changed_years = update_years(*years, current_year=current_year, log_s3=log_s3, jobs=jobs)
     if not changed_years:
         err("No XML updates; no commit")
         return None
@@ -1,6 +1,5 @@
 from typing import Tuple
 
-import pandas as pd
 from utz import solo
 from utz.cli import multi, opt, arg
 from utz.ymd import dates, YMD
@@ -10,6 +9,7 @@ from .base import slack, channel_client_opts
 from .channel_client import ChannelClient
 from ...crash import Log
 from ...crash.log import versions
+from ...crash_log import read_crash_log
 from ...paths import S3_CRASH_LOG_PQT
 
 
@@ -34,11 +34,11 @@ def sync(
     <COMMIT> argument should be a "Refresh NJSP data" / `njsp refresh-data` commit hash (that
     updates `data/FAUQStats*.xml` files).
     """
-    crashes_log = pd.read_parquet(crash_log_url)
     if refspecs:
         if accids:
             raise ValueError("Cannot specify both --ref and accids")
-        reset = crashes_log.reset_index()
+        # Only the `(accid, sha)` index is needed to resolve refs to crashes.
+        reset = read_crash_log(crash_log_url, columns=['rundate']).reset_index()
         l, n = solo(reset.sha.apply(len).value_counts().to_dict())
         refs = [
             sha[:l]
@@ -46,9 +46,8 @@ def sync(
             for sha in expand_refspec(refspec, 'data')
         ]
         accids = reset.loc[reset.sha.isin(refs), 'accid'].unique().tolist()
-        crashes_log = crashes_log.loc[list(accids)]
-    elif accids:
-        crashes_log = crashes_log.loc[list(accids)]
+    # With accids, read just their row groups (via the log's accid offsets index).
+    crashes_log = read_crash_log(crash_log_url, accids) if refspecs or accids else read_crash_log(crash_log_url)
 
     # First crash-log entry for each crash ("accid")
     first_dates = crashes_log.groupby(level=0)['dt'].min().dt.date
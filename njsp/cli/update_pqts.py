@@ -2,10 +2,19 @@
 # - Load XMLs
 # - Clean / Assign some dtypes
 # - Write to parquet and SQLite
+#
+# Runs incrementally: `crashes.parquet`'s metadata records a sha256 per
+# `FAUQStats<year>.xml` (plus the muni-code / PDF inputs every year depends
+# on). Only years whose XML changed (typically just the current one) are
+# re-parsed and re-harmonized; other years' rows are reused from the
+# existing parquet, and only added/changed/removed rows are written to
+# SQLite.
+import hashlib
+import re
 import sqlite3
 import subprocess
 from os import remove
-from os.path import exists
+from os.path import basename, exists
 
 import click
 import json
@@ -13,6 +22,8 @@ import json
 from glob import glob
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from typing import Optional, Tuple
 
 from git import Tree
@@ -28,6 +39,11 @@ from njsp.utils import parse_rundate
 from .base import command
 from ..paths import CRASHES_PQT
 
+DIGESTS_KEY = b'njsp:input_sha256'
+# Non-XML inputs every year's rows depend on (muni codes, PDF listings);
+# a change to any of them reprocesses all years.
+SHARED_KEY = 'shared'
+
 
 def get_crashes_df(
         tree: Optional[Tree] = None,
@@ -64,18 +80,65 @@ def get_crashes_df(
     return crashes, totals, rundate
 
 
-@command
-@click.option('--replace-db', is_flag=True, help="Replace DB tables (instead of rm'ing DB and writing new tables from scratch)")
-@click.option('--s3', 'sync_s3', is_flag=True, help=f"Upload to S3")
-def update_pqts(replace_db, sync_s3):
-    """Update crashes Parquet/SQLite with NJSP crash data, update rundate.json."""
-    crashes, totals, rundate = get_crashes_df()
+def xml_paths() -> dict[int, str]:
+    """`{year: path}` of the local `FAUQStats<year>.xml`s."""
+    paths = {}
+    for path in glob(f'{DATA_DIR}/FAUQStats20*.xml'):
+        m = re.fullmatch(r'FAUQStats(?P<year>20\d\d)\.xml', basename(path))
+        if m:
+            paths[int(m['year'])] = path
+    return dict(sorted(paths.items()))
+
+
+def _sha256(*paths: str) -> str:
+    h = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def shared_inputs() -> list[str]:
+    from njsp.harmonize_pdfs import CC2MC2MN_JSON, PER_CRASH_CSV
+    from njsp.paths import MC_PQT
+    return [MC_PQT, PER_CRASH_CSV, CC2MC2MN_JSON]
+
+
+def input_digests(paths: dict[int, str]) -> dict[str, str]:
+    """sha256 per XML year (keyed by `str(year)`, as JSON round-trips it), plus
+    `SHARED_KEY` over `shared_inputs()`."""
+    digests = {str(year): _sha256(path) for year, path in paths.items()}
+    digests[SHARED_KEY] = _sha256(*shared_inputs())
+    return digests
+
+
+def read_digests(path: Optional[str] = None) -> Optional[dict[str, str]]:
+    path = path or CRASHES_PQT
+    if not exists(path):
+        return None
+    md = pq.read_schema(path).metadata or {}
+    digests = md.get(DIGESTS_KEY)
+    return json.loads(digests) if digests else None
+
+
+def changed_years(old: dict[str, str], new: dict[str, str]) -> set[int]:
+    """XML years added, removed, or modified between two `input_digests`; every
+    year if the shared inputs changed."""
+    years = { int(y) for y in set(old) | set(new) if y != SHARED_KEY }
+    if old.get(SHARED_KEY) != new.get(SHARED_KEY):
+        return years
+    return { y for y in years if old.get(str(y)) != new.get(str(y)) }
+
+
+def clean_crashes(crashes: pd.DataFrame) -> pd.DataFrame:
+    """Raw `FAUQStats.crashes` → `crashes.parquet` columns/dtypes (sans `type_source`)."""
+    crashes = crashes.copy()
     crashes['cc'] = crashes.CCODE.astype(int)
     crashes['mc_sp'] = crashes.MCODE.str[2:].astype(int)
     crashes.index.name = 'id'
     crashes.index = crashes.index.astype('int16')
     assert not crashes.mc_sp.isna().any()
-    crashes = (
+    return (
         update_mc(crashes, 'sp')
         .drop(columns=[ 'CCODE', 'CNAME', 'MCODE', 'MNAME', ])
         .sort_values('dt')
@@ -99,16 +162,26 @@ def update_pqts(replace_db, sync_s3):
         })
     )
 
-    refresh_sha = subprocess.run(
-        ['git', 'log', '--grep=^Refresh NJSP data', '-1', '--format=%H'],
-        capture_output=True, text=True, check=False,
-    ).stdout.strip() or None
-    with open(RUNDATE_PATH, 'w') as f:
-        json.dump({ 'rundate': str(rundate), 'refresh_sha': refresh_sha }, f)
+
+def load_years(paths: dict[int, str]) -> Optional[pd.DataFrame]:
+    """Parse, clean, verify and harmonize the given years' XMLs.
+
+    Harmonization only matches XML and PDF rows on the same date, so years are
+    independent and can be (re)processed separately. Returns `None` if the
+    XMLs contain no crashes (e.g. a new year's first, empty, feed).
+    """
+    fauqstatss = [ FAUQStats.load(path) for year, path in sorted(paths.items()) ]
+    totals = pd.concat([ f.totals for f in fauqstatss ]).set_index('year').sort_index()
+    err(totals)
+    dfs = [ f.crashes for f in fauqstatss if 'dt' in f.crashes ]
+    if not dfs:
+        return None
+    crashes = clean_crashes(pd.concat(dfs))
 
     # Verify the reported "total deaths" stat reflects what we see in the crash records
     njsp_totals = totals.fatalities.rename('NJSP total')
     fatalities_per_year = crashes.tk.groupby(crashes.dt.dt.year).sum().astype(int).rename('NJSP records')
+    fatalities_per_year = fatalities_per_year.reindex(njsp_totals.index, fill_value=0)
     njsp_diffs = sxs(njsp_totals, fatalities_per_year)[njsp_totals != fatalities_per_year]
     if not njsp_diffs.empty:
         raise RuntimeError(f"NJSP totals don't match crash records:\n{njsp_diffs}")
@@ -116,39 +189,158 @@ def update_pqts(replace_db, sync_s3):
     # Harmonize XML records with PDF per-crash listings: backfill pre-2020
     # dk/ok/pk/bk from the annual-report PDFs, add a `type_source` column,
     # and surface any rows that could not be matched.
-    from njsp.harmonize_pdfs import harmonize, load_pre_xml_crashes
+    from njsp.harmonize_pdfs import harmonize
     crashes, residuals = harmonize(crashes)
     if len(residuals):
         err(f"WARNING: {len(residuals)} unresolved harmonization rows:")
         err(residuals.to_string(index=False))
     else:
         err("Harmonization: all pre-2020 crashes backfilled from PDFs (0 residuals)")
+    return crashes
+
+
+def reuse_crashes(old: pd.DataFrame, years: set[int]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split a previous `crashes.parquet` into (XML rows of years not in
+    `years`, pre-XML PDF-only rows in their original load order)."""
+    pdf_only = old.type_source == 'pdf-only'
+    xml = old[~pdf_only & ~old.dt.dt.year.isin(years)]
+    # Pre-XML ids were assigned sequentially in `load_pre_xml_crashes` order.
+    pre_xml = old[pdf_only].sort_index()
+    return xml, pre_xml
 
-    # Extend with pre-XML PDF-only crashes (2001-2007). IDs start past the
-    # existing XML-derived max to avoid collisions.
-    earliest_xml_year = int(crashes.dt.dt.year.min())
-    pre_xml = load_pre_xml_crashes(earliest_xml_year)
-    id_start = int(crashes.index.max()) + 1
+
+def assemble(xml: pd.DataFrame, pre_xml: pd.DataFrame) -> pd.DataFrame:
+    """Prepend pre-XML PDF-only crashes (re-numbered to start past the XML
+    max id, to avoid collisions) and sort by `dt` (ties by id, so a partial
+    rebuild orders rows exactly as a full one)."""
+    id_start = int(xml.index.max()) + 1
+    pre_xml = pre_xml.copy()
     pre_xml.index = pd.RangeIndex(id_start, id_start + len(pre_xml), name='id').astype('int16')
-    crashes = pd.concat([pre_xml, crashes]).sort_values('dt')
-    err(f"Added {len(pre_xml)} pre-XML PDF-only crashes ({int(pre_xml.dt.dt.year.min())}-{earliest_xml_year - 1})")
+    return pd.concat([pre_xml, xml]).sort_index().sort_values('dt', kind='stable')
 
-    # ### Save to file
 
+def _eq(a: pd.Series, b: pd.Series) -> pd.Series:
+    """Elementwise equality with null == null."""
+    both_na = a.isna() & b.isna()
+    return pd.Series(a == b, index=a.index).fillna(False).astype(bool) | both_na
+
+
+def diff_crashes(old: pd.DataFrame, new: pd.DataFrame) -> Tuple[pd.Index, pd.DataFrame]:
+    """`(stale ids, rows to insert)` taking SQLite table `old` to `new`: stale
+    ids are removed or changed rows, inserts are changed or added rows."""
+    common = new.index.intersection(old.index)
+    a = old.loc[common, new.columns]
+    b = new.loc[common]
+    same = pd.concat([ _eq(a[c], b[c]) for c in new.columns ], axis=1).all(axis=1)
+    changed = common[~same.to_numpy()]
+    removed = old.index.difference(new.index)
+    stale = removed.append(changed)
+    inserts = new[new.index.isin(changed) | ~new.index.isin(old.index)]
+    return stale, inserts
+
+
+def upsert_db(old: pd.DataFrame, new: pd.DataFrame, db_uri: str) -> Tuple[int, int]:
+    """Apply `diff_crashes(old, new)` to the `crashes` table in one transaction."""
+    from sqlalchemy import create_engine, text
+    stale, inserts = diff_crashes(old, new)
+    if len(stale) or len(inserts):
+        engine = create_engine(db_uri)
+        with engine.begin() as conn:
+            if len(stale):
+                ids = ','.join(str(int(i)) for i in stale)
+                conn.execute(text(f'DELETE FROM crashes WHERE id IN ({ids})'))
+            if len(inserts):
+                inserts.to_sql('crashes', conn, if_exists='append')
+        engine.dispose()
+    return len(stale), len(inserts)
+
+
+def write_pqt(crashes: pd.DataFrame, digests: dict[str, str], path: Optional[str] = None):
+    path = path or CRASHES_PQT
+    tbl = pa.Table.from_pandas(crashes)
+    tbl = tbl.replace_schema_metadata({**(tbl.schema.metadata or {}), DIGESTS_KEY: json.dumps(digests)})
+    pq.write_table(tbl, path)
+
+
+def xml_rundate(path: str) -> pd.Timestamp:
+    """RUNDATE of an XML, without parsing the rest of it."""
+    with open(path, 'rb') as f:
+        m = re.search(rb'<RUNDATE>([^<]+)</RUNDATE>', f.read())
+    return pd.to_datetime(parse_rundate(m.group(1).decode()))
+
+
+@command
+@click.option('--replace-db', is_flag=True, help="Replace DB tables (instead of rm'ing DB and writing new tables from scratch)")
+@click.option('--s3', 'sync_s3', is_flag=True, help=f"Upload to S3")
+@click.option('-F', '--full', is_flag=True, help="Reprocess every year, and rewrite the DB from scratch")
+@click.option('-y', '--years', help="Comma-separated years to reprocess (default: those whose XML, or a shared input, changed since the last run)")
+def update_pqts(replace_db, sync_s3, full, years):
+    """Update crashes Parquet/SQLite with NJSP crash data, update rundate.json."""
     from njsp.paths import CRASHES_DB, CRASHES_DB_URI
 
-    if exists(CRASHES_DB) and not replace_db:
-        err(f"Removing existing DB {CRASHES_DB}")
-        remove(CRASHES_DB)
+    paths = xml_paths()
+    digests = input_digests(paths)
+    old_digests = None if full else read_digests()
+    incremental = old_digests is not None and exists(CRASHES_DB)
+    if incremental:
+        if years:
+            todo = { int(y) for y in years.split(',') }
+        else:
+            todo = changed_years(old_digests, digests)
+        err(f"Reprocessing {len(todo)} year(s): {', '.join(map(str, sorted(todo))) or 'none'}")
+    else:
+        if not full:
+            err(f"No input digests in {CRASHES_PQT} (or no {CRASHES_DB}); processing all years")
+        todo = set(paths)
+
+    rundate = xml_rundate(paths[max(paths)])
+    refresh_sha = subprocess.run(
+        ['git', 'log', '--grep=^Refresh NJSP data', '-1', '--format=%H'],
+        capture_output=True, text=True, check=False,
+    ).stdout.strip() or None
+    with open(RUNDATE_PATH, 'w') as f:
+        json.dump({ 'rundate': str(rundate), 'refresh_sha': refresh_sha }, f)
+
+    if incremental and not todo:
+        err(f"No FAUQStats changes; leaving {CRASHES_PQT} and {CRASHES_DB} as-is")
+        return "Update NJSP data"
+
+    processed = load_years({ y: p for y, p in paths.items() if y in todo })
+    if incremental:
+        old = pd.read_parquet(CRASHES_PQT)
+        xml, pre_xml = reuse_crashes(old, todo)
+        err(f"Reusing {len(xml)} XML crashes from {len(set(paths) - todo)} unchanged year(s)")
+        if processed is not None:
+            xml = pd.concat([xml, processed])
+    else:
+        # Extend with pre-XML PDF-only crashes (2001-2007). IDs start past the
+        # existing XML-derived max to avoid collisions.
+        from njsp.harmonize_pdfs import load_pre_xml_crashes
+        xml = processed
+        earliest_xml_year = int(xml.dt.dt.year.min())
+        pre_xml = load_pre_xml_crashes(earliest_xml_year)
+        err(f"Added {len(pre_xml)} pre-XML PDF-only crashes ({int(pre_xml.dt.dt.year.min())}-{earliest_xml_year - 1})")
+    crashes = assemble(xml, pre_xml)
+
+    # ### Save to file
+
+    if incremental:
+        n_stale, n_inserts = upsert_db(old, crashes, CRASHES_DB_URI)
+        err(f"{CRASHES_DB}: removed {n_stale} stale rows, inserted {n_inserts}")
+    else:
+        if exists(CRASHES_DB) and not replace_db:
+            err(f"Removing existing DB {CRASHES_DB}")
+            remove(CRASHES_DB)
+
+        replace_kwargs = dict(if_exists='replace') if replace_db else {}
+        crashes.to_sql('crashes', CRASHES_DB_URI, **replace_kwargs)
 
-    replace_kwargs = dict(if_exists='replace') if replace_db else {}
-    crashes.to_sql('crashes', CRASHES_DB_URI, **replace_kwargs)
-    crashes.to_parquet(CRASHES_PQT)
+        with sqlite3.connect(CRASHES_DB) as con:
+            cur = con.cursor()
+            sql.add_idx(cur, 'crashes', 'dt')
+            sql.add_idx(cur, 'crashes', 'cc', 'mc', 'dt')
 
-    with sqlite3.connect(CRASHES_DB) as con:
-        cur = con.cursor()
-        sql.add_idx(cur, 'crashes', 'dt')
-        sql.add_idx(cur, 'crashes', 'cc', 'mc', 'dt')
+    write_pqt(crashes, digests)
 
     if sync_s3:
         s3.upload(CRASHES_PQT, CRASHES_PQT_S3)
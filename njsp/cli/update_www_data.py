@@ -44,17 +44,22 @@ def muni_label(cc, mc, cc2mc2mn):
     return cn, mn
 
 
-@command
-@click.option('-f', '--force', is_flag=True, help="Force regeneration even if files exist")
-def update_www_data(force):
-    """Generate Parquet data files for frontend plots."""
-    err(f"Loading {CRASHES_PQT}...")
-    crashes = pd.read_parquet(CRASHES_PQT)
-
-    # Load municipality names
-    cc2mc2mn = load_cc2mc2mn()
-
-    # Add derived columns
+TYPE_COLS = ['driver', 'passenger', 'pedestrian', 'cyclist']
+YTD_OUT_COLS = [
+    'county', 'cc', 'mc', 'year', 'day_of_year', 'date_label',
+    'fatalities', *TYPE_COLS, 'cumulative', *(f'{c}_cumulative' for c in TYPE_COLS),
+]
+MONTHLY_OUT_COLS = [
+    'county', 'cc', 'mc', 'date', 'year', 'month',
+    'fatalities', *TYPE_COLS, 'avg_12mo',
+]
+# "Jan 01" … "Dec 31" by day-of-year (non-leap calendar, as `%j` parses;
+# day 366 wraps to "Jan 01").
+DATE_LABELS = pd.to_datetime(pd.Series(range(1, 367)), format='%j').dt.strftime('%b %d').to_numpy()
+
+
+def add_columns(crashes: pd.DataFrame):
+    """Add date parts, per-type death counts and county name (in place)."""
     crashes['year'] = crashes['dt'].dt.year
     crashes['month'] = crashes['dt'].dt.month
     crashes['day_of_year'] = crashes['dt'].dt.dayofyear
@@ -65,118 +70,113 @@ def update_www_data(force):
     crashes['cyclist'] = crashes['bk'].fillna(0).astype(int)
     crashes['county'] = crashes['cc'].map(CC2CN).fillna('')
 
-    # Build list of (cc, mc) pairs present in data
-    muni_pairs = (
-        crashes[['cc', 'mc']].drop_duplicates()
-        .sort_values(['cc', 'mc'])
-        .values.tolist()
+
+def explode_geos(crashes: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Tag crashes with every geography they roll up into.
+
+    Returns `(geos, by_geo)`: `geos` is indexed by an int `geo` id in output
+    order — statewide, then counties by name, then munis with ≥1 fatality by
+    `(cc, mc)` — with `county`/`cc`/`mc` labels (null where n/a); `by_geo` is
+    `crashes` repeated once per geography, with a `geo` column.
+    """
+    counties = sorted(CC2CN.values())
+    county_geo = {CN2CC[cn]: i + 1 for i, cn in enumerate(counties)}
+
+    muni_deaths = crashes.groupby(['cc', 'mc'])['fatalities'].sum()
+    munis = muni_deaths[muni_deaths > 0].index.to_frame(index=False)
+    munis['geo'] = range(len(counties) + 1, len(counties) + 1 + len(munis))
+
+    geos = pd.concat([
+        pd.DataFrame({'county': [None], 'cc': [None], 'mc': [None]}),
+        pd.DataFrame({'county': counties, 'cc': [CN2CC[cn] for cn in counties], 'mc': None}),
+        pd.DataFrame({
+            'county': [CC2CN.get(cc, None) for cc in munis['cc']],
+            'cc': munis['cc'].astype(object),
+            'mc': munis['mc'].astype(object),
+        }),
+    ], ignore_index=True)
+    geos.index.name = 'geo'
+    geos['cc'] = geos['cc'].astype('Int64')
+    geos['mc'] = geos['mc'].astype('Int64')
+
+    statewide = crashes.assign(geo=0)
+    in_county = crashes[crashes['county'] != '']
+    county = in_county.assign(geo=in_county['cc'].map(county_geo))
+    muni = crashes.merge(munis, on=['cc', 'mc'], how='inner')
+    by_geo = pd.concat([statewide, county, muni], ignore_index=True)
+    return geos, by_geo
+
+
+def compute_ytd(by_geo: pd.DataFrame, geos: pd.DataFrame) -> pd.DataFrame:
+    """Deaths by `(geo, year, day_of_year)` with within-year running totals."""
+    ytd = (
+        by_geo
+        .groupby(['geo', 'year', 'day_of_year'])[['fatalities', *TYPE_COLS]]
+        .sum()
+        .reset_index()
     )
+    g = ytd.groupby(['geo', 'year'])
+    ytd['cumulative'] = g['fatalities'].cumsum()
+    for c in TYPE_COLS:
+        ytd[f'{c}_cumulative'] = g[c].cumsum()
+    ytd['date_label'] = DATE_LABELS[ytd['day_of_year'].to_numpy() - 1]
+    ytd = ytd.join(geos, on='geo')
+    return ytd[YTD_OUT_COLS]
+
+
+def compute_monthly(by_geo: pd.DataFrame, geos: pd.DataFrame) -> pd.DataFrame:
+    """Deaths by `(geo, year, month)` with a trailing 12-row (months with
+    deaths) rolling average per geography."""
+    monthly = (
+        by_geo
+        .groupby(['geo', 'year', 'month'])[['fatalities', *TYPE_COLS]]
+        .sum()
+        .reset_index()
+    )
+    monthly['date'] = pd.to_datetime(monthly[['year', 'month']].assign(day=1))
+    monthly['avg_12mo'] = (
+        monthly
+        .groupby('geo')['fatalities']
+        .rolling(window=12, min_periods=1)
+        .mean()
+        .round(1)
+        .reset_index(level=0, drop=True)
+    )
+    monthly = monthly.join(geos, on='geo')
+    return monthly[MONTHLY_OUT_COLS]
+
+
+@command
+@click.option('-f', '--force', is_flag=True, help="Force regeneration even if files exist")
+def update_www_data(force):
+    """Generate Parquet data files for frontend plots."""
+    err(f"Loading {CRASHES_PQT}...")
+    crashes = pd.read_parquet(CRASHES_PQT)
+
+    add_columns(crashes)
+
+    # Every crash once per geography it rolls up into (statewide, county, muni)
+    geos, by_geo = explode_geos(crashes)
+    err(f"  {len(geos)} geographies ({(geos['mc'].notna()).sum()} munis)")
 
     # 1. YTD data: cumulative deaths by day of year for each year
     ytd_path = join(WWW_NJSP, 'ytd.parquet')
     err(f"Generating {ytd_path}...")
-
-    type_cols = ['driver', 'passenger', 'pedestrian', 'cyclist']
-    ytd_cum_cols = [f'{c}_cumulative' for c in type_cols] + ['cumulative']
-    ytd_out_cols = [
-        'county', 'cc', 'mc', 'year', 'day_of_year', 'date_label',
-        'fatalities', *type_cols, 'cumulative', *(f'{c}_cumulative' for c in type_cols),
-    ]
-
-    def compute_ytd(df, county=None, cc=None, mc=None):
-        agg_cols = {'fatalities': 'sum', **{c: 'sum' for c in type_cols}}
-        ytd = (
-            df
-            .groupby(['year', 'day_of_year'])
-            .agg(agg_cols)
-            .reset_index()
-        )
-        ytd['cumulative'] = ytd.groupby('year')['fatalities'].cumsum()
-        for c in type_cols:
-            ytd[f'{c}_cumulative'] = ytd.groupby('year')[c].cumsum()
-        ytd['date_label'] = pd.to_datetime(ytd['day_of_year'], format='%j').dt.strftime('%b %d')
-        ytd['county'] = county
-        ytd['cc'] = cc
-        ytd['mc'] = mc
-        return ytd[ytd_out_cols]
-
-    ytd_parts = [compute_ytd(crashes)]
-    for cn in sorted(CC2CN.values()):
-        ytd_parts.append(compute_ytd(crashes[crashes['county'] == cn], cn, cc=CN2CC[cn]))
-    for cc_val, mc_val in muni_pairs:
-        cn = CC2CN.get(cc_val, None)
-        mn = cc2mc2mn.get(cc_val, {}).get(mc_val, f'Muni {mc_val}')
-        muni_data = crashes[(crashes['cc'] == cc_val) & (crashes['mc'] == mc_val)]
-        if muni_data['fatalities'].sum() > 0:
-            ytd_parts.append(compute_ytd(muni_data, cn, cc_val, mc_val))
-    ytd = pd.concat(ytd_parts, ignore_index=True)
-    ytd['cc'] = ytd['cc'].astype('Int64')
-    ytd['mc'] = ytd['mc'].astype('Int64')
+    ytd = compute_ytd(by_geo, geos)
     ytd.to_parquet(ytd_path, compression='snappy', index=False)
     err(f"  Wrote {len(ytd)} rows")
 
     # 2. Monthly timeseries: deaths per month with 12-mo rolling average
     monthly_path = join(WWW_NJSP, 'monthly.parquet')
     err(f"Generating {monthly_path}...")
-
-    def compute_monthly(df, county=None, cc=None, mc=None):
-        agg_cols = {'fatalities': 'sum', 'driver': 'sum', 'passenger': 'sum', 'pedestrian': 'sum', 'cyclist': 'sum'}
-        monthly = (
-            df
-            .groupby(['year', 'month'])
-            .agg(agg_cols)
-            .reset_index()
-        )
-        monthly['date'] = pd.to_datetime(monthly['year'].astype(str) + '-' + monthly['month'].astype(str).str.zfill(2) + '-01')
-        monthly = monthly.sort_values('date')
-        monthly['avg_12mo'] = monthly['fatalities'].rolling(window=12, min_periods=1).mean().round(1)
-        monthly['county'] = county
-        monthly['cc'] = cc
-        monthly['mc'] = mc
-        return monthly[['county', 'cc', 'mc', 'date', 'year', 'month', 'fatalities', 'driver', 'passenger', 'pedestrian', 'cyclist', 'avg_12mo']]
-
-    monthly_parts = [compute_monthly(crashes)]
-    for cn in sorted(CC2CN.values()):
-        monthly_parts.append(compute_monthly(crashes[crashes['county'] == cn], cn, cc=CN2CC[cn]))
-    for cc_val, mc_val in muni_pairs:
-        cn = CC2CN.get(cc_val, None)
-        muni_data = crashes[(crashes['cc'] == cc_val) & (crashes['mc'] == mc_val)]
-        if muni_data['fatalities'].sum() > 0:
-            monthly_parts.append(compute_monthly(muni_data, cn, cc_val, mc_val))
-    monthly = pd.concat(monthly_parts, ignore_index=True)
-    monthly['cc'] = monthly['cc'].astype('Int64')
-    monthly['mc'] = monthly['mc'].astype('Int64')
-
+    monthly = compute_monthly(by_geo, geos)
     monthly.to_parquet(monthly_path, compression='snappy', index=False)
     err(f"  Wrote {len(monthly)} rows")
 
     # 3. Month-year data: deaths by year and month
     month_year_path = join(WWW_NJSP, 'month-year.parquet')
     err(f"Generating {month_year_path}...")
-
-    def compute_month_year(df, county=None, cc=None, mc=None):
-        my = (
-            df
-            .groupby(['year', 'month'])['fatalities']
-            .sum()
-            .reset_index()
-        )
-        my['county'] = county
-        my['cc'] = cc
-        my['mc'] = mc
-        return my[['county', 'cc', 'mc', 'year', 'month', 'fatalities']]
-
-    my_parts = [compute_month_year(crashes)]
-    for cn in sorted(CC2CN.values()):
-        my_parts.append(compute_month_year(crashes[crashes['county'] == cn], cn, cc=CN2CC[cn]))
-    for cc_val, mc_val in muni_pairs:
-        cn = CC2CN.get(cc_val, None)
-        muni_data = crashes[(crashes['cc'] == cc_val) & (crashes['mc'] == mc_val)]
-        if muni_data['fatalities'].sum() > 0:
-            my_parts.append(compute_month_year(muni_data, cn, cc_val, mc_val))
-    month_year = pd.concat(my_parts, ignore_index=True)
-    month_year['cc'] = month_year['cc'].astype('Int64')
-    month_year['mc'] = month_year['mc'].astype('Int64')
+    month_year = monthly[['county', 'cc', 'mc', 'year', 'month', 'fatalities']]
     month_year.to_parquet(month_year_path, compression='snappy', index=False)
     err(f"  Wrote {len(month_year)} rows")
 
@@ -164,8 +164,7 @@ class CommitCrashes:
         try:
             parent.tree
         except ValueError:
-            parent = get_github_repo().get_commit(parent.hexsha)
-            parent = GithubCommitWrapper(parent)
+            parent = GithubCommitWrapper.from_sha(parent.hexsha)
         return parent
 
     @cached_property
@@ -179,10 +179,15 @@ class Log:
     versions: list[Version]
 
     @staticmethod
-    def load(df: DataFrame, accid: int) -> 'Log':
+    def load(df: DataFrame | str, accid: int) -> 'Log':
+        """`accid`'s history, from a crash-log frame or a `crash-log.parquet`
+        path/URL (reading only the row groups holding `accid`'s rows)."""
+        if isinstance(df, str):
+            from njsp.crash_log import read_crash_log
+            df = read_crash_log(df, [accid])
         return Log(
             accid=accid,
-            versions=versions(df.loc[accid].reset_index()),
+            versions=versions(df.loc[[accid]].reset_index()),
         )
 
     @property
@@ -2,9 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Literal
+from typing import Literal, Sequence
 
+import json
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from git import Repo, Commit
 from pandas import DataFrame, Series, to_datetime, Timestamp
 from utz import err
@@ -25,6 +29,102 @@ FAUQSTATS_COLS = [
     'FATALITIES', 'FATAL_D', 'FATAL_P', 'FATAL_T', 'FATAL_B', 'INJURIES', 'dt',
 ]
 
+# `crash-log.parquet` layout: rows sorted by `(accid, rundate)`, in small row
+# groups, with an "offsets" index in the footer (`OFFSETS_KEY`: sorted
+# `accid`s and each one's starting row, plus a final end row). One crash's
+# history is then a footer read + the 1-2 row groups spanning its rows.
+ROW_GROUP_SIZE = 512
+OFFSETS_KEY = b'njsp:accid_offsets'
+
+
+def sort_crash_log(df: DataFrame) -> DataFrame:
+    """Stable sort by `(accid, rundate)` (`accid` may be a column or index level)."""
+    return df.sort_values(['accid', 'rundate'], kind='stable')
+
+
+def accid_offsets(df: DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """`(accids, starts)` of a sorted crash log: rows of `accids[i]` are
+    `starts[i]:starts[i+1]` (`len(starts) == len(accids) + 1`)."""
+    accid = df.index.get_level_values('accid') if 'accid' in df.index.names else df['accid']
+    accid = np.asarray(accid)
+    if len(accid) and (np.diff(accid) < 0).any():
+        raise ValueError("crash log must be sorted by accid")
+    starts = np.flatnonzero(np.r_[True, accid[1:] != accid[:-1]]) if len(accid) else np.array([], dtype=int)
+    return accid[starts], np.r_[starts, len(accid)]
+
+
+def write_crash_log(df: DataFrame, path: str):
+    """Write `df` sorted by `(accid, rundate)`, in `ROW_GROUP_SIZE` row groups,
+    with its `accid_offsets` in the footer."""
+    df = sort_crash_log(df)
+    accids, starts = accid_offsets(df)
+    tbl = pa.Table.from_pandas(df)
+    offsets = json.dumps({'accid': accids.tolist(), 'start': starts.tolist()})
+    tbl = tbl.replace_schema_metadata({**(tbl.schema.metadata or {}), OFFSETS_KEY: offsets})
+    pq.write_table(tbl, path, row_group_size=ROW_GROUP_SIZE)
+
+
+def _open(path: str):
+    import fsspec
+    return fsspec.open(path, 'rb')
+
+
+def read_offsets(pf: pq.ParquetFile) -> tuple[np.ndarray, np.ndarray] | None:
+    md = pf.schema_arrow.metadata or {}
+    offsets = md.get(OFFSETS_KEY)
+    if not offsets:
+        return None
+    offsets = json.loads(offsets)
+    return np.asarray(offsets['accid']), np.asarray(offsets['start'])
+
+
+def read_crash_log(
+    path: str = CRASH_LOG_PQT,
+    accids: Sequence[int] | None = None,
+    columns: list[str] | None = None,
+) -> DataFrame:
+    """Load the crash log (indexed by `(accid, sha)`), or just `accids`' rows.
+
+    With an offsets index, only the row groups holding `accids`' rows are
+    fetched (ranged reads, for remote paths); otherwise (logs written before
+    the index) the whole file is read and filtered.
+    """
+    with _open(path) as f:
+        pf = pq.ParquetFile(f)
+        offsets = read_offsets(pf)
+        if accids is None:
+            return pf.read(columns=columns, use_pandas_metadata=True).to_pandas()
+        accids = np.array(sorted(set(int(a) for a in accids)), dtype='int64')
+        if offsets is None:
+            df = pf.read(columns=columns, use_pandas_metadata=True).to_pandas()
+            return df[df.index.get_level_values('accid').isin(accids)]
+        all_accids, starts = offsets
+        idxs = np.searchsorted(all_accids, accids)
+        found = idxs < len(all_accids)
+        found[found] = all_accids[idxs[found]] == accids[found]
+        idxs = idxs[found]
+        rg_starts = np.cumsum([0] + [pf.metadata.row_group(i).num_rows for i in range(pf.num_row_groups)])
+        ranges = [ (starts[i], starts[i + 1]) for i in idxs ]
+        groups = sorted({
+            g
+            for lo, hi in ranges
+            for g in range(np.searchsorted(rg_starts, lo, side='right') - 1, np.searchsorted(rg_starts, hi, side='left'))
+        })
+        tbl = pf.read_row_groups(groups, columns=columns, use_pandas_metadata=True)
+    # Map global row ranges to positions within the fetched row groups.
+    base = {}
+    pos = 0
+    for g in groups:
+        base[g] = pos
+        pos += rg_starts[g + 1] - rg_starts[g]
+    rows = [
+        base[g] + (r - rg_starts[g])
+        for lo, hi in ranges
+        for r in range(lo, hi)
+        for g in [np.searchsorted(rg_starts, r, side='right') - 1]
+    ]
+    return tbl.take(pa.array(rows, type=pa.int64())).to_pandas()
+
 
 def get_commit_crash_updates(
     prv_commit: Commit | GithubCommit,
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 import re
 from dataclasses import dataclass
@@ -27,6 +28,27 @@ def get_fauqstats(path: str | IO):
     return fauqstats
 
 
+# `DATE="12/31/2024" TIME="2247"`
+DT_FORMAT = '%m/%d/%Y %H%M'
+# Wall-clock times in the 1am hour repeated when DST ends are read as the
+# first (EDT) occurrence; times skipped when DST starts shift forward to 3am.
+AMBIGUOUS_DST = True
+NONEXISTENT = 'shift_forward'
+
+
+def crash_dts(date: pd.Series, time: pd.Series, tz: str = TZ) -> pd.Series:
+    """Localized crash datetimes from `DATE`/`TIME` strings, in one vectorized
+    parse + `tz_localize` (DST edge cases per `AMBIGUOUS_DST`/`NONEXISTENT`)."""
+    s = date + ' ' + time
+    dt = pd.to_datetime(s, format=DT_FORMAT, errors='coerce')
+    bad = dt.isna() & s.notna()
+    if bad.any():
+        # Off-format values (e.g. unpadded times in old blobs): parse individually.
+        dt[bad] = pd.to_datetime(s[bad], format='mixed')
+    ambiguous = np.full(len(dt), AMBIGUOUS_DST)
+    return dt.dt.tz_localize(tz, ambiguous=ambiguous, nonexistent=NONEXISTENT)
+
+
 def get_children(tag):
     return [ child for child in tag.children if not isinstance(child, str) ]
 
@@ -95,16 +117,7 @@ class FAUQStats:
 
         crashes = pd.DataFrame(records)
         if 'DATE' in crashes:
-            crashes['dt'] = (
-                crashes[['DATE', 'TIME']]
-                .apply(
-                    lambda r: (
-                        pd.to_datetime(f'{r["DATE"]} {r["TIME"]}')
-                        .tz_localize(TZ)
-                    ),
-                    axis=1
-                )
-            )
+            crashes['dt'] = crash_dts(crashes['DATE'], crashes['TIME'])
             float_cols = [
                 'FATALITIES',
                 'FATAL_D',
@@ -0,0 +1,98 @@
+"""`crash-log.parquet` layout: sorted by `(accid, rundate)` in small row groups
+with an accid → row-range offsets index, so one crash's history is read from
+just the row groups holding it."""
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from njsp import crash_log
+from njsp.crash.log import Log
+from njsp.crash_log import FAUQSTATS_COLS, read_crash_log, write_crash_log
+
+TZ = "US/Eastern"
+
+
+def _log(n_accids: int = 300, seed: int = 0) -> pd.DataFrame:
+    """Synthetic add/update…/del histories, shuffled (as `pd.concat` of appends leaves them)."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for accid in rng.permutation(np.arange(1000, 1000 + n_accids)):
+        n = int(rng.integers(1, 6))
+        day0 = int(rng.integers(0, 300))
+        for v in range(n):
+            kind = 'add' if v == 0 else ('del' if v == n - 1 and rng.random() < .3 else 'update')
+            row = {col: None for col in FAUQSTATS_COLS}
+            row.update(
+                accid=int(accid), sha=f'{rng.integers(0, 16**7):07x}',
+                rundate=pd.Timestamp('2024-01-01', tz=TZ) + pd.Timedelta(days=day0 + 7 * v),
+                kind=kind,
+                dt=pd.Timestamp('2024-01-01', tz=TZ) + pd.Timedelta(days=day0),
+                CCODE="09", CNAME="Hudson", MCODE="0906", MNAME="Jersey City",
+                FATALITIES=float(v + 1), FATAL_D=1.,
+            )
+            rows.append(row)
+    df = pd.DataFrame(rows).sample(frac=1, random_state=seed)
+    return df.set_index(['accid', 'sha'])[['rundate', 'kind', *FAUQSTATS_COLS]]
+
+
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(crash_log, 'ROW_GROUP_SIZE', 16)
+    df = _log()
+    path = str(tmp_path / 'crash-log.parquet')
+    write_crash_log(df, path)
+    return df, path
+
+
+def test_sorted_with_offsets(log_path):
+    df, path = log_path
+    stored = read_crash_log(path)
+    exp = df.sort_values(['accid', 'rundate'])
+    pd.testing.assert_frame_equal(stored, exp)
+    pf = pq.ParquetFile(path)
+    assert pf.num_row_groups == -(-len(df) // 16)
+    accids, starts = crash_log.read_offsets(pf)
+    assert accids.tolist() == sorted(set(df.index.get_level_values('accid')))
+    assert starts[-1] == len(df)
+
+
+def test_read_slices(log_path, monkeypatch):
+    df, path = log_path
+    full = read_crash_log(path)
+    calls = []
+    read_row_groups = pq.ParquetFile.read_row_groups
+    def spy(self, row_groups, *args, **kwargs):
+        calls.append(list(row_groups))
+        return read_row_groups(self, row_groups, *args, **kwargs)
+    monkeypatch.setattr(pq.ParquetFile, 'read_row_groups', spy)
+
+    accids = full.index.get_level_values('accid').unique()
+    for accid in accids[[0, 1, 57, 150, -1]]:
+        act = read_crash_log(path, [accid])
+        pd.testing.assert_frame_equal(act, full.loc[[accid]])
+        # ≤5 versions per crash, 16-row groups: at most 2 groups touched.
+        assert len(calls[-1]) <= 2
+
+    some = [accids[3], accids[200], 99999]  # unknown accid ignored
+    pd.testing.assert_frame_equal(read_crash_log(path, some), full.loc[[accids[3], accids[200]]])
+    assert read_crash_log(path, [99999]).empty
+
+
+def test_log_load_from_path(log_path):
+    df, path = log_path
+    full = read_crash_log(path)
+    accid = int(full.index.get_level_values('accid')[40])
+    from_path = Log.load(path, accid)
+    from_df = Log.load(full, accid)
+    assert from_path == from_df
+    assert [v.rundate for v in from_path.versions] == sorted(v.rundate for v in from_path.versions)
+
+
+def test_legacy_file_without_offsets(tmp_path):
+    df = _log(50, seed=1)
+    path = str(tmp_path / 'legacy.parquet')
+    df.to_parquet(path)
+    accid = int(df.index.get_level_values('accid')[0])
+    act = read_crash_log(path, [accid])
+    pd.testing.assert_frame_equal(act, df.loc[[accid]])
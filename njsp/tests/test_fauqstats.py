@@ -0,0 +1,64 @@
+"""`FAUQStats.load`'s vectorized `dt` (one `to_datetime` + `tz_localize`) matches
+the per-row parse it replaced, and resolves DST-boundary wall-clock times
+per the explicit `AMBIGUOUS_DST` / `NONEXISTENT` policies."""
+import pandas as pd
+
+from njsp.fauqstats import FAUQStats, crash_dts
+
+XML = '''<?xml version="1.0" encoding="utf-8"?>
+<!-- FAUQStats test fixture -->
+<FAUQSTATS>
+  <RUNDATE>Wed Dec 31 10:01:13 EST 2025</RUNDATE>
+  <STATSYEAR>2024</STATSYEAR>
+  <COUNTY CCODE="01" CNAME="Atlantic">
+    <MUNICIPALITY MCODE="0102" MNAME="Atlantic City">
+{accidents}
+    </MUNICIPALITY>
+  </COUNTY>
+  <TOTACCIDENTS>{n}</TOTACCIDENTS>
+  <TOTINJURIES>0</TOTINJURIES>
+  <TOTFATALITIES>{n}</TOTFATALITIES>
+</FAUQSTATS>
+'''
+
+DTS = [
+    # (DATE, TIME, expected)
+    ('01/15/2024', '0000', '2024-01-15 00:00:00-05:00'),
+    ('03/10/2024', '0159', '2024-03-10 01:59:00-05:00'),  # last EST minute
+    ('03/10/2024', '0230', '2024-03-10 03:00:00-04:00'),  # nonexistent → shift forward
+    ('03/10/2024', '0300', '2024-03-10 03:00:00-04:00'),
+    ('11/03/2024', '0059', '2024-11-03 00:59:00-04:00'),
+    ('11/03/2024', '0130', '2024-11-03 01:30:00-04:00'),  # ambiguous → EDT (first occurrence)
+    ('11/03/2024', '0200', '2024-11-03 02:00:00-05:00'),
+    ('12/31/2024', '2359', '2024-12-31 23:59:00-05:00'),
+]
+
+
+def test_load_dst_boundaries(tmp_path):
+    accidents = '\n'.join(
+        f'      <ACCIDENT ACCID="{i}" DATE="{date}" TIME="{time}"><FATALITIES>1</FATALITIES><INJURIES>0</INJURIES></ACCIDENT>'
+        for i, (date, time, _) in enumerate(DTS)
+    )
+    path = tmp_path / 'FAUQStats2024.xml'
+    path.write_text(XML.format(accidents=accidents, n=len(DTS)))
+    crashes = FAUQStats.load(str(path)).crashes
+    assert str(crashes.dt.dtype) == 'datetime64[ns, US/Eastern]'
+    act = crashes.sort_index().dt.astype(str).tolist()
+    assert act == [ exp for _, _, exp in DTS ]
+
+
+def test_matches_per_row_parse():
+    # Unambiguous times (the per-row `tz_localize` raised on DST edge cases).
+    df = pd.DataFrame(
+        [ (date, time) for date, time, _ in DTS if date not in ('03/10/2024', '11/03/2024') ]
+        + [ ('07/04/2023', '1215'), ('02/29/2024', '0930') ],
+        columns=['DATE', 'TIME'],
+    )
+    exp = df.apply(lambda r: pd.to_datetime(f'{r["DATE"]} {r["TIME"]}').tz_localize('US/Eastern'), axis=1)
+    pd.testing.assert_series_equal(crash_dts(df.DATE, df.TIME), exp)
+
+
+def test_off_format_fallback():
+    # Unpadded dates still parse (via the per-value fallback).
+    dts = crash_dts(pd.Series(['1/5/2024', '01/06/2024']), pd.Series(['0930', '1800']))
+    assert dts.astype(str).tolist() == ['2024-01-05 09:30:00-05:00', '2024-01-06 18:00:00-05:00']
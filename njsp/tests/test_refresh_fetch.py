@@ -0,0 +1,159 @@
+"""`njsp.cli.refresh_data.update_years` against a local HTTP server: concurrent
+conditional GETs over one pooled session, 304s for unchanged years, and 429s
+retried after a per-host backoff shared across threads."""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from njsp.cli import refresh_data
+from nj_crashes.utils.retry import HostBackoff
+
+ETAG = '"v1"'
+LAST_MODIFIED = 'Tue, 14 Apr 2026 15:20:07 GMT'
+
+
+def _xml(year: int, rundate: str) -> bytes:
+    return f'<FAUQSTATS><STATSYEAR>{year}</STATSYEAR><RUNDATE>{rundate}</RUNDATE></FAUQSTATS>'.encode()
+
+
+class Feed:
+    """Per-year responses: `bodies[year]` (served with `ETAG` unless
+    `etags[year]` overrides), plus `throttle[year]` leading 429s."""
+    def __init__(self):
+        self.bodies: dict[int, bytes] = {}
+        self.etags: dict[int, str] = {}
+        self.throttle: dict[int, int] = {}
+        self.requests: list[tuple[int, dict]] = []
+        self.ports: set[int] = set()
+        self.lock = threading.Lock()
+
+
+@pytest.fixture
+def feed():
+    feed = Feed()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, headers=None, body=b''):
+            self.send_response(status)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            year = int(self.path.rsplit('FAUQStats', 1)[1].split('.')[0])
+            with feed.lock:
+                feed.requests.append((year, dict(self.headers)))
+                feed.ports.add(self.client_address[1])
+                throttled = feed.throttle.get(year, 0)
+                if throttled:
+                    feed.throttle[year] = throttled - 1
+            if throttled:
+                return self._send(429, {'Retry-After': '1'})
+            if year not in feed.bodies:
+                return self._send(404)
+            etag = feed.etags.get(year, ETAG)
+            if self.headers.get('If-None-Match') == etag:
+                return self._send(304, {'ETag': etag})
+            self._send(200, {
+                'Content-Type': 'text/xml',
+                'ETag': etag,
+                'Last-Modified': LAST_MODIFIED,
+            }, feed.bodies[year])
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    feed.url = f'http://127.0.0.1:{server.server_address[1]}'
+    yield feed
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def data_dir(tmp_path, feed, monkeypatch):
+    monkeypatch.setattr(refresh_data, 'fauqstats_relpath', lambda year: str(tmp_path / f'FAUQStats{year}.xml'))
+    monkeypatch.setattr(refresh_data, 'fauqstats_url', lambda year: f'{feed.url}/xml/FAUQStats{year}.xml')
+    monkeypatch.setattr(refresh_data, 'HOST_BACKOFF', HostBackoff())
+    with patch('njsp.cli.refresh_data.process.run'):
+        yield tmp_path
+
+
+def _track(dir: Path, year: int, content: bytes, etag: str = ETAG):
+    """Local XML + `.dvc` as a previous refresh would have left them."""
+    import hashlib
+    (dir / f'FAUQStats{year}.xml').write_bytes(content)
+    (dir / f'FAUQStats{year}.xml.dvc').write_text(yaml.safe_dump({
+        'deps': [{'path': f'https://example.com/FAUQStats{year}.xml', 'checksum': etag, 'mtime': '2026-04-14T15:20:07+00:00', 'size': len(content)}],
+        'outs': [{'md5': hashlib.md5(content).hexdigest(), 'size': len(content), 'hash': 'md5', 'path': f'FAUQStats{year}.xml'}],
+        'meta': {'git_tracked': True},
+    }, sort_keys=False))
+
+
+def test_200_304(feed, data_dir):
+    old = _xml(2025, 'Mon Jan 05 10:01:14 EST 2026')
+    new = _xml(2026, 'Thu Apr 09 10:00:01 EDT 2026')
+    _track(data_dir, 2025, old)
+    _track(data_dir, 2026, _xml(2026, 'Wed Apr 08 10:00:01 EDT 2026'))
+    feed.bodies = {2024: _xml(2024, 'Mon Jan 06 10:01:14 EST 2025'), 2025: old, 2026: new}
+    feed.etags = {2026: '"v2"'}
+
+    rundate, changed = refresh_data.update_years(2024, 2025, 2026, current_year=2026)
+    assert changed == [2024, 2026]
+    assert rundate == 'Thu Apr 09 10:00:01 EDT 2026'
+    assert (data_dir / 'FAUQStats2026.xml').read_bytes() == new
+    assert yaml.safe_load((data_dir / 'FAUQStats2026.xml.dvc').read_text())['deps'][0]['checksum'] == '"v2"'
+    # Conditional headers only where a prior download exists.
+    sent = {year: headers for year, headers in feed.requests}
+    assert 'If-None-Match' not in sent[2024]
+    assert sent[2025]['If-None-Match'] == ETAG
+    assert sent[2025]['If-Modified-Since'] == LAST_MODIFIED
+
+
+def test_404(feed, data_dir):
+    # Current year not yet published: skipped; past year missing: error.
+    feed.bodies = {2025: _xml(2025, 'Mon Jan 05 10:01:14 EST 2026')}
+    assert refresh_data.update_years(2025, 2026, current_year=2026) == (None, [2025])
+    with pytest.raises(ValueError, match='404'):
+        refresh_data.update_years(2024, current_year=2026)
+
+
+def test_429_shared_backoff(feed, data_dir):
+    feed.bodies = {
+        2025: _xml(2025, 'Mon Jan 05 10:01:14 EST 2026'),
+        2026: _xml(2026, 'Thu Apr 09 10:00:01 EDT 2026'),
+    }
+    feed.throttle = {2026: 1}
+    sleeps = []
+    real_sleep = time.sleep
+    with patch('nj_crashes.utils.retry.time.sleep', side_effect=lambda s: (sleeps.append(s), real_sleep(s))):
+        rundate, changed = refresh_data.update_years(2025, 2026, current_year=2026)
+    assert changed == [2025, 2026]
+    assert [year for year, _ in feed.requests].count(2026) == 2
+    # The 429's `Retry-After: 1` deferred the host, and the retry waited it out.
+    assert sleeps and all(0 < s <= 1 for s in sleeps)
+
+    # Deferring one URL delays every URL on that host, not others.
+    backoff = HostBackoff()
+    backoff.defer(f'{feed.url}/xml/FAUQStats2025.xml', 30)
+    assert backoff.remaining(f'{feed.url}/xml/FAUQStats2026.xml') > 29
+    assert backoff.remaining('http://example.com/FAUQStats2026.xml') == 0
+
+
+def test_session_reuses_connections(feed, data_dir):
+    feed.bodies = {year: _xml(year, 'Mon Jan 05 10:01:14 EST 2026') for year in range(2020, 2027)}
+    refresh_data.update_years(*range(2020, 2027), current_year=2026, jobs=2)
+    assert len(feed.requests) == 7
+    # Keep-alive: at most one connection per worker.
+    assert len(feed.ports) <= 2
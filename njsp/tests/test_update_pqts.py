@@ -0,0 +1,83 @@
+"""Incremental `update_pqts`: reprocessing only changed years (reusing the rest
+from the previous `crashes.parquet`) and upserting the diff into SQLite gives
+the same parquet rows and DB contents as a full rebuild."""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from njsp.cli.update_pqts import (
+    SHARED_KEY, assemble, changed_years, read_digests, reuse_crashes, upsert_db, write_pqt,
+)
+
+TZ = 'US/Eastern'
+
+
+def _xml(rng, years: list[int], id0: int) -> pd.DataFrame:
+    """Harmonized XML rows, with `dt` ties (same-day midnight crashes)."""
+    n = 40 * len(years)
+    days = rng.integers(0, 365, n)
+    year = np.repeat(years, 40)
+    dt = pd.to_datetime([f'{y}-01-01' for y in year]) + pd.to_timedelta(days, unit='D')
+    ints = lambda: pd.array(rng.integers(0, 3, n), dtype='Int8')
+    df = pd.DataFrame({
+        'cc': rng.integers(1, 22, n).astype('int8'),
+        'mc': rng.integers(1, 30, n).astype('int8'),
+        'dt': dt.tz_localize(TZ),
+        'tk': ints(), 'ti': ints(), 'dk': ints(), 'ok': ints(), 'pk': ints(), 'bk': ints(),
+        'location': [f'loc {i}' for i in range(n)],
+        'street': None,
+        'highway': rng.choice(['I-80', None], n),
+        'type_source': pd.array(rng.choice(['xml', 'pdf', 'unresolved'], n), dtype='string'),
+    }, index=pd.Index(np.arange(id0, id0 + n), name='id').astype('int16'))
+    return df
+
+
+def _pre_xml(rng) -> pd.DataFrame:
+    n = 30
+    df = _xml(rng, [2006], 0).iloc[:n]
+    df['ti'] = pd.array([pd.NA] * n, dtype='Int8')
+    df[['location', 'street', 'highway']] = None
+    df['type_source'] = pd.array(['pdf-only'] * n, dtype='string')
+    return df.reset_index(drop=True)
+
+
+def _dump(path) -> list:
+    with sqlite3.connect(path) as con:
+        return con.execute('SELECT * FROM crashes ORDER BY id').fetchall()
+
+
+def test_incremental_matches_full(tmp_path):
+    rng = np.random.default_rng(0)
+    xml = _xml(rng, [2008, 2009, 2010], 100)
+    pre_xml = _pre_xml(rng)
+    old = assemble(xml, pre_xml)
+    digests = {'2008': 'a', '2009': 'b', '2010': 'c', SHARED_KEY: 's'}
+    pqt = str(tmp_path / 'crashes.parquet')
+    write_pqt(old, digests, pqt)
+    assert read_digests(pqt) == digests
+    old = pd.read_parquet(pqt)
+
+    # 2010's feed updates: one crash revised, one dropped, two new (with
+    # larger ACCIDs, so the pre-XML ids shift too).
+    y2010 = xml[xml.dt.dt.year == 2010].copy()
+    y2010.loc[y2010.index[0], 'tk'] = 5
+    y2010 = y2010.drop(y2010.index[1])
+    y2010 = pd.concat([y2010, _xml(rng, [2010], 500).iloc[:2]])
+    new_digests = {**digests, '2010': 'c2'}
+    assert changed_years(digests, new_digests) == {2010}
+    assert changed_years(digests, {**new_digests, SHARED_KEY: 't'}) == {2008, 2009, 2010}
+
+    full = assemble(pd.concat([xml[xml.dt.dt.year < 2010], y2010]), pre_xml)
+    kept, reused_pre = reuse_crashes(old, {2010})
+    inc = assemble(pd.concat([kept, y2010]), reused_pre)
+    pd.testing.assert_frame_equal(inc, full)
+
+    full_db = str(tmp_path / 'full.db')
+    inc_db = str(tmp_path / 'inc.db')
+    full.to_sql('crashes', f'sqlite:///{full_db}')
+    old.to_sql('crashes', f'sqlite:///{inc_db}')
+    n_stale, n_inserts = upsert_db(old, inc, f'sqlite:///{inc_db}')
+    # 1 revised + 1 dropped + 30 renumbered pre-XML; 1 revised + 2 new + 30 pre-XML.
+    assert (n_stale, n_inserts) == (32, 33)
+    assert _dump(inc_db) == _dump(full_db)
@@ -0,0 +1,73 @@
+"""`update_www_data`'s single-groupby YTD / monthly builders == the per-geography
+filter + groupby loop they replaced."""
+import numpy as np
+import pandas as pd
+
+from njsp.cli.update_www_data import (
+    CC2CN, CN2CC, MONTHLY_OUT_COLS, TYPE_COLS, YTD_OUT_COLS,
+    add_columns, compute_monthly, compute_ytd, explode_geos,
+)
+
+
+def _crashes(n=3_000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dt = pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.integers(0, 5 * 366, n), unit='D')
+    # Include a leap-year Dec 31 (day 366).
+    dt = dt.append(pd.DatetimeIndex([pd.Timestamp('2020-12-31')]))
+    n += 1
+    cc = rng.integers(1, 23, n).astype(float)  # 22: no county name
+    cc[rng.random(n) < .02] = np.nan
+    mc = rng.integers(1, 30, n).astype(float)
+    mc[rng.random(n) < .02] = np.nan
+    df = pd.DataFrame({'dt': dt, 'cc': cc, 'mc': mc})
+    for c in ('tk', 'dk', 'ok', 'pk', 'bk'):
+        v = rng.choice([0, 0, 0, 1, 2], n).astype(float)
+        v[rng.random(n) < .05] = np.nan
+        df[c] = v
+    add_columns(df)
+    return df
+
+
+def _parts(crashes, fn):
+    muni_pairs = crashes[['cc', 'mc']].drop_duplicates().sort_values(['cc', 'mc']).values.tolist()
+    parts = [fn(crashes)]
+    for cn in sorted(CC2CN.values()):
+        parts.append(fn(crashes[crashes['county'] == cn], cn, cc=CN2CC[cn]))
+    for cc_val, mc_val in muni_pairs:
+        muni_data = crashes[(crashes['cc'] == cc_val) & (crashes['mc'] == mc_val)]
+        if muni_data['fatalities'].sum() > 0:
+            parts.append(fn(muni_data, CC2CN.get(cc_val, None), cc_val, mc_val))
+    out = pd.concat(parts, ignore_index=True)
+    out['cc'] = out['cc'].astype('Int64')
+    out['mc'] = out['mc'].astype('Int64')
+    return out
+
+
+def _ytd_ref(df, county=None, cc=None, mc=None):
+    ytd = df.groupby(['year', 'day_of_year']).agg({'fatalities': 'sum', **{c: 'sum' for c in TYPE_COLS}}).reset_index()
+    ytd['cumulative'] = ytd.groupby('year')['fatalities'].cumsum()
+    for c in TYPE_COLS:
+        ytd[f'{c}_cumulative'] = ytd.groupby('year')[c].cumsum()
+    ytd['date_label'] = pd.to_datetime(ytd['day_of_year'], format='%j').dt.strftime('%b %d')
+    ytd['county'] = county
+    ytd['cc'] = cc
+    ytd['mc'] = mc
+    return ytd[YTD_OUT_COLS]
+
+
+def _monthly_ref(df, county=None, cc=None, mc=None):
+    monthly = df.groupby(['year', 'month']).agg({'fatalities': 'sum', **{c: 'sum' for c in TYPE_COLS}}).reset_index()
+    monthly['date'] = pd.to_datetime(monthly['year'].astype(str) + '-' + monthly['month'].astype(str).str.zfill(2) + '-01')
+    monthly = monthly.sort_values('date')
+    monthly['avg_12mo'] = monthly['fatalities'].rolling(window=12, min_periods=1).mean().round(1)
+    monthly['county'] = county
+    monthly['cc'] = cc
+    monthly['mc'] = mc
+    return monthly[MONTHLY_OUT_COLS]
+
+
+def test_ytd_monthly_match_per_geo_loop():
+    crashes = _crashes()
+    geos, by_geo = explode_geos(crashes)
+    pd.testing.assert_frame_equal(compute_ytd(by_geo, geos), _parts(crashes, _ytd_ref))
+    pd.testing.assert_frame_equal(compute_monthly(by_geo, geos), _parts(crashes, _monthly_ref))
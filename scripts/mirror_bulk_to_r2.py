@@ -10,10 +10,18 @@ DVX cache at `s3://nj-crashes/.dvc/files/md5/<md5[:2]>/<md5[2:]>`, and
 streams it to `r2://nj-crashes/raw/<dvc-path-without-.dvc>`. No disk
 persistence.
 
+The destination prefix is listed once up front (instead of a HEAD per
+blob) to skip blobs already mirrored with matching size. The rest are
+copied by a pool of `-j` workers. Blobs of at least `-m` MiB are streamed
+through in `-c` MiB multipart-upload parts, so memory is bounded by
+`jobs × chunk` rather than by the largest blob.
+
 See specs/mirror-bulk-to-r2.md.
 """
 import fnmatch
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from functools import partial
 from pathlib import Path
@@ -32,6 +40,11 @@ DEFAULT_INCLUDE = '*.zip,*.pqt,*.txt'
 DEFAULT_BUCKET = 'nj-crashes'
 DEFAULT_PREFIX = 'raw/'
 DEFAULT_PROFILE = 'cf'
+DEFAULT_JOBS = 8
+DEFAULT_CHUNK_MB = 16      # Multipart part size
+MIN_CHUNK_MB = 5           # S3/R2 minimum part size (except the last part)
+DEFAULT_MULTIPART_MB = 64  # Blobs at least this large are uploaded in parts
+MiB = 1024 * 1024
 
 
 @dataclass
@@ -68,26 +81,131 @@ def _load_jobs(years: list[str], include_globs: list[str], prefix: str) -> list[
     return jobs
 
 
-def _r2_has(r2, bucket: str, key: str, size: int) -> bool:
+@dataclass
+class Result:
+    job: Job
+    uploaded: bool
+    elapsed: float = 0.
+
+    @property
+    def mib_per_s(self) -> float:
+        return self.job.size / MiB / self.elapsed if self.elapsed else 0.
+
+
+def list_sizes(client, bucket: str, prefix: str) -> dict[str, int]:
+    """Map each key under `prefix` to its size (one paginated LIST, vs. a HEAD per key)."""
+    paginator = client.get_paginator('list_objects_v2')
+    return {
+        obj['Key']: obj['Size']
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix)
+        for obj in page.get('Contents', [])
+    }
+
+
+def _read_parts(body, part_size: int):
+    """Yield `part_size`-byte chunks of a streaming `body` (the last may be shorter)."""
+    buf = bytearray()
+    while True:
+        chunk = body.read(part_size - len(buf))
+        if not chunk:
+            break
+        buf += chunk
+        if len(buf) == part_size:
+            yield bytes(buf)
+            buf.clear()
+    if buf:
+        yield bytes(buf)
+
+
+def copy_blob(s3, r2, bucket: str, job: Job, chunk_size: int, multipart_threshold: int) -> None:
+    """Stream `job`'s source blob to its destination key; multipart if it's large."""
+    body = s3.get_object(Bucket=bucket, Key=job.src_key)['Body']
+    if job.size < multipart_threshold:
+        data = body.read()
+        if len(data) != job.size:
+            raise RuntimeError(f'{job.src_key}: size mismatch (got {len(data):,}, expected {job.size:,})')
+        r2.put_object(Bucket=bucket, Key=job.dst_key, Body=data, ContentLength=job.size)
+        return
+
+    upload_id = r2.create_multipart_upload(Bucket=bucket, Key=job.dst_key)['UploadId']
     try:
-        head = r2.head_object(Bucket=bucket, Key=key)
-    except r2.exceptions.ClientError:
-        return False
-    except Exception as e:
-        # boto3 raises botocore.exceptions.ClientError; r2.exceptions covers it,
-        # but some 404s come through as ClientError on the underlying class.
-        msg = str(e)
-        if '404' in msg or 'Not Found' in msg or 'NoSuchKey' in msg:
-            return False
+        parts = []
+        n = 0
+        for part_number, part in enumerate(_read_parts(body, chunk_size), 1):
+            res = r2.upload_part(Bucket=bucket, Key=job.dst_key, UploadId=upload_id, PartNumber=part_number, Body=part)
+            parts.append({'PartNumber': part_number, 'ETag': res['ETag']})
+            n += len(part)
+        if n != job.size:
+            raise RuntimeError(f'{job.src_key}: size mismatch (got {n:,}, expected {job.size:,})')
+        r2.complete_multipart_upload(
+            Bucket=bucket, Key=job.dst_key, UploadId=upload_id,
+            MultipartUpload={'Parts': parts},
+        )
+    except BaseException:
+        # Don't let a failed abort mask the error that caused it
+        try:
+            r2.abort_multipart_upload(Bucket=bucket, Key=job.dst_key, UploadId=upload_id)
+        except Exception as e:
+            err(f'{job.dst_key}: aborting multipart upload {upload_id} failed: {e!r}')
         raise
-    return head['ContentLength'] == size
+
+
+def mirror(
+    jobs: list[Job],
+    s3,
+    r2,
+    bucket: str,
+    force: bool = False,
+    workers: int = DEFAULT_JOBS,
+    chunk_size: int = DEFAULT_CHUNK_MB * MiB,
+    multipart_threshold: int = DEFAULT_MULTIPART_MB * MiB,
+) -> tuple[list[Result], list[tuple[Job, Exception]]]:
+    """Copy each job's blob unless the destination already has it (at the same size).
+
+    Returns per-job `Result`s (in completion order) and the jobs that failed.
+    """
+    if force:
+        existing = {}
+    else:
+        prefix = os.path.commonprefix([j.dst_key for j in jobs])
+        existing = list_sizes(r2, bucket, prefix)
+    results = [Result(j, uploaded=False) for j in jobs if existing.get(j.dst_key) == j.size]
+    todo = [j for j in jobs if existing.get(j.dst_key) != j.size]
+    err(f'{len(results)} already mirrored, {len(todo)} to copy ({sum(j.size for j in todo) / MiB:.1f} MiB)')
+
+    def copy(job: Job) -> Result:
+        t0 = time()
+        copy_blob(s3, r2, bucket, job, chunk_size, multipart_threshold)
+        return Result(job, uploaded=True, elapsed=time() - t0)
+
+    failures = []
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = {ex.submit(copy, j): j for j in todo}
+        pbar = tqdm(total=sum(j.size for j in todo), unit='B', unit_scale=True, desc='mirror')
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                r = future.result()
+            except Exception as e:
+                err(f'  {job.dst_key}: {e}')
+                failures.append((job, e))
+                continue
+            finally:
+                pbar.update(job.size)
+            results.append(r)
+            pbar.write(f'  {job.dst_key}: {job.size / MiB:.1f} MiB in {r.elapsed:.1f}s ({r.mib_per_s:.1f} MiB/s)', file=sys.stderr)
+        pbar.close()
+    return results, failures
 
 
 @click.command()
 @click.option('-a', '--all', 'all_years', is_flag=True, help='Mirror every year present in njdot/data/')
 @click.option('-b', '--bucket', default=DEFAULT_BUCKET, help='R2 bucket name')
+@click.option('-c', '--chunk-mb', type=click.IntRange(min=MIN_CHUNK_MB), default=DEFAULT_CHUNK_MB, help=f'Multipart upload part size (MiB, at least {MIN_CHUNK_MB})')
 @click.option('-f', '--force', is_flag=True, help='Skip the "already exists with matching size" check; re-upload')
 @click.option('-i', '--include-glob', default=DEFAULT_INCLUDE, help='Comma-separated glob filters on the data file name')
+@click.option('-j', '--jobs', 'workers', type=int, default=DEFAULT_JOBS, help='Concurrent copies')
+@click.option('-m', '--multipart-mb', type=int, default=DEFAULT_MULTIPART_MB, help='Upload blobs at least this large (MiB) in parts')
 @click.option('-n', '--dry-run', is_flag=True, help='Print plan and exit without uploading')
 @click.option('-p', '--prefix', default=DEFAULT_PREFIX, help='R2 key prefix')
 @click.option('-P', '--profile', default=DEFAULT_PROFILE, help='AWS named profile for R2 (endpoint_url + creds)')
@@ -95,8 +213,11 @@ def _r2_has(r2, bucket: str, key: str, size: int) -> bool:
 def main(
     all_years: bool,
     bucket: str,
+    chunk_mb: int,
     force: bool,
     include_glob: str,
+    workers: int,
+    multipart_mb: int,
     dry_run: bool,
     prefix: str,
     profile: str,
@@ -129,30 +250,24 @@ def main(
     s3 = boto3.client('s3')  # default profile
     r2 = boto3.Session(profile_name=profile).client('s3')
 
-    n_uploaded = 0
-    n_skipped = 0
-    bytes_uploaded = 0
     t0 = time()
-
-    pbar = tqdm(jobs, unit='file', desc='mirror')
-    for j in pbar:
-        pbar.set_postfix_str(j.dst_key)
-        if not force and _r2_has(r2, bucket, j.dst_key, j.size):
-            n_skipped += 1
-            continue
-        body = s3.get_object(Bucket=bucket, Key=j.src_key)['Body'].read()
-        if len(body) != j.size:
-            raise RuntimeError(f'{j.src_key}: size mismatch (got {len(body):,}, expected {j.size:,})')
-        r2.put_object(Bucket=bucket, Key=j.dst_key, Body=body, ContentLength=j.size)
-        n_uploaded += 1
-        bytes_uploaded += j.size
-
+    results, failures = mirror(
+        jobs, s3, r2, bucket,
+        force=force,
+        workers=workers,
+        chunk_size=chunk_mb * MiB,
+        multipart_threshold=multipart_mb * MiB,
+    )
     elapsed = time() - t0
+    uploaded = [r for r in results if r.uploaded]
+    bytes_uploaded = sum(r.job.size for r in uploaded)
     err(
-        f'Done. uploaded={n_uploaded}, skipped={n_skipped}, '
-        f'bytes={bytes_uploaded:,} ({bytes_uploaded / 1024 / 1024:.1f} MiB), '
-        f'elapsed={elapsed:.1f}s'
+        f'Done. uploaded={len(uploaded)}, skipped={len(results) - len(uploaded)}, failed={len(failures)}, '
+        f'bytes={bytes_uploaded:,} ({bytes_uploaded / MiB:.1f} MiB), '
+        f'elapsed={elapsed:.1f}s ({bytes_uploaded / MiB / elapsed if elapsed else 0:.1f} MiB/s)'
     )
+    if failures:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from h3.api import numpy_int as h3i
+
+from njdot.cli.cells import _h3_int_col, _parent_int_col
+
+BASE_RES = 10
+
+
+@pytest.fixture
+def raw_dir(tmp_path: Path) -> Path:
+    """Synthetic raw index: ~3k crashes across NJ, sharded at r4 like `cells
+    raw` (`{tmp}/raw/h3_r{BASE_RES}/{r4}.parquet`)."""
+    rng = np.random.default_rng(0)
+    n = 3000
+    lat = rng.uniform(39.0, 41.2, n)
+    lon = rng.uniform(-75.4, -73.9, n)
+    cells = _h3_int_col(lat, lon, BASE_RES)
+    severity = rng.choice(['f', 'i', 'p'], n)
+    inj = severity == 'i'
+    pi = np.where(inj, rng.integers(0, 2, n), 0)
+    df = pd.DataFrame({
+        f'h3_r{BASE_RES}': cells,
+        'year': rng.integers(2001, 2024, n).astype('int16'),
+        # Coarse timestamps → plenty of `dt` ties, which exercise topK stability.
+        'dt': pd.to_datetime(rng.integers(0, 500, n) * 86_400 * 10**9),
+        'case': [f'c{i}' for i in range(n)],
+        'severity': severity,
+        'ti': (pi + np.where(inj, rng.integers(1, 3, n), 0)).astype(float),
+        'pi': pi.astype(float),
+        'tk': (severity == 'f').astype(float),
+        'pk': rng.integers(0, 2, n).astype(float) * (severity == 'f'),
+        'tv': rng.integers(1, 4, n).astype(float),
+    })
+    df['__shard'] = _parent_int_col(cells, 4)
+    df = df.sort_values(['__shard', f'h3_r{BASE_RES}'], kind='mergesort')
+    d = tmp_path / 'raw' / f'h3_r{BASE_RES}'
+    d.mkdir(parents=True)
+    for shard, sub in df.groupby('__shard', sort=False):
+        sub.drop(columns='__shard').to_parquet(d / f'{h3i.int_to_str(int(shard))}.parquet', index=False)
+    return d
@@ -0,0 +1,96 @@
+"""`njdot.aashto.normalize`'s streaming path (record-aligned byte ranges parsed
+in worker processes, tables written one row group at a time) writes the same
+parquet bytes as the in-memory `DataFrame` + `to_parquet` path."""
+import csv
+import io
+
+import pyarrow.parquet as pq
+import pytest
+
+pytest.importorskip("tqdm")
+
+from njdot.aashto import normalize as n
+from njdot.aashto.bench_normalize import synthetic_csv
+
+
+@pytest.fixture(scope="module")
+def crash_csv(tmp_path_factory):
+    return synthetic_csv(tmp_path_factory.mktemp("aashto") / "Crash.csv", 3000)
+
+
+def _run(tmp_path, crash_csv, name, **kwargs):
+    out = tmp_path / name
+    out.mkdir()
+    if name == "in-memory":
+        n.normalize_in_memory(crash_csv, out, **kwargs)
+    else:
+        n.normalize(crash_csv, out, **kwargs)
+    return { table: (out / f"{table}.parquet").read_bytes() for table in n.TABLES }
+
+
+def test_record_ranges(crash_csv):
+    header, ranges = n.record_ranges(crash_csv, chunk_bytes=64 * 1024)
+    with open(crash_csv, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert header == rows[0]
+    assert len(ranges) > 10
+    data = crash_csv.read_bytes()
+    chunked = [
+        row
+        for a, b in ranges
+        for row in csv.reader(io.StringIO(data[a:b].decode(), newline=""))
+    ]
+    assert chunked == rows[1:]
+    # Some rows hold quoted newlines, so not every newline is a boundary.
+    assert any("\n" in cell for row in rows for cell in row)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_byte_identical(tmp_path, crash_csv, jobs):
+    exp = _run(tmp_path, crash_csv, "in-memory")
+    act = _run(tmp_path, crash_csv, "streaming", jobs=jobs, chunk_bytes=64 * 1024)
+    assert act == exp
+    issues = pq.read_table(tmp_path / "streaming" / "issues.parquet").to_pandas()
+    assert {"FATAL", "object_undefined", "vehicle_col_compound"} <= set(issues.issue_type)
+
+
+def test_limit(tmp_path, crash_csv, monkeypatch):
+    exp = _run(tmp_path, crash_csv, "in-memory", limit=500)
+    parsed = []
+    parse_chunk = n.parse_chunk
+    def spy(csv_path, header, rng, **kwargs):
+        parsed.append((rng, kwargs["limit"]))
+        return parse_chunk(csv_path, header, rng, **kwargs)
+    monkeypatch.setattr(n, "parse_chunk", spy)
+    act = _run(tmp_path, crash_csv, "streaming", limit=500, chunk_bytes=64 * 1024)
+    assert act == exp
+    # Ranges are parsed in order, each with the rows still wanted, and parsing
+    # stops short of the end of the file.
+    _, ranges = n.record_ranges(crash_csv, chunk_bytes=64 * 1024)
+    assert 1 < len(parsed) < len(ranges)
+    assert [ rng for rng, _ in parsed ] == ranges[:len(parsed)]
+    assert parsed[0][1] == 500 and all(a > b for (_, a), (_, b) in zip(parsed, parsed[1:]))
+
+
+def test_row_groups(tmp_path, crash_csv, monkeypatch):
+    _run(tmp_path, crash_csv, "in-memory")
+    monkeypatch.setattr(n, "ROW_GROUP_SIZE", 1000)
+    _run(tmp_path, crash_csv, "streaming", jobs=1, chunk_bytes=64 * 1024)
+    for table in ["crashes", "vehicles", "persons"]:
+        exp = pq.read_table(tmp_path / "in-memory" / f"{table}.parquet")
+        pf = pq.ParquetFile(tmp_path / "streaming" / f"{table}.parquet")
+        assert pf.read().equals(exp)
+        assert pf.num_row_groups == -(-exp.num_rows // 1000)
+
+
+def test_parse_cell_skips_non_json(monkeypatch):
+    n.parse_cell.cache_clear()
+    def no_decode(s):
+        raise AssertionError(f"decoded {s!r}")
+    monkeypatch.setattr(n, "json_decode", no_decode)
+    assert n.parse_cell("[object Object]") == ("scalar", "[object Object]")
+    assert n.parse_cell("[ Unknown ]") == ("scalar", "[ Unknown ]")
+    monkeypatch.undo()
+    n.parse_cell.cache_clear()
+    assert n.parse_cell('[ "a", [1] ]') == ("array", ["a", [1]])
+    assert n.parse_cell("[ oops") == ("scalar", "[ oops")
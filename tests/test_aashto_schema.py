@@ -0,0 +1,113 @@
+"""`njdot.aashto.to_njdot_schema`'s distinct-pair `(cc, mc)` resolution (and
+`map_distinct` for the per-row int / severity / departure mappings) == the
+per-row `apply`s it replaced."""
+import numpy as np
+import pandas as pd
+
+from njdot.aashto.to_njdot_schema import (
+    crash_pk_index, infer_severity, lookup_cc_mc, map_distinct, to_int, to_njdot_schema,
+)
+from njdot.aashto.to_njdot_vehicles import map_departure
+
+LOOKUP = {
+    ("Hudson", "Jersey City"): (9, 6),
+    ("Hudson", "Bayonne"): (9, 1),
+    ("Hudson", "Weehawken"): (9, 11),
+    ("Bergen", "Elmwood Park"): (2, 14),
+    ("Bergen", "Ho-Ho-Kus"): (2, 28),
+    ("Essex", "South Orange"): (7, 19),
+    ("Essex", "Newark"): (7, 14),
+}
+PAIRS = [
+    ("Hudson", "Jersey City"),          # exact
+    ("Hudson", "Jersey City City"),     # suffix stripped
+    ("Hudson", "Bayonne City"),
+    ("Bergen", "ElmWood Park Boro"),    # alias
+    ("Bergen", "Ho Ho Kus Boro"),       # alias
+    ("Bergen", "Bayonne City"),         # alias → dropped
+    ("Essex", "South Orange Village Twp"),
+    ("Essex", "Newark"),
+    ("Essex", "Nowhere Twp"),           # unresolved
+    (None, "Newark"),
+    ("Essex", np.nan),
+]
+INT_COLS = [
+    "Total Injured", "Total Pedestrians Killed", "Total Injured Pedestrians",
+    "Total Vehicles", "Crash Fatality Count", "Total Killed",
+]
+STR_COLS = [
+    "Street Name", "Intersect Street Name", "Route Number", "Route Suffix", "SRI",
+    "Road System", "Road Character - Grade", "Road Surface Type", "Surface Condition",
+    "Light Condition", "Weather Condition", "Road Horizontal Alignment",
+    "First Harmful Event", "At Intersection", "Ramp", "Ramp Route Number",
+    "Crash Type", "State Police Station", "Alcohol Involved", "Hazmat Involved",
+]
+
+
+def _crashes(n: int = 5000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    pairs = [ PAIRS[i] for i in rng.integers(0, len(PAIRS), n) ]
+    df = pd.DataFrame({
+        "crash_id": [ f"C{i:06d}" for i in range(n) ],
+        "County": [ c for c, _ in pairs ],
+        "Municipality": [ m for _, m in pairs ],
+        "Case Number": rng.choice(["24-001", "X9", None], n),
+        "Date & Time of Crash": "2024-02-04T12:20:00.000",
+        "Fatal Crash Indicator": rng.choice(["Y", "N", None], n),
+        "Latitude": "40.7", "Longitude": "-74.1", "Milepost": rng.choice(["1.5", "", None], n),
+        **{ col: rng.choice(["0", "2", "1.0", "", "x", None], n) for col in INT_COLS },
+        **{ col: rng.choice(["Yes", "No", None], n) for col in STR_COLS },
+    })
+    df.index = pd.RangeIndex(100, 100 + n)
+    return df
+
+
+def test_map_distinct():
+    s = pd.Series(["a", None, "b", "a", np.nan, "b"])
+    calls = []
+    vals, codes = map_distinct(lambda v: calls.append(v) or str(v), s)
+    assert [ vals[c] for c in codes ] == ["a", "None", "b", "a", "None", "b"]
+    assert calls == ["a", None, "b"]
+
+
+def test_cc_mc_ints_severity():
+    df = _crashes()
+    out = to_njdot_schema(df, 2024, LOOKUP)
+    cc_mc = df.apply(lambda r: lookup_cc_mc(LOOKUP, r["County"], r["Municipality"]), axis=1)
+    pd.testing.assert_series_equal(out["cc"], cc_mc.apply(lambda x: x[0]).astype("Int8"), check_names=False)
+    pd.testing.assert_series_equal(out["mc"], cc_mc.apply(lambda x: x[1]).astype("Int16"), check_names=False)
+    assert out["cc"].isna().any() and out["cc"].notna().any()
+
+    ti = df["Total Injured"].apply(to_int)
+    for col, name in [("Total Injured", "ti"), ("Total Pedestrians Killed", "pk"), ("Total Vehicles", "tv"), ("Crash Fatality Count", "tk"), ("Total Killed", "tk_broad")]:
+        pd.testing.assert_series_equal(out[name], df[col].apply(to_int).astype("int8"), check_names=False)
+    fatal_indicator = df["Fatal Crash Indicator"].astype("string").fillna("")
+    exp = pd.Series([ infer_severity(f, i) for f, i in zip(fatal_indicator, ti) ], index=df.index, dtype="string")
+    pd.testing.assert_series_equal(out["severity"], exp, check_names=False)
+
+
+def test_crash_pk_index():
+    df = _crashes(seed=1)
+    cc_mc = df.apply(lambda r: lookup_cc_mc(LOOKUP, r["County"], r["Municipality"]), axis=1)
+    exp = pd.DataFrame({
+        "crash_id": df["crash_id"],
+        "cc": cc_mc.apply(lambda x: x[0]),
+        "mc": cc_mc.apply(lambda x: x[1]),
+        "case": df["Case Number"].astype(str),
+    }).set_index("crash_id")
+    pk = crash_pk_index(df, LOOKUP)
+    pd.testing.assert_frame_equal(pk, exp)
+
+    # All pairs resolvable → int64 codes, as the per-row `apply` gave.
+    ok = df[df["County"].eq("Hudson")]
+    assert crash_pk_index(ok, LOOKUP)["cc"].dtype == "int64"
+
+    persons = pd.DataFrame({ "crash_id": df["crash_id"].sample(frac=2, replace=True, random_state=0).to_numpy() })
+    pd.testing.assert_frame_equal(persons.join(pk, on="crash_id"), persons.join(exp, on="crash_id"))
+
+
+def test_departure():
+    removed = pd.Series(["None", "Unknown", "", None, "Left Scene", "Joe's Towing", "Driven by owner"] * 50)
+    vals, codes = map_distinct(map_departure, removed)
+    act = pd.Series(vals, dtype=object).take(codes).set_axis(removed.index).astype("Int8")
+    pd.testing.assert_series_equal(act, removed.apply(map_departure).astype("Int8"))
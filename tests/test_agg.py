@@ -0,0 +1,63 @@
+"""`njdot agg`'s single-scan rollup lattice writes the same parquet bytes as
+one direct `aggregate` groupby per config."""
+import io
+
+import numpy as np
+import pandas as pd
+
+from njdot.agg import AGG_CONFIGS, HAS_COLS, MEASURES, VD_COLS, VEP_COLS, VTC_COLS, aggregate, aggregate_lattice
+
+
+def _crashes(n=30_000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'year': rng.integers(2001, 2026, n),
+        # Null keys in every dim: rows dropped from groupings that use the
+        # dim, kept by those that don't.
+        'month': np.where(rng.random(n) < .01, np.nan, rng.integers(1, 13, n)),
+        'cc': np.where(rng.random(n) < .01, np.nan, rng.integers(1, 22, n)),
+        'mc': pd.array(np.where(rng.random(n) < .01, None, rng.integers(1, 40, n)), dtype='Int16'),
+        'severity': np.where(rng.random(n) < .01, None, rng.choice(['f', 'i', 'p'], n)),
+        'n': 1,
+        'tk': np.where(rng.random(n) < .3, np.nan, rng.integers(0, 2, n)),
+        'ti': rng.integers(0, 4, n).astype(float),
+        'pk': rng.integers(0, 2, n).astype(float),
+        'pi': rng.integers(0, 2, n).astype(float),
+        'tv': rng.integers(0, 300, n).astype(float),
+    })
+    for i, c in enumerate(VTC_COLS):
+        # Some VTC columns all-zero (dropped from outputs); int32, like the
+        # legacy O/P join produces.
+        df[c] = (rng.integers(0, 3, n) if i % 4 else np.zeros(n, dtype=int)).astype('int32')
+    for c in VD_COLS:
+        df[c] = rng.integers(0, 3, n).astype('int32')
+    for c in VEP_COLS:
+        df[c] = rng.integers(0, 3, n)
+    for c in HAS_COLS:
+        df[c] = (rng.random(n) < .5).astype('int8')
+    return df
+
+
+def _bytes(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False, compression='snappy')
+    return buf.getvalue()
+
+
+def test_lattice_matches_direct_aggregate():
+    df = _crashes()
+    assert set(MEASURES) <= set(df.columns)
+    out = aggregate_lattice(df, AGG_CONFIGS)
+    assert list(out) == list(AGG_CONFIGS)
+    for name, dims in AGG_CONFIGS.items():
+        direct = aggregate(df, dims)
+        pd.testing.assert_frame_equal(out[name], direct)
+        assert _bytes(out[name]) == _bytes(direct), name
+
+
+def test_lattice_subset_and_order():
+    df = _crashes(5_000)
+    configs = {'ys': AGG_CONFIGS['ys'], 'sy': ['s', 'y'], 'yccs': AGG_CONFIGS['yccs']}
+    out = aggregate_lattice(df, configs)
+    for name, dims in configs.items():
+        assert _bytes(out[name]) == _bytes(aggregate(df, dims)), name
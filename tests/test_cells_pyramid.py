@@ -0,0 +1,65 @@
+"""Streamed (per-raw-shard) H3 pyramid build == whole-index build.
+
+`cells pyramid` builds each raw r4 shard independently (`_raw_units` /
+`_run_pyramid_units`); these pin that the per-shard output files are
+byte-identical to building every level from the concatenated, `dt`-sorted
+raw index (the pre-streaming path).
+"""
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from h3.api import numpy_int as h3i
+
+from njdot.cli.cells import (
+    _build_pyramid_level,
+    _pyramid_keep_cols,
+    _raw_units,
+    _run_pyramid_units,
+)
+
+from conftest import BASE_RES
+
+LEVELS = (6, 8, 9)
+
+
+def _whole_index(raw_dir: Path, out: Path, shard_res: int):
+    paths = sorted(raw_dir.glob('*.parquet'))
+    base = pd.concat([pd.read_parquet(p, columns=_pyramid_keep_cols(BASE_RES)) for p in paths], ignore_index=True)
+    base = base.sort_values('dt', ascending=False, kind='mergesort')
+    for lv in LEVELS:
+        _build_pyramid_level(base, f'h3_r{BASE_RES}', lv, shard_res, 3, out / f'r{lv}', row_group_size=256)
+
+
+def _file_bytes(root: Path) -> dict[str, bytes]:
+    return {str(p.relative_to(root)): p.read_bytes() for p in sorted(root.rglob('*.parquet'))}
+
+
+@pytest.mark.parametrize('shard_res,n_jobs', [(4, 1), (4, 2), (3, 1)])
+def test_streamed_pyramid_matches_whole_index(raw_dir, tmp_path, shard_res, n_jobs):
+    paths = sorted(raw_dir.glob('*.parquet'))
+    assert len(paths) > 1
+    units = _raw_units(paths, shard_res)
+    assert sorted(p for u in units for p in u) == paths
+
+    expected = tmp_path / 'whole'
+    _whole_index(raw_dir, expected, shard_res)
+
+    streamed = tmp_path / 'streamed'
+    targets = [(lv, shard_res, f'r{lv}', 256) for lv in LEVELS]
+    totals = _run_pyramid_units(units, BASE_RES, targets, 3, streamed, None, n_jobs)
+
+    exp = _file_bytes(expected)
+    assert exp
+    assert _file_bytes(streamed) == exp
+    for lv in LEVELS:
+        n = sum(len(pd.read_parquet(expected / f'r{lv}' / p.name)) for p in (expected / f'r{lv}').glob('*.parquet'))
+        assert totals[f'r{lv}'] == n
+
+
+def test_raw_units_group_at_coarser_shard_res(raw_dir):
+    paths = sorted(raw_dir.glob('*.parquet'))
+    units = _raw_units(paths, 2)
+    parents = [{h3i.cell_to_parent(h3i.str_to_int(p.stem), 2) for p in u} for u in units]
+    assert all(len(ps) == 1 for ps in parents)
+    assert len({next(iter(ps)) for ps in parents}) == len(units)
@@ -0,0 +1,134 @@
+"""`njdot.cells_query` (Python reference for the worker's `/v1/cells`).
+
+Pins the `h3-range.ts` port against h3 itself, the pyramid path's answers
+against a brute-force aggregation of the raw crashes, and that row-group
+pruning actually skips row groups for a viewport-sized request.
+"""
+from pathlib import Path
+
+import h3
+import pandas as pd
+import pytest
+from h3.api import numpy_int as h3i
+
+from njdot.cells_query import CellsQuery, CellsRequest, descendant_range, merge_ranges
+from njdot.cli.cells import _raw_units, _run_pyramid_units
+
+from conftest import BASE_RES
+
+LEVELS = (6, 7, 8)
+
+
+@pytest.fixture
+def cells_root(raw_dir: Path) -> Path:
+    root = raw_dir.parent.parent
+    targets = [(lv, 4, f'r{lv}', 16) for lv in LEVELS]
+    _run_pyramid_units(_raw_units(sorted(raw_dir.glob('*.parquet')), 4), BASE_RES, targets, 3, root / 'pyramid', None, 1)
+    return root
+
+
+def _raw(root: Path) -> pd.DataFrame:
+    return pd.concat([pd.read_parquet(p) for p in sorted((root / 'raw' / f'h3_r{BASE_RES}').glob('*.parquet'))])
+
+
+def _busiest(raw: pd.DataFrame, res: int) -> str:
+    parents = [h3i.cell_to_parent(int(c), res) for c in raw[f'h3_r{BASE_RES}']]
+    return h3.int_to_str(int(pd.Series(parents).value_counts().index[0]))
+
+
+def _brute(raw: pd.DataFrame, cover: str, res: int, years: tuple[int, int], sevs: str) -> dict[str, dict]:
+    """Expected cells, aggregated directly from per-crash rows."""
+    out: dict[str, dict] = {}
+    for row in raw.itertuples(index=False):
+        cell = h3.int_to_str(h3i.cell_to_parent(int(getattr(row, f'h3_r{BASE_RES}')), res))
+        if h3.cell_to_parent(cell, h3.get_resolution(cover)) != cover or not years[0] <= row.year <= years[1]:
+            continue
+        c = out.setdefault(cell, dict(n_fatal=0, n_inj_ped=0, n_inj_other=0, n_pdo=0, n_vehs=0, fatal_years=set()))
+        if 'f' in sevs and row.severity == 'f':
+            c['n_fatal'] += 1
+            c['fatal_years'].add(int(row.year))
+        if 'i' in sevs:
+            c['n_inj_ped'] += int(row.pi)
+            c['n_inj_other'] += int(row.ti - row.pi)
+        if 'p' in sevs and row.severity == 'p':
+            c['n_pdo'] += 1
+        c['n_vehs'] += int(row.tv)
+    return {
+        k: v for k, v in out.items()
+        if v['n_fatal'] or v['n_inj_ped'] or v['n_inj_other'] or v['n_pdo']
+    }
+
+
+def test_descendant_range_brackets_children():
+    cell = h3.latlng_to_cell(40.72, -74.04, 5)
+    for base in (7, 9):
+        lo, hi = descendant_range(h3.str_to_int(cell), 5, base)
+        kids = [h3.str_to_int(c) for c in h3.cell_to_children(cell, base)]
+        assert lo <= min(kids) and max(kids) <= hi
+        assert h3.is_valid_cell(h3.int_to_str(lo))
+        # Neighbours' descendants fall outside.
+        for nb in h3.grid_ring(cell, 1):
+            assert all(not lo <= h3.str_to_int(c) <= hi for c in h3.cell_to_children(nb, base))
+
+
+def test_merge_ranges():
+    assert merge_ranges([(5, 9), (1, 3), (4, 4), (12, 13)]) == [(1, 9), (12, 13)]
+
+
+def test_from_url():
+    req = CellsRequest.from_url('/v1/cells?cells=8428c09ffffffff&res=9&years=2018-2022&severities=fi&polygon=-74,40,-73,40,-73,41')
+    assert req.cells == ['8428c09ffffffff']
+    assert (req.res, req.years, req.severities) == (9, (2018, 2022), frozenset('fi'))
+    assert req.polygon == [(-74, 40), (-73, 40), (-73, 41)]
+    with pytest.raises(ValueError):
+        CellsRequest.from_url('cells=8428c09ffffffff&res=9&severity=x')
+
+
+@pytest.mark.parametrize('cover_res,res,sevs', [(4, 6, 'fip'), (6, 8, 'fi'), (5, 7, 'p')])
+def test_pyramid_matches_brute_force(cells_root, cover_res, res, sevs):
+    raw = _raw(cells_root)
+    cover = _busiest(raw, cover_res)
+    years = (2005, 2018)
+    req = CellsRequest(cells=[cover], res=res, years=years, severities=frozenset(sevs))
+    resp, stats = CellsQuery(cells_root).query(req)
+    assert stats.source == 'pyramid'
+    got = {
+        c['h3']: {**{k: c[k] for k in ('n_fatal', 'n_inj_ped', 'n_inj_other', 'n_pdo', 'n_vehs')}, 'fatal_years': set(c.get('fatal_years', []))}
+        for c in resp['cells']
+    }
+    assert got == _brute(raw, cover, res, years, sevs)
+    assert stats.bytes_read > 0
+
+
+def test_row_group_pruning(cells_root):
+    raw = _raw(cells_root)
+    cover = _busiest(raw, 7)
+    _, stats = CellsQuery(cells_root).query(CellsRequest(cells=[cover], res=8))
+    assert 0 < stats.row_groups < stats.row_groups_total
+
+
+def test_raw_fallback_matches_pyramid(cells_root):
+    raw = _raw(cells_root)
+    cover = _busiest(raw, 5)
+    req = CellsRequest(cells=[cover], res=7, years=(2010, 2020))
+    engine = CellsQuery(cells_root)
+    pyr, _ = engine.query(req)
+    engine.manifest['pyramid_levels'] = []
+    fallback, stats = engine.query(req)
+    assert stats.source == 'raw'
+    # Like the worker's `queryRaw`, the fallback returns whole r4 shards (no
+    # cover-range filter); within the cover it must agree with the pyramid.
+    in_cover = [c for c in fallback['cells'] if h3.cell_to_parent(c['h3'], 5) == cover]
+    key = lambda r: r['h3']
+    assert sorted(in_cover, key=key) == sorted(pyr['cells'], key=key)
+
+
+def test_max_cells_coarsens(cells_root):
+    raw = _raw(cells_root)
+    req = CellsRequest(cells=[_busiest(raw, 4)], res=8, max_cells=5)
+    resp, stats = CellsQuery(cells_root).query(req)
+    assert len(resp['cells']) <= 5 or resp['res'] == 5
+    assert resp['res'] < 8
+    full, _ = CellsQuery(cells_root).query(CellsRequest(cells=req.cells, res=8))
+    total = lambda cs: sum(c['n_pdo'] for c in cs)
+    assert total(resp['cells']) == total(full['cells'])
@@ -0,0 +1,98 @@
+"""`njdot.cells_tune` / `cells tune`: the client `pickCover` port, Pareto
+selection, and a tiny end-to-end tune that writes `pyramid_combos`."""
+import json
+
+import h3
+import numpy as np
+import pandas as pd
+from click.testing import CliRunner
+
+from njdot import cells_tune as ct
+from njdot.cli.cells import cells
+
+from conftest import BASE_RES
+
+
+def test_pick_res_matches_client_examples():
+    # Statewide view (z8, 1280×800) → r7; street-level (z15) → r12.
+    assert ct.pick_res(8, 40.2, 1280, 800) == 7
+    assert ct.pick_res(15, 40.2, 1280, 800) == 12
+    # Clamped to the client's pyramid envelope.
+    assert ct.pick_res(3, 40.2, 1280, 800) == ct.MIN_PYRAMID_RES
+    assert ct.pick_res(22, 40.2, 1280, 800) == ct.MAX_PYRAMID_RES
+
+
+def test_pick_cover_covers_viewport_within_root(raw_dir):
+    root = {p.stem for p in raw_dir.glob('*.parquet')}
+    bbox = ct.viewport_bbox(-74.45, 40.5, 13, 1280, 800)
+    cover = ct.pick_cover((6, 7, 8), bbox, root)
+    assert cover and len(cover) <= ct.COVER_MAX_SHARDS
+    assert {r for r, _ in cover} <= {6, 7, 8}
+    assert all(h3.get_resolution(c) == r for r, c in cover)
+    assert all(h3.cell_to_parent(c, ct.SHARD_ROOT_RES) in root for _, c in cover)
+    # Every in-NJ point of the viewport lands in some cover cell.
+    covered = set(c for _, c in cover)
+    rng = np.random.default_rng(0)
+    for lon, lat in zip(rng.uniform(bbox[0], bbox[2], 200), rng.uniform(bbox[1], bbox[3], 200)):
+        leaf = h3.latlng_to_cell(lat, lon, 8)
+        if h3.cell_to_parent(leaf, ct.SHARD_ROOT_RES) not in root:
+            continue
+        assert any(h3.cell_to_parent(leaf, r) in covered for r in (6, 7, 8))
+
+
+def test_cover_requests_batch_per_tier():
+    cover = [(6, f'86{i:013x}') for i in range(30)] + [(7, f'87{i:013x}') for i in range(3)]
+    reqs = ct.cover_requests(cover, 9)
+    assert [len(r.cells) for r in reqs] == [25, 5, 3]
+    assert all(r.labels == 'nums' for r in reqs)
+    assert ct.cover_requests(cover[:1], 12)[0].labels == 'full'
+
+
+def test_menu_candidates():
+    assert ct.menu_candidates(8) == [
+        (3,), (3, 4), (3, 4, 5), (4,), (4, 5), (4, 5, 6), (5,), (5, 6), (6,),
+    ]
+    assert ct.menu_candidates(3, depths=(2, 3, 4)) == [(0,), (0, 1), (1,)]
+
+
+def test_pareto_front():
+    df = pd.DataFrame({
+        'bytes': [10, 20, 5, 10, 30],
+        'objects': [5, 1, 9, 6, 1],
+    })
+    # Row 3 is dominated by row 0; row 4 by row 1.
+    assert ct.pareto_front(df, ['bytes', 'objects']).tolist() == [True, True, True, False, False]
+
+
+def test_tune_writes_pareto_best_combos(raw_dir):
+    out = raw_dir.parent.parent
+    runner = CliRunner()
+    r = runner.invoke(cells, ['manifest', '-b', str(BASE_RES), '-l', '6,7,8', '-o', str(out)], catch_exceptions=False)
+    assert r.exit_code == 0
+    runs_path = out / 'runs.csv'
+    r = runner.invoke(cells, [
+        'tune', '-b', str(BASE_RES), '-l', '6,7,8', '-o', str(out), '-s', '4', '-r', '16,256',
+        '-S', '', '-n', '4', '-z', '10:1', '-j', '1', '-w', '-O', str(runs_path),
+    ], catch_exceptions=False)
+    assert r.exit_code == 0, r.output
+    assert 'Recommended: cells pyramid -s 4 -r ' in r.output
+
+    layouts = {'s4_rg16', 's4_rg256'}
+    assert {p.name for p in (out / 'tune').iterdir()} == layouts
+    runs = pd.read_csv(runs_path)
+    assert set(runs['layout']) == layouts
+    assert (runs['requests'] > 0).all()
+    # Both layouts replay the same planned covers.
+    per_layout = runs.set_index(['layout', 'vp', 'menu'])['cover']
+    assert per_layout['s4_rg16'].equals(per_layout['s4_rg256'])
+
+    combos = json.loads((out / 'manifest.json').read_text())['pyramid_combos']
+    assert combos
+    assert {c['data_res'] for c in combos} <= set(runs['res'])
+    assert all(c['shard_res'] < c['data_res'] for c in combos)
+
+    # `cells manifest -c` re-applies the recommended menu.
+    spec = r.output.rsplit('cells manifest -c ', 1)[1].strip()
+    r = runner.invoke(cells, ['manifest', '-b', str(BASE_RES), '-l', '6,7,8', '-o', str(out), '-c', spec], catch_exceptions=False)
+    assert r.exit_code == 0
+    assert json.loads((out / 'manifest.json').read_text())['pyramid_combos'] == combos
@@ -0,0 +1,52 @@
+"""`njsp` / `njdot` / `rawdata --help` import none of `HEAVY_MODULES`, and every
+lazily-registered subcommand resolves to a command of that name."""
+import subprocess
+import sys
+
+import click
+import pytest
+
+from nj_crashes.utils.cli import LazyGroup
+from njdot.bench_cli_startup import ENTRY_POINTS, run_startup
+
+
+@pytest.mark.parametrize('entry_point', ENTRY_POINTS)
+def test_help_imports(entry_point):
+    res = run_startup(entry_point, ['--help'])
+    assert res.self_us, f"no `-X importtime` output from {entry_point}"
+    assert res.heavy == []
+
+
+def lazy_groups():
+    from njdot.cli.base import njdot
+    from njdot.cli.compute import compute
+    from njdot.rawdata.base import rawdata
+    from njdot.aashto import aashto
+    from njsp.cli.base import njsp
+    return [njsp, njdot, compute, rawdata, aashto]
+
+
+@pytest.mark.parametrize('group', lazy_groups(), ids=lambda g: g.name)
+def test_lazy_commands_resolve(group: LazyGroup):
+    ctx = click.Context(group)
+    for cmd_name, (spec, _) in group.lazy_commands.items():
+        try:
+            cmd = group.get_command(ctx, cmd_name)
+        except ModuleNotFoundError as e:
+            # Optional deps (`atproto`, `slack_sdk`, …) aren't installed everywhere
+            if e.name.split('.')[0] in { 'njsp', 'njdot', 'nj_crashes' }:
+                raise
+            continue
+        assert cmd is not None, f"{spec} didn't register `{cmd_name}`"
+        assert cmd.name == cmd_name
+
+
+def test_njdot_submodules_lazy():
+    """`import njdot` alone makes `njdot.paths` / `njdot.data` attribute access work (loading them on first use)."""
+    code = '\n'.join([
+        'import sys, njdot',
+        'assert "njdot.paths" not in sys.modules',
+        'print(njdot.paths.MC_PQT)',
+        'assert "njdot.paths" in sys.modules',
+    ])
+    subprocess.run([sys.executable, '-c', code], check=True, capture_output=True)
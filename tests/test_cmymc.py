@@ -0,0 +1,59 @@
+"""`cmymc`'s one-scan GROUPING SETS rollups + single-transaction SQLite write
+produce the same tables (schema, indices, rows) as the per-table
+`sum_idx_col` / `to_sql` cascade."""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from njdot.cmymc import CMYM_COLS, write_db, write_db_cascade
+
+
+def _frames() -> tuple[pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(0)
+    n = 5_000
+    keys = pd.DataFrame({
+        'cc': pd.array(rng.integers(1, 22, n), dtype='Int8'),
+        'mc': pd.array(rng.integers(1, 40, n), dtype='Int16'),
+        'y': rng.integers(2001, 2026, n).astype('int32'),
+        'm': pd.array(rng.integers(1, 13, n), dtype='Int8'),
+        'condition': rng.integers(1, 6, n).astype('int8'),
+    })
+    cmymc = keys.assign(**{
+        c: rng.integers(0, 50, n) for c in ('drivers', 'passengers', 'pedestrians', 'cyclists', 'num_crashes')
+    }).groupby(list(keys.columns)).sum()
+    v = keys[CMYM_COLS].assign(
+        hit_run=rng.random(n) < .1,
+        towed=rng.random(n) < .3,
+        disabled=rng.random(n) < .2,
+    )
+    cmymv = v.groupby(CMYM_COLS)[['hit_run', 'towed', 'disabled']].sum()
+    return cmymc, cmymv
+
+
+def _dump(path) -> tuple[dict, dict]:
+    con = sqlite3.connect(path)
+    schema = {
+        (typ, name): sql
+        for typ, name, sql in con.execute("SELECT type, name, sql FROM sqlite_master")
+    }
+    tbls = [name for typ, name in schema if typ == 'table']
+    rows = {t: con.execute(f'SELECT * FROM {t} ORDER BY rowid').fetchall() for t in tbls}
+    page_size = con.execute('pragma page_size').fetchone()
+    con.close()
+    return {**schema, 'page_size': page_size}, rows
+
+
+def test_write_db_matches_cascade(tmp_path):
+    cmymc, cmymv = _frames()
+    old = str(tmp_path / 'old.db')
+    new = str(tmp_path / 'new.db')
+    write_db_cascade(cmymc, cmymv, old)
+    write_db(cmymc, cmymv, new)
+    old_schema, old_rows = _dump(old)
+    new_schema, new_rows = _dump(new)
+    assert len(old_rows) == 12
+    # `to_sql` formats its own CREATE statements; compare modulo whitespace.
+    norm = lambda s: {k: ' '.join(v.split()) if isinstance(v, str) else v for k, v in s.items()}
+    assert norm(new_schema) == norm(old_schema)
+    assert new_rows == old_rows
@@ -0,0 +1,88 @@
+"""`njdot.compact`: master parquets written in narrow / dictionary / µs-timestamp
+storage dtypes read back (via the embedded schema manifest) equal to the frame
+that was written."""
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from njdot.bench_compact import synthetic_crashes, synthetic_vehicles
+from njdot.compact import METADATA_KEY, read_manifest, read_pqt, restore, write_pqt
+
+
+def edge_cases(n: int = 1000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'small': rng.integers(-100, 100, n),
+        'wide': rng.integers(0, 2 ** 40, n),
+        'nullable': pd.array(np.where(rng.random(n) < .3, None, rng.integers(0, 300, n)), dtype='Int64'),
+        'all_null': pd.array([None] * n, dtype='Int32'),
+        'halves': rng.integers(0, 100, n) / 2,
+        'precise': rng.random(n),
+        'nan_halves': np.where(rng.random(n) < .2, np.nan, rng.integers(0, 10, n) / 4),
+        'ns': pd.to_datetime(rng.integers(0, 10 ** 18, n)),
+        'us': pd.to_datetime(rng.integers(0, 10 ** 12, n) * 1000).astype('datetime64[ns]'),
+        'utc': pd.to_datetime(rng.integers(0, 10 ** 9, n), unit='s', utc=True),
+        'nat': pd.to_datetime(np.where(rng.random(n) < .5, None, '2020-01-01')).astype('datetime64[ns]'),
+        'codes': rng.choice(np.array(['a', 'b', None], dtype=object), n),
+        'unique': [ f'{i}' for i in range(n) ],
+        'string': pd.array(rng.choice(['x', 'y', None], n), dtype='string'),
+        'flag': rng.random(n) < .5,
+        'cat': pd.Categorical(rng.choice(['p', 'q'], n)),
+    })
+    df.index.name = 'id'
+    return df
+
+
+def test_edge_cases(tmp_path):
+    df = edge_cases()
+    path = str(tmp_path / 'edge.parquet')
+    manifest = write_pqt(df, path)
+    assert read_manifest(path) == manifest
+    storage = { col: spec['storage'] for col, spec in manifest['columns'].items() }
+    assert storage == {
+        **{ col: str(df[col].dtype) for col in df },
+        'small': 'int8',
+        'nullable': 'Int16',
+        'all_null': 'Int8',
+        'halves': 'float32',
+        'nan_halves': 'float32',
+        'us': 'datetime64[us]',
+        'utc': 'datetime64[us, UTC]',
+        'nat': 'datetime64[us]',
+    }
+    assert [ col for col, spec in manifest['columns'].items() if spec['dictionary'] ] == ['codes', 'string']
+
+    pd.testing.assert_frame_equal(read_pqt(path), df)
+    cols = ['codes', 'small', 'us']
+    pd.testing.assert_frame_equal(read_pqt(path, columns=cols), df[cols])
+    filtered = read_pqt(path, columns=cols, filters=[('small', '>=', 0)])
+    # The index is stored as a column, so filtered reads keep row ids.
+    pd.testing.assert_frame_equal(filtered, df.loc[df.small >= 0, cols])
+
+    compact = read_pqt(path, compact=True)
+    assert compact['small'].dtype == 'int8'
+    assert isinstance(compact['codes'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(restore(compact, manifest), df)
+
+
+def test_masters(tmp_path):
+    for name, df in [ ('crashes', synthetic_crashes(20_000)), ('vehicles', synthetic_vehicles(40_000)) ]:
+        plain = tmp_path / f'{name}.plain.parquet'
+        path = str(tmp_path / f'{name}.parquet')
+        df.to_parquet(plain)
+        write_pqt(df, path)
+        pd.testing.assert_frame_equal(read_pqt(path), df)
+        # Plain readers see the same values, in narrower dtypes.
+        pd.testing.assert_frame_equal(pd.read_parquet(path), df, check_dtype=False)
+        assert pq.ParquetFile(path).metadata.row_group(0).column(0).compression == 'ZSTD'
+        compact = read_pqt(path, compact=True)
+        assert compact.memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum() / 3
+
+
+def test_no_manifest(tmp_path):
+    df = edge_cases(100)
+    path = str(tmp_path / 'plain.parquet')
+    df.to_parquet(path)
+    assert METADATA_KEY not in pq.read_schema(path).metadata
+    assert read_manifest(path) is None
+    pd.testing.assert_frame_equal(read_pqt(path), pd.read_parquet(path))
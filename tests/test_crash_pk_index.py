@@ -0,0 +1,75 @@
+"""`njdot.crash_pk_index`: the memory-mapped `searchsorted` crash-PK lookups
+(`remap_crash_pks` + `normalize(..., index=)`) == the `crash_pk_mappings.parquet`
+and `crashes.load()` merges they replace, and the index is rebuilt only when
+`crashes.parquet`'s content changes."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from njdot import crash_pk_index as cpi, load
+from njdot.bench_crash_pk_index import synthetic_crashes, synthetic_rows, write_crashes
+from njdot.crash_pk_index import CrashPKIndex, load_crash_pk_index
+from njdot.load import normalize, remap_crash_pks
+
+
+@pytest.fixture
+def crashes_pqt(tmp_path, monkeypatch):
+    monkeypatch.setattr(load, 'DOT_DATA', str(tmp_path))
+    return write_crashes(synthetic_crashes(20_000), tmp_path)
+
+
+def _r_fn(path):
+    return lambda cols: pd.read_parquet(path, columns=cols)
+
+
+def test_matches_merges(crashes_pqt, tmp_path):
+    crashes = pd.read_parquet(crashes_pqt)
+    index = load_crash_pk_index(crashes_pqt, str(tmp_path / 'idx'))
+    assert isinstance(index.keys, np.memmap)
+
+    rows = synthetic_rows(crashes, 50_000)
+    exp = remap_crash_pks(rows.copy(), 'vehicles')
+    act = remap_crash_pks(rows.copy(), 'vehicles', index)
+    pd.testing.assert_frame_equal(act, exp)
+    assert (exp['cc'] != rows['cc']).sum() > 1000
+    assert (exp['mc'] == 9901).any()
+
+    for drop in (True, False):
+        exp_n = normalize(exp, 'crash_id', _r_fn(crashes_pqt), drop=drop)
+        act_n = normalize(act, 'crash_id', _r_fn(crashes_pqt), drop=drop, index=index)
+        pd.testing.assert_frame_equal(act_n, exp_n)
+    assert exp_n['crash_id'].isna().sum() > 500
+    assert exp_n['crash_id'].notna().sum() > 40_000
+
+
+def test_invalidation(crashes_pqt, tmp_path, monkeypatch):
+    dir = str(tmp_path / 'idx')
+    builds = []
+    build = cpi.build
+    monkeypatch.setattr(cpi, 'build', lambda *a, **kw: builds.append(a) or build(*a, **kw))
+
+    load_crash_pk_index(crashes_pqt, dir)
+    load_crash_pk_index(crashes_pqt, dir)
+    assert len(builds) == 1
+
+    # Same content, new mtime: rehashed, not rebuilt.
+    st = os.stat(crashes_pqt)
+    os.utime(crashes_pqt, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    load_crash_pk_index(crashes_pqt, dir)
+    assert len(builds) == 1
+
+    # New content: rebuilt, and lookups see the new crashes.
+    crashes = synthetic_crashes(5_000, seed=7)
+    crashes.to_parquet(crashes_pqt)
+    index = load_crash_pk_index(crashes_pqt, dir)
+    assert len(builds) == 2
+    fresh = CrashPKIndex.from_crashes(crashes)
+    np.testing.assert_array_equal(index.keys, fresh.keys)
+    np.testing.assert_array_equal(index.crash_id, fresh.crash_id)
+    # Rebuilds and meta refreshes stage in unique temp paths, cleaned up after
+    assert not [ name for name in os.listdir(tmp_path) if name.startswith('.') ]
+    assert sorted(os.listdir(dir)) == sorted([ *(f'{name}.npy' for name in cpi.ARRAYS), 'meta.json' ])
+
+    assert load_crash_pk_index(str(tmp_path / 'missing.parquet'), dir) is None
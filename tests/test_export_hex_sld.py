@@ -0,0 +1,98 @@
+"""`export_hex_sld._nearest_mp` / `_muni_county` against per-point
+reference loops (the pre-vectorization implementations)."""
+import json
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from shapely.geometry import Point, box, mapping, shape
+from shapely.strtree import STRtree
+
+from njdot.cli.export_hex_sld import CROSS_DIST_THRESHOLD, _muni_county, _nearest_mp
+
+
+def _centroids(rng, n=500):
+    return pd.DataFrame({
+        'h3': [f'c{i}' for i in range(n)],
+        'lat': rng.uniform(40.0, 40.02, n),
+        'lon': rng.uniform(-74.02, -74.0, n),
+    })
+
+
+def _mp(rng, n=400):
+    # A handful of SRIs, MPs a few tens of meters apart: plenty of cells
+    # both with and without a cross-street inside the threshold.
+    return pd.DataFrame({
+        'lat': rng.uniform(40.0, 40.02, n),
+        'lon': rng.uniform(-74.02, -74.0, n),
+        'SRI': rng.choice(['A', 'B', 'C', 'D'], n),
+        'SLD_NAME': rng.choice(['MAIN ST', 'BROAD ST', 'NJ 3', 'US 1'], n),
+        'MP': rng.uniform(0, 10, n).round(1),
+        'ROUTE_SUBT': rng.integers(1, 7, n),
+    })
+
+
+def _cross_idx_loop(centroids, mp):
+    tree = cKDTree(mp[['lon', 'lat']].values)
+    sris = mp['SRI'].values
+    _, idx = tree.query(centroids[['lon', 'lat']].values, k=1)
+    dists, idxs = tree.query(centroids[['lon', 'lat']].values, k=20)
+    out = np.full(len(centroids), -1)
+    for i in range(len(centroids)):
+        for j in range(20):
+            if dists[i, j] > CROSS_DIST_THRESHOLD:
+                break
+            if sris[idxs[i, j]] != sris[idx[i]]:
+                out[i] = idxs[i, j]
+                break
+    return idx, out
+
+
+def test_nearest_mp_matches_loop():
+    rng = np.random.default_rng(0)
+    centroids, mp = _centroids(rng), _mp(rng)
+    out = _nearest_mp(centroids, mp)
+    idx, cross = _cross_idx_loop(centroids, mp)
+    assert out['sri'].tolist() == mp['SRI'].values[idx].tolist()
+    assert out['mp'].tolist() == mp['MP'].values[idx].tolist()
+    has = cross >= 0
+    assert 0 < has.sum() < len(centroids)
+    assert out['cross_sri'].notna().tolist() == has.tolist()
+    assert out['cross_sri'][has].tolist() == mp['SRI'].values[cross[has]].tolist()
+    assert out['cross_mp'][has].tolist() == mp['MP'].values[cross[has]].tolist()
+
+
+def test_nearest_mp_fewer_mps_than_k():
+    rng = np.random.default_rng(1)
+    out = _nearest_mp(_centroids(rng, 20), _mp(rng, 5))
+    assert len(out) == 20 and out['sri'].notna().all()
+
+
+def test_muni_county_matches_loop(tmp_path):
+    rng = np.random.default_rng(2)
+    # A 4×4 grid of munis plus one overlapping polygon; some points fall
+    # outside every polygon.
+    feats = [
+        {'type': 'Feature', 'geometry': mapping(box(-74.02 + i * .004, 40.0 + j * .004, -74.016 + i * .004, 40.004 + j * .004)),
+         'properties': {'MUN_LABEL': f'M{i}{j}', 'COUNTY': f'county {i}'}}
+        for i in range(4) for j in range(4)
+    ]
+    feats.append({'type': 'Feature', 'geometry': mapping(box(-74.012, 40.002, -74.006, 40.008)),
+                  'properties': {'MUN': 'Overlap', 'COUNTY': 'X'}})
+    path = tmp_path / 'munis.geojson'
+    path.write_text(json.dumps({'type': 'FeatureCollection', 'features': feats}))
+    centroids = _centroids(rng)
+
+    polys = [shape(f['geometry']) for f in feats]
+    tree = STRtree(polys)
+    exp_mun, exp_county = [], []
+    for lon, lat in zip(centroids['lon'], centroids['lat']):
+        pt = Point(lon, lat)
+        hit = next((i for i in tree.query(pt) if polys[i].contains(pt)), None)
+        exp_mun.append('' if hit is None else feats[hit]['properties'].get('MUN_LABEL') or feats[hit]['properties']['MUN'])
+        exp_county.append('' if hit is None else feats[hit]['properties']['COUNTY'].title())
+
+    out = _muni_county(centroids, str(path))
+    assert out['mun'].tolist() == exp_mun
+    assert out['county'].tolist() == exp_county
+    assert '' in exp_mun and 'Overlap' in exp_mun
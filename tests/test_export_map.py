@@ -0,0 +1,149 @@
+"""`export_map_data` / `export_map_v2` shard emitters (one stable sort, then
+contiguous runs written from a thread pool; array-kernel `dt` years and H3
+parents) write the same bytes as the per-group filter / `apply` loops they
+replaced."""
+import h3
+import numpy as np
+import pandas as pd
+import pytest
+
+from njdot.bench_export_map import synthetic_crashes
+from njdot.cli.cells import _parent_int_col
+from njdot.cli import export_map_data, export_map_v2
+from njdot.cli.export_map_data import _build_base, _dt_year, _emit_shards, _h3_str_col, _top_road
+from njdot.cli.export_map_v2 import POINT_COLS_OUT, SHARD_RES, _add_h3_cols, _emit_hex, _emit_points, _hex_aggregate
+
+
+@pytest.fixture(scope="module")
+def base():
+    return _build_base(synthetic_crashes(4000), {"f", "i", "p"})
+
+
+def _files(d) -> dict:
+    return { p.relative_to(d).as_posix(): p.read_bytes() for p in sorted(d.rglob("*.parquet")) }
+
+
+def _ref_emit_shards(df, outdir):
+    (outdir / "by-year").mkdir(parents=True, exist_ok=True)
+    (outdir / "by-year-county").mkdir(parents=True, exist_ok=True)
+    per_year = {}
+    per_year_county = {}
+    df = df.copy()
+    df["_year"] = (pd.to_datetime(df["dt"] * 60, unit="s", utc=True)).dt.year
+    for y in sorted(df["_year"].unique().tolist()):
+        sub = df[df["_year"] == y].drop(columns=["_year"])
+        sub.to_parquet(outdir / "by-year" / f"{y}.parquet", row_group_size=20_000, index=False, compression="snappy")
+        per_year[int(y)] = len(sub)
+        for cc in sorted(sub["cc"].dropna().unique()):
+            sub_cc = sub[sub["cc"] == cc]
+            p = outdir / "by-year-county" / f"{y}-{int(cc):02d}.parquet"
+            sub_cc.to_parquet(p, row_group_size=5_000, index=False, compression="snappy")
+            per_year_county[f"{y}-{int(cc):02d}"] = len(sub_cc)
+    return {"per_year": per_year, "per_year_county": per_year_county}
+
+
+def _ref_add_h3_cols(df, resolutions):
+    for res in resolutions:
+        cells = [ h3.latlng_to_cell(float(la), float(lo), res) for la, lo in zip(df["lat"], df["lon"]) ]
+        df[f"h3_r{res}"] = pd.array(cells, dtype="string")
+    return df
+
+
+def _ref_emit_points(df, outdir, point_sevs):
+    pts_dir = outdir / "points"
+    pts_dir.mkdir(parents=True, exist_ok=True)
+    pts = df[df["severity"].isin(point_sevs)].copy()
+    pts = pts.sort_values(["h3_r5", "year", "h3_r9"], kind="mergesort")
+    counts = {}
+    for cell, sub in pts.groupby("h3_r5", sort=False):
+        out = sub[POINT_COLS_OUT]
+        out.to_parquet(pts_dir / f"{cell}.parquet", row_group_size=5_000, index=False, compression="snappy")
+        counts[str(cell)] = len(out)
+    return counts
+
+
+def _ref_top_road(df, keys):
+    return (
+        df.groupby(keys)["_road"]
+        .agg(lambda s: s.mode().iloc[0] if len(s.mode()) else "")
+        .reset_index()
+        .rename(columns={"_road": "top_route"})
+    )
+
+
+def test_top_road(monkeypatch, tmp_path):
+    rng = np.random.default_rng(0)
+    n = 3000
+    df = pd.DataFrame({
+        "h3": rng.choice(["a", "b", "c"], n),
+        "cc": pd.array(np.where(rng.random(n) < .1, None, rng.integers(1, 4, n)), dtype="Int8"),
+        # Few rows per bin and few road values → plenty of count ties.
+        "mc": rng.integers(0, 200, n),
+        "_road": pd.array(rng.choice(["ROUTE 9", "MAIN ST", "Route 1", "ELM"], n), dtype="string"),
+    })
+    keys = ["h3", "cc", "mc"]
+    exp = _ref_top_road(df, keys)
+    act = _top_road(df, keys)
+    merged = exp.merge(act, on=keys, how="outer", suffixes=("", "_act"), indicator=True)
+    assert (merged["_merge"] == "both").all()
+    assert (merged["top_route"] == merged["top_route_act"]).all()
+
+    base = _build_base(synthetic_crashes(3000, seed=1), {"f", "i", "p"})
+    export_map_data._emit_hex_aggregates(base, tmp_path / "act", resolutions=(7,))
+    v2 = _add_h3_cols(base.assign(year=_dt_year(base["dt"])), (7,))
+    act = _hex_aggregate(v2, 7)
+    monkeypatch.setattr(export_map_data, "_top_road", _ref_top_road)
+    monkeypatch.setattr(export_map_v2, "_top_road", _ref_top_road)
+    export_map_data._emit_hex_aggregates(base, tmp_path / "ref", resolutions=(7,))
+    assert _files(tmp_path / "act") == _files(tmp_path / "ref")
+    pd.testing.assert_frame_equal(act, _hex_aggregate(v2, 7))
+
+
+def test_kernels(base):
+    dt = base["dt"]
+    exp = pd.to_datetime(dt * 60, unit="s", utc=True).dt.year.astype("int16").to_numpy()
+    np.testing.assert_array_equal(_dt_year(dt), exp)
+    lat, lon = base["lat"].to_numpy(), base["lon"].to_numpy()
+    for res in (5, 9):
+        cells = _h3_str_col(lat, lon, res)
+        assert cells.tolist() == [ h3.latlng_to_cell(float(la), float(lo), res) for la, lo in zip(lat, lon) ]
+    ints = np.array([ h3.str_to_int(c) for c in cells ])
+    for res in range(SHARD_RES, 10):
+        assert _parent_int_col(ints, res).tolist() == [ h3.str_to_int(h3.cell_to_parent(c, res)) for c in cells ]
+    with pytest.raises(ValueError):
+        _parent_int_col(ints, 10)
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_emit_shards(base, tmp_path, jobs):
+    pts = base[base["severity"].isin({"f", "i"})].copy()
+    exp = _ref_emit_shards(pts, tmp_path / "ref")
+    act = _emit_shards(pts, tmp_path / "act", jobs=jobs)
+    assert act == exp
+    assert list(act["per_year_county"]) == list(exp["per_year_county"])
+    assert _files(tmp_path / "act") == _files(tmp_path / "ref")
+    assert len(_files(tmp_path / "ref")) > 50
+
+
+def test_v2(base, tmp_path):
+    base = base.assign(year=_dt_year(base["dt"]))
+    ref = _ref_add_h3_cols(base.copy(), (SHARD_RES, 6, 7, 8, 9))
+    act = _add_h3_cols(base.copy(), (SHARD_RES, 6, 7, 8, 9))
+    pd.testing.assert_frame_equal(act, ref)
+
+    (tmp_path / "ref").mkdir()
+    (tmp_path / "act").mkdir()
+    exp = _ref_emit_points(ref, tmp_path / "ref", {"f", "i"})
+    assert _emit_points(act, tmp_path / "act", {"f", "i"}, jobs=3) == exp
+    assert _files(tmp_path / "act") == _files(tmp_path / "ref")
+
+    counts = _emit_hex(act, tmp_path / "act", jobs=3)
+    # Per-shard hex files == the single file's rows grouped by (string) r5 parent.
+    for res in (7, 8, 9):
+        single = pd.read_parquet(tmp_path / "act" / f"hex-r{res}.parquet")
+        parents = single["h3"].map(lambda c: h3.cell_to_parent(c, SHARD_RES))
+        assert counts[f"r{res}"] == parents.value_counts().to_dict()
+        for cell, sub in single.groupby(parents, sort=False):
+            exp_bytes = tmp_path / "exp.parquet"
+            sub.to_parquet(exp_bytes, row_group_size=10_000, index=False, compression="snappy")
+            assert (tmp_path / "act" / f"hex-r{res}" / f"{cell}.parquet").read_bytes() == exp_bytes.read_bytes()
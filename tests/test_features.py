@@ -0,0 +1,148 @@
+"""Per-crash feature store (`njdot.features`): built from synthetic masters,
+it reproduces the joins its consumers used to compute themselves, and goes
+stale when an input changes."""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from njdot import agg, features, load
+from njdot.cli.export_map_data import _build_base
+
+KEYS = features.KEYS
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Legacy 2021-2023 masters + AASHTO 2023-2024 (superseding 2023)."""
+    rng = np.random.default_rng(0)
+    n = 600
+    year = np.repeat([2021, 2022, 2023], n // 3)
+    olat = rng.uniform(39.0, 41.2, n)
+    olat[rng.random(n) < .1] = 0  # out of NJ → falls back to ilat or none
+    ilat = np.where(rng.random(n) < .5, rng.uniform(39.0, 41.2, n), np.nan)
+    crashes = pd.DataFrame({
+        'year': year.astype('int16'),
+        'cc': rng.integers(1, 22, n).astype('int8'),
+        'mc': rng.integers(1, 40, n).astype('int8'),
+        'case': [f'L{i}' for i in rng.permutation(n)],
+        'dt': pd.to_datetime('2021-01-01') + pd.to_timedelta(rng.integers(0, 1000, n), unit='D'),
+        'severity': rng.choice(['f', 'i', 'p'], n),
+        **{c: rng.integers(0, 3, n).astype(float) for c in ('tk', 'ti', 'pk', 'pi', 'tv')},
+        'olat': olat, 'olon': rng.uniform(-75.4, -73.9, n),
+        'ilat': ilat, 'ilon': np.where(np.isnan(ilat), np.nan, rng.uniform(-75.4, -73.9, n)),
+        'road': 'MAIN ST', 'cross_street': '', 'route': '9', 'sri': '00000009__', 'mp': rng.uniform(0, 50, n),
+    })
+    m = 1500
+    occupants = pd.DataFrame({
+        'crash_id': rng.integers(0, n, m),
+        'pos': pd.array(rng.choice([0, 1, 2, 3], m), dtype='Int8'),
+        'condition': pd.array(np.where(rng.random(m) < .3, None, rng.integers(0, 6, m)), dtype='Int8'),
+    })
+    pedestrians = pd.DataFrame({
+        'crash_id': rng.integers(0, n, 100),
+        'cyclist': rng.random(100) < .3,
+        'condition': pd.array(rng.integers(1, 6, 100), dtype='Int8'),
+    })
+    vehicles = pd.DataFrame({
+        'crash_id': rng.integers(0, n, 900),
+        'damage': pd.array(np.where(rng.random(900) < .2, None, rng.integers(1, 5, 900)), dtype='Int8'),
+        'departure': pd.array(rng.integers(1, 7, 900), dtype='Int8'),
+    })
+    k = 300
+    aashto = crashes.sample(k, random_state=0).reset_index(drop=True)
+    aashto['year'] = np.repeat([2023, 2024], k // 2).astype('int16')
+    aashto['case'] = [f'A{i}' for i in range(k)]
+    aashto['cc'] = aashto['cc'].astype('Int8')
+    for c in agg.VTC_COLS:
+        aashto[c] = rng.integers(0, 2, k).astype('int16')
+
+    paths = {
+        'CRASHES_PQT': crashes,
+        'OCCUPANTS_PQT': occupants,
+        'PEDESTRIANS_PQT': pedestrians,
+        'VEHICLES_PQT': vehicles,
+        'AASHTO_SUPPLEMENTED_CRASHES': aashto,
+    }
+    for name, df in paths.items():
+        path = str(tmp_path / f'{name.lower()}.parquet')
+        df.to_parquet(path)
+        for mod in (features, load, agg):
+            monkeypatch.setattr(mod, name, path, raising=False)
+    for name in ('AASHTO_SUPPLEMENTED_VEHICLES', 'CRASHES_GEOCODE_BACKFILL'):
+        for mod in (features, load, agg):
+            monkeypatch.setattr(mod, name, str(tmp_path / f'{name.lower()}.parquet'), raising=False)
+    store = str(tmp_path / 'crash_features.parquet')
+    for mod in (features, agg):
+        monkeypatch.setattr(mod, 'CRASH_FEATURES_PQT', store)
+    return tmp_path
+
+
+def test_build_matches_direct_joins(data_dir):
+    df = features.build_features()
+    features.write_features(df)
+    assert features.features_current()
+    stored = features.load_features()
+    assert len(stored) == 600 - 200 + 300  # legacy 2023 superseded by AASHTO
+    assert stored[KEYS].equals(stored[KEYS].sort_values(KEYS, ignore_index=True))
+    assert set(stored.loc[stored['crash_id'].isna(), 'year']) == {2023, 2024}
+
+    # Legacy VTC / facets == the per-crash_id joins `agg` used to compute.
+    legacy = stored[stored['crash_id'].notna()].set_index(stored['crash_id'].dropna().astype('int64'))
+    vtc = agg.compute_legacy_vtc(Path(features.OCCUPANTS_PQT), Path(features.PEDESTRIANS_PQT))
+    exp = vtc.reindex(legacy.index, fill_value=0)
+    assert (legacy[agg.VTC_COLS].astype('int32') == exp).all().all()
+
+    # `_build_base` over the store == over the raw load (modulo row order).
+    raw = load.load_crashes_with_aashto(columns=features.BASE_COLS + features.GEOCODE_COLS)
+    exp = _build_base(raw, set()).sort_values('case', ignore_index=True)
+    act = _build_base(features.load_map_input(features.BASE_COLS + features.GEOCODE_COLS), set())
+    act = act.sort_values('case', ignore_index=True)
+    pd.testing.assert_frame_equal(act, exp, check_dtype=False)
+
+    # H3 ids only on geocoded rows.
+    assert stored[features.H3_COL].notna().equals(stored['lat'].notna())
+
+    # Year pushdown + legacy/AASHTO split.
+    assert set(features.load_features(['year'], years=[2022])['year']) == {2022}
+    assert features.load_features(['case'], legacy=False)['case'].str.startswith('A').all()
+
+
+def test_agg_reads_store(data_dir, capsys):
+    path = Path(agg.CRASHES_PQT)
+    aashto_input = Path(agg.AASHTO_SUPPLEMENTED_CRASHES)
+    exp = agg.load_crashes(path, enrich_legacy_vtc=True, enrich_legacy_vehicles=True, aashto_input=aashto_input)
+    features.write_features(features.build_features())
+    capsys.readouterr()
+    act = agg.load_crashes(path, enrich_legacy_vtc=True, enrich_legacy_vehicles=True, aashto_input=aashto_input)
+    out = capsys.readouterr().out
+    assert 'from' in out and 'crash_features.parquet' in out and 'Computing legacy' not in out
+    # Store omits superseded legacy years; compare the rest.
+    keep = exp['year'] < 2023
+    pd.testing.assert_frame_equal(act[keep], exp[keep])
+
+
+@pytest.mark.parametrize('aashto_input', [None, 'missing.parquet'])
+def test_agg_store_other_aashto(data_dir, capsys, aashto_input):
+    """With a different (here: absent) AASHTO input, legacy 2023 isn't superseded, and
+    its crashes (which the store lacks) are joined directly rather than zero-filled."""
+    path = Path(agg.CRASHES_PQT)
+    aashto_input = aashto_input and data_dir / aashto_input
+    exp = agg.load_crashes(path, enrich_legacy_vtc=True, enrich_legacy_vehicles=True, aashto_input=aashto_input)
+    features.write_features(features.build_features())
+    capsys.readouterr()
+    act = agg.load_crashes(path, enrich_legacy_vtc=True, enrich_legacy_vehicles=True, aashto_input=aashto_input)
+    out = capsys.readouterr().out
+    assert 'crash_features.parquet' in out and '200 crashes to join directly' in out
+    pd.testing.assert_frame_equal(act, exp)
+    assert exp.loc[exp['year'] == 2023, agg.VTC_COLS].values.sum() > 0
+
+
+def test_stale_when_input_changes(data_dir):
+    features.write_features(features.build_features())
+    assert features.features_current()
+    st = os.stat(features.VEHICLES_PQT)
+    os.utime(features.VEHICLES_PQT, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert not features.features_current()
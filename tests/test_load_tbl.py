@@ -0,0 +1,68 @@
+"""`load_tbl`'s `years` / `cc` / `county` / `cols` reads of `write_master`-written
+(sorted, row-grouped) master parquets: pushed down as pyarrow filters (`crash_id`
+ranges, for the V/O/P/D masters), equal to filtering the full table in pandas."""
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from njdot.bench_compact import synthetic_crashes
+from njdot.bench_load_tbl import filter_full, synthetic_vehicles
+from njdot.load import load_tbl, pushdown_filters, sort_master, write_master
+
+
+@pytest.fixture(scope='module')
+def root(tmp_path_factory):
+    root = tmp_path_factory.mktemp('masters')
+    crashes = sort_master(synthetic_crashes(20_000)).reset_index(drop=True)
+    crashes.index.name = 'id'
+    write_master(crashes, str(root / 'crashes.parquet'), row_group_size=500)
+    write_master(synthetic_vehicles(crashes).sample(frac=1, random_state=0), str(root / 'vehicles.parquet'), row_group_size=1000)
+    return root
+
+
+def test_layout(root):
+    pf = pq.ParquetFile(root / 'crashes.parquet')
+    assert pf.metadata.num_row_groups == 40
+    df = pf.read(columns=['year', 'cc', 'mc']).to_pandas()
+    assert df.equals(df.sort_values(['year', 'cc', 'mc']))
+    stats = pf.metadata.row_group(0).column(pf.schema_arrow.get_field_index('year')).statistics
+    assert stats.has_min_max
+    v = pq.read_table(root / 'vehicles.parquet', columns=['crash_id']).column(0).to_pandas()
+    assert v.is_monotonic_increasing
+
+
+@pytest.mark.parametrize('tbl', ['crashes', 'vehicles'])
+@pytest.mark.parametrize('years, ccs', [
+    ([2010], None),
+    (None, [9]),
+    ([2005, 2019], [9, 2]),
+    ([1999], None),
+])
+def test_pushdown(root, tbl, years, ccs):
+    exp = filter_full(tbl, root, years, ccs)
+    act = load_tbl(tbl, years=years, cc=ccs, read_pqt=True, pqt_path=str(root / f'{tbl}.parquet'))
+    pd.testing.assert_frame_equal(act, exp)
+    filters = pushdown_filters(str(root / f'{tbl}.parquet'), years, ccs)
+    assert filters is not None
+    if tbl == 'vehicles' and years == [2010]:
+        # One year of crashes is one run of crash ids.
+        assert len(filters) == 1
+
+
+def test_county_cols(root):
+    path = str(root / 'crashes.parquet')
+    exp = filter_full('crashes', root, [2012], [9])[['severity', 'tk']]
+    act = load_tbl('crashes', years='2012', county='Hudson', cols=['severity', 'tk'], read_pqt=True, pqt_path=path)
+    pd.testing.assert_frame_equal(act, exp)
+    assert load_tbl('crashes', county='Hudson', cc=2, read_pqt=True, pqt_path=path).empty
+
+
+def test_range_index_fallback(tmp_path):
+    """Files whose index is `RangeIndex` metadata are filtered after loading (a
+    filtered read would renumber them)."""
+    df = synthetic_crashes(5_000)
+    path = str(tmp_path / 'crashes.parquet')
+    df.to_parquet(path)
+    assert pushdown_filters(path, [2010], None) is not None
+    act = load_tbl('crashes', years=2010, read_pqt=True, pqt_path=path)
+    pd.testing.assert_frame_equal(act, df[df.year == 2010])
@@ -0,0 +1,91 @@
+"""`njdot.merge_dupes`' columnar dedup (vectorized case classification,
+shift-paired ucase/tcase groups, `transform`-broadcast fills) == the per-row
+`classify_case` / per-group `merge_ucase_tcase` loop it replaced."""
+import numpy as np
+import pandas as pd
+
+from njdot.merge_dupes import classify_case, classify_cases, merge_duplicates, merge_ucase_tcase
+
+PK = ['cc', 'mc_dot', 'case']
+TEXT = ['pdn', 'road', 'cross_street']
+FILL = ['sri', 'mp', 'cross_street', 'Direction From Cross Street']
+
+
+def _reference(df: pd.DataFrame) -> pd.DataFrame:
+    dupe_mask = df.duplicated(PK, keep=False)
+    dupes = df[dupe_mask].copy()
+    dupes['_case_class'] = dupes.apply(lambda r: classify_case(r, TEXT), axis=1)
+    merged_records = []
+    for _, group in dupes.groupby(PK, sort=False):
+        merged = group.iloc[-1]
+        if len(group) == 2:
+            r1, r2 = group.iloc[0], group.iloc[1]
+            if sorted([r1['_case_class'], r2['_case_class']]) == ['tcase', 'ucase']:
+                ucase, tcase = (r1, r2) if r1['_case_class'] == 'ucase' else (r2, r1)
+                merged = merge_ucase_tcase(ucase, tcase, fillable_fields=FILL)
+        merged_records.append(merged.drop('_case_class'))
+    merged_df = pd.DataFrame(merged_records)
+    for col in merged_df.columns:
+        merged_df[col] = merged_df[col].astype(df[col].dtype)
+    result = pd.concat([df[~dupe_mask], merged_df]).sort_index()
+    result.index.name = df.index.name
+    return result
+
+
+def _crashes(n: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """Crash rows whose keys repeat 1-4×, with UPPER / Title / lower / numeric /
+    blank / null text, so every classification and fill branch is hit."""
+    rng = np.random.default_rng(seed)
+    texts = np.array(['Main St', 'Rt 1', 'Jersey City PD', '123', '', '  ', None], dtype=object)
+    # Mostly-UPPER or mostly-Title rows (ucase/tcase versions of a crash), some mixed.
+    style = rng.choice(['upper', 'title', 'lower'], n, p=[.45, .45, .1])
+    def text(m):
+        vals = rng.choice(texts, m)
+        upper = (style == 'upper') ^ (rng.random(m) < .15)
+        lower = style == 'lower'
+        return np.array([
+            v.upper() if isinstance(v, str) and u else v.lower() if isinstance(v, str) and l else v
+            for v, u, l in zip(vals, upper, lower)
+        ], dtype=object)
+    keys = rng.integers(0, int(n * .6), n)
+    df = pd.DataFrame({
+        'cc': (keys % 21 + 1).astype('int8'),
+        'mc_dot': (keys // 21 % 40 + 1).astype('int8'),
+        'case': [f'{k:06d}' for k in keys],
+        'dt': pd.to_datetime(rng.integers(0, 365, n), unit='D').tz_localize('US/Eastern'),
+        'pdn': text(n),
+        'road': text(n),
+        'cross_street': text(n),
+        'Direction From Cross Street': rng.choice(np.array(['N', 'S', '', None], dtype=object), n),
+        'sri': rng.choice(np.array(['00000001__', ' ', None], dtype=object), n),
+        'mp': np.where(rng.random(n) < .4, np.nan, rng.uniform(0, 50, n).round(2)),
+        'tk': pd.array(np.where(rng.random(n) < .1, None, rng.integers(0, 3, n)), dtype='Int8'),
+    })
+    df.index = pd.Index(rng.permutation(n), name='id')
+    return df
+
+
+def test_classify_cases():
+    df = _crashes()
+    exp = df.apply(lambda r: classify_case(r, TEXT), axis=1)
+    pd.testing.assert_series_equal(classify_cases(df, TEXT), exp)
+    assert set(exp) == {'ucase', 'tcase', 'neither'}
+
+
+def test_merge_matches_rowwise():
+    df = _crashes()
+    exp = _reference(df)
+    act = merge_duplicates(df, PK, text_fields=TEXT, fillable_fields=FILL)
+    pd.testing.assert_frame_equal(act, exp)
+    assert not act.duplicated(PK).any()
+
+
+def test_string_dtype_and_no_dupes():
+    df = _crashes(seed=1)
+    df[TEXT] = df[TEXT].astype('string')
+    pd.testing.assert_frame_equal(
+        merge_duplicates(df, PK, text_fields=TEXT, fillable_fields=FILL),
+        _reference(df),
+    )
+    uniq = df.drop_duplicates(PK)
+    assert merge_duplicates(uniq, PK, text_fields=TEXT) is uniq
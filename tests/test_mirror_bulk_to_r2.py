@@ -0,0 +1,187 @@
+"""`scripts/mirror_bulk_to_r2.py`'s mirror engine against an in-memory S3
+stand-in: one LIST (no per-blob HEADs) answers existence checks, copies run on
+a worker pool, and large blobs stream through bounded multipart parts."""
+import importlib.util
+import threading
+from collections import Counter
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("tqdm")
+
+SCRIPT = Path(__file__).parent.parent / "scripts" / "mirror_bulk_to_r2.py"
+spec = importlib.util.spec_from_file_location("mirror_bulk_to_r2", SCRIPT)
+m = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(m)
+
+BUCKET = "nj-crashes"
+
+
+class Body:
+    """Streaming-body stand-in; records the largest single `read`."""
+    def __init__(self, data: bytes, reads: list[int]):
+        self.io = BytesIO(data)
+        self.reads = reads
+
+    def read(self, n: int = -1) -> bytes:
+        # Like a socket, return short reads sometimes.
+        chunk = self.io.read(n if n < 0 else max(1, n - 7))
+        self.reads.append(len(chunk))
+        return chunk
+
+
+class FakeS3:
+    """The subset of a boto3 S3 client the mirror uses, backed by a dict."""
+    def __init__(self, objects: dict[str, bytes] | None = None, page_size: int = 2):
+        self.objects = dict(objects or {})
+        self.page_size = page_size
+        self.calls = Counter()
+        self.reads: list[int] = []
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.fail: set[str] = set()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def _call(self, name):
+        with self.lock:
+            self.calls[name] += 1
+
+    def head_object(self, Bucket, Key):
+        self._call("head_object")
+        raise AssertionError("HEAD per key")
+
+    def get_paginator(self, name):
+        assert name == "list_objects_v2"
+        fake = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                keys = sorted(k for k in fake.objects if k.startswith(Prefix))
+                for i in range(0, max(len(keys), 1), fake.page_size):
+                    fake._call("list_objects_v2")
+                    page = keys[i:i + fake.page_size]
+                    yield {"Contents": [{"Key": k, "Size": len(fake.objects[k])} for k in page]} if page else {}
+        return Paginator()
+
+    def get_object(self, Bucket, Key):
+        self._call("get_object")
+        if Key in self.fail:
+            raise RuntimeError(f"{Key}: 500")
+        return {"Body": Body(self.objects[Key], self.reads)}
+
+    def put_object(self, Bucket, Key, Body, ContentLength):
+        self._call("put_object")
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        threading.Event().wait(.05)
+        with self.lock:
+            self.active -= 1
+        assert len(Body) == ContentLength
+        self.objects[Key] = Body
+
+    def create_multipart_upload(self, Bucket, Key):
+        self._call("create_multipart_upload")
+        self.uploads[Key] = {}
+        return {"UploadId": Key}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._call("upload_part")
+        self.uploads[UploadId][PartNumber] = Body
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self._call("complete_multipart_upload")
+        parts = self.uploads.pop(UploadId)
+        nums = [p["PartNumber"] for p in MultipartUpload["Parts"]]
+        assert nums == sorted(parts)
+        sizes = [len(parts[n]) for n in nums]
+        assert all(s == sizes[0] for s in sizes[:-1])
+        self.objects[Key] = b"".join(parts[n] for n in nums)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self._call("abort_multipart_upload")
+        self.uploads.pop(UploadId)
+
+
+def _job(i: int, data: bytes) -> tuple[m.Job, str]:
+    md5 = f"{i:032x}"
+    src = f".dvc/files/md5/{md5[:2]}/{md5[2:]}"
+    path = Path(f"njdot/data/2023/NewJersey2023Accidents{i}.zip")
+    return m.Job(Path(f"{path}.dvc"), md5, len(data), src, f"raw/{path}"), src
+
+
+@pytest.fixture
+def blobs():
+    sizes = [100, 3000, 250_000, 40, 1_000_000, 0, 7]
+    return [bytes([i]) * n for i, n in enumerate(sizes)]
+
+
+def test_mirror(blobs):
+    jobs, srcs = zip(*(_job(i, b) for i, b in enumerate(blobs)))
+    s3 = FakeS3(dict(zip(srcs, blobs)))
+    r2 = FakeS3({
+        jobs[0].dst_key: blobs[0],            # already mirrored
+        jobs[1].dst_key: b"truncated",        # wrong size → recopied
+        "raw/njdot/data/2022/other.zip": b"x",
+    })
+    results, failures = m.mirror(list(jobs), s3, r2, BUCKET, workers=4, chunk_size=64 * 1024, multipart_threshold=200_000)
+    assert not failures
+    for j, b in zip(jobs, blobs):
+        assert r2.objects[j.dst_key] == b
+    assert {r.job.dst_key for r in results if not r.uploaded} == {jobs[0].dst_key}
+    assert all(r.elapsed > 0 and r.mib_per_s > 0 for r in results if r.uploaded and r.job.size)
+
+    assert r2.calls["head_object"] == 0
+    # One LIST page: only the 2 keys under the jobs' common prefix, not `2022/other.zip`.
+    assert r2.calls["list_objects_v2"] == 1
+    assert r2.calls["create_multipart_upload"] == r2.calls["complete_multipart_upload"] == 2
+    assert r2.calls["upload_part"] == -(-250_000 // 65536) + -(-1_000_000 // 65536)
+    assert r2.calls["put_object"] == 4
+    assert r2.max_active > 1
+    # Large blobs were never read whole.
+    assert max(s3.reads) < 200_000
+
+    # Everything's mirrored now: a rerun copies nothing.
+    s3.calls.clear()
+    results, _ = m.mirror(list(jobs), s3, r2, BUCKET)
+    assert not any(r.uploaded for r in results)
+    assert not s3.calls
+
+
+def test_failures(blobs):
+    jobs, srcs = zip(*(_job(i, b) for i, b in enumerate(blobs)))
+    s3 = FakeS3(dict(zip(srcs, blobs)))
+    s3.fail = {jobs[2].src_key}
+    # Multipart with a size mismatch is aborted, not completed.
+    s3.objects[jobs[4].src_key] = blobs[4][:-1]
+    r2 = FakeS3()
+    results, failures = m.mirror(list(jobs), s3, r2, BUCKET, force=True, chunk_size=64 * 1024, multipart_threshold=200_000)
+    assert {j.dst_key for j, _ in failures} == {jobs[2].dst_key, jobs[4].dst_key}
+    assert len(results) == len(jobs) - 2
+    assert r2.calls["abort_multipart_upload"] == 1
+    assert r2.calls["list_objects_v2"] == 0
+    assert jobs[4].dst_key not in r2.objects and not r2.uploads
+
+
+def test_abort_failure_keeps_original_error(blobs):
+    job, src = _job(4, blobs[4])
+    s3 = FakeS3({src: blobs[4][:-1]})
+    r2 = FakeS3()
+
+    def abort(Bucket, Key, UploadId):
+        raise ConnectionError("abort failed")
+    r2.abort_multipart_upload = abort
+    with pytest.raises(RuntimeError, match="size mismatch"):
+        m.copy_blob(s3, r2, BUCKET, job, chunk_size=64 * 1024, multipart_threshold=200_000)
+
+
+def test_chunk_mb_min():
+    from click.testing import CliRunner
+    res = CliRunner().invoke(m.main, ["-n", "-c", "4"])
+    assert res.exit_code == 2
+    assert "--chunk-mb" in res.output
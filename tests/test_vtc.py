@@ -0,0 +1,66 @@
+"""`njdot.vtc`'s lookup + `np.bincount` kernel == the per-row `.apply` / string
+concat / `unstack` VTC matrix it replaced."""
+import numpy as np
+import pandas as pd
+
+from njdot.vtc import CONDITION_MAP, VTC_COLS, person_vtc
+
+
+def _pos_to_vt(pos):
+    if pd.isna(pos) or pos == 0:
+        return 'u'
+    return 'd' if pos == 1 else 'o'
+
+
+def _reference(o: pd.DataFrame, p: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    o = o.copy()
+    o['vtc'] = o['pos'].apply(_pos_to_vt) + o['condition'].map(CONDITION_MAP).fillna('n')
+    p = p.copy()
+    p['vtc'] = p['cyclist'].apply(lambda b: 'b' if b else 'p') + p['condition'].map(CONDITION_MAP).fillna('n')
+    o_agg = o.groupby(keys + ['vtc']).size().unstack(fill_value=0)
+    p_agg = p.groupby(keys + ['vtc']).size().unstack(fill_value=0)
+    combined = o_agg.add(p_agg, fill_value=0)
+    for col in VTC_COLS:
+        if col not in combined.columns:
+            combined[col] = 0
+    return combined[VTC_COLS].fillna(0).astype('int64')
+
+
+def _persons(rng, n: int, keys: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
+    def cond(m):
+        # In-range codes, 0, out-of-range and nulls.
+        return pd.array(np.where(rng.random(m) < .2, None, rng.integers(0, 8, m)), dtype='Int8')
+    o = pd.DataFrame({
+        **{k: v(n) for k, v in keys.items()},
+        'pos': pd.array(np.where(rng.random(n) < .1, None, rng.integers(0, 13, n)), dtype='Int8'),
+        'condition': cond(n),
+    })
+    m = n // 5
+    p = pd.DataFrame({
+        **{k: v(m) for k, v in keys.items()},
+        'cyclist': rng.random(m) < .3,
+        'condition': cond(m),
+    })
+    return o, p
+
+
+def test_person_vtc_crash_id():
+    rng = np.random.default_rng(0)
+    o, p = _persons(rng, 20_000, {'crash_id': lambda m: rng.integers(0, 3_000, m)})
+    pd.testing.assert_frame_equal(person_vtc(o, p, ['crash_id']), _reference(o, p, ['crash_id']), check_names=False)
+
+
+def test_person_vtc_pk():
+    rng = np.random.default_rng(1)
+    keys = {
+        'year': lambda m: rng.integers(2023, 2025, m).astype('int16'),
+        'cc': lambda m: pd.array(np.where(rng.random(m) < .01, None, rng.integers(1, 22, m)), dtype='Int8'),
+        'mc': lambda m: pd.array(rng.integers(1, 30, m), dtype='Int16'),
+        'case': lambda m: [f'c{i}' for i in rng.integers(0, 50, m)],
+    }
+    o, p = _persons(rng, 20_000, keys)
+    pk = list(keys)
+    act = person_vtc(o, p, pk)
+    exp = _reference(o, p, pk)
+    assert act.index.equals(exp.index)
+    assert (act.to_numpy() == exp.to_numpy()).all()